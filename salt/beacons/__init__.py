@@ -7,6 +7,8 @@ from __future__ import absolute_import
 import logging
 import copy
 import re
+import threading
+import time
 
 # Import Salt libs
 import salt.loader
@@ -27,10 +29,26 @@ class Beacon(object):
         self.functions = functions
         self.beacons = salt.loader.beacons(opts, functions)
         self.interval_map = dict()
+        # The beacons being run, with the time they were started. The minion
+        # may run the beacons in a worker thread and leave a beacon running
+        # past beacons_timeout behind, it is skipped until it returns.
+        self.running = dict()
+        # Bumped when the minion leaves a worker behind, see abandon()
+        self.generation = 0
+        self.lock = threading.Lock()
 
-    def process(self, config, grains):
+    def abandon(self):
         '''
-        Process the configured beacons
+        Make the runs of process() started before stop once their current
+        beacon returns
+        '''
+        with self.lock:
+            self.generation += 1
+
+    def process(self, config, grains, generation=None):
+        '''
+        Process the configured beacons. When a ``generation`` is passed, the
+        run stops before the next beacon once abandon() was called.
 
         The config must be a list and looks like this in yaml
 
@@ -48,6 +66,9 @@ class Beacon(object):
         for mod in config:
             if mod == 'enabled':
                 continue
+            if generation is not None and generation != self.generation:
+                log.debug('Stopping an abandoned run of the beacons')
+                break
 
             # Convert beacons that are lists to a dict to make processing easier
             current_beacon_config = None
@@ -71,6 +92,9 @@ class Beacon(object):
             log.trace('Beacon processing: %s', mod)
             fun_str = '{0}.beacon'.format(mod)
             validate_str = '{0}.validate'.format(mod)
+            if mod in self.running:
+                log.trace('Skipping beacon %s. It is still running.', mod)
+                continue
             if fun_str in self.beacons:
                 runonce = self._determine_beacon_config(current_beacon_config, 'run_once')
                 interval = self._determine_beacon_config(current_beacon_config, 'interval')
@@ -109,7 +133,16 @@ class Beacon(object):
                         continue
 
                 # Fire the beacon!
-                raw = self.beacons[fun_str](b_config[mod])
+                with self.lock:
+                    if generation is not None and generation != self.generation:
+                        break
+                    if mod in self.running:
+                        continue
+                    self.running[mod] = time.time()
+                try:
+                    raw = self.beacons[fun_str](b_config[mod])
+                finally:
+                    self.running.pop(mod, None)
                 for data in raw:
                     tag = 'salt/beacon/{0}/{1}/'.format(self.opts['id'], mod)
                     if 'tag' in data:
@@ -150,19 +183,19 @@ class Beacon(object):
         Return True if a beacon should be run on this loop
         '''
         log.trace('Processing interval %s for beacon mod %s', interval, mod)
-        loop_interval = self.opts['loop_interval']
+        now = time.time()
         if mod in self.interval_map:
             log.trace('Processing interval in map')
-            counter = self.interval_map[mod]
-            log.trace('Interval counter: %s', counter)
-            if counter * loop_interval >= interval:
-                self.interval_map[mod] = 1
+            # Run the beacon on the loop closest to the end of its interval,
+            # the beacons are processed every loop_interval
+            elapsed = now - self.interval_map[mod]
+            log.trace('Interval elapsed: %s', elapsed)
+            if elapsed + self.opts['loop_interval'] / 2.0 >= interval:
+                self.interval_map[mod] = now
                 return True
-            else:
-                self.interval_map[mod] += 1
         else:
             log.trace('Interval process inserting mod: %s', mod)
-            self.interval_map[mod] = 1
+            self.interval_map[mod] = now
         return False
 
     def _get_index(self, beacon_config, label):
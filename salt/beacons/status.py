@@ -25,6 +25,10 @@ functions will be returned:
     - meminfo
     - vmstats
     - time
+    - jobs
+
+The ``jobs`` function reports the number of running jobs and the depth of the
+minion's job queue, see :conf_minion:`process_count_max`.
 
 You can also configure your own set of functions to be returned:
 
@@ -136,6 +140,7 @@ def beacon(config):
             'meminfo': ['all'],
             'vmstats': ['all'],
             'time': ['all'],
+            'jobs': ['all'],
         }]
 
     if not isinstance(config, list):
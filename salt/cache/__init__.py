@@ -8,6 +8,7 @@ Loader mechanism for caching data, with data expiration, etc.
 # Import Python libs
 from __future__ import absolute_import
 import logging
+import os
 import time
 
 # Import Salt libs
@@ -17,6 +18,7 @@ from salt.payload import Serial
 from salt.utils.odict import OrderedDict
 import salt.loader
 import salt.syspaths
+import salt.utils.cache
 
 log = logging.getLogger(__name__)
 
@@ -179,6 +181,72 @@ class Cache(object):
         fun = '{0}.fetch'.format(self.driver)
         return self.modules[fun](bank, key, **self._kwargs)
 
+    def fetch_many(self, bank_keys):
+        '''
+        Fetch the data of many keys, with a single call to the cache driver if
+        it supports it
+
+        :param bank_keys:
+            An iterable of ``(bank, key)`` tuples.
+
+        :return:
+            Return a dict mapping the ``(bank, key)`` tuples to the python
+            objects fetched from the cache, or empty dicts for the keys not
+            found.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        '''
+        bank_keys = list(bank_keys)
+        fun = '{0}.fetch_many'.format(self.driver)
+        if fun in self.modules:
+            return self.modules[fun](bank_keys, **self._kwargs)
+        return dict((bank_key, self.fetch(*bank_key)) for bank_key in bank_keys)
+
+    def store_many(self, data):
+        '''
+        Store the data of many keys, with a single call to the cache driver if
+        it supports it
+
+        :param data:
+            A dict mapping ``(bank, key)`` tuples to the data to store.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        '''
+        fun = '{0}.store_many'.format(self.driver)
+        if fun in self.modules:
+            return self.modules[fun](data, **self._kwargs)
+        for (bank, key), value in six.iteritems(data):
+            self.store(bank, key, value)
+
+    def list_with_data(self, bank):
+        '''
+        Fetch the data of all the keys of a bank, with a single call to the
+        cache driver if it supports it
+
+        :param bank:
+            The name of the location inside the cache which will hold the key
+            and its associated data.
+
+        :return:
+            Return a dict mapping the keys of the bank to the python objects
+            fetched from the cache. The sub-banks are left out.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        '''
+        fun = '{0}.list_with_data'.format(self.driver)
+        if fun in self.modules:
+            return self.modules[fun](bank, **self._kwargs)
+        fetched = self.fetch_many((bank, key) for key in self.list(bank))
+        # The drivers fetch an empty dict for the sub-banks
+        return dict((key, value) for (_, key), value in six.iteritems(fetched)
+                    if value != {})
+
     def updated(self, bank, key):
         '''
         Get the last updated epoch for the specified key
@@ -273,9 +341,24 @@ class MemCache(Cache):
     '''
     Short-lived in-memory cache store keeping values on time and/or size (count)
     basis.
+
+    The values are kept for ``memcache_expire_seconds`` after they were read
+    from the cache driver, the least recently used one is dropped when the
+    storage holds ``memcache_max_items`` values.
+
+    With ``memcache_shared`` the processes using the same cache directory
+    share a table of generation counters (see
+    :py:class:`salt.utils.cache.CacheGenerations`): storing or flushing a
+    key makes the other processes read it again from the cache driver on its
+    next fetch instead of serving their copy until it expires.
     '''
-    # {<storage_id>: odict({<key>: [atime, data], ...}), ...}
+    # {<storage_id>: odict({<key>: [time read, data, version], ...}), ...}
     data = {}
+    # {<storage_id>: {<counter>: <value>, ...}, ...}
+    stats = {}
+    # {<path>: CacheGenerations or None, ...}
+    generations = {}
+    STATS_COUNTERS = ('hit', 'miss', 'expired', 'invalidated', 'evicted')
 
     def __init__(self, opts, **kwargs):
         super(MemCache, self).__init__(opts, **kwargs)
@@ -283,25 +366,24 @@ class MemCache(Cache):
         self.max = opts.get('memcache_max_items', 1024)
         self.cleanup = opts.get('memcache_full_cleanup', False)
         self.debug = opts.get('memcache_debug', False)
-        if self.debug:
-            self.call = 0
-            self.hit = 0
+        self.shared = opts.get('memcache_shared', False)
         self._storage = None
-
-    @classmethod
-    def __cleanup(cls, expire):
-        now = time.time()
-        for storage in six.itervalues(cls.data):
-            for key, data in list(storage.items()):
-                if data[0] + expire < now:
-                    del storage[key]
-                else:
-                    break
+        self._stats = None
+        self._generations = None
+
+    def __cleanup(self, now):
+        # Drop the expired values at the least recently used end
+        while self.storage:
+            bank_key = next(iter(self.storage))
+            if self.storage[bank_key][0] + self.expire >= now:
+                break
+            del self.storage[bank_key]
+            self._stats['expired'] += 1
 
     def _get_storage_id(self):
         fun = '{0}.storage_id'.format(self.driver)
         if fun in self.modules:
-            return self.modules[fun](self.kwargs)
+            return self.modules[fun](self._kwargs)
         else:
             return self.driver
 
@@ -311,47 +393,151 @@ class MemCache(Cache):
             storage_id = self._get_storage_id()
             if storage_id not in MemCache.data:
                 MemCache.data[storage_id] = OrderedDict()
+                MemCache.stats[storage_id] = dict.fromkeys(self.STATS_COUNTERS, 0)
             self._storage = MemCache.data[storage_id]
+            self._stats = MemCache.stats[storage_id]
         return self._storage
 
-    def fetch(self, bank, key):
+    @property
+    def gens(self):
+        '''
+        The generation counters shared with the other processes, ``None``
+        if they are disabled or cannot be used
+        '''
+        if not self.shared:
+            return None
+        if self._generations is None:
+            path = os.path.join(self.cachedir, '.memcache_generations')
+            if path not in MemCache.generations:
+                try:
+                    if not os.path.isdir(self.cachedir):
+                        os.makedirs(self.cachedir)
+                    MemCache.generations[path] = salt.utils.cache.CacheGenerations(path)
+                except (IOError, OSError, ValueError) as exc:
+                    log.warning('Unable to share the memcache invalidations '
+                                'through %s, the values are kept until they '
+                                'expire: %s', path, exc)
+                    MemCache.generations[path] = None
+            self._generations = MemCache.generations[path]
+        return self._generations
+
+    def _version(self, bank, key):
+        gens = self.gens
+        return gens.version(bank, key) if gens is not None else None
+
+    def _changed(self, bank, key=None):
+        gens = self.gens
+        if gens is not None:
+            gens.bump(bank, key)
+
+    def _lookup(self, bank_key, now):
+        '''
+        Return the record of a valid cached value and move it to the most
+        recently used end, or None
+        '''
+        record = self.storage.pop(bank_key, None)
+        if record is None:
+            self._stats['miss'] += 1
+            return None
+        if record[0] + self.expire < now:
+            self._stats['expired'] += 1
+            self._stats['miss'] += 1
+            return None
+        if record[2] is not None and record[2] != self._version(*bank_key):
+            self._stats['invalidated'] += 1
+            self._stats['miss'] += 1
+            return None
+        self._stats['hit'] += 1
+        self.storage[bank_key] = record
+        return record
+
+    def _log_stats(self):
         if self.debug:
-            self.call += 1
+            total = self._stats['hit'] + self._stats['miss']
+            log.debug('MemCache stats (%s): %s, hit rate %s',
+                      self._get_storage_id(),
+                      ', '.join('{0} {1}'.format(name, self._stats[name])
+                                for name in self.STATS_COUNTERS),
+                      float(self._stats['hit']) / total if total else 0.0)
+
+    def get_stats(self):
+        '''
+        Return the hit, miss, expiration, invalidation and eviction counts of
+        the storage in this process
+        '''
+        self.storage  # pylint: disable=pointless-statement
+        return dict(self._stats)
+
+    def fetch(self, bank, key):
         now = time.time()
-        record = self.storage.pop((bank, key), None)
-        # Have a cached value for the key
-        if record is not None and record[0] + self.expire >= now:
-            if self.debug:
-                self.hit += 1
-                log.debug('MemCache stats (call/hit/rate): '
-                          '{0}/{1}/{2}'.format(self.call,
-                                               self.hit,
-                                               float(self.hit) / self.call))
-            # update atime and return
-            record[0] = now
-            self.storage[(bank, key)] = record
+        record = self._lookup((bank, key), now)
+        self._log_stats()
+        if record is not None:
             return record[1]
 
         # Have no value for the key or value is expired
+        version = self._version(bank, key)
         data = super(MemCache, self).fetch(bank, key)
+        self._remember((bank, key), data, now, version)
+        return data
+
+    def fetch_many(self, bank_keys):
+        now = time.time()
+        ret = {}
+        missing = []
+        for bank_key in bank_keys:
+            record = self._lookup(bank_key, now)
+            if record is not None:
+                ret[bank_key] = record[1]
+            else:
+                missing.append(bank_key)
+        self._log_stats()
+        if missing:
+            versions = [self._version(*bank_key) for bank_key in missing]
+            fetched = super(MemCache, self).fetch_many(missing)
+            for bank_key, version in zip(missing, versions):
+                if bank_key in fetched:
+                    self._remember(bank_key, fetched[bank_key], now, version)
+            ret.update(fetched)
+        return ret
+
+    def _remember(self, bank_key, data, now, version=None):
+        self.storage.pop(bank_key, None)
         if len(self.storage) >= self.max:
             if self.cleanup:
-                MemCache.__cleanup(self.expire)
+                self.__cleanup(now)
             if len(self.storage) >= self.max:
                 self.storage.popitem(last=False)
-        self.storage[(bank, key)] = [now, data]
-        return data
+                self._stats['evicted'] += 1
+        self.storage[bank_key] = [now, data, version]
 
     def store(self, bank, key, data):
         self.storage.pop((bank, key), None)
         super(MemCache, self).store(bank, key, data)
-        if len(self.storage) >= self.max:
-            if self.cleanup:
-                MemCache.__cleanup(self.expire)
-            if len(self.storage) >= self.max:
-                self.storage.popitem(last=False)
-        self.storage[(bank, key)] = [time.time(), data]
+        self._changed(bank, key)
+        if self.gens is None:
+            # Another process may store the key after this one, the shared
+            # values are read again on the next fetch
+            self._remember((bank, key), data, time.time())
+
+    def store_many(self, data):
+        for bank_key in data:
+            self.storage.pop(bank_key, None)
+        super(MemCache, self).store_many(data)
+        for bank, key in data:
+            self._changed(bank, key)
+        if self.gens is None:
+            now = time.time()
+            for bank_key, value in six.iteritems(data):
+                self._remember(bank_key, value, now)
 
     def flush(self, bank, key=None):
-        self.storage.pop((bank, key), None)
+        if key is not None:
+            self.storage.pop((bank, key), None)
+        else:
+            prefix = bank.rstrip('/') + '/'
+            for bank_key in [bank_key for bank_key in self.storage
+                             if bank_key[0] == bank or bank_key[0].startswith(prefix)]:
+                del self.storage[bank_key]
         super(MemCache, self).flush(bank, key)
+        self._changed(bank, key)
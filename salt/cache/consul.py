@@ -47,6 +47,7 @@ value to ``consul``:
 
 '''
 from __future__ import absolute_import
+import base64
 import logging
 try:
     import consul
@@ -55,10 +56,15 @@ except ImportError:
     HAS_CONSUL = False
 
 from salt.exceptions import SaltCacheError
+from salt.ext import six
+from salt.ext.six.moves import range
 
 log = logging.getLogger(__name__)
 api = None
 
+# The number of operations Consul accepts in a transaction
+_TXN_OPS = 64
+
 
 # Define the module's virtual name
 __virtualname__ = 'consul'
@@ -126,6 +132,93 @@ def fetch(bank, key):
         )
 
 
+def _txn(ops):
+    '''
+    Run the KV operations in transactions, return the KV results
+    '''
+    results = []
+    for idx in range(0, len(ops), _TXN_OPS):
+        ret = api.txn.put([{'KV': op} for op in ops[idx:idx + _TXN_OPS]])
+        if ret.get('Errors'):
+            raise SaltCacheError(
+                'The Consul transaction failed: {0}'.format(ret['Errors'])
+            )
+        results.extend(result['KV'] for result in ret.get('Results') or [])
+    return results
+
+
+def fetch_many(bank_keys):
+    '''
+    Fetch many key values, with transactions.
+    '''
+    bank_keys = list(bank_keys)
+    if not hasattr(api, 'txn'):
+        # python-consul < 1.0
+        return dict((bank_key, fetch(*bank_key)) for bank_key in bank_keys)
+    c_keys = dict(('{0}/{1}'.format(*bank_key), bank_key) for bank_key in bank_keys)
+    ret = dict((bank_key, {}) for bank_key in bank_keys)
+    try:
+        # A get fails the whole transaction if the key does not exist, a
+        # get-tree of the key does not
+        results = _txn([{'Verb': 'get-tree', 'Key': c_key} for c_key in c_keys])
+        for result in results:
+            # The tree also holds the keys starting with the same name
+            if result['Key'] in c_keys and result.get('Value') is not None:
+                ret[c_keys[result['Key']]] = __context__['serial'].loads(
+                    base64.b64decode(result['Value']))
+    except SaltCacheError:
+        raise
+    except Exception as exc:
+        raise SaltCacheError(
+            'There was an error reading the keys: {0}'.format(exc)
+        )
+    return ret
+
+
+def store_many(data):
+    '''
+    Store many key values, with transactions.
+    '''
+    if not hasattr(api, 'txn'):
+        # python-consul < 1.0
+        for (bank, key), value in six.iteritems(data):
+            store(bank, key, value)
+        return
+    try:
+        _txn([{'Verb': 'set',
+               'Key': '{0}/{1}'.format(bank, key),
+               'Value': base64.b64encode(__context__['serial'].dumps(value)).decode('ascii')}
+              for (bank, key), value in six.iteritems(data)])
+    except SaltCacheError:
+        raise
+    except Exception as exc:
+        raise SaltCacheError(
+            'There was an error writing the keys: {0}'.format(exc)
+        )
+
+
+def list_with_data(bank):
+    '''
+    Fetch all the key values of a bank, with a single recursive read.
+    '''
+    try:
+        _, values = api.kv.get(bank + '/', recurse=True)
+    except Exception as exc:
+        raise SaltCacheError(
+            'There was an error getting the key "{0}": {1}'.format(
+                bank, exc
+            )
+        )
+    ret = {}
+    for value in values or []:
+        key = value['Key'][len(bank) + 1:]
+        # Leave out the keys of the sub-banks
+        if not key or '/' in key or value['Value'] is None:
+            continue
+        ret[key] = __context__['serial'].loads(value['Value'])
+    return ret
+
+
 def flush(bank, key=None):
     '''
     Remove the key from the cache bank with all the key content.
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+'''
+LMDB
+====
+
+Cache data in a local LMDB database.
+
+.. versionadded:: Oxygen
+
+:depends: lmdb Python module
+
+The ``localfs`` cache writes every key to its own file through a temporary
+file and a rename, and opens the file again on every fetch. With tens of
+thousands of minions the files and their inodes, and the metadata updates
+of every write, dominate the cost of the minion data cache. This module
+keeps all the banks and keys in a single `LMDB`_ database: the reads are
+served from a memory map of the database without a system call, the writes
+of ``store_many`` share one transaction, and ``list`` is a range scan.
+
+The database is local to the master, it is shared by the master processes
+and the CLI tools running on the same host. To use it set in the master
+configuration:
+
+.. code-block:: yaml
+
+    cache: lmdb
+
+The following options are available:
+
+cache.lmdb.path: ``<cachedir>/lmdb``
+    The directory holding the database.
+
+cache.lmdb.map_size: ``1073741824``
+    The initial size in bytes of the memory map, and so of the largest
+    database. The map is doubled when it gets full.
+
+cache.lmdb.sync: ``True``
+    Flush the database to the disk at the end of every write transaction.
+    Without it a crash of the host can lose the last writes, but not corrupt
+    the database.
+
+cache.lmdb.max_readers: ``512``
+    The largest number of threads and processes reading the database at the
+    same time.
+
+The data of the ``localfs`` cache can be copied into the database with the
+:py:func:`cache.migrate <salt.runners.cache.migrate>` runner before
+switching the master to it:
+
+.. code-block:: bash
+
+    salt-run cache.migrate source=localfs target=lmdb
+
+Layout
+------
+
+A key is stored under ``<bank>\\0<key>``, with the value prefixed with the
+time it was stored. The keys of a bank are therefore contiguous, followed
+by the keys of its sub-banks (``<bank>/<sub-bank>\\0<key>``), and listing or
+flushing a bank only visits the records under it.
+
+.. _`LMDB`: https://symas.com/lmdb/
+'''
+from __future__ import absolute_import
+import logging
+import os
+import struct
+import time
+
+# Import third party libs
+try:
+    import lmdb
+    HAS_LMDB = True
+except ImportError:
+    HAS_LMDB = False
+
+# Import salt libs
+import salt.syspaths
+import salt.utils.stringutils
+from salt.exceptions import SaltCacheError
+from salt.ext import six
+
+log = logging.getLogger(__name__)
+
+__virtualname__ = 'lmdb'
+__func_alias__ = {'list_': 'list'}
+
+# The environments opened by this process, LMDB environments cannot be used
+# after a fork: {(path, pid): lmdb.Environment}
+_ENVS = {}
+
+# The store time prefixing the values
+_STAMP = struct.Struct('<d')
+
+
+def __virtual__():
+    '''
+    The lmdb library must be installed for this module to work.
+    '''
+    if not HAS_LMDB:
+        return (False, 'Please install the python lmdb package.')
+    return __virtualname__
+
+
+def __cachedir(kwargs=None):
+    if kwargs and 'cachedir' in kwargs:
+        return kwargs['cachedir']
+    return __opts__.get('cachedir', salt.syspaths.CACHE_DIR)
+
+
+def init_kwargs(kwargs):
+    return {'path': __opts__.get('cache.lmdb.path',
+                                 os.path.join(__cachedir(kwargs), 'lmdb'))}
+
+
+def storage_id(kwargs):
+    return ('lmdb', kwargs['path'])
+
+
+def _env(path):
+    '''
+    Return the environment of the database in ``path``, opened once per
+    process
+    '''
+    pid = os.getpid()
+    env = _ENVS.get((path, pid))
+    if env is None:
+        try:
+            if not os.path.isdir(path):
+                os.makedirs(path)
+            env = lmdb.open(path,
+                            map_size=__opts__.get('cache.lmdb.map_size', 1024 ** 3),
+                            max_readers=__opts__.get('cache.lmdb.max_readers', 512),
+                            sync=__opts__.get('cache.lmdb.sync', True),
+                            metasync=__opts__.get('cache.lmdb.sync', True))
+        except (OSError, lmdb.Error) as exc:
+            raise SaltCacheError(
+                'Unable to open the cache database {0}: {1}'.format(path, exc)
+            )
+        _ENVS[(path, pid)] = env
+    return env
+
+
+def _run(path, func, write=False):
+    '''
+    Call ``func`` with a transaction of the database in ``path``, growing the
+    memory map when it is full or was grown by another process
+    '''
+    env = _env(path)
+    while True:
+        try:
+            with env.begin(write=write) as txn:
+                return func(txn)
+        except lmdb.MapResizedError:
+            # Adopt the size set by another process
+            env.set_mapsize(0)
+        except lmdb.MapFullError:
+            size = env.info()['map_size'] * 2
+            log.info('The cache database %s is full, growing it to %s bytes',
+                     path, size)
+            env.set_mapsize(size)
+        except lmdb.Error as exc:
+            raise SaltCacheError(
+                'There was an error accessing the cache database {0}: {1}'.format(
+                    path, exc
+                )
+            )
+
+
+def _bank(bank):
+    return bank.strip('/') if bank else ''
+
+
+def _key(bank, key):
+    return salt.utils.stringutils.to_bytes(u'{0}\0{1}'.format(_bank(bank), key))
+
+
+def _prefixes(bank):
+    '''
+    Return the prefixes of the keys and of the sub-banks of a bank
+    '''
+    bank = _bank(bank)
+    return (salt.utils.stringutils.to_bytes(u'{0}\0'.format(bank)),
+            salt.utils.stringutils.to_bytes(u'{0}/'.format(bank)) if bank else b'')
+
+
+def _dumps(data):
+    return _STAMP.pack(time.time()) + __context__['serial'].dumps(data)
+
+
+def _loads(value):
+    if value is None:
+        return {}
+    return __context__['serial'].loads(value[_STAMP.size:])
+
+
+def _iter_prefix(txn, prefix):
+    cursor = txn.cursor()
+    if not cursor.set_range(prefix):
+        return
+    for key, value in cursor:
+        if not key.startswith(prefix):
+            return
+        yield key, value
+
+
+def store(bank, key, data, path):
+    '''
+    Store information in the database.
+    '''
+    value = _dumps(data)
+    _run(path, lambda txn: txn.put(_key(bank, key), value), write=True)
+
+
+def store_many(data, path):
+    '''
+    Store the data of many keys in a single transaction.
+    '''
+    values = [(_key(bank, key), _dumps(value))
+              for (bank, key), value in six.iteritems(data)]
+
+    def _store(txn):
+        for key, value in values:
+            txn.put(key, value)
+    _run(path, _store, write=True)
+
+
+def fetch(bank, key, path):
+    '''
+    Fetch information from the database.
+    '''
+    return _loads(_run(path, lambda txn: txn.get(_key(bank, key))))
+
+
+def fetch_many(bank_keys, path):
+    '''
+    Fetch the data of many keys in a single transaction.
+    '''
+    bank_keys = list(bank_keys)
+    values = _run(path, lambda txn: [txn.get(_key(bank, key))
+                                     for bank, key in bank_keys])
+    return dict((bank_key, _loads(value))
+                for bank_key, value in zip(bank_keys, values))
+
+
+def list_with_data(bank, path):
+    '''
+    Fetch the data of all the keys of a bank in a single transaction.
+    '''
+    prefix = _prefixes(bank)[0]
+    values = _run(path, lambda txn: list(_iter_prefix(txn, prefix)))
+    return dict((salt.utils.stringutils.to_str(key[len(prefix):]), _loads(value))
+                for key, value in values)
+
+
+def updated(bank, key, path):
+    '''
+    Return the epoch of the time this key was stored
+    '''
+    value = _run(path, lambda txn: txn.get(_key(bank, key)))
+    if value is None:
+        log.warning('Cache key "%s" of bank "%s" does not exist', key, bank)
+        return None
+    return int(_STAMP.unpack(value[:_STAMP.size])[0])
+
+
+def flush(bank, key=None, path=None):
+    '''
+    Remove the key from the cache bank with all the key content.
+    '''
+    if path is None:
+        path = init_kwargs({})['path']
+    if key is not None:
+        return _run(path, lambda txn: txn.delete(_key(bank, key)), write=True)
+
+    def _flush(txn):
+        removed = False
+        for prefix in _prefixes(bank):
+            cursor = txn.cursor()
+            if not cursor.set_range(prefix):
+                continue
+            # delete() moves the cursor to the next record
+            while cursor.key().startswith(prefix):
+                removed = True
+                if not cursor.delete():
+                    break
+        return removed
+    return _run(path, _flush, write=True)
+
+
+def list_(bank, path):
+    '''
+    Return an iterable object containing all entries stored in the specified bank.
+    '''
+    keys_prefix, banks_prefix = _prefixes(bank)
+
+    def _list(txn):
+        ret = [key[len(keys_prefix):] for key, _ in _iter_prefix(txn, keys_prefix)]
+        # Jump from sub-bank to sub-bank instead of visiting their keys
+        cursor = txn.cursor()
+        seen = set()
+        start = banks_prefix
+        while cursor.set_range(start):
+            if not cursor.key().startswith(banks_prefix):
+                break
+            rest = cursor.key()[len(banks_prefix):]
+            end = min(idx for idx in (rest.find(b'/'), rest.find(b'\0'))
+                      if idx >= 0)
+            name = rest[:end]
+            if name and name not in seen:
+                seen.add(name)
+                ret.append(name)
+            start = banks_prefix + name + six.int2byte(six.indexbytes(rest, end) + 1)
+        return ret
+    return [salt.utils.stringutils.to_str(name) for name in _run(path, _list)]
+
+
+def contains(bank, key, path):
+    '''
+    Checks if the specified bank contains the specified key.
+    '''
+    if key is not None:
+        return _run(path, lambda txn: txn.get(_key(bank, key)) is not None)
+
+    def _contains(txn):
+        for prefix in _prefixes(bank):
+            for _ in _iter_prefix(txn, prefix):
+                return True
+        return False
+    return _run(path, _contains)
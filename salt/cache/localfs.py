@@ -16,15 +16,22 @@ import os
 import os.path
 import shutil
 import tempfile
+from multiprocessing.pool import ThreadPool
 
 from salt.exceptions import SaltCacheError
 import salt.utils.atomicfile
 import salt.utils.files
+from salt.ext import six
 
 log = logging.getLogger(__name__)
 
 __func_alias__ = {'list_': 'list'}
 
+# The number of threads reading the files of fetch_many, which reads fewer
+# keys than PARALLEL_MIN_KEYS in the calling thread
+READ_THREADS = 8
+PARALLEL_MIN_KEYS = 16
+
 
 def __cachedir(kwargs=None):
     if kwargs and 'cachedir' in kwargs:
@@ -98,6 +105,45 @@ def fetch(bank, key, cachedir):
         )
 
 
+def fetch_many(bank_keys, cachedir):
+    '''
+    Fetch information from many files, read in parallel.
+    '''
+    bank_keys = list(bank_keys)
+
+    def _fetch(bank_key):
+        return fetch(bank_key[0], bank_key[1], cachedir)
+
+    if len(bank_keys) < PARALLEL_MIN_KEYS:
+        return dict((bank_key, _fetch(bank_key)) for bank_key in bank_keys)
+    pool = ThreadPool(READ_THREADS)
+    try:
+        values = pool.map(_fetch, bank_keys)
+    finally:
+        pool.close()
+        pool.join()
+    return dict(zip(bank_keys, values))
+
+
+def list_with_data(bank, cachedir):
+    '''
+    Fetch information from all the files of a bank.
+    '''
+    base = os.path.join(cachedir, os.path.normpath(bank))
+    if not os.path.isdir(base):
+        return {}
+    try:
+        keys = [item[:-2] for item in os.listdir(base) if item.endswith('.p')]
+    except OSError as exc:
+        raise SaltCacheError(
+            'There was an error accessing directory "{0}": {1}'.format(
+                base, exc
+            )
+        )
+    return dict((key, value) for (_, key), value in
+                six.iteritems(fetch_many([(bank, key) for key in keys], cachedir)))
+
+
 def updated(bank, key, cachedir):
     '''
     Return the epoch of the mtime for this cache file
@@ -161,7 +207,7 @@ def list_(bank, cachedir):
     ret = []
     for item in items:
         if item.endswith('.p'):
-            ret.append(item.rstrip(item[-2:]))
+            ret.append(item[:-2])
         else:
             ret.append(item)
     return ret
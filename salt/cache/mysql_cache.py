@@ -53,10 +53,14 @@ except ImportError:
     HAS_MYSQL = False
 
 from salt.exceptions import SaltCacheError
+from salt.ext.six.moves import range
 
 _DEFAULT_DATABASE_NAME = "salt_cache"
 _DEFAULT_CACHE_TABLE_NAME = "cache"
 _RECONNECT_INTERVAL_SEC = 0.050
+# The number of rows read or written by each query of fetch_many and
+# store_many
+_BATCH_SIZE = 500
 
 log = logging.getLogger(__name__)
 client = None
@@ -79,16 +83,16 @@ def __virtual__():
     return __virtualname__
 
 
-def run_query(conn, query, retries=3):
+def run_query(conn, query, retries=3, args=None):
     '''
-    Get a cursor and run a query. Reconnect up to `retries` times if
-    needed.
+    Get a cursor and run a query, with the parameters in `args`. Reconnect up
+    to `retries` times if needed.
     Returns: cursor, affected rows counter
     Raises: SaltCacheError, AttributeError, MySQLdb.OperationalError
     '''
     try:
         cur = conn.cursor()
-        out = cur.execute(query)
+        out = cur.execute(query, args)
         return cur, out
     except (AttributeError, MySQLdb.OperationalError) as e:
         if retries == 0:
@@ -101,7 +105,7 @@ def run_query(conn, query, retries=3):
             log.info("mysql_cache: recreating db connection due to: %r", e)
         global client
         client = MySQLdb.connect(**_mysql_kwargs)
-        return run_query(client, query, retries - 1)
+        return run_query(client, query, retries - 1, args)
     except Exception as e:
         if len(query) > 150:
             query = query[:150] + "<...>"
@@ -197,6 +201,55 @@ def fetch(bank, key):
     return __context__['serial'].loads(r[0])
 
 
+def fetch_many(bank_keys):
+    '''
+    Fetch many key values, with an IN query.
+    '''
+    _init_client()
+    bank_keys = list(bank_keys)
+    ret = dict((bank_key, {}) for bank_key in bank_keys)
+    for idx in range(0, len(bank_keys), _BATCH_SIZE):
+        batch = bank_keys[idx:idx + _BATCH_SIZE]
+        query = "SELECT bank, etcd_key, data FROM {0} WHERE (bank, etcd_key) " \
+            "IN ({1})".format(_table_name, ', '.join(['(%s, %s)'] * len(batch)))
+        cur, _ = run_query(client, query,
+                           args=[item for bank_key in batch for item in bank_key])
+        for bank, key, data in cur.fetchall():
+            ret[(bank, key)] = __context__['serial'].loads(data)
+        cur.close()
+    return ret
+
+
+def store_many(data):
+    '''
+    Store many key values, with multi-row REPLACE queries.
+    '''
+    _init_client()
+    items = list(data.items())
+    for idx in range(0, len(items), _BATCH_SIZE):
+        batch = items[idx:idx + _BATCH_SIZE]
+        query = "REPLACE INTO {0} (bank, etcd_key, data) VALUES {1}".format(
+            _table_name, ', '.join(['(%s, %s, %s)'] * len(batch)))
+        args = []
+        for (bank, key), value in batch:
+            args.extend([bank, key, __context__['serial'].dumps(value)])
+        cur, _ = run_query(client, query, args=args)
+        cur.close()
+
+
+def list_with_data(bank):
+    '''
+    Fetch all the key values of a bank.
+    '''
+    _init_client()
+    query = "SELECT etcd_key, data FROM {0} WHERE bank=%s".format(_table_name)
+    cur, _ = run_query(client, query, args=[bank])
+    out = dict((row[0], __context__['serial'].loads(row[1]))
+               for row in cur.fetchall())
+    cur.close()
+    return out
+
+
 def flush(bank, key=None):
     '''
     Remove the key from the cache bank with all the key content.
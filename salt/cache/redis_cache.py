@@ -153,6 +153,8 @@ except ImportError:
     HAS_REDIS_CLUSTER = False
 
 # Import salt
+import salt.utils.stringutils
+from salt.ext import six
 from salt.ext.six.moves import range
 from salt.exceptions import SaltCacheError
 
@@ -169,6 +171,8 @@ _BANK_PREFIX = '$BANK'
 _KEY_PREFIX = '$KEY'
 _BANK_KEYS_PREFIX = '$BANKEYS'
 _SEPARATOR = '_'
+# The number of keys read by each MGET of fetch_many
+_MGET_BATCH = 1000
 
 REDIS_SERVER = None
 
@@ -375,6 +379,71 @@ def fetch(bank, key):
     return __context__['serial'].loads(redis_value)
 
 
+def fetch_many(bank_keys):
+    '''
+    Fetch the data of many keys from the Redis cache, with MGET.
+    '''
+    bank_keys = list(bank_keys)
+    redis_server = _get_redis_server()
+    redis_keys = [_get_key_redis_key(bank, key) for bank, key in bank_keys]
+    ret = {}
+    try:
+        for idx in range(0, len(redis_keys), _MGET_BATCH):
+            redis_values = redis_server.mget(redis_keys[idx:idx + _MGET_BATCH])
+            for bank_key, redis_value in zip(bank_keys[idx:idx + _MGET_BATCH], redis_values):
+                if redis_value is None:
+                    ret[bank_key] = {}
+                else:
+                    ret[bank_key] = __context__['serial'].loads(redis_value)
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = 'Cannot fetch the Redis cache keys: {rerr}'.format(rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+    return ret
+
+
+def store_many(data):
+    '''
+    Store the data of many keys in the Redis cache, with a single pipeline.
+    '''
+    redis_server = _get_redis_server()
+    redis_pipe = redis_server.pipeline()
+    banks = set()
+    try:
+        for (bank, key), value in six.iteritems(data):
+            if bank not in banks:
+                _build_bank_hier(bank, redis_pipe)
+                banks.add(bank)
+            redis_pipe.set(_get_key_redis_key(bank, key),
+                           __context__['serial'].dumps(value))
+            redis_pipe.sadd(_get_bank_keys_redis_key(bank), key)
+        redis_pipe.execute()
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = 'Cannot set the Redis cache keys: {rerr}'.format(rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+
+
+def list_with_data(bank):
+    '''
+    Fetch the data of all the keys of a bank from the Redis cache.
+    '''
+    redis_server = _get_redis_server()
+    bank_keys_redis_key = _get_bank_keys_redis_key(bank)
+    try:
+        keys = redis_server.smembers(bank_keys_redis_key)
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = 'Cannot list the Redis cache key {rkey}: {rerr}'.format(rkey=bank_keys_redis_key,
+                                                                       rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+    if not keys:
+        return {}
+    keys = [salt.utils.stringutils.to_str(key) for key in keys]
+    return dict((key, value) for (_, key), value in
+                six.iteritems(fetch_many([(bank, key) for key in keys])))
+
+
 def flush(bank, key=None):
     '''
     Remove the key from the cache bank with all the key content. If no key is specified, remove
@@ -501,7 +570,12 @@ def contains(bank, key):
     redis_server = _get_redis_server()
     bank_redis_key = _get_bank_redis_key(bank)
     try:
-        return redis_server.sismember(bank_redis_key, key)
+        if key is None:
+            return bool(redis_server.exists(bank_redis_key)
+                        or redis_server.exists(_get_bank_keys_redis_key(bank)))
+        # The keys of a bank are in its SET of keys, the sub-banks in the
+        # SET of the bank
+        return redis_server.sismember(_get_bank_keys_redis_key(bank), key)
     except (RedisConnectionError, RedisResponseError) as rerr:
         mesg = 'Cannot retrieve the Redis cache key {rkey}: {rerr}'.format(rkey=bank_redis_key,
                                                                            rerr=rerr)
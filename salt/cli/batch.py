@@ -8,9 +8,13 @@ from __future__ import absolute_import, print_function
 import math
 import time
 import copy
+import collections
 from datetime import datetime, timedelta
 
 # Import salt libs
+import salt.utils.data
+import salt.utils.histogram
+import salt.utils.minions
 import salt.utils.stringutils
 import salt.client
 import salt.output
@@ -36,9 +40,28 @@ class Batch(object):
         self.pub_kwargs = eauth if eauth else {}
         self.quiet = quiet
         self.local = salt.client.get_local_client(opts['conf_file'])
-        self.minions, self.ping_gen, self.down_minions = self.__gather_minions()
+        self.stream = salt.utils.data.is_true(opts.get('batch_stream')) and \
+            bool(opts.get('presence_table') or opts.get('minion_data_cache'))
+        if self.stream:
+            self.minions, self.ping_gen, self.down_minions = self.__connected_minions()
+        else:
+            self.minions, self.ping_gen, self.down_minions = self.__gather_minions()
         self.options = parser
 
+    def __connected_minions(self):
+        '''
+        Return the targeted minions which are connected to the master, using
+        the presence table or the minion data cache instead of pinging them
+        '''
+        tgt_type = self.opts.get('selected_target_option') or self.opts.get('tgt_type', 'glob')
+        ckminions = salt.utils.minions.CkMinions(self.opts)
+        targeted = ckminions.check_minions(self.opts['tgt'], tgt_type)['minions']
+        connected = ckminions.connected_ids(subset=targeted)
+        minions = [minion for minion in targeted if minion in connected]
+        if not minions and not self.quiet:
+            salt.utils.stringutils.print_cli('No minions matched the target.')
+        return (minions, iter(()), set(targeted).difference(connected))
+
     def __gather_minions(self):
         '''
         Return a list of minions to use for the batch run
@@ -106,10 +129,36 @@ class Batch(object):
         if i:
             del wait[:i]
 
+    def __munge_retcode(self, data):
+        '''
+        Munge the retcode into the return data, return True if the batch run
+        has to stop because of failhard
+        '''
+        if 'retcode' in data and isinstance(data['ret'], dict) and 'retcode' not in data['ret']:
+            data['ret']['retcode'] = data['retcode']
+            if self.opts.get('failhard') and data['ret']['retcode'] > 0:
+                return True
+        return False
+
+    def __display(self, minion, data):
+        data[minion] = data.pop('ret')
+        if 'out' in data:
+            out = data.pop('out')
+        else:
+            out = None
+        salt.output.display_output(
+            data,
+            out,
+            self.opts)
+
     def run(self):
         '''
         Execute the batch run
         '''
+        if self.stream:
+            for ret in self.__run_stream():
+                yield ret
+            return
         args = [[],
                 self.opts['fun'],
                 self.opts['arg'],
@@ -249,11 +298,7 @@ class Batch(object):
                     if bwait:
                         wait.append(datetime.now() + timedelta(seconds=bwait))
                 # Munge retcode into return data
-                failhard = False
-                if 'retcode' in data and isinstance(data['ret'], dict) and 'retcode' not in data['ret']:
-                    data['ret']['retcode'] = data['retcode']
-                    if self.opts.get('failhard') and data['ret']['retcode'] > 0:
-                        failhard = True
+                failhard = self.__munge_retcode(data)
 
                 if self.opts.get('raw'):
                     ret[minion] = data
@@ -263,15 +308,7 @@ class Batch(object):
                     yield {minion: data['ret']}
                 if not self.quiet:
                     ret[minion] = data['ret']
-                    data[minion] = data.pop('ret')
-                    if 'out' in data:
-                        out = data.pop('out')
-                    else:
-                        out = None
-                    salt.output.display_output(
-                            data,
-                            out,
-                            self.opts)
+                    self.__display(minion, data)
                 if failhard:
                     log.error('ERROR: Minion {} returned with non-zero exit code. Batch run stopped due to failhard'.format(minion))
                     raise StopIteration
@@ -287,3 +324,167 @@ class Batch(object):
                             active.remove(minion)
                             if bwait:
                                 wait.append(datetime.now() + timedelta(seconds=bwait))
+
+    def __adapt_bnum(self, bnum, latency):
+        '''
+        Return the new batch size after ``latency`` recorded a full batch of
+        returns. The batch grows while the 95th percentile of the return time
+        stays under ``batch_max_latency`` and shrinks back when it does not.
+        '''
+        p95 = latency.percentile(95)
+        if p95 <= self.opts['batch_max_latency']:
+            new = min(bnum + max(1, bnum // 4), len(self.minions))
+        else:
+            new = max(self.get_bnum(), bnum // 2)
+        if new != bnum:
+            log.debug('Batch size changed from %s to %s, p95 return time %.2fs',
+                      bnum, new, p95)
+        return new
+
+    def __run_stream(self):
+        '''
+        Execute the batch run keeping a sliding window of jobs in flight.
+
+        A job is published to the next minions as soon as others return, and
+        the returns of all jobs are read from a single event stream. Every
+        minion gets its own timeout, which is extended while the minion
+        reports the job as running through its job heartbeat or find_job.
+        '''
+        bnum = self.get_bnum()
+        if not self.minions or not bnum:
+            return
+        timeout = self.opts['timeout']
+        gather_job_timeout = self.opts['gather_job_timeout']
+        adaptive = bool(self.opts.get('batch_max_latency'))
+        bwait = self.opts.get('batch_wait', 0)
+        raw = self.opts.get('raw', False)
+        event = self.local.event
+
+        to_run = collections.deque(self.minions)
+        # minion id -> {'jid', 'start', 'timeout', 'checking'}
+        active = {}
+        # find_job jid -> [set of minions which did not answer, timeout time]
+        checks = {}
+        # times at which the slots held by batch_wait are freed
+        wait = []
+        latency = salt.utils.histogram.LatencyHistogram()
+
+        if not self.quiet:
+            for down_minion in self.down_minions:
+                salt.utils.stringutils.print_cli('Minion {0} is not connected. No job will be sent.'.format(down_minion))
+
+        while to_run or active:
+            parts = {}
+            now = time.time()
+            if wait:
+                wait = [free_at for free_at in wait if free_at > now]
+            free = min(bnum - len(active) - len(wait), len(to_run))
+            if free > 0:
+                next_ = [to_run.popleft() for _ in range(free)]
+                if not self.quiet:
+                    salt.utils.stringutils.print_cli('\nExecuting run on {0}\n'.format(sorted(next_)))
+                pub_data = self.local.run_job(
+                    next_,
+                    self.opts['fun'],
+                    self.opts['arg'],
+                    'list',
+                    ret=self.opts.get('return', ''),
+                    timeout=timeout,
+                    listen=True,
+                    **self.eauth)
+                start = time.time()
+                for minion in next_:
+                    active[minion] = {'jid': pub_data.get('jid'),
+                                      'start': start,
+                                      'timeout': start + timeout,
+                                      'checking': False}
+                    if not pub_data.get('jid'):
+                        # The publish failed, there is nothing to wait for
+                        parts[minion] = {'ret': {}}
+
+            # Gather the events which arrived, waiting a little if there are none
+            ret = event.get_event(wait=0.01, tag='salt/job/', match_type='startswith',
+                                  full=True, auto_reconnect=self.local.auto_reconnect)
+            while ret is not None:
+                tag = ret['tag'].split('/', 4)
+                data = ret['data']
+                minion = tag[-1]
+                if len(tag) == 5 and tag[3] == 'heartbeat':
+                    if minion in active and active[minion]['jid'] == tag[2]:
+                        active[minion]['timeout'] = time.time() + timeout
+                elif len(tag) == 5 and tag[3] == 'ret':
+                    if tag[2] in checks:
+                        # find_job reports the job as running
+                        if minion in active and data.get('return'):
+                            active[minion]['timeout'] = time.time() + timeout
+                            active[minion]['checking'] = False
+                            checks[tag[2]][0].discard(minion)
+                    elif minion in active and active[minion]['jid'] == tag[2] \
+                            and 'return' in data:
+                        if raw:
+                            parts[minion] = ret
+                        else:
+                            part = {'ret': data['return']}
+                            for key in ('out', 'retcode', 'jid'):
+                                if key in data:
+                                    part[key] = data[key]
+                            parts[minion] = part
+                ret = event.get_event(wait=0, tag='salt/job/', match_type='startswith',
+                                      full=True, no_block=True,
+                                      auto_reconnect=self.local.auto_reconnect)
+
+            now = time.time()
+            # Minions which did not confirm that they still run the job
+            for check_jid in list(checks):
+                missing, check_timeout = checks[check_jid]
+                if now > check_timeout:
+                    for minion in missing:
+                        if minion in active and minion not in parts:
+                            parts[minion] = {'ret': {}}
+                    del checks[check_jid]
+
+            # Check whether minions past their timeout still run the job
+            expired = {}
+            for minion, job in six.iteritems(active):
+                if now > job['timeout'] and not job['checking'] and minion not in parts:
+                    expired.setdefault(job['jid'], []).append(minion)
+            for jid, minions in six.iteritems(expired):
+                running = salt.utils.minions.running_jobs(self.opts, minions)
+                pending = []
+                for minion in minions:
+                    if jid in running.get(minion, {}).get('jobs', {}):
+                        active[minion]['timeout'] = now + timeout
+                    else:
+                        active[minion]['checking'] = True
+                        pending.append(minion)
+                if pending:
+                    check = self.local.gather_job_info(
+                        jid, pending, 'list',
+                        gather_job_timeout=gather_job_timeout,
+                        **self.eauth)
+                    if 'jid' in check:
+                        checks[check['jid']] = [set(pending), now + gather_job_timeout]
+                    else:
+                        for minion in pending:
+                            parts[minion] = {'ret': {}}
+
+            for minion, data in six.iteritems(parts):
+                job = active.pop(minion)
+                if bwait:
+                    wait.append(now + bwait)
+                if adaptive:
+                    latency.add(now - job['start'])
+                    if latency.count >= bnum:
+                        bnum = self.__adapt_bnum(bnum, latency)
+                        latency = salt.utils.histogram.LatencyHistogram()
+                if raw:
+                    yield data
+                    continue
+                failhard = self.__munge_retcode(data)
+                yield {minion: data['ret']}
+                if not self.quiet:
+                    self.__display(minion, data)
+                if failhard:
+                    log.error('ERROR: Minion %s returned with non-zero exit code. '
+                              'Batch run stopped due to failhard', minion)
+                    return
@@ -22,6 +22,7 @@ The data structure needs to be:
 from __future__ import absolute_import, print_function
 import os
 import time
+import heapq
 import random
 import logging
 from datetime import datetime
@@ -33,6 +34,7 @@ import salt.payload
 import salt.transport
 import salt.loader
 import salt.utils.args
+import salt.utils.data
 import salt.utils.event
 import salt.utils.files
 import salt.utils.jid
@@ -108,6 +110,75 @@ def get_local_client(
             auto_reconnect=auto_reconnect)
 
 
+class ReturnTracker(object):
+    '''
+    Keep track of the minions expected to return for a job, the minions which
+    returned and when each remaining minion times out.
+
+    All operations are incremental, so tracking a job sent to tens of
+    thousands of minions does not cost time proportional to the number of
+    minions on every pass through the event loop. ``minions`` is updated in
+    place, like ``get_iter_returns`` always did with the set it was given.
+    '''
+    def __init__(self, minions, timeout):
+        self.minions = minions
+        self.timeout = timeout
+        self.found = set()
+        self.remaining = set()
+        # id -> time the minion times out, and a heap of (-timeout, id)
+        # entries so the latest timeout is on top. Entries which no longer
+        # match the current timeout of a minion are dropped lazily.
+        self.timeouts = {}
+        self._heap = []
+        self.add(list(minions))
+
+    def __len__(self):
+        return len(self.minions)
+
+    def set_timeout(self, id_, timeout_at):
+        self.timeouts[id_] = timeout_at
+        heapq.heappush(self._heap, (-timeout_at, id_))
+
+    def add(self, minions, now=None):
+        '''
+        Add minions to the set of expected minions
+        '''
+        if now is None:
+            now = time.time()
+        for id_ in minions:
+            self.minions.add(id_)
+            if id_ in self.found or id_ in self.remaining:
+                continue
+            self.remaining.add(id_)
+            self.set_timeout(id_, now + self.timeout)
+
+    def remove(self, id_):
+        '''
+        Stop waiting for a minion
+        '''
+        self.minions.discard(id_)
+        self.remaining.discard(id_)
+
+    def returned(self, id_):
+        self.found.add(id_)
+        self.remaining.discard(id_)
+
+    def all_returned(self):
+        return not self.remaining
+
+    def timed_out(self, now):
+        '''
+        Return True if every remaining minion has timed out
+        '''
+        heap = self._heap
+        while heap:
+            timeout_at, id_ = heap[0]
+            if id_ in self.remaining and self.timeouts.get(id_) == -timeout_at:
+                return now >= -timeout_at
+            heapq.heappop(heap)
+        return True
+
+
 class LocalClient(object):
     '''
     The interface used by the :command:`salt` CLI tool on the Salt Master
@@ -534,6 +605,15 @@ class LocalClient(object):
         following exceptions.
 
         :param batch: The batch identifier of systems to execute on
+        :param batch_stream: Run the batch on the connected minions without
+            pinging them first, see :conf_master:`batch_stream`
+
+            .. versionadded:: Oxygen
+        :param batch_max_latency: Grow the batch while the 95th percentile of
+            the return time stays under this number of seconds, see
+            :conf_master:`batch_max_latency`
+
+            .. versionadded:: Oxygen
 
         :returns: A generator of minion returns
 
@@ -572,6 +652,10 @@ class LocalClient(object):
             opts['gather_job_timeout'] = kwargs['gather_job_timeout']
         if 'batch_wait' in kwargs:
             opts['batch_wait'] = int(kwargs['batch_wait'])
+        if 'batch_stream' in kwargs:
+            opts['batch_stream'] = salt.utils.data.is_true(kwargs['batch_stream'])
+        if 'batch_max_latency' in kwargs:
+            opts['batch_max_latency'] = float(kwargs['batch_max_latency'])
 
         eauth = {}
         if 'eauth' in kwargs:
@@ -1143,10 +1227,10 @@ class LocalClient(object):
         gather_job_timeout = int(kwargs.get('gather_job_timeout', self.opts['gather_job_timeout']))
         start = int(time.time())
 
-        # timeouts per minion, id_ -> timeout time
-        minion_timeouts = {}
-
-        found = set()
+        # expected and returned minions and the timeout of each minion
+        tracker = ReturnTracker(minions, timeout)
+        raw_returns = kwargs.get('raw', False)
+        cmd_meta = kwargs.get('_cmd_meta', False)
         missing = []
         # Check to see if the jid is real, if not return the empty dict
         try:
@@ -1169,6 +1253,7 @@ class LocalClient(object):
         jinfo_iter = []
         # open event jids that need to be un-subscribed from later
         open_jids = set()
+        heartbeat_tag = 'salt/job/{0}/heartbeat/'.format(jid)
         timeout_at = time.time() + timeout
         gather_syndic_wait = time.time() + self.opts['syndic_wait']
         # are there still minions running the job out there
@@ -1184,37 +1269,43 @@ class LocalClient(object):
                 # if we got None, then there were no events
                 if raw is None:
                     break
-                if 'minions' in raw.get('data', {}):
-                    minions.update(raw['data']['minions'])
-                    if 'missing' in raw.get('data', {}):
-                        missing.extend(raw['data']['missing'])
+                data = raw.get('data', {})
+                if 'minions' in data:
+                    tracker.add(data['minions'])
+                    if 'missing' in data:
+                        missing.extend(data['missing'])
                     continue
-                if 'return' not in raw['data']:
+                if raw.get('tag', '').startswith(heartbeat_tag):
+                    # The minion is still running the job
+                    if data.get('id') in tracker.remaining:
+                        tracker.set_timeout(data['id'], time.time() + timeout)
+                        minions_running = True
                     continue
-                if kwargs.get('raw', False):
-                    found.add(raw['data']['id'])
+                if 'return' not in data:
+                    continue
+                tracker.returned(data['id'])
+                if raw_returns:
                     yield raw
                 else:
-                    found.add(raw['data']['id'])
-                    ret = {raw['data']['id']: {'ret': raw['data']['return']}}
-                    if 'out' in raw['data']:
-                        ret[raw['data']['id']]['out'] = raw['data']['out']
-                    if 'retcode' in raw['data']:
-                        ret[raw['data']['id']]['retcode'] = raw['data']['retcode']
-                    if 'jid' in raw['data']:
-                        ret[raw['data']['id']]['jid'] = raw['data']['jid']
-                    if kwargs.get('_cmd_meta', False):
-                        ret[raw['data']['id']].update(raw['data'])
-                    log.debug('jid %s return from %s', jid, raw['data']['id'])
+                    ret = {data['id']: {'ret': data['return']}}
+                    if 'out' in data:
+                        ret[data['id']]['out'] = data['out']
+                    if 'retcode' in data:
+                        ret[data['id']]['retcode'] = data['retcode']
+                    if 'jid' in data:
+                        ret[data['id']]['jid'] = data['jid']
+                    if cmd_meta:
+                        ret[data['id']].update(data)
+                    log.debug('jid %s return from %s', jid, data['id'])
                     yield ret
 
             # if we have all of the returns (and we aren't a syndic), no need for anything fancy
-            if len(found.intersection(minions)) >= len(minions) and not self.opts['order_masters']:
+            if tracker.all_returned() and not self.opts['order_masters']:
                 # All minions have returned, break out of the loop
-                log.debug('jid %s found all minions %s', jid, found)
+                log.debug('jid %s found all minions %s', jid, tracker.found)
                 break
-            elif len(found.intersection(minions)) >= len(minions) and self.opts['order_masters']:
-                if len(found) >= len(minions) and len(minions) > 0 and time.time() > gather_syndic_wait:
+            elif tracker.all_returned() and self.opts['order_masters']:
+                if len(tracker.found) >= len(minions) and len(minions) > 0 and time.time() > gather_syndic_wait:
                     # There were some minions to find and we found them
                     # However, this does not imply that *all* masters have yet responded with expected minion lists.
                     # Therefore, continue to wait up to the syndic_wait period (calculated in gather_syndic_wait) to see
@@ -1224,19 +1315,27 @@ class LocalClient(object):
             # If we get here we may not have gathered the minion list yet. Keep waiting
             # for all lower-level masters to respond with their minion lists
 
-            # let start the timeouts for all remaining minions
-
-            for id_ in minions - found:
-                # if we have a new minion in the list, make sure it has a timeout
-                if id_ not in minion_timeouts:
-                    minion_timeouts[id_] = time.time() + timeout
-
             # if the jinfo has timed out and some minions are still running the job
             # re-do the ping
             if time.time() > timeout_at and minions_running:
-                # since this is a new ping, no one has responded yet
-                jinfo = self.gather_job_info(jid, list(minions - found), 'list', **kwargs)
                 minions_running = False
+                pending = set(tracker.remaining)
+                # Minions sending job heartbeats report their jobs in the
+                # running jobs table, only publish find_job to the others
+                for id_, data in six.iteritems(salt.utils.minions.running_jobs(self.opts, pending)):
+                    if jid in data['jobs']:
+                        tracker.set_timeout(id_, time.time() + timeout)
+                        minions_running = True
+                        pending.discard(id_)
+                    elif data['time'] - data['interval'] > start:
+                        # The minion had a full heartbeat interval to receive
+                        # the job, it is not running it anymore
+                        pending.discard(id_)
+                if pending:
+                    # since this is a new ping, no one has responded yet
+                    jinfo = self.gather_job_info(jid, list(pending), 'list', **kwargs)
+                else:
+                    jinfo = {}
                 # if we weren't assigned any jid that means the master thinks
                 # we have nothing to send
                 if 'jid' not in jinfo:
@@ -1256,7 +1355,7 @@ class LocalClient(object):
                 try:
                     if raw['data']['retcode'] > 0:
                         log.error('saltutil returning errors on minion %s', raw['data']['id'])
-                        minions.remove(raw['data']['id'])
+                        tracker.remove(raw['data']['id'])
                         break
                 except KeyError as exc:
                     # This is a safe pass. We're just using the try/except to
@@ -1275,10 +1374,10 @@ class LocalClient(object):
 
                 # TODO: move to a library??
                 if 'minions' in raw.get('data', {}):
-                    minions.update(raw['data']['minions'])
+                    tracker.add(raw['data']['minions'])
                     continue
                 if 'syndic' in raw.get('data', {}):
-                    minions.update(raw['syndic'])
+                    tracker.add(raw['syndic'])
                     continue
                 if 'return' not in raw.get('data', {}):
                     continue
@@ -1292,10 +1391,9 @@ class LocalClient(object):
                     continue
 
                 # if we didn't originally target the minion, lets add it to the list
-                if raw['data']['id'] not in minions:
-                    minions.add(raw['data']['id'])
+                tracker.add([raw['data']['id']])
                 # update this minion's timeout, as long as the job is still running
-                minion_timeouts[raw['data']['id']] = time.time() + timeout
+                tracker.set_timeout(raw['data']['id'], time.time() + timeout)
                 # a minion returned, so we know its running somewhere
                 minions_running = True
 
@@ -1304,14 +1402,8 @@ class LocalClient(object):
             now = time.time()
             # if we have finished waiting, and no minions are running the job
             # then we need to see if each minion has timedout
-            done = (now > timeout_at) and not minions_running
-            if done:
-                # if all minions have timeod out
-                for id_ in minions - found:
-                    if now < minion_timeouts[id_]:
-                        done = False
-                        break
-            if done:
+            # and if all minions have timed out
+            if now > timeout_at and not minions_running and tracker.timed_out(now):
                 break
 
             # don't spin
@@ -1326,7 +1418,7 @@ class LocalClient(object):
                 self.event.unsubscribe(jid)
 
         if expect_minions:
-            for minion in list((minions - found)):
+            for minion in list(tracker.remaining):
                 yield {minion: {'failed': True}}
 
         if missing:
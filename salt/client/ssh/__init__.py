@@ -19,6 +19,7 @@ import sys
 import time
 import uuid
 import tempfile
+import threading
 import binascii
 import sys
 import datetime
@@ -56,6 +57,7 @@ from salt.template import compile_template
 # Import 3rd-party libs
 from salt.ext import six
 from salt.ext.six.moves import input  # pylint: disable=import-error,redefined-builtin
+from salt.ext.six.moves import queue  # pylint: disable=import-error
 try:
     import saltwinshell
     HAS_WINSHELL = False
@@ -328,7 +330,8 @@ class SSH(object):
                                              extra_mods=self.opts.get('thin_extra_mods'),
                                              overwrite=self.opts['regen_thin'],
                                              python2_bin=self.opts['python2_bin'],
-                                             python3_bin=self.opts['python3_bin'])
+                                             python3_bin=self.opts['python3_bin'],
+                                             compress_threads=self.opts.get('thin_compress_threads', 0))
         self.mods = mod_data(self.fsclient)
 
     def _get_roster(self):
@@ -544,7 +547,16 @@ class SSH(object):
         Spin up the needed threads or processes and execute the subsequent
         routines
         '''
-        que = multiprocessing.Queue()
+        threads = self.opts.get('ssh_threads', 0)
+        if threads:
+            # Run the routines in threads of this process, for functions
+            # which mostly wait on the network. They share self.fsclient and
+            # self.mods.
+            que = queue.Queue()
+            max_running = threads
+        else:
+            que = multiprocessing.Queue()
+            max_running = self.opts.get('ssh_max_procs', 25)
         running = {}
         target_iter = self.targets.__iter__()
         returned = set()
@@ -554,7 +566,7 @@ class SSH(object):
             if not self.targets:
                 log.error('No matching targets found in roster.')
                 break
-            if len(running) < self.opts.get('ssh_max_procs', 25) and not init:
+            if len(running) < max_running and not init:
                 try:
                     host = next(target_iter)
                 except StopIteration:
@@ -572,9 +584,14 @@ class SSH(object):
                         self.targets[host],
                         mine,
                         )
-                routine = MultiprocessingProcess(
-                                target=self.handle_routine,
-                                args=args)
+                if threads:
+                    routine = threading.Thread(target=self.handle_routine,
+                                               args=args)
+                    routine.daemon = True
+                else:
+                    routine = MultiprocessingProcess(
+                                    target=self.handle_routine,
+                                    args=args)
                 routine.start()
                 running[host] = {'thread': routine}
                 continue
@@ -619,7 +636,7 @@ class SSH(object):
             if len(rets) >= len(self.targets):
                 break
             # Sleep when limit or all threads started
-            if len(running) >= self.opts.get('ssh_max_procs', 25) or len(self.targets) >= len(running):
+            if len(running) >= max_running or len(self.targets) >= len(running):
                 time.sleep(0.1)
 
     def run_iter(self, mine=False, jid=None):
@@ -112,6 +112,38 @@ class Shell(object):
             return line
         return errstr
 
+    def _control_opts(self):
+        '''
+        Return the options sharing one multiplexed connection per host between
+        all of the ssh and scp commands run against it, or an empty list if
+        ssh_multiplex is disabled or not supported by this version of ssh
+        '''
+        if not self.opts.get('ssh_multiplex') \
+                or self.opts.get('_ssh_version', (0,)) < (5, 6):
+            # ControlPersist was added in OpenSSH 5.6
+            return []
+        control_dir = self.opts.get('ssh_control_path') \
+            or os.path.join(self.opts['cachedir'], 'ssh_control')
+        if not os.path.isdir(control_dir):
+            try:
+                os.makedirs(control_dir, 0o700)
+            except OSError as exc:
+                if not os.path.isdir(control_dir):
+                    log.warning(
+                        'Unable to create the ssh control path %s, not '
+                        'multiplexing ssh connections: %s', control_dir, exc
+                    )
+                    return []
+        if self.opts['_ssh_version'] >= (6, 7):
+            # %C is a hash of the connection, it keeps the socket path short
+            control_path = os.path.join(control_dir, '%C')
+        else:
+            control_path = os.path.join(control_dir, '%r@%h:%p')
+        return ['ControlMaster=auto',
+                'ControlPath={0}'.format(control_path),
+                'ControlPersist={0}'.format(
+                    self.opts.get('ssh_control_persist', 60))]
+
     def _key_opts(self):
         '''
         Return options for the ssh command base for Salt to call
@@ -119,6 +151,7 @@ class Shell(object):
         options = [
                    'KbdInteractiveAuthentication=no',
                    ]
+        options.extend(self._control_opts())
         if self.passwd:
             options.append('PasswordAuthentication=yes')
         else:
@@ -152,12 +185,11 @@ class Shell(object):
         '''
         Return options to pass to ssh
         '''
-        # TODO ControlMaster does not work without ControlPath
-        # user could take advantage of it if they set ControlPath in their
-        # ssh config.  Also, ControlPersist not widely available.
-        options = ['ControlMaster=auto',
-                   'StrictHostKeyChecking=no',
-                   ]
+        # ControlMaster does not work without ControlPath, which is only set
+        # with ssh_multiplex. Otherwise users can take advantage of it if they
+        # set ControlPath in their ssh config.
+        options = self._control_opts() or ['ControlMaster=auto']
+        options.append('StrictHostKeyChecking=no')
         if self.opts['_ssh_version'] > (4, 9):
             options.append('GSSAPIAuthentication=no')
         options.append('ConnectTimeout={0}'.format(self.timeout))
@@ -422,6 +454,19 @@ class Shell(object):
                     term.sendline(mods_raw)
                 if stdout:
                     old_stdout = stdout
+                if not stdout and not stderr and not term.isalive():
+                    # The ControlPersist master started by this ssh may hold
+                    # its stderr open. Read what ssh wrote before it exited
+                    # and stop.
+                    while True:
+                        stdout, stderr = term.recv()
+                        if not stdout and not stderr:
+                            break
+                        if stdout:
+                            ret_stdout += stdout
+                        if stderr:
+                            ret_stderr += stderr
+                    break
                 time.sleep(0.01)
             return ret_stdout, ret_stderr, term.exitstatus
         finally:
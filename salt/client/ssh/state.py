@@ -4,10 +4,13 @@ Create ssh executor system
 '''
 from __future__ import absolute_import
 # Import python libs
+import hashlib
+import io
 import logging
 import os
 import tarfile
 import tempfile
+import time
 import json
 import shutil
 from contextlib import closing
@@ -15,7 +18,9 @@ from contextlib import closing
 # Import salt libs
 import salt.client.ssh.shell
 import salt.client.ssh
+import salt.utils.atomicfile
 import salt.utils.files
+import salt.utils.stringutils
 import salt.utils.thin
 import salt.utils.url
 import salt.utils.verify
@@ -29,6 +34,14 @@ from salt.ext import six
 
 log = logging.getLogger(__name__)
 
+STATE_OBJECTS = 'state_objects.json'
+# Forget the files sent to a target a week ago, before the target prunes them
+# from its object cache
+STATE_OBJECT_TTL = 7 * 86400
+# The files of the package holding the run's pillar, grains and lowstate are
+# always sent and never kept in the object cache of the target
+STATE_PKG_PRIVATE = ('lowstate.json', 'pillar.json', 'roster_grains.json')
+
 
 class SSHState(salt.state.State):
     '''
@@ -249,3 +262,100 @@ def prep_trans_tar(opts, file_client, chunks, file_refs, pillar=None, id_=None,
         os.chdir(cwd)
     shutil.rmtree(gendir)
     return trans_tar
+
+
+def delta_enabled(opts):
+    '''
+    Return whether the state packages sent to the targets only hold the files
+    changed since the last run. Not the case when the thin dir is wiped after
+    every run.
+    '''
+    return bool(opts.get('ssh_state_delta', True)) and not opts.get('ssh_wipe')
+
+
+class StatePkgDelta(object):
+    '''
+    Strip the files a target already holds from the state packages sent to it
+
+    The target keeps the files of the state packages in an object cache keyed
+    by checksum, see :py:func:`salt.modules.state.pkg`. The checksums of the
+    files sent to each target are recorded in the cachedir of the master, and
+    the stripped package comes with a ``manifest.json`` mapping every file of
+    the full package to its checksum, so the target can fill in the files left
+    out.
+    '''
+    def __init__(self, opts, id_, hash_type='sha256'):
+        self.opts = opts
+        self.hash_type = hash_type
+        self.path = os.path.join(
+            opts['cachedir'], 'salt-ssh', six.text_type(id_), STATE_OBJECTS)
+        self.manifest = {}
+        self.objects = self._load()
+
+    def _load(self):
+        try:
+            with salt.utils.files.fopen(self.path, 'r') as fp_:
+                data = json.load(fp_)
+        except (IOError, OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) \
+                or data.get('thin_dir') != self.opts.get('thin_dir') \
+                or data.get('hash_type') != self.hash_type:
+            # The object cache of the target lives in the thin dir
+            return {}
+        now = time.time()
+        return dict((sum_, used) for sum_, used in six.iteritems(data.get('objects', {}))
+                    if now - used < STATE_OBJECT_TTL)
+
+    def strip(self, trans_tar):
+        '''
+        Write a copy of the state package without the files the target holds,
+        return the path to the copy
+        '''
+        self.manifest = {}
+        delta_tar = salt.utils.files.mkstemp()
+        with closing(tarfile.open(trans_tar, 'r:gz')) as src, \
+                closing(tarfile.open(delta_tar, 'w:gz')) as dst:
+            for member in src.getmembers():
+                if not member.isfile():
+                    dst.addfile(member)
+                    continue
+                data = src.extractfile(member).read()
+                if member.name in STATE_PKG_PRIVATE:
+                    dst.addfile(member, io.BytesIO(data))
+                    continue
+                sum_ = hashlib.new(self.hash_type, data).hexdigest()
+                self.manifest[member.name] = sum_
+                if sum_ not in self.objects:
+                    dst.addfile(member, io.BytesIO(data))
+            manifest = salt.utils.stringutils.to_bytes(json.dumps(self.manifest))
+            info = tarfile.TarInfo('manifest.json')
+            info.size = len(manifest)
+            info.mtime = time.time()
+            dst.addfile(info, io.BytesIO(manifest))
+        return delta_tar
+
+    def reset(self):
+        '''
+        Forget the files sent to the target, used when the target reports
+        files missing from its object cache
+        '''
+        self.objects = {}
+
+    def delivered(self):
+        '''
+        Record the files of the last package as held by the target
+        '''
+        now = time.time()
+        for sum_ in six.itervalues(self.manifest):
+            self.objects[sum_] = now
+        try:
+            cachedir = os.path.dirname(self.path)
+            if not os.path.isdir(cachedir):
+                os.makedirs(cachedir)
+            with salt.utils.atomicfile.atomic_open(self.path, 'w') as fp_:
+                fp_.write(json.dumps({'thin_dir': self.opts.get('thin_dir'),
+                                      'hash_type': self.hash_type,
+                                      'objects': self.objects}))
+        except (IOError, OSError):
+            log.error('Unable to write %s', self.path, exc_info=True)
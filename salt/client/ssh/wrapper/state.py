@@ -49,6 +49,94 @@ def _merge_extra_filerefs(*args):
     return ','.join(ret)
 
 
+def _exec_state_pkg(trans_tar, st_kwargs, **pkg_kwargs):
+    '''
+    Copy the state package to the target, run it with state.pkg and return
+    the result
+
+    Unless :conf_master:`ssh_state_delta` is disabled, the package only holds
+    the files the target does not have in its object cache yet. If the target
+    lost files from its cache, the full package is sent again.
+    '''
+    master_opts = __context__['master_opts']
+    hash_type = __opts__['hash_type']
+    delta = None
+    if salt.client.ssh.state.delta_enabled(master_opts):
+        delta = salt.client.ssh.state.StatePkgDelta(
+                master_opts,
+                st_kwargs['id_'],
+                hash_type)
+    while True:
+        pkg_tar = delta.strip(trans_tar) if delta is not None else trans_tar
+
+        # Create a hash so we can verify the tar on the target system
+        pkg_sum = salt.utils.hashutils.get_hash(pkg_tar, hash_type)
+
+        # We use state.pkg to execute the "state package"
+        cmd = 'state.pkg {0}/salt_state.tgz'.format(__opts__['thin_dir'])
+        for key, val in six.iteritems(pkg_kwargs):
+            cmd += ' {0}={1}'.format(key, val)
+        cmd += ' pkg_sum={0} hash_type={1}'.format(pkg_sum, hash_type)
+
+        # Create a salt-ssh Single object to actually do the ssh work
+        single = salt.client.ssh.Single(
+                __opts__,
+                cmd,
+                fsclient=__context__['fileclient'],
+                minion_opts=__salt__.minion_opts,
+                **st_kwargs)
+
+        # Copy the tar down
+        single.shell.send(
+                pkg_tar,
+                '{0}/salt_state.tgz'.format(__opts__['thin_dir']))
+
+        # Run the state.pkg command on the target
+        stdout, stderr, _ = single.cmd_block()
+
+        if pkg_tar != trans_tar:
+            try:
+                os.remove(pkg_tar)
+            except (OSError, IOError):
+                pass
+
+        if delta is None:
+            break
+        try:
+            ret = json.loads(stdout)['local']['return']
+        except (ValueError, KeyError, TypeError):
+            # The ssh command failed or did not return from state.pkg
+            break
+        if not isinstance(ret, dict) or '_missing_objects' not in ret:
+            # state.pkg returns {} when the package is rejected, and a string
+            # when it fails
+            if ret and isinstance(ret, (dict, list)):
+                delta.delivered()
+            break
+        missing = ret['_missing_objects']
+        if not delta.objects:
+            break
+        log.debug('%s files missing from the state object cache of %s, '
+                  'sending the full state package', len(missing), st_kwargs['id_'])
+        delta.reset()
+
+    # Clean up our tar
+    try:
+        os.remove(trans_tar)
+    except (OSError, IOError):
+        pass
+
+    # Read in the JSON data and return the data structure
+    try:
+        return json.loads(stdout, object_hook=salt.utils.data.decode_dict)
+    except Exception as e:
+        log.error("JSON Render failed for: %s\n%s", stdout, stderr)
+        log.error(str(e))
+
+    # If for some reason the json load fails, return the stdout
+    return stdout
+
+
 def sls(mods, saltenv='base', test=None, exclude=None, **kwargs):
     '''
     Create the seed file for a state.sls run
@@ -104,38 +192,7 @@ def sls(mods, saltenv='base', test=None, exclude=None, **kwargs):
             __pillar__,
             st_kwargs['id_'],
             roster_grains)
-    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, __opts__['hash_type'])
-    cmd = 'state.pkg {0}/salt_state.tgz test={1} pkg_sum={2} hash_type={3}'.format(
-            __opts__['thin_dir'],
-            test,
-            trans_tar_sum,
-            __opts__['hash_type'])
-    single = salt.client.ssh.Single(
-            __opts__,
-            cmd,
-            fsclient=__context__['fileclient'],
-            minion_opts=__salt__.minion_opts,
-            **st_kwargs)
-    single.shell.send(
-            trans_tar,
-            '{0}/salt_state.tgz'.format(__opts__['thin_dir']))
-    stdout, stderr, _ = single.cmd_block()
-
-    # Clean up our tar
-    try:
-        os.remove(trans_tar)
-    except (OSError, IOError):
-        pass
-
-    # Read in the JSON data and return the data structure
-    try:
-        return json.loads(stdout, object_hook=salt.utils.data.decode_dict)
-    except Exception as e:
-        log.error("JSON Render failed for: %s\n%s", stdout, stderr)
-        log.error(str(e))
-
-    # If for some reason the json load fails, return the stdout
-    return stdout
+    return _exec_state_pkg(trans_tar, st_kwargs, test=test)
 
 
 def low(data, **kwargs):
@@ -181,37 +238,7 @@ def low(data, **kwargs):
             __pillar__,
             st_kwargs['id_'],
             roster_grains)
-    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, __opts__['hash_type'])
-    cmd = 'state.pkg {0}/salt_state.tgz pkg_sum={1} hash_type={2}'.format(
-            __opts__['thin_dir'],
-            trans_tar_sum,
-            __opts__['hash_type'])
-    single = salt.client.ssh.Single(
-            __opts__,
-            cmd,
-            fsclient=__context__['fileclient'],
-            minion_opts=__salt__.minion_opts,
-            **st_kwargs)
-    single.shell.send(
-            trans_tar,
-            '{0}/salt_state.tgz'.format(__opts__['thin_dir']))
-    stdout, stderr, _ = single.cmd_block()
-
-    # Clean up our tar
-    try:
-        os.remove(trans_tar)
-    except (OSError, IOError):
-        pass
-
-    # Read in the JSON data and return the data structure
-    try:
-        return json.loads(stdout, object_hook=salt.utils.data.decode_dict)
-    except Exception as e:
-        log.error("JSON Render failed for: %s\n%s", stdout, stderr)
-        log.error(str(e))
-
-    # If for some reason the json load fails, return the stdout
-    return stdout
+    return _exec_state_pkg(trans_tar, st_kwargs)
 
 
 def high(data, **kwargs):
@@ -254,37 +281,7 @@ def high(data, **kwargs):
             __pillar__,
             st_kwargs['id_'],
             roster_grains)
-    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, __opts__['hash_type'])
-    cmd = 'state.pkg {0}/salt_state.tgz pkg_sum={1} hash_type={2}'.format(
-            __opts__['thin_dir'],
-            trans_tar_sum,
-            __opts__['hash_type'])
-    single = salt.client.ssh.Single(
-            __opts__,
-            cmd,
-            fsclient=__context__['fileclient'],
-            minion_opts=__salt__.minion_opts,
-            **st_kwargs)
-    single.shell.send(
-            trans_tar,
-            '{0}/salt_state.tgz'.format(__opts__['thin_dir']))
-    stdout, stderr, _ = single.cmd_block()
-
-    # Clean up our tar
-    try:
-        os.remove(trans_tar)
-    except (OSError, IOError):
-        pass
-
-    # Read in the JSON data and return the data structure
-    try:
-        return json.loads(stdout, object_hook=salt.utils.data.decode_dict)
-    except Exception as e:
-        log.error("JSON Render failed for: %s\n%s", stdout, stderr)
-        log.error(str(e))
-
-    # If for some reason the json load fails, return the stdout
-    return stdout
+    return _exec_state_pkg(trans_tar, st_kwargs)
 
 
 def apply_(mods=None,
@@ -494,38 +491,7 @@ def highstate(test=None, **kwargs):
             __pillar__,
             st_kwargs['id_'],
             roster_grains)
-    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, __opts__['hash_type'])
-    cmd = 'state.pkg {0}/salt_state.tgz test={1} pkg_sum={2} hash_type={3}'.format(
-            __opts__['thin_dir'],
-            test,
-            trans_tar_sum,
-            __opts__['hash_type'])
-    single = salt.client.ssh.Single(
-            __opts__,
-            cmd,
-            fsclient=__context__['fileclient'],
-            minion_opts=__salt__.minion_opts,
-            **st_kwargs)
-    single.shell.send(
-            trans_tar,
-            '{0}/salt_state.tgz'.format(__opts__['thin_dir']))
-    stdout, stderr, _ = single.cmd_block()
-
-    # Clean up our tar
-    try:
-        os.remove(trans_tar)
-    except (OSError, IOError):
-        pass
-
-    # Read in the JSON data and return the data structure
-    try:
-        return json.loads(stdout, object_hook=salt.utils.data.decode_dict)
-    except Exception as e:
-        log.error("JSON Render failed for: %s\n%s", stdout, stderr)
-        log.error(str(e))
-
-    # If for some reason the json load fails, return the stdout
-    return stdout
+    return _exec_state_pkg(trans_tar, st_kwargs, test=test)
 
 
 def top(topfn, test=None, **kwargs):
@@ -574,38 +540,7 @@ def top(topfn, test=None, **kwargs):
             __pillar__,
             st_kwargs['id_'],
             roster_grains)
-    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, __opts__['hash_type'])
-    cmd = 'state.pkg {0}/salt_state.tgz test={1} pkg_sum={2} hash_type={3}'.format(
-            __opts__['thin_dir'],
-            test,
-            trans_tar_sum,
-            __opts__['hash_type'])
-    single = salt.client.ssh.Single(
-            __opts__,
-            cmd,
-            fsclient=__context__['fileclient'],
-            minion_opts=__salt__.minion_opts,
-            **st_kwargs)
-    single.shell.send(
-            trans_tar,
-            '{0}/salt_state.tgz'.format(__opts__['thin_dir']))
-    stdout, stderr, _ = single.cmd_block()
-
-    # Clean up our tar
-    try:
-        os.remove(trans_tar)
-    except (OSError, IOError):
-        pass
-
-    # Read in the JSON data and return the data structure
-    try:
-        return json.loads(stdout, object_hook=salt.utils.data.decode_dict)
-    except Exception as e:
-        log.error("JSON Render failed for: %s\n%s", stdout, stderr)
-        log.error(str(e))
-
-    # If for some reason the json load fails, return the stdout
-    return stdout
+    return _exec_state_pkg(trans_tar, st_kwargs, test=test)
 
 
 def show_highstate():
@@ -835,44 +770,4 @@ def single(fun, name, test=None, **kwargs):
             st_kwargs['id_'],
             roster_grains)
 
-    # Create a hash so we can verify the tar on the target system
-    trans_tar_sum = salt.utils.hashutils.get_hash(trans_tar, __opts__['hash_type'])
-
-    # We use state.pkg to execute the "state package"
-    cmd = 'state.pkg {0}/salt_state.tgz test={1} pkg_sum={2} hash_type={3}'.format(
-            __opts__['thin_dir'],
-            test,
-            trans_tar_sum,
-            __opts__['hash_type'])
-
-    # Create a salt-ssh Single object to actually do the ssh work
-    single = salt.client.ssh.Single(
-            __opts__,
-            cmd,
-            fsclient=__context__['fileclient'],
-            minion_opts=__salt__.minion_opts,
-            **st_kwargs)
-
-    # Copy the tar down
-    single.shell.send(
-            trans_tar,
-            '{0}/salt_state.tgz'.format(__opts__['thin_dir']))
-
-    # Run the state.pkg command on the target
-    stdout, stderr, _ = single.cmd_block()
-
-    # Clean up our tar
-    try:
-        os.remove(trans_tar)
-    except (OSError, IOError):
-        pass
-
-    # Read in the JSON data and return the data structure
-    try:
-        return json.loads(stdout, object_hook=salt.utils.data.decode_dict)
-    except Exception as e:
-        log.error("JSON Render failed for: %s\n%s", stdout, stderr)
-        log.error(str(e))
-
-    # If for some reason the json load fails, return the stdout
-    return stdout
+    return _exec_state_pkg(trans_tar, st_kwargs, test=test)
@@ -358,9 +358,19 @@ VALID_OPTS = {
     # Whether or not processes should be forked when needed. The alternative is to use threading.
     'multiprocessing': bool,
 
+    # Fork job processes from a process which has loaded all modules ahead of time
+    'fork_server': bool,
+
     # Maximum number of concurrently active processes at any given point in time
     'process_count_max': int,
 
+    # Maximum number of concurrently running jobs per function glob, jobs over
+    # either limit wait in the minion's job queue
+    'process_count_max_functions': dict,
+
+    # The interval in seconds at which the minion reports its running jobs to the master
+    'job_heartbeat_interval': int,
+
     # Whether or not the salt minion should run scheduled mine updates
     'mine_enabled': bool,
 
@@ -650,6 +660,8 @@ VALID_OPTS = {
     'git_pillar_root': str,
     'git_pillar_ssl_verify': bool,
     'git_pillar_global_lock': bool,
+    'git_pillar_fetch_concurrency': int,
+    'git_pillar_check_refs': bool,
     'git_pillar_user': str,
     'git_pillar_password': str,
     'git_pillar_insecure_auth': bool,
@@ -675,10 +687,15 @@ VALID_OPTS = {
     'gitfs_saltenv_blacklist': list,
     'gitfs_ssl_verify': bool,
     'gitfs_global_lock': bool,
+    'gitfs_fetch_concurrency': int,
+    'gitfs_check_refs': bool,
     'gitfs_saltenv': list,
     'gitfs_ref_types': list,
     'gitfs_refspecs': list,
     'gitfs_disable_saltenv_mapping': bool,
+
+    # Serve gitfs files and file lists straight from the git object store (pygit2 only)
+    'gitfs_object_store': bool,
     'hgfs_remotes': list,
     'hgfs_mountpoint': str,
     'hgfs_root': str,
@@ -768,6 +785,9 @@ VALID_OPTS = {
     'fileserver_followsymlinks': bool,
     'fileserver_ignoresymlinks': bool,
     'fileserver_limit_traversal': bool,
+    'fileserver_update_interval': int,
+    'git_pillar_update_interval': int,
+    'git_push_events': bool,
     'fileserver_verify_config': bool,
 
     # Optionally apply '*' permissioins to any user. By default '*' is a fallback case that is
@@ -825,6 +845,9 @@ VALID_OPTS = {
     # reply from executions.
     'minion_data_cache': bool,
 
+    # The number of seconds the master processes keep the mine data they read
+    'mine_cache_ttl': int,
+
     # The number of seconds between AES key rotations on the master
     'publish_session': int,
 
@@ -840,6 +863,16 @@ VALID_OPTS = {
     # The queue size for workers in the reactor
     'reactor_worker_hwm': int,
 
+    # The number of seconds the reactor gathers events to merge their local
+    # reactions into calls with list targets
+    'reactor_merge_window': float,
+
+    # The priorities and rate limits of the reactor SLS files
+    'reactor_limits': dict,
+
+    # The number of seconds between the events with the reactor statistics
+    'reactor_stats_interval': int,
+
     # Defines engines. See https://docs.saltstack.com/en/latest/topics/engines/
     'engines': list,
 
@@ -937,6 +970,12 @@ VALID_OPTS = {
     # The number of seconds to wait when the client is requesting information about running jobs
     'gather_job_timeout': int,
 
+    # Run batch jobs on the connected minions as a sliding window of jobs, without pinging
+    # the targeted minions first, and grow the batch while the 95th percentile of the return
+    # time stays under batch_max_latency seconds
+    'batch_stream': bool,
+    'batch_max_latency': float,
+
     # The number of seconds to wait before timing out an authentication request
     'auth_timeout': int,
 
@@ -975,6 +1014,11 @@ VALID_OPTS = {
     'ssh_scan_ports': str,
     'ssh_scan_timeout': float,
     'ssh_identities_only': bool,
+    'ssh_multiplex': bool,
+    'ssh_control_path': str,
+    'ssh_control_persist': int,
+    'ssh_threads': int,
+    'ssh_state_delta': bool,
     'ssh_log_file': str,
     'ssh_config_file': str,
 
@@ -1023,6 +1067,18 @@ VALID_OPTS = {
     # Use zmq.SUSCRIBE to limit listening sockets to only process messages bound for them
     'zmq_filtering': bool,
 
+    # Maintain a table of the connected minions in the cachedir, used to answer which
+    # minions are connected without scanning the minion data cache
+    'presence_table': bool,
+
+    # Attach a filter of the resolved minions to publications so minions which are not
+    # targeted can drop them without decrypting, for the listed target types only
+    'pub_target_filter': bool,
+    'pub_target_filter_types': list,
+
+    # Send encrypted requests as multipart zmq messages to avoid copying large payloads
+    'zmq_multipart': bool,
+
     # Connection caching. Can greatly speed up salt performance.
     'con_cache': bool,
     'rotate_aes_key': bool,
@@ -1086,9 +1142,12 @@ VALID_OPTS = {
     'memcache_full_cleanup': bool,
     # Enable collecting the memcache stats and log it on `debug` log level.
     'memcache_debug': bool,
+    # Share the memcache invalidations between the processes using the same cachedir.
+    'memcache_shared': bool,
 
     # Thin and minimal Salt extra modules
     'thin_extra_mods': str,
+    'thin_compress_threads': int,
     'min_extra_mods': str,
 
     # Default returners minion should use. List or comma-delimited string
@@ -1114,6 +1173,25 @@ VALID_OPTS = {
     # to the master is attempted.
     'beacons_before_connect': bool,
 
+    # Run the beacons in a worker thread instead of the minion's main loop
+    'beacons_async': bool,
+
+    # The number of seconds after which the beacons still running in the
+    # worker thread are left behind and the other beacons processed again
+    'beacons_timeout': int,
+
+    # The interval in seconds at which the events of the beacons are fired to
+    # the master in a single request, 0 fires them after every run
+    'beacons_batch_interval': int,
+
+    # The number of events the minion queues before sending them to the
+    # master in a single request, 0 sends every event on its own
+    'fire_master_batch_size': int,
+
+    # The longest time in seconds an event waits in the queue of events sent
+    # to the master
+    'fire_master_batch_interval': float,
+
     # Controls whether the scheduler is set up before a connection
     # to the master is attempted.
     'scheduler_before_connect': bool,
@@ -1252,6 +1330,8 @@ DEFAULT_MINION_OPTS = {
     'git_pillar_root': '',
     'git_pillar_ssl_verify': True,
     'git_pillar_global_lock': True,
+    'git_pillar_fetch_concurrency': 4,
+    'git_pillar_check_refs': True,
     'git_pillar_user': '',
     'git_pillar_password': '',
     'git_pillar_insecure_auth': False,
@@ -1275,11 +1355,14 @@ DEFAULT_MINION_OPTS = {
     'gitfs_saltenv_whitelist': [],
     'gitfs_saltenv_blacklist': [],
     'gitfs_global_lock': True,
+    'gitfs_fetch_concurrency': 4,
+    'gitfs_check_refs': True,
     'gitfs_ssl_verify': True,
     'gitfs_saltenv': [],
     'gitfs_ref_types': ['branch', 'tag', 'sha'],
     'gitfs_refspecs': _DFLT_REFSPECS,
     'gitfs_disable_saltenv_mapping': False,
+    'gitfs_object_store': False,
     'unique_jid': False,
     'hash_type': 'sha256',
     'disable_modules': [],
@@ -1300,7 +1383,10 @@ DEFAULT_MINION_OPTS = {
     'auto_accept': True,
     'autosign_timeout': 120,
     'multiprocessing': True,
+    'fork_server': False,
     'process_count_max': -1,
+    'process_count_max_functions': {},
+    'job_heartbeat_interval': 10,
     'mine_enabled': True,
     'mine_return_job': False,
     'mine_interval': 60,
@@ -1374,6 +1460,9 @@ DEFAULT_MINION_OPTS = {
     'reactor_refresh_interval': 60,
     'reactor_worker_threads': 10,
     'reactor_worker_hwm': 10000,
+    'reactor_merge_window': 0,
+    'reactor_limits': {},
+    'reactor_stats_interval': 60,
     'engines': [],
     'tcp_keepalive': True,
     'tcp_keepalive_idle': 300,
@@ -1413,6 +1502,7 @@ DEFAULT_MINION_OPTS = {
     'password': None,
     'zmq_filtering': False,
     'zmq_monitor': False,
+    'zmq_multipart': False,
     'cache_sreqs': True,
     'cmd_safe': True,
     'sudo_user': '',
@@ -1429,6 +1519,11 @@ DEFAULT_MINION_OPTS = {
     'ssl': None,
     'multifunc_ordered': False,
     'beacons_before_connect': False,
+    'beacons_async': True,
+    'beacons_timeout': 30,
+    'beacons_batch_interval': 0,
+    'fire_master_batch_size': 0,
+    'fire_master_batch_interval': 0.5,
     'scheduler_before_connect': False,
     'cache': 'localfs',
     'salt_cp_chunk_size': 65536,
@@ -1493,6 +1588,8 @@ DEFAULT_MASTER_OPTS = {
     'git_pillar_root': '',
     'git_pillar_ssl_verify': True,
     'git_pillar_global_lock': True,
+    'git_pillar_fetch_concurrency': 4,
+    'git_pillar_check_refs': True,
     'git_pillar_user': '',
     'git_pillar_password': '',
     'git_pillar_insecure_auth': False,
@@ -1517,11 +1614,14 @@ DEFAULT_MASTER_OPTS = {
     'gitfs_saltenv_whitelist': [],
     'gitfs_saltenv_blacklist': [],
     'gitfs_global_lock': True,
+    'gitfs_fetch_concurrency': 4,
+    'gitfs_check_refs': True,
     'gitfs_ssl_verify': True,
     'gitfs_saltenv': [],
     'gitfs_ref_types': ['branch', 'tag', 'sha'],
     'gitfs_refspecs': _DFLT_REFSPECS,
     'gitfs_disable_saltenv_mapping': False,
+    'gitfs_object_store': False,
     'hgfs_remotes': [],
     'hgfs_mountpoint': '',
     'hgfs_root': '',
@@ -1593,6 +1693,9 @@ DEFAULT_MASTER_OPTS = {
     'fileserver_ignoresymlinks': False,
     'fileserver_limit_traversal': False,
     'fileserver_verify_config': True,
+    'fileserver_update_interval': 0,
+    'git_pillar_update_interval': 0,
+    'git_push_events': False,
     'max_open_files': 100000,
     'hash_type': 'sha256',
     'conf_file': os.path.join(salt.syspaths.CONFIG_DIR, 'master'),
@@ -1606,12 +1709,16 @@ DEFAULT_MASTER_OPTS = {
     'state_top_saltenv': None,
     'master_tops': {},
     'order_masters': False,
+    'presence_table': False,
+    'pub_target_filter': False,
+    'pub_target_filter_types': ['glob', 'pcre', 'list'],
     'job_cache': True,
     'ext_job_cache': '',
     'master_job_cache': 'local_cache',
     'job_cache_store_endtime': False,
     'minion_data_cache': True,
     'enforce_mine_cache': False,
+    'mine_cache_ttl': 0,
     'ipc_mode': _DFLT_IPC_MODE,
     'ipc_write_buffer': _DFLT_IPC_WBUFFER,
     'ipv6': False,
@@ -1636,6 +1743,9 @@ DEFAULT_MASTER_OPTS = {
     'reactor_refresh_interval': 60,
     'reactor_worker_threads': 10,
     'reactor_worker_hwm': 10000,
+    'reactor_merge_window': 0,
+    'reactor_limits': {},
+    'reactor_stats_interval': 60,
     'engines': [],
     'event_return': '',
     'event_return_queue': 0,
@@ -1692,6 +1802,8 @@ DEFAULT_MASTER_OPTS = {
     'keysize': 2048,
     'transport': 'zeromq',
     'gather_job_timeout': 10,
+    'batch_stream': False,
+    'batch_max_latency': 0.0,
     'syndic_event_forward_timeout': 0.5,
     'syndic_jid_forward_cache_hwm': 100,
     'regen_thin': False,
@@ -1704,6 +1816,11 @@ DEFAULT_MASTER_OPTS = {
     'ssh_scan_ports': '22',
     'ssh_scan_timeout': 0.01,
     'ssh_identities_only': False,
+    'ssh_multiplex': False,
+    'ssh_control_path': '',
+    'ssh_control_persist': 60,
+    'ssh_threads': 0,
+    'ssh_state_delta': True,
     'ssh_log_file': os.path.join(salt.syspaths.LOGS_DIR, 'ssh'),
     'ssh_config_file': os.path.join(salt.syspaths.HOME_DIR, '.ssh', 'config'),
     'master_floscript': os.path.join(FLO_DIR, 'master.flo'),
@@ -1746,7 +1863,9 @@ DEFAULT_MASTER_OPTS = {
     'memcache_max_items': 1024,
     'memcache_full_cleanup': False,
     'memcache_debug': False,
+    'memcache_shared': True,
     'thin_extra_mods': '',
+    'thin_compress_threads': 0,
     'min_extra_mods': '',
     'ssl': None,
     'extmod_whitelist': {},
@@ -1306,16 +1306,30 @@ class Crypticle(object):
         sig = hmac.new(hmac_key, data, hashlib.sha256).digest()
         return data + sig
 
-    def decrypt(self, data):
+    def encrypt_parts(self, *chunks):
         '''
-        verify HMAC-SHA256 signature and decrypt data with AES-CBC
+        Encrypt the concatenation of ``chunks`` like :meth:`encrypt`, but
+        return the IV, the ciphertext and the signature as separate parts.
+
+        The chunks and the padding are joined once and nothing is appended to
+        the ciphertext afterwards, so large payloads are not copied around.
+        ``b''.join(parts)`` is identical to what :meth:`encrypt` returns.
         '''
         aes_key, hmac_key = self.keys
-        sig = data[-self.SIG_SIZE:]
-        data = data[:-self.SIG_SIZE]
-        if six.PY3 and not isinstance(data, bytes):
-            data = salt.utils.stringutils.to_bytes(data)
-        mac_bytes = hmac.new(hmac_key, data, hashlib.sha256).digest()
+        size = sum(len(chunk) for chunk in chunks)
+        pad = self.AES_BLOCK_SIZE - size % self.AES_BLOCK_SIZE
+        data = b''.join(chunks + (salt.utils.stringutils.to_bytes(pad * chr(pad)),))
+        iv_bytes = os.urandom(self.AES_BLOCK_SIZE)
+        cypher = AES.new(aes_key, AES.MODE_CBC, iv_bytes)
+        data = cypher.encrypt(data)
+        mac = hmac.new(hmac_key, iv_bytes, hashlib.sha256)
+        mac.update(data)
+        return [iv_bytes, data, mac.digest()]
+
+    def _verify_sig(self, mac_bytes, sig):
+        '''
+        Compare two signatures in constant time
+        '''
         if len(mac_bytes) != len(sig):
             log.debug('Failed to authenticate message')
             raise AuthenticationError('message authentication failed')
@@ -1330,6 +1344,18 @@ class Crypticle(object):
         if result != 0:
             log.debug('Failed to authenticate message')
             raise AuthenticationError('message authentication failed')
+
+    def decrypt(self, data):
+        '''
+        verify HMAC-SHA256 signature and decrypt data with AES-CBC
+        '''
+        aes_key, hmac_key = self.keys
+        sig = data[-self.SIG_SIZE:]
+        data = data[:-self.SIG_SIZE]
+        if six.PY3 and not isinstance(data, bytes):
+            data = salt.utils.stringutils.to_bytes(data)
+        mac_bytes = hmac.new(hmac_key, data, hashlib.sha256).digest()
+        self._verify_sig(mac_bytes, sig)
         iv_bytes = data[:self.AES_BLOCK_SIZE]
         data = data[self.AES_BLOCK_SIZE:]
         cypher = AES.new(aes_key, AES.MODE_CBC, iv_bytes)
@@ -1339,19 +1365,58 @@ class Crypticle(object):
         else:
             return data[:-data[-1]]
 
+    def decrypt_parts(self, parts):
+        '''
+        Verify and decrypt a message split in the parts returned by
+        :meth:`encrypt_parts`. The parts can be any buffer objects, e.g.
+        memoryviews of ZeroMQ frames, and are never joined. On Python 3 a
+        memoryview of the plaintext is returned to avoid stripping the padding
+        with a copy.
+        '''
+        if len(parts) != 3 or len(parts[0]) != self.AES_BLOCK_SIZE:
+            # Not split the way encrypt_parts does it
+            return self.decrypt(b''.join(memoryview(part).tobytes() for part in parts))
+        aes_key, hmac_key = self.keys
+        iv_bytes = memoryview(parts[0]).tobytes()
+        data = parts[1]
+        if six.PY2 or not CDOME:
+            # Only pycryptodome and the py3 hashlib reliably take memoryviews
+            data = memoryview(data).tobytes()
+        mac = hmac.new(hmac_key, iv_bytes, hashlib.sha256)
+        mac.update(data)
+        self._verify_sig(mac.digest(), memoryview(parts[2]).tobytes())
+        cypher = AES.new(aes_key, AES.MODE_CBC, iv_bytes)
+        data = cypher.decrypt(data)
+        if six.PY2:
+            return data[:-ord(data[-1])]
+        return memoryview(data)[:-data[-1]]
+
     def dumps(self, obj):
         '''
         Serialize and encrypt a python object
         '''
         return self.encrypt(self.PICKLE_PAD + self.serial.dumps(obj))
 
+    def dumps_parts(self, obj):
+        '''
+        Serialize and encrypt a python object, returning the parts of the
+        encrypted message as described in :meth:`encrypt_parts`
+        '''
+        return self.encrypt_parts(self.PICKLE_PAD, self.serial.dumps(obj))
+
     def loads(self, data, raw=False):
         '''
         Decrypt and un-serialize a python object
+
+        ``data`` can also be a list of message parts as returned by
+        :meth:`dumps_parts`.
         '''
-        data = self.decrypt(data)
+        if isinstance(data, list):
+            data = self.decrypt_parts(data)
+        else:
+            data = self.decrypt(data)
         # simple integrity check to verify that we got meaningful data
-        if not data.startswith(self.PICKLE_PAD):
+        if memoryview(data)[:len(self.PICKLE_PAD)].tobytes() != self.PICKLE_PAD:
             return {}
         load = self.serial.loads(data[len(self.PICKLE_PAD):], raw=raw)
         return load
@@ -37,6 +37,7 @@ import salt.utils.verify
 import salt.utils.minions
 import salt.utils.gzip_util
 import salt.utils.jid
+import salt.utils.mine
 import salt.utils.minions
 import salt.utils.platform
 import salt.utils.stringutils
@@ -249,7 +250,7 @@ def access_keys(opts):
     return keys
 
 
-def fileserver_update(fileserver):
+def fileserver_update(fileserver, remotes=None, refs=None):
     '''
     Update the fileserver backends, requires that a built fileserver object
     be passed in
@@ -261,7 +262,7 @@ def fileserver_update(fileserver):
                 'serve files to minions'
             )
             raise SaltMasterError('No fileserver backends available')
-        fileserver.update()
+        fileserver.update(remotes=remotes, refs=refs)
     except Exception as exc:
         log.error(
             'Exception {0} occurred in file server update'.format(exc),
@@ -585,13 +586,7 @@ class RemoteFuncs(object):
                 greedy=False
                 )
         minions = _res['minions']
-        for minion in minions:
-            fdata = self.cache.fetch('minions/{0}'.format(minion), 'mine')
-            if isinstance(fdata, dict):
-                fdata = fdata.get(load['fun'])
-                if fdata:
-                    ret[minion] = fdata
-        return ret
+        return salt.utils.mine.get(self.opts, minions, load['fun'], self.cache)
 
     def _mine(self, load, skip_verify=False):
         '''
@@ -600,15 +595,10 @@ class RemoteFuncs(object):
         if not skip_verify:
             if 'id' not in load or 'data' not in load:
                 return False
-        if self.opts.get('minion_data_cache', False) or self.opts.get('enforce_mine_cache', False):
-            cbank = 'minions/{0}'.format(load['id'])
-            ckey = 'mine'
-            if not load.get('clear', False):
-                data = self.cache.fetch(cbank, ckey)
-                if isinstance(data, dict):
-                    data.update(load['data'])
-                    load['data'] = data
-            self.cache.store(cbank, ckey, load['data'])
+        if salt.utils.mine.enabled(self.opts):
+            salt.utils.mine.store(self.opts, load['id'], load['data'],
+                                  clear=load.get('clear', False),
+                                  cache=self.cache)
         return True
 
     def _mine_delete(self, load):
@@ -617,16 +607,10 @@ class RemoteFuncs(object):
         '''
         if 'id' not in load or 'fun' not in load:
             return False
-        if self.opts.get('minion_data_cache', False) or self.opts.get('enforce_mine_cache', False):
-            cbank = 'minions/{0}'.format(load['id'])
-            ckey = 'mine'
+        if salt.utils.mine.enabled(self.opts):
             try:
-                data = self.cache.fetch(cbank, ckey)
-                if not isinstance(data, dict):
-                    return False
-                if load['fun'] in data:
-                    del data[load['fun']]
-                    self.cache.store(cbank, ckey, data)
+                salt.utils.mine.delete(self.opts, load['id'], load['fun'],
+                                       cache=self.cache)
             except OSError:
                 return False
         return True
@@ -637,8 +621,8 @@ class RemoteFuncs(object):
         '''
         if not skip_verify and 'id' not in load:
             return False
-        if self.opts.get('minion_data_cache', False) or self.opts.get('enforce_mine_cache', False):
-            return self.cache.flush('minions/{0}'.format(load['id']), 'mine')
+        if salt.utils.mine.enabled(self.opts):
+            return salt.utils.mine.delete(self.opts, load['id'], cache=self.cache)
         return True
 
     def _file_recv(self, load):
@@ -458,17 +458,29 @@ class Fileserver(object):
                 errors.extend(bad)
         return cleared, errors
 
-    def update(self, back=None):
+    def update(self, back=None, remotes=None, refs=None):
         '''
         Update all of the enabled fileserver backends which support the update
         function, or
+
+        When ``remotes`` is passed, only the backends whose update function
+        can update single remotes are updated, and only the remotes matching
+        it. ``refs`` narrows the file list caches cleared after the update to
+        the saltenvs served from these branches/tags.
         '''
         back = self._gen_back(back)
         for fsb in back:
             fstr = '{0}.update'.format(fsb)
             if fstr in self.servers:
+                kwargs = {}
+                if remotes is not None:
+                    if 'remotes' not in _argspec(self.servers[fstr]).args:
+                        log.debug('{0} fileserver cannot update single '
+                                  'remotes, skipping'.format(fsb))
+                        continue
+                    kwargs = {'remotes': remotes, 'refs': refs}
                 log.debug('Updating {0} fileserver cache'.format(fsb))
-                self.servers[fstr]()
+                self.servers[fstr](**kwargs)
 
     def envs(self, back=None, sources=False):
         '''
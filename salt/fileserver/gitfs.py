@@ -122,11 +122,12 @@ def lock(remote=None):
     return _gitfs().lock(remote=remote)
 
 
-def update():
+def update(remotes=None, refs=None):
     '''
-    Execute a git fetch on all of the repos
+    Execute a git fetch on all of the repos, or only on the ones matching
+    ``remotes``. See :py:meth:`salt.utils.gitfs.GitBase.update`.
     '''
-    _gitfs().update()
+    _gitfs().update(remotes=remotes, refs=refs)
 
 
 def envs(ignore_cache=False):
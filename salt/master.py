@@ -70,11 +70,14 @@ import salt.utils.event
 import salt.utils.files
 import salt.utils.gitfs
 import salt.utils.gzip_util
+import salt.utils.histogram
 import salt.utils.jid
 import salt.utils.job
 import salt.utils.master
 import salt.utils.minions
 import salt.utils.platform
+import salt.utils.mine
+import salt.utils.presence
 import salt.utils.process
 import salt.utils.schedule
 import salt.utils.user
@@ -201,19 +204,35 @@ class Maintenance(salt.utils.process.SignalHandlingMultiprocessingProcess):
         self.ckminions = salt.utils.minions.CkMinions(self.opts)
         # Make Event bus for firing
         self.event = salt.utils.event.get_master_event(self.opts, self.opts['sock_dir'], listen=False)
+        if self.opts['master_stats']:
+            # The stats fired by the MWorkers, aggregated until the next
+            # master_stats_event_iter
+            self.stats = {}
+            self.stats_workers = set()
+            self.stats_clock = time.time()
         # Init any values needed by the git ext pillar
         self.git_pillar = salt.daemons.masterapi.init_git_pillar(self.opts)
+        # When the last polling updates of the fileserver and git_pillar ran
+        self.fileserver_updated = 0
+        self.git_pillar_updated = 0
+        # Listen for the push events naming the remotes to update and for the
+        # stats of the MWorkers. The listener gets the whole event bus, which
+        # the publisher buffers until it is read, so wait() reads it all the
+        # time.
+        self.listen_event = None
+        if self.opts['git_push_events'] or self.opts['master_stats']:
+            self.listen_event = salt.utils.event.get_master_event(self.opts, self.opts['sock_dir'], listen=True)
 
-        self.presence_events = False
-        if self.opts.get('presence_events', False):
-            tcp_only = True
-            for transport, _ in iter_transport_opts(self.opts):
-                if transport != 'tcp':
-                    tcp_only = False
-            if not tcp_only:
-                # For a TCP only transport, the presence events will be
-                # handled in the transport code.
-                self.presence_events = True
+        tcp_only = True
+        for transport, _ in iter_transport_opts(self.opts):
+            if transport != 'tcp':
+                tcp_only = False
+        # For a TCP only transport, the presence events and the presence
+        # table will be handled in the transport code.
+        self.presence_events = self.opts.get('presence_events', False) and not tcp_only
+        self.presence_table = None
+        if self.opts.get('presence_table', False) and not tcp_only:
+            self.presence_table = salt.utils.presence.PresenceTable(self.opts)
 
     def run(self):
         '''
@@ -240,15 +259,100 @@ class Maintenance(salt.utils.process.SignalHandlingMultiprocessingProcess):
                 salt.daemons.masterapi.clean_old_jobs(self.opts)
                 salt.daemons.masterapi.clean_expired_tokens(self.opts)
                 salt.daemons.masterapi.clean_pub_auth(self.opts)
-            self.handle_git_pillar()
+            self.handle_git_pillar(now)
             self.handle_schedule()
             self.handle_key_cache()
             self.handle_presence(old_present)
             self.handle_key_rotate(now)
-            salt.daemons.masterapi.fileserver_update(self.fileserver)
+            self.handle_stats()
+            self.handle_fileserver(now)
             salt.utils.verify.check_max_open_files(self.opts)
             last = now
-            time.sleep(self.loop_interval)
+            self.idle(self.loop_interval)
+
+    def idle(self, timeout):
+        '''
+        Wait for the next maintenance run, evaluating the scheduler when one
+        of its jobs is due in the meantime
+        '''
+        end = time.time() + timeout
+        while True:
+            now = time.time()
+            remaining = end - now
+            if remaining <= 0:
+                return
+            deadline = self.schedule.next_fire_time()
+            # Check if scheduler requires lower loop interval than
+            # the loop_interval setting
+            if self.schedule.loop_interval < remaining:
+                deadline = min(deadline or end, now + self.schedule.loop_interval)
+            if deadline is None or deadline >= end:
+                self.wait(remaining)
+                return
+            # The when, once and run_explicit jobs, and a job skipped by its
+            # range, are due on every evaluation, evaluate them every second
+            self.wait(min(max(deadline - now, 1), remaining))
+            self.handle_schedule()
+
+    def wait(self, timeout):
+        '''
+        Sleep until the next maintenance run. With git_push_events or
+        master_stats, handle the events received in the meantime right away.
+        '''
+        if self.listen_event is None:
+            time.sleep(timeout)
+            return
+        end = time.time() + timeout
+        while True:
+            remaining = end - time.time()
+            if remaining <= 0:
+                return
+            ret = self.listen_event.get_event(wait=remaining, full=True)
+            if ret is None:
+                # Timed out, or the event bus is gone
+                time.sleep(max(end - time.time(), 0))
+                return
+            self.handle_event(ret['tag'], ret['data'])
+
+    def handle_event(self, tag, data):
+        '''
+        Handle an event of the master event bus read by wait()
+        '''
+        if tag in salt.utils.gitfs.PUSH_TAGS:
+            if self.opts['git_push_events']:
+                self.handle_push(tag, data)
+        elif self.opts['master_stats'] and tag.startswith(tagify(prefix='stats')):
+            if 'worker' not in data or not isinstance(data.get('stats'), dict):
+                # Our own aggregated event, or something malformed
+                return
+            self.stats_workers.add(data['worker'])
+            salt.utils.histogram.merge_stats(self.stats, data['stats'])
+
+    def handle_push(self, tag, data):
+        '''
+        Fetch the gitfs and git_pillar remotes named in a push event
+        '''
+        remotes, refs = salt.utils.gitfs.push_targets(data)
+        if not remotes:
+            log.debug('Push event %s does not name a remote, ignoring', tag)
+            return
+        log.debug('Updating the remotes matching %s after a push', ', '.join(remotes))
+        salt.daemons.masterapi.fileserver_update(self.fileserver, remotes=remotes, refs=refs)
+        for pillar in self.git_pillar:
+            try:
+                pillar.fetch_remotes(remotes=remotes)
+            except Exception:
+                log.error('Exception caught while updating git_pillar',
+                          exc_info=True)
+
+    def handle_fileserver(self, now):
+        '''
+        Update the fileserver backends every fileserver_update_interval
+        '''
+        if now - self.fileserver_updated < self.opts['fileserver_update_interval']:
+            return
+        self.fileserver_updated = now
+        salt.daemons.masterapi.fileserver_update(self.fileserver)
 
     def handle_key_cache(self):
         '''
@@ -311,10 +415,13 @@ class Maintenance(salt.utils.process.SignalHandlingMultiprocessingProcess):
                           'due to key rotation')
                 salt.utils.master.ping_all_connected_minions(self.opts)
 
-    def handle_git_pillar(self):
+    def handle_git_pillar(self, now):
         '''
-        Update git pillar
+        Update git pillar every git_pillar_update_interval
         '''
+        if now - self.git_pillar_updated < self.opts['git_pillar_update_interval']:
+            return
+        self.git_pillar_updated = now
         try:
             for pillar in self.git_pillar:
                 pillar.fetch_remotes()
@@ -328,19 +435,62 @@ class Maintenance(salt.utils.process.SignalHandlingMultiprocessingProcess):
         '''
         try:
             self.schedule.eval()
-            # Check if scheduler requires lower loop interval than
-            # the loop_interval setting
-            if self.schedule.loop_interval < self.loop_interval:
-                self.loop_interval = self.schedule.loop_interval
         except Exception as exc:
             log.error('Exception %s occurred in scheduled job', exc)
 
+    def handle_stats(self):
+        '''
+        Fire a single aggregated ``salt/stats/master`` event with the stats
+        histograms of the MWorkers, merged by handle_event(), every
+        master_stats_event_iter
+        '''
+        if not self.opts['master_stats']:
+            return
+        now = time.time()
+        if now - self.stats_clock < self.opts['master_stats_event_iter']:
+            return
+        if self.stats:
+            report = {'start': self.stats_clock,
+                      'end': now,
+                      'workers': sorted(self.stats_workers),
+                      'stats': {}}
+            summary = {}
+            for cmd, cmd_stats in six.iteritems(self.stats):
+                report['stats'][cmd] = {'runs': cmd_stats['runs'],
+                                        'wait': cmd_stats['wait'].to_dict(),
+                                        'proc': cmd_stats['proc'].to_dict()}
+                summary[cmd] = {'runs': cmd_stats['runs'],
+                                'wait': cmd_stats['wait'].summary(),
+                                'proc': cmd_stats['proc'].summary()}
+                if 'events' in cmd_stats:
+                    report['stats'][cmd]['events'] = cmd_stats['events'].to_dict()
+                    summary[cmd]['events'] = cmd_stats['events'].summary()
+            # Keep the last report around for the stats runner
+            try:
+                with salt.utils.atomicfile.atomic_open(
+                        os.path.join(self.opts['cachedir'], 'master_stats.p'), 'wb') as fp_:
+                    self.serial.dump(report, fp_)
+            except (IOError, OSError) as exc:
+                log.error('Unable to write master stats report: %s', exc)
+            self.event.fire_event({'time': now - self.stats_clock,
+                                   'workers': report['workers'],
+                                   'stats': summary},
+                                  tagify('master', 'stats'))
+        self.stats = {}
+        self.stats_workers = set()
+        self.stats_clock = now
+
     def handle_presence(self, old_present):
         '''
-        Fire presence events if enabled
+        Update the presence table and fire presence events if enabled
         '''
+        if self.presence_table is not None:
+            present = self.ckminions.scan_connected_ids()
+            self.presence_table.update(present)
+            self.presence_table.write()
         if self.presence_events:
-            present = self.ckminions.connected_ids()
+            if self.presence_table is None:
+                present = self.ckminions.connected_ids()
             new = present.difference(old_present)
             lost = old_present.difference(present)
             if new or lost:
@@ -517,6 +667,12 @@ class Master(SMaster):
 
         self.__set_max_open_files()
 
+        if salt.utils.mine.enabled(self.opts):
+            try:
+                salt.utils.mine.migrate(self.opts)
+            except salt.exceptions.SaltCacheError:
+                log.error('Unable to convert the mine data', exc_info=True)
+
         # Reset signals to default ones before adding processes to the process
         # manager. We don't want the processes being started to inherit those
         # signal handlers
@@ -806,7 +962,7 @@ class MWorker(salt.utils.process.SignalHandlingMultiprocessingProcess):
         self.mkey = mkey
         self.key = key
         self.k_mtime = 0
-        self.stats = collections.defaultdict(lambda: {'mean': 0, 'runs': 0})
+        self.stats = self._new_stats()
         self.stat_clock = time.time()
 
     # We need __setstate__ and __getstate__ to also pickle 'SMaster.secrets'.
@@ -879,21 +1035,71 @@ class MWorker(salt.utils.process.SignalHandlingMultiprocessingProcess):
         '''
         key = payload['enc']
         load = payload['load']
+        if self.opts['master_stats']:
+            start = time.time()
         ret = {'aes': self._handle_aes,
                'clear': self._handle_clear}[key](load)
+        if self.opts['master_stats']:
+            cmd = load.get('cmd')
+            if cmd and not cmd.startswith('__'):
+                events = self._count_events(load) if cmd == '_minion_event' else None
+                self._post_stats(payload.get('recv_time', start), start, cmd, events)
         raise tornado.gen.Return(ret)
 
-    def _post_stats(self, start, cmd):
+    @staticmethod
+    def _new_stats():
+        '''
+        Return an empty per-command stats tracker
+        '''
+        return collections.defaultdict(
+            lambda: {'mean': 0,
+                     'runs': 0,
+                     'wait': salt.utils.histogram.LatencyHistogram(),
+                     'proc': salt.utils.histogram.LatencyHistogram()})
+
+    @staticmethod
+    def _count_events(load):
+        '''
+        Return the number of events carried by a ``_minion_event`` load
+        '''
+        batch = load.get('batch')
+        count = 0
+        for event_load in batch if isinstance(batch, list) else [load]:
+            if isinstance(event_load, dict):
+                events = event_load.get('events')
+                count += len(events) if isinstance(events, list) else 1
+        return count
+
+    def _post_stats(self, recv, start, cmd, events=None):
         '''
         Calculate the master stats and fire events with stat info
+
+        :param float recv: When the transport received the request
+        :param float start: When the command handler was started
+        :param str cmd: The command which was run
+        :param int events: The number of events carried by a minion event
         '''
         end = time.time()
         duration = end - start
-        self.stats[cmd]['mean'] = (self.stats[cmd]['mean'] * (self.stats[cmd]['runs'] - 1) + duration) / self.stats[cmd]['runs']
+        stats = self.stats[cmd]
+        stats['runs'] += 1
+        stats['mean'] = (stats['mean'] * (stats['runs'] - 1) + duration) / stats['runs']
+        stats['wait'].add(start - recv)
+        stats['proc'].add(duration)
+        if events is not None:
+            stats.setdefault('events', salt.utils.histogram.CountHistogram()).add(events)
         if end - self.stat_clock > self.opts['master_stats_event_iter']:
             # Fire the event with the stats and wipe the tracker
-            self.aes_funcs.event.fire_event({'time': end - self.stat_clock, 'worker': self.name, 'stats': self.stats}, tagify(self.name, 'stats'))
-            self.stats = collections.defaultdict(lambda: {'mean': 0, 'runs': 0})
+            data = {}
+            for name, cmd_stats in six.iteritems(self.stats):
+                data[name] = {'mean': cmd_stats['mean'],
+                              'runs': cmd_stats['runs'],
+                              'wait': cmd_stats['wait'].to_dict(),
+                              'proc': cmd_stats['proc'].to_dict()}
+                if 'events' in cmd_stats:
+                    data[name]['events'] = cmd_stats['events'].to_dict()
+            self.aes_funcs.event.fire_event({'time': end - self.stat_clock, 'worker': self.name, 'stats': data}, tagify(self.name, 'stats'))
+            self.stats = self._new_stats()
             self.stat_clock = end
 
     def _handle_clear(self, load):
@@ -908,13 +1114,7 @@ class MWorker(salt.utils.process.SignalHandlingMultiprocessingProcess):
         cmd = load['cmd']
         if cmd.startswith('__'):
             return False
-        if self.opts['master_stats']:
-            start = time.time()
-            self.stats[cmd]['runs'] += 1
-        ret = getattr(self.clear_funcs, cmd)(load), {'fun': 'send_clear'}
-        if self.opts['master_stats']:
-            self._post_stats(start, cmd)
-        return ret
+        return getattr(self.clear_funcs, cmd)(load), {'fun': 'send_clear'}
 
     def _handle_aes(self, data):
         '''
@@ -931,13 +1131,7 @@ class MWorker(salt.utils.process.SignalHandlingMultiprocessingProcess):
         log.trace('AES payload received with command %s', data['cmd'])
         if cmd.startswith('__'):
             return False
-        if self.opts['master_stats']:
-            start = time.time()
-            self.stats[cmd]['runs'] += 1
-        ret = self.aes_funcs.run_func(data['cmd'], data)
-        if self.opts['master_stats']:
-            self._post_stats(start, cmd)
-        return ret
+        return self.aes_funcs.run_func(data['cmd'], data)
 
     def run(self):
         '''
@@ -1373,6 +1567,17 @@ class AESFuncs(object):
         load = self.__verify_load(load, ('id', 'tok'))
         if load is False:
             return {}
+        if isinstance(load.get('batch'), list):
+            # The events queued by the minion, see fire_master_batch_size,
+            # every one is an event load of its own
+            for event_load in load['batch']:
+                if not isinstance(event_load, dict):
+                    continue
+                event_load['id'] = load['id']
+                event_load['cmd'] = '_minion_event'
+                self.masterapi._minion_event(event_load)
+                self._handle_minion_event(event_load)
+            return
         # Route to master event bus
         self.masterapi._minion_event(load)
         # Process locally
@@ -1389,8 +1594,20 @@ class AESFuncs(object):
                 id_, load['data']['message']
             )
 
+        jobs_tag = tagify([id_, 'jobs'], 'minion')
         for event in load.get('events', []):
             event_data = event.get('data', {})
+            if event.get('tag') == jobs_tag:
+                # A job heartbeat, update the running jobs table
+                try:
+                    salt.utils.minions.store_running_jobs(
+                        self.opts,
+                        id_,
+                        event_data,
+                        cache=self.masterapi.cache)
+                except salt.exceptions.SaltCacheError as exc:
+                    log.error('Could not store the running jobs of %s: %s', id_, exc)
+                continue
             if 'minions' in event_data:
                 jid = event_data.get('jid')
                 if not jid:
@@ -1943,7 +2160,7 @@ class ClearFuncs(object):
         payload = self._prep_pub(minions, jid, clear_load, extra, missing)
 
         # Send it!
-        self._send_pub(payload)
+        self._send_pub(payload, minions=minions)
 
         return {
             'enc': 'clear',
@@ -1997,13 +2214,16 @@ class ClearFuncs(object):
             return {'error': msg}
         return jid
 
-    def _send_pub(self, load):
+    def _send_pub(self, load, minions=None):
         '''
         Take a load and send it across the network to connected minions
+
+        :param list minions: The minions the target was resolved to, passed
+                             along so the publisher does not resolve it again
         '''
         for transport, opts in iter_transport_opts(self.opts):
             chan = salt.transport.server.PubServerChannel.factory(opts)
-            chan.publish(load)
+            chan.publish(load, minions=minions)
 
     def _prep_pub(self, minions, jid, clear_load, extra, missing):
         '''
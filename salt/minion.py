@@ -1042,6 +1042,16 @@ class Minion(MinionBase):
         # True means the Minion is fully functional and ready to handle events.
         self.ready = False
         self.jid_queue = jid_queue or []
+        self.job_queue = salt.utils.minion.JobQueue(self.opts)
+        self._job_queue_handle = None
+        self._fork_server = None
+        self._heartbeat_jobs = False
+        self._beacons_worker = None
+        self._beacons_started = 0
+        self._beacon_events = []
+        self._event_batch = []
+        self._event_batch_count = 0
+        self._event_batch_handle = None
 
         if io_loop is None:
             if HAS_ZMQ:
@@ -1283,6 +1293,9 @@ class Minion(MinionBase):
             if not HAS_RESOURCE:
                 log.error('Unable to enforce modules_max_memory because resource is missing')
 
+        # Jobs forked from the fork server must see the new modules and opts
+        self._stop_fork_server()
+
         # This might be a proxy minion
         if hasattr(self, 'proxy'):
             proxy = self.proxy
@@ -1337,7 +1350,7 @@ class Minion(MinionBase):
         ret = yield channel.send(load, timeout=timeout)
         raise tornado.gen.Return(ret)
 
-    def _fire_master(self, data=None, tag=None, events=None, pretag=None, timeout=60, sync=True, timeout_handler=None):
+    def _fire_master(self, data=None, tag=None, events=None, pretag=None, timeout=60, sync=True, timeout_handler=None, batch=None):
         '''
         Fire an event on the master, or drop message if unable to send.
         '''
@@ -1345,7 +1358,9 @@ class Minion(MinionBase):
                 'cmd': '_minion_event',
                 'pretag': pretag,
                 'tok': self.tok}
-        if events:
+        if batch:
+            load['batch'] = batch
+        elif events:
             load['events'] = events
         elif data and tag:
             load['data'] = data
@@ -1376,6 +1391,42 @@ class Minion(MinionBase):
                 self._send_req_async(load, timeout, callback=lambda f: None)  # pylint: disable=unexpected-keyword-arg
         return True
 
+    def _batch_fire_master(self, data=None, tag=None, events=None, pretag=None, sync=True):
+        '''
+        Fire an event on the master. With fire_master_batch_size, the event is
+        queued and sent to the master with the other events queued within
+        fire_master_batch_interval, in a single request.
+        '''
+        batch_size = self.opts.get('fire_master_batch_size', 0)
+        if batch_size <= 0:
+            return self._fire_master(data=data, tag=tag, events=events, pretag=pretag, sync=sync)
+        if events:
+            self._event_batch.append({'events': events, 'pretag': pretag})
+            self._event_batch_count += len(events)
+        elif tag:
+            self._event_batch.append({'data': data or {}, 'tag': tag, 'pretag': pretag})
+            self._event_batch_count += 1
+        else:
+            return
+        if self._event_batch_count >= batch_size:
+            self._flush_event_batch()
+        elif self._event_batch_handle is None:
+            self._event_batch_handle = self.io_loop.call_later(
+                self.opts.get('fire_master_batch_interval', 0.5), self._flush_event_batch)
+        return True
+
+    def _flush_event_batch(self):
+        '''
+        Send the queued events to the master in a single request
+        '''
+        if self._event_batch_handle is not None:
+            self.io_loop.remove_timeout(self._event_batch_handle)
+            self._event_batch_handle = None
+        batch, self._event_batch = self._event_batch, []
+        self._event_batch_count = 0
+        if batch and self.connected:
+            self._fire_master(batch=batch, sync=False)
+
     @tornado.gen.coroutine
     def _handle_decoded_payload(self, data):
         '''
@@ -1410,20 +1461,54 @@ class Minion(MinionBase):
                 self.schedule.functions = self.functions
                 self.schedule.returners = self.returners
 
-        process_count_max = self.opts.get('process_count_max')
-        if process_count_max > 0:
-            process_count = len(salt.utils.minion.running(self.opts))
-            while process_count >= process_count_max:
-                log.warn("Maximum number of processes reached while executing jid {0}, waiting...".format(data['jid']))
-                yield tornado.gen.sleep(10)
-                process_count = len(salt.utils.minion.running(self.opts))
+        for job in self.job_queue.submit(data):
+            self._spawn_job(job)
+        if self.job_queue:
+            self._schedule_job_queue()
+
+    def _schedule_job_queue(self):
+        '''
+        Check the job queue again after ``loop_interval`` seconds
+        '''
+        if self._job_queue_handle is None:
+            self._job_queue_handle = self.io_loop.call_later(
+                self.opts['loop_interval'], self._process_job_queue)
+
+    def _process_job_queue(self):
+        '''
+        Start the queued jobs which are allowed to run now
+        '''
+        self._job_queue_handle = None
+        try:
+            for job in self.job_queue.ready():
+                self._spawn_job(job)
+        except Exception:
+            log.exception('Failed to start the queued jobs')
+        if self.job_queue:
+            self._schedule_job_queue()
+
+    def _spawn_job(self, data):
+        '''
+        Run a job in a new process or thread
+        '''
+        multiprocessing_enabled = self.opts.get('multiprocessing', True)
+        if multiprocessing_enabled and self.opts.get('fork_server') \
+                and not salt.utils.platform.is_windows():
+            if self._fork_server is None:
+                self._fork_server = salt.utils.process.ForkServer(
+                    self._fork_server_target,
+                    warmup=self._fork_server_warmup,
+                    name='{0}.ForkServer'.format(self.__class__.__name__)
+                )
+            if self._fork_server.submit(data, self.connected):
+                return
+            log.warning('Fork server unavailable, forking jid %s from the minion', data['jid'])
 
         # We stash an instance references to allow for the socket
         # communication in Windows. You can't pickle functions, and thus
         # python needs to be able to reconstruct the reference on the other
         # side.
         instance = self
-        multiprocessing_enabled = self.opts.get('multiprocessing', True)
         if multiprocessing_enabled:
             if sys.platform.startswith('win'):
                 # let python reconstruct the minion on the other side if we're
@@ -1455,6 +1540,29 @@ class Minion(MinionBase):
         else:
             self.win_proc.append(process)
 
+    def _fork_server_warmup(self):
+        '''
+        Load all of the modules in the fork server before the first job
+        '''
+        for loader in (self.functions, self.returners, self.executors):
+            # Sizing a LazyLoader loads all of its modules
+            len(loader)
+
+    def _fork_server_target(self, data, connected):
+        '''
+        Run a job in a child of the fork server
+        '''
+        self.connected = connected
+        self._target(self, self.opts, data, connected)
+
+    def _stop_fork_server(self):
+        '''
+        Stop the fork server, the next job starts a new one from the current
+        state of the minion
+        '''
+        if getattr(self, '_fork_server', None) is not None:
+            self._fork_server.stop()
+
     def ctx(self):
         '''
         Return a single context manager for the minion's data
@@ -2014,6 +2122,118 @@ class Minion(MinionBase):
                     }
             })
 
+    def _handle_beacons(self):
+        '''
+        Process the beacons. With beacons_async they run in a worker thread,
+        so a slow beacon does not hold up the minion's main loop.
+        '''
+        if not self.opts.get('beacons_async', True):
+            beacons = None
+            try:
+                beacons = self.process_beacons(self.functions)
+            except Exception:
+                log.critical('The beacon errored: ', exc_info=True)
+            self._queue_beacon_events(beacons)
+            return
+
+        if self._beacons_worker is not None:
+            timeout = self.opts.get('beacons_timeout', 30)
+            if time.time() - self._beacons_started < timeout:
+                return
+            # The worker cannot be interrupted, leave it behind, it stops once
+            # the beacon it is running returns, which is skipped until then
+            log.error('The beacons %s did not return within %s seconds, '
+                      'processing the other beacons without them',
+                      ', '.join(sorted(self.beacons.running)), timeout)
+            self.beacons.abandon()
+        if 'config.merge' not in self.functions:
+            return
+        # Copy the configuration, manage_beacons changes it in this thread
+        b_conf = copy.deepcopy(
+            self.functions['config.merge']('beacons', self.opts['beacons'], omit_opts=True)
+        )
+        if not b_conf:
+            return
+        worker = threading.Thread(target=self._run_beacons,
+                                  args=(self.beacons, b_conf, self.opts['grains'],
+                                        self.beacons.generation))
+        worker.daemon = True
+        self._beacons_worker = worker
+        self._beacons_started = time.time()
+        worker.start()
+
+    def _run_beacons(self, beacons, config, grains, generation):
+        '''
+        Run the beacons in a worker thread and hand their events to the main
+        loop
+        '''
+        events = None
+        try:
+            events = beacons.process(config, grains, generation)
+        except Exception:
+            log.critical('The beacon errored: ', exc_info=True)
+        self.io_loop.add_callback(self._beacons_done, threading.current_thread(), events)
+
+    def _beacons_done(self, worker, events):
+        if worker is self._beacons_worker:
+            self._beacons_worker = None
+        self._queue_beacon_events(events)
+
+    def _queue_beacon_events(self, events):
+        '''
+        Queue the events of the beacons, they are fired to the master every
+        beacons_batch_interval seconds, or right away when it is 0
+        '''
+        if not events:
+            return
+        self._beacon_events.extend(events)
+        if not self.opts.get('beacons_batch_interval', 0):
+            self._flush_beacon_events()
+
+    def _flush_beacon_events(self):
+        '''
+        Fire the queued beacon events to the master in a single request
+        '''
+        events, self._beacon_events = self._beacon_events, []
+        if events and self.connected:
+            self._batch_fire_master(events=events, sync=False)
+
+    def _job_heartbeat(self):
+        '''
+        Report the running and queued jobs to the master. Clients waiting for
+        a job learn that it is still running from these events, without
+        publishing saltutil.find_job.
+        '''
+        try:
+            jobs = {}
+            for data in salt.utils.minion.running(self.opts):
+                jobs[data['jid']] = {'fun': data.get('fun'),
+                                     'pid': data.get('pid'),
+                                     'state': 'running'}
+            for data in self.job_queue.queue:
+                jobs[data['jid']] = {'fun': data.get('fun'),
+                                     'pid': None,
+                                     'state': 'queued'}
+            # Send one more heartbeat once the last job is done so the
+            # master does not keep it in its running jobs table
+            if not jobs and not self._heartbeat_jobs:
+                return
+            self._heartbeat_jobs = bool(jobs)
+            if not self.connected:
+                return
+            events = [{'tag': tagify([self.opts['id'], 'jobs'], 'minion'),
+                       'data': {'id': self.opts['id'],
+                                'interval': self.opts['job_heartbeat_interval'],
+                                'jobs': jobs}}]
+            for jid, job in six.iteritems(jobs):
+                data = {'jid': jid, 'id': self.opts['id']}
+                data.update(job)
+                events.append({'tag': tagify([jid, 'heartbeat', self.opts['id']], 'job'),
+                               'data': data})
+            self._fire_master(events=events, sync=False)
+        except Exception:
+            log.error('Failed to send the job heartbeat', exc_info=True)
+
     def _fire_master_minion_start(self):
         # Send an event to the master that the minion is live
         self._fire_master(
@@ -2239,7 +2459,7 @@ class Minion(MinionBase):
         elif tag.startswith('fire_master'):
             if self.connected:
                 log.debug('Forwarding master event tag=%s', data['tag'])
-                self._fire_master(data['data'], data['tag'], data['events'], data['pretag'])
+                self._batch_fire_master(data['data'], data['tag'], data['events'], data['pretag'])
         elif tag.startswith(master_event(type='disconnected')) or tag.startswith(master_event(type='failback')):
             # if the master disconnect event is for a different master, raise an exception
             if tag.startswith(master_event(type='disconnected')) and data['master'] != self.opts['master']:
@@ -2382,7 +2602,7 @@ class Minion(MinionBase):
         elif tag.startswith('_salt_error'):
             if self.connected:
                 log.debug('Forwarding salt error event tag=%s', tag)
-                self._fire_master(data, tag)
+                self._batch_fire_master(data, tag)
         elif tag.startswith('salt/auth/creds'):
             key = tuple(data['key'])
             log.debug(
@@ -2476,17 +2696,16 @@ class Minion(MinionBase):
 
         self.periodic_callbacks['cleanup'] = tornado.ioloop.PeriodicCallback(self._fallback_cleanups, loop_interval * 1000, io_loop=self.io_loop)
 
-        def handle_beacons():
-            # Process Beacons
-            beacons = None
-            try:
-                beacons = self.process_beacons(self.functions)
-            except Exception:
-                log.critical('The beacon errored: ', exc_info=True)
-            if beacons and self.connected:
-                self._fire_master(events=beacons, sync=False)
+        self.periodic_callbacks['beacons'] = tornado.ioloop.PeriodicCallback(self._handle_beacons, loop_interval * 1000, io_loop=self.io_loop)
+        beacons_batch_interval = self.opts.get('beacons_batch_interval', 0)
+        if beacons_batch_interval > 0:
+            self.periodic_callbacks['beacons_flush'] = tornado.ioloop.PeriodicCallback(
+                self._flush_beacon_events, beacons_batch_interval * 1000, io_loop=self.io_loop)
 
-        self.periodic_callbacks['beacons'] = tornado.ioloop.PeriodicCallback(handle_beacons, loop_interval * 1000, io_loop=self.io_loop)
+        job_heartbeat_interval = self.opts.get('job_heartbeat_interval', 0)
+        if job_heartbeat_interval > 0:
+            self.periodic_callbacks['job_heartbeat'] = tornado.ioloop.PeriodicCallback(
+                self._job_heartbeat, job_heartbeat_interval * 1000, io_loop=self.io_loop)
 
         # TODO: actually listen to the return and change period
         def handle_schedule():
@@ -2571,6 +2790,13 @@ class Minion(MinionBase):
         if hasattr(self, 'periodic_callbacks'):
             for cb in six.itervalues(self.periodic_callbacks):
                 cb.stop()
+        if getattr(self, '_job_queue_handle', None) is not None:
+            self.io_loop.remove_timeout(self._job_queue_handle)
+            self._job_queue_handle = None
+        if getattr(self, '_event_batch_handle', None) is not None:
+            self.io_loop.remove_timeout(self._event_batch_handle)
+            self._event_batch_handle = None
+        self._stop_fork_server()
 
     def __del__(self):
         self.destroy()
@@ -1112,10 +1112,16 @@ def find_job(jid):
         # salt my-minion saltutil.find_job 20160503150049487736
         my-minion:
             ----------
+
+    A job which is waiting in the minion's job queue (see
+    :conf_minion:`process_count_max`) is returned as well, it has no ``pid``.
     '''
     for data in running():
         if data['jid'] == jid:
             return data
+    for data in salt.utils.minion.queued(__opts__):
+        if data['jid'] == jid:
+            return data
     return {}
 
 
@@ -18,6 +18,7 @@ import fnmatch
 import json
 import logging
 import os
+import re
 import shutil
 import sys
 import tarfile
@@ -70,6 +71,14 @@ log = logging.getLogger(__name__)
 # Define the module's virtual name
 __virtualname__ = 'state'
 
+# Files of the delta state packages sent by salt-ssh are cached by checksum,
+# objects unused for two weeks are pruned
+_STATE_OBJECT_RE = re.compile(r'^[0-9a-f]+$')
+_STATE_OBJECT_TTL = 14 * 86400
+# The files holding the run's pillar, grains and lowstate, they are never
+# written to the object cache
+_STATE_PKG_PRIVATE = ('lowstate.json', 'pillar.json', 'roster_grains.json')
+
 
 def __virtual__():
     '''
@@ -1961,6 +1970,59 @@ def clear_cache():
     return ret
 
 
+def _unpack_state_objects(root):
+    '''
+    Complete a state package which only holds the files changed since the
+    last run. The files shipped in the package are added to the object cache
+    of the target, the files the package left out are copied from it.
+    Returns the checksums of the files missing from the object cache.
+    '''
+    manifest_json = os.path.join(root, 'manifest.json')
+    if not os.path.isfile(manifest_json):
+        return []
+    with salt.utils.files.fopen(manifest_json, 'r') as fp_:
+        manifest = json.load(fp_)
+    os.remove(manifest_json)
+    objdir = os.path.join(__opts__['cachedir'], 'state_objects')
+    if not os.path.isdir(objdir):
+        os.makedirs(objdir, 0o700)
+    missing = []
+    for path, sum_ in six.iteritems(manifest):
+        if not _STATE_OBJECT_RE.match(sum_) \
+                or os.path.isabs(path) \
+                or '..' in path.split('/'):
+            raise CommandExecutionError(
+                'Invalid entry in the state package manifest: {0}'.format(path))
+        if path in _STATE_PKG_PRIVATE:
+            continue
+        full = os.path.join(root, path)
+        obj = os.path.join(objdir, sum_)
+        if os.path.isfile(full):
+            if not os.path.isfile(obj):
+                shutil.copyfile(full, obj)
+        elif os.path.isfile(obj):
+            tgt_dir = os.path.dirname(full)
+            if not os.path.isdir(tgt_dir):
+                os.makedirs(tgt_dir)
+            shutil.copyfile(obj, full)
+        else:
+            missing.append(sum_)
+            continue
+        # Keep the objects in use from being pruned
+        os.utime(obj, None)
+    # Prune the objects no package used for a while, salt-ssh forgets about
+    # them sooner so it does not rely on pruned objects
+    now = time.time()
+    for name in os.listdir(objdir):
+        obj = os.path.join(objdir, name)
+        try:
+            if now - os.path.getmtime(obj) > _STATE_OBJECT_TTL:
+                os.remove(obj)
+        except OSError:
+            pass
+    return missing
+
+
 def pkg(pkg_path,
         pkg_sum,
         hash_type,
@@ -1994,6 +2056,11 @@ def pkg(pkg_path,
             return {}
     s_pkg.extractall(root)
     s_pkg.close()
+    missing = _unpack_state_objects(root)
+    if missing:
+        # Ask salt-ssh to send the full package
+        shutil.rmtree(root, ignore_errors=True)
+        return {'_missing_objects': missing}
     lowstate_json = os.path.join(root, 'lowstate.json')
     with salt.utils.files.fopen(lowstate_json, 'r') as fp_:
         lowstate = json.load(fp_, object_hook=salt.utils.data.decode_dict)
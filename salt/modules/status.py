@@ -25,6 +25,7 @@ import salt.config
 import salt.minion
 import salt.utils.event
 import salt.utils.files
+import salt.utils.minion
 import salt.utils.network
 import salt.utils.path
 import salt.utils.platform
@@ -1600,6 +1601,24 @@ def proxy_reconnect(proxy_name, opts=None):
     return True  # success
 
 
+def jobs():
+    '''
+    .. versionadded:: Oxygen
+
+    Return the number of running and queued jobs on the minion, along with
+    the configured :conf_minion:`process_count_max`
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '*' status.jobs
+    '''
+    return {'running': len(salt.utils.minion.running(__opts__)),
+            'queued': len(salt.utils.minion.queued(__opts__)),
+            'max': __opts__.get('process_count_max', -1)}
+
+
 def time_(format='%A, %d. %B %Y %I:%M%p'):
     '''
     .. versionadded:: 2016.3.0
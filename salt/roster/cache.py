@@ -102,6 +102,7 @@ import copy
 
 # Salt libs
 import salt.utils.data
+import salt.utils.mine
 import salt.utils.minions
 import salt.utils.versions
 import salt.cache
@@ -199,7 +200,7 @@ def _load_minion(minion_id, cache):
         6: sorted([ipaddress.IPv6Address(addr) for addr in grains.get('ipv6', [])])
     }
 
-    mine = cache.fetch('minions/{0}'.format(minion_id), 'mine')
+    mine = salt.utils.mine.get_all(__opts__, minion_id, cache)
 
     return grains, pillar, addrs, mine
 
@@ -506,3 +506,68 @@ def flush(bank, key=None, cachedir=None):
     except TypeError:
         cache = salt.cache.Cache(__opts__)
     return cache.flush(bank, key)
+
+
+def migrate(source='localfs', target=None, banks='minions', batch=1000, cachedir=None):
+    '''
+    .. versionadded:: Oxygen
+
+    Copy the keys of the banks, and of all their sub-banks, from the
+    ``source`` cache driver to the ``target`` one, by default the
+    :conf_master:`cache` of the master. Run it before switching the master
+    to the target driver; the keys stored in the meantime are copied again
+    by running it once more.
+
+    source
+        The cache driver to read, ``localfs`` by default
+
+    target
+        The cache driver to write, the ``cache`` option by default
+
+    banks
+        A comma separated list of the banks to copy, ``minions`` by default
+
+    batch
+        The number of keys written at once
+
+    CLI Examples:
+
+    .. code-block:: bash
+
+        salt-run cache.migrate target=lmdb
+        salt-run cache.migrate source=localfs target=redis banks=minions,cloud
+    '''
+    if target is None:
+        target = __opts__['cache']
+    if source == target:
+        raise SaltInvocationError('The source and target cache drivers are both {0}'.format(source))
+    if cachedir is None:
+        cachedir = __opts__['cachedir']
+    if isinstance(banks, six.string_types):
+        banks = banks.split(',')
+
+    src = salt.cache.Cache(dict(__opts__, cache=source), cachedir=cachedir)
+    dst = salt.cache.Cache(dict(__opts__, cache=target), cachedir=cachedir)
+    ret = {'banks': 0, 'keys': 0}
+    pending = {}
+    stack = [bank.strip('/') for bank in reversed(banks)]
+    while stack:
+        bank = stack.pop()
+        ret['banks'] += 1
+        data = src.list_with_data(bank)
+        for key, value in six.iteritems(data):
+            pending[(bank, key)] = value
+        if len(pending) >= batch:
+            dst.store_many(pending)
+            ret['keys'] += len(pending)
+            pending = {}
+        # A name can be both a key and a sub-bank
+        for name in sorted(set(src.list(bank)), reverse=True):
+            if src.contains('{0}/{1}'.format(bank, name), None):
+                stack.append('{0}/{1}'.format(bank, name))
+    if pending:
+        dst.store_many(pending)
+        ret['keys'] += len(pending)
+    log.info('Copied %s keys of %s banks from the %s cache to the %s cache',
+             ret['keys'], ret['banks'], source, target)
+    return ret
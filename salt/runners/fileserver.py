@@ -280,7 +280,7 @@ def empty_dir_list(saltenv='base', backend=None):
     return fileserver.file_list_emptydirs(load=load)
 
 
-def update(backend=None):
+def update(backend=None, remotes=None, refs=None):
     '''
     Update the fileserver cache. If no backend is provided, then the cache for
     all configured backends will be updated.
@@ -299,15 +299,30 @@ def update(backend=None):
             comma-separated list. In earlier versions, they needed to be passed
             as a python list (ex: ``backend="['roots', 'git']"``)
 
+    remotes
+        .. versionadded:: Oxygen
+
+        Only update the remotes matching these comma-separated URLs or glob
+        patterns, and clear the file list caches of the saltenvs they serve.
+        Backends which cannot update single remotes are skipped. Currently
+        only :mod:`gitfs <salt.fileserver.gitfs>` can.
+
+    refs
+        .. versionadded:: Oxygen
+
+        With ``remotes``, the branches/tags which changed. Only the file list
+        caches of the saltenvs mapped to them are cleared.
+
     CLI Example:
 
     .. code-block:: bash
 
         salt-run fileserver.update
         salt-run fileserver.update backend=roots,git
+        salt-run fileserver.update remotes=https://example.com/states.git refs=master
     '''
     fileserver = salt.fileserver.Fileserver(__opts__)
-    fileserver.update(back=backend)
+    fileserver.update(back=backend, remotes=remotes, refs=refs)
     return True
 
 
@@ -15,6 +15,7 @@ import salt.payload
 import salt.utils.args
 import salt.utils.files
 import salt.utils.jid
+import salt.utils.minions
 import salt.minion
 import salt.returners
 
@@ -31,24 +32,37 @@ except ImportError:
 log = logging.getLogger(__name__)
 
 
-def active(display_progress=False):
+def active(display_progress=False, heartbeat=False):
     '''
     Return a report on all actively running jobs from a job id centric
     perspective
 
+    heartbeat : False
+        .. versionadded:: Oxygen
+
+        Build the report from the running jobs table which the master keeps
+        from the job heartbeats of the minions (see
+        :conf_minion:`job_heartbeat_interval`), instead of publishing
+        ``saltutil.running`` to all minions. Minions which do not send job
+        heartbeats are not included.
+
     CLI Example:
 
     .. code-block:: bash
 
         salt-run jobs.active
+        salt-run jobs.active heartbeat=True
     '''
     ret = {}
-    client = salt.client.get_local_client(__opts__['conf_file'])
-    try:
-        active_ = client.cmd('*', 'saltutil.running', timeout=__opts__['timeout'])
-    except SaltClientError as client_error:
-        print(client_error)
-        return ret
+    if heartbeat:
+        active_ = _heartbeat_running()
+    else:
+        client = salt.client.get_local_client(__opts__['conf_file'])
+        try:
+            active_ = client.cmd('*', 'saltutil.running', timeout=__opts__['timeout'])
+        except SaltClientError as client_error:
+            print(client_error)
+            return ret
 
     if display_progress:
         __jid_event__.fire_event({
@@ -560,6 +574,31 @@ def _format_job_instance(job):
     return ret
 
 
+def _heartbeat_running():
+    '''
+    Return the running jobs table in the format of saltutil.running, with the
+    job details taken from the job cache
+    '''
+    mminion = salt.minion.MasterMinion(__opts__)
+    get_load = mminion.returners['{0}.get_load'.format(__opts__['master_job_cache'])]
+    loads = {}
+    ret = {}
+    for minion, data in six.iteritems(salt.utils.minions.running_jobs(__opts__)):
+        ret[minion] = []
+        for jid, job in six.iteritems(data['jobs']):
+            if jid not in loads:
+                try:
+                    loads[jid] = get_load(jid) or {}
+                except Exception as exc:
+                    log.warning('Could not get the load of job %s: %s', jid, exc)
+                    loads[jid] = {}
+            info = dict(loads[jid])
+            info.update(job)
+            info['jid'] = jid
+            ret[minion].append(info)
+    return ret
+
+
 def _format_jid_instance(jid, job):
     '''
     Helper to format jid instance
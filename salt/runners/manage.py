@@ -24,6 +24,7 @@ import salt.key
 import salt.utils.compat
 import salt.utils.files
 import salt.utils.minions
+import salt.utils.presence
 import salt.utils.raetevent
 import salt.utils.versions
 import salt.client
@@ -39,6 +40,27 @@ log = logging.getLogger(__name__)
 
 def _ping(tgt, tgt_type, timeout, gather_job_timeout):
     client = salt.client.get_local_client(__opts__['conf_file'])
+
+    # Minions which sent a job heartbeat recently are up, only ping the others
+    alive = set()
+    down = set()
+    if tgt_type in ('glob', 'pcre', 'list'):
+        targeted = salt.utils.minions.CkMinions(__opts__).check_minions(tgt, tgt_type)['minions']
+        alive = set(salt.utils.minions.running_jobs(__opts__, targeted))
+        if alive:
+            log.debug('manage runner found job heartbeats from: %s', ', '.join(sorted(alive)))
+        if __opts__['transport'] == 'tcp':
+            # The TCP publisher knows which minions are connected, the others
+            # cannot answer
+            present = salt.utils.presence.connected(__opts__, targeted)
+            if present is not None:
+                down = set(targeted) - present - alive
+        if alive or down:
+            remaining = sorted(set(targeted) - alive - down)
+            if not remaining:
+                return sorted(alive), sorted(down)
+            tgt, tgt_type = remaining, 'list'
+
     pub_data = client.run_job(tgt, 'test.ping', (), tgt_type, '', timeout, '')
 
     if not pub_data:
@@ -49,7 +71,7 @@ def _ping(tgt, tgt_type, timeout, gather_job_timeout):
         ', '.join(sorted(pub_data['minions']))
     )
 
-    returned = set()
+    returned = set(alive)
     for fn_ret in client.get_cli_event_returns(
             pub_data['jid'],
             pub_data['minions'],
@@ -63,7 +85,7 @@ def _ping(tgt, tgt_type, timeout, gather_job_timeout):
                 log.debug('minion \'%s\' returned from ping', mid)
                 returned.add(mid)
 
-    not_returned = sorted(set(pub_data['minions']) - returned)
+    not_returned = sorted(set(pub_data['minions']).union(down) - returned)
     returned = sorted(returned)
 
     return returned, not_returned
@@ -31,11 +31,11 @@ def list_(saltenv='base', test=None):
         salt-run reactor.list
     '''
     sevent = salt.utils.event.get_event(
-            'master',
-            __opts__['sock_dir'],
-            __opts__['transport'],
-            opts=__opts__,
-            listen=True)
+        'master',
+        __opts__['sock_dir'],
+        __opts__['transport'],
+        opts=__opts__,
+        listen=True)
 
     __jid_event__.fire_event({}, 'salt/reactors/manage/list')
 
@@ -58,11 +58,11 @@ def add(event, reactors, saltenv='base', test=None):
         reactors = [reactors]
 
     sevent = salt.utils.event.get_event(
-            'master',
-            __opts__['sock_dir'],
-            __opts__['transport'],
-            opts=__opts__,
-            listen=True)
+        'master',
+        __opts__['sock_dir'],
+        __opts__['transport'],
+        opts=__opts__,
+        listen=True)
 
     __jid_event__.fire_event({'event': event,
                               'reactors': reactors},
@@ -83,13 +83,40 @@ def delete(event, saltenv='base', test=None):
         salt-run reactor.delete 'salt/cloud/*/destroyed'
     '''
     sevent = salt.utils.event.get_event(
-            'master',
-            __opts__['sock_dir'],
-            __opts__['transport'],
-            opts=__opts__,
-            listen=True)
+        'master',
+        __opts__['sock_dir'],
+        __opts__['transport'],
+        opts=__opts__,
+        listen=True)
 
     __jid_event__.fire_event({'event': event}, 'salt/reactors/manage/delete')
 
     res = sevent.get_event(wait=30, tag='salt/reactors/manage/delete-complete')
     return res['result']
+
+
+def stats():
+    '''
+    .. versionadded:: Oxygen
+
+    Return the statistics of the reactor: the depth of the queue of the
+    ``runner`` and ``wheel`` reactions, the dropped and rate limited
+    reactions and the latencies, in the current interval of
+    :conf_master:`reactor_stats_interval` and since the start
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run reactor.stats
+    '''
+    sevent = salt.utils.event.get_event(
+        'master',
+        __opts__['sock_dir'],
+        __opts__['transport'],
+        opts=__opts__,
+        listen=True)
+
+    __jid_event__.fire_event({}, 'salt/reactors/manage/stats')
+
+    return sevent.get_event(wait=30, tag='salt/reactors/manage/stats-results')
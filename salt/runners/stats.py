@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+'''
+Report on the request latency of the salt master
+
+The master workers record how long each command waited before being handled
+and how long it took to process. When :conf_master:`master_stats` is enabled
+the Maintenance process merges these latency histograms and keeps the last
+aggregated report in the master cachedir.
+
+.. versionadded:: Oxygen
+'''
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import os
+import logging
+
+# Import salt libs
+import salt.payload
+import salt.utils.args
+import salt.utils.files
+import salt.utils.histogram
+from salt.ext import six
+
+log = logging.getLogger(__name__)
+
+
+def _read_report():
+    '''
+    Load the last aggregated stats report written by the master
+    '''
+    path = os.path.join(__opts__['cachedir'], 'master_stats.p')
+    if not os.path.isfile(path):
+        return {}
+    serial = salt.payload.Serial(__opts__)
+    try:
+        with salt.utils.files.fopen(path, 'rb') as fp_:
+            return serial.load(fp_) or {}
+    except (IOError, OSError) as exc:
+        log.error('Unable to read master stats report %s: %s', path, exc)
+        return {}
+
+
+def report(cmd=None, percentiles='50,90,99'):
+    '''
+    Return the latency percentiles of the commands handled by the master
+    workers during the last :conf_master:`master_stats_event_iter` window.
+
+    ``wait`` is the time a request spent in the worker before its handler was
+    called, ``proc`` is the time spent in the handler itself. ``events`` is
+    the number of events carried by each ``_minion_event`` request.
+
+    cmd
+        Only report on the given command(s), e.g. ``_pillar`` or
+        ``_serve_file``. Can be a comma-separated list.
+
+    percentiles
+        The percentiles to report, as a comma-separated list or a list.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run stats.report
+        salt-run stats.report cmd=_pillar,_serve_file percentiles=50,99,99.9
+    '''
+    if not __opts__.get('master_stats'):
+        return 'master_stats is not enabled on this master'
+    data = _read_report()
+    if not data:
+        return {}
+    if cmd is not None:
+        cmd = salt.utils.args.split_input(cmd)
+    percentiles = [float(pct) for pct in salt.utils.args.split_input(percentiles)]
+    percentiles = [int(pct) if pct.is_integer() else pct for pct in percentiles]
+
+    ret = {'start': data.get('start'),
+           'end': data.get('end'),
+           'workers': data.get('workers', []),
+           'stats': {}}
+    for name, stat in six.iteritems(data.get('stats', {})):
+        if cmd is not None and name not in cmd:
+            continue
+        ret['stats'][name] = {'runs': stat.get('runs', 0)}
+        for key in ('wait', 'proc'):
+            hist = salt.utils.histogram.LatencyHistogram.from_dict(stat.get(key))
+            ret['stats'][name][key] = hist.summary(percentiles)
+        if stat.get('events'):
+            hist = salt.utils.histogram.CountHistogram.from_dict(stat['events'])
+            ret['stats'][name]['events'] = hist.summary(percentiles)
+    return ret
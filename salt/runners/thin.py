@@ -43,7 +43,8 @@ def generate(extra_mods='', overwrite=False, so_mods='',
                                     python2_bin,
                                     python3_bin,
                                     absonly,
-                                    compress)
+                                    compress,
+                                    __opts__.get('thin_compress_threads', 0))
 
 
 def generate_min(extra_mods='', overwrite=False, so_mods='',
@@ -15,6 +15,7 @@ import salt.crypt
 import salt.payload
 import salt.master
 import salt.transport.frame
+import salt.utils.bloom
 import salt.utils.event
 import salt.utils.files
 import salt.utils.minions
@@ -48,8 +49,25 @@ class AESPubClientMixin(object):
             if not salt.crypt.verify_signature(master_pubkey_path, payload['load'], payload.get('sig')):
                 raise salt.crypt.AuthenticationError('Message signature failed to validate.')
 
+    def _check_target_filter(self, payload):
+        '''
+        Return False if the master resolved the target of the publication and
+        this minion is certainly not part of it
+        '''
+        tgt_filter = payload.get('tgt_filter')
+        if not isinstance(tgt_filter, dict) or self.opts.get('id') is None:
+            return True
+        try:
+            return salt.utils.bloom.check(tgt_filter, self.opts['id'])
+        except Exception as exc:
+            log.debug('Unable to check the publication target filter: %s', exc)
+            return True
+
     @tornado.gen.coroutine
     def _decode_payload(self, payload):
+        if not self._check_target_filter(payload):
+            log.trace('Publication is not targeted at this minion, dropping it')
+            raise tornado.gen.Return(None)
         # we need to decrypt it
         log.trace('Decoding payload: {0}'.format(payload))
         if payload['enc'] == 'aes':
@@ -102,9 +120,12 @@ class AESReqServerMixin(object):
 
         self.master_key = salt.crypt.MasterKeys(self.opts)
 
-    def _encrypt_private(self, ret, dictkey, target):
+    def _encrypt_private(self, ret, dictkey, target, parts=False):
         '''
         The server equivalent of ReqChannel.crypted_transfer_decode_dictentry
+
+        With ``parts``, the dict entry is the list of the parts of the
+        encrypted message returned by Crypticle.dumps_parts
         '''
         # encrypt with a specific AES key
         pubfn = os.path.join(self.opts['pki_dir'],
@@ -129,7 +150,8 @@ class AESReqServerMixin(object):
             pret['key'] = cipher.encrypt(key)
         else:
             pret['key'] = cipher.encrypt(salt.utils.stringutils.to_bytes(key))
-        pret[dictkey] = pcrypt.dumps(
+        dumps = pcrypt.dumps_parts if parts else pcrypt.dumps
+        pret[dictkey] = dumps(
             ret if ret is not False else {}
         )
         return pret
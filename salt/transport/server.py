@@ -100,9 +100,13 @@ class PubServerChannel(object):
         '''
         pass
 
-    def publish(self, load):
+    def publish(self, load, minions=None):
         '''
         Publish "load" to minions
+
+        :param dict load: A load to be sent across the wire to minions
+        :param list minions: The minions the master resolved the target to,
+                             if known
         '''
         raise NotImplementedError()
 
@@ -21,7 +21,9 @@ import errno
 import salt.crypt
 import salt.utils.async
 import salt.utils.event
+import salt.utils.minions
 import salt.utils.platform
+import salt.utils.presence
 import salt.utils.process
 import salt.utils.verify
 import salt.payload
@@ -531,7 +533,8 @@ class AsyncTCPPubChannel(salt.transport.mixins.auth.AESPubClientMixin, salt.tran
                 if six.PY3:
                     body = salt.transport.frame.decode_embedded_strs(body)
             ret = yield self._decode_payload(body)
-            callback(ret)
+            if ret is not None:
+                callback(ret)
         return self.message_client.on_recv(wrap_callback)
 
 
@@ -615,6 +618,7 @@ class TCPReqServerChannel(salt.transport.mixins.auth.AESReqServerMixin, salt.tra
         '''
         Handle incoming messages from underylying tcp streams
         '''
+        recv_time = time.time()
         try:
             try:
                 payload = self._decode_payload(payload)
@@ -646,6 +650,9 @@ class TCPReqServerChannel(salt.transport.mixins.auth.AESReqServerMixin, salt.tra
                     self._auth(payload['load']), header=header))
                 raise tornado.gen.Return()
 
+            # Let the handler account for the time spent before it was called
+            payload['recv_time'] = recv_time
+
             # TODO: test
             try:
                 ret, req_opts = yield self.payload_handler(payload)
@@ -1163,11 +1170,11 @@ class PubServer(tornado.tcpserver.TCPServer, object):
         self.aes_funcs = salt.master.AESFuncs(self.opts)
         self.present = {}
         self.presence_events = False
+        tcp_only = True
+        for transport, _ in iter_transport_opts(self.opts):
+            if transport != 'tcp':
+                tcp_only = False
         if self.opts.get('presence_events', False):
-            tcp_only = True
-            for transport, _ in iter_transport_opts(self.opts):
-                if transport != 'tcp':
-                    tcp_only = False
             if tcp_only:
                 # Only when the transport is TCP only, the presence events will
                 # be handled here. Otherwise, it will be handled in the
@@ -1181,10 +1188,26 @@ class PubServer(tornado.tcpserver.TCPServer, object):
                 listen=False
             )
 
+        # The publisher knows the id of every connected minion, so it
+        # maintains the presence table, writing it at most once a second.
+        # Like the presence events, it is maintained by the 'Maintenance'
+        # process when the transport is not TCP only.
+        self.presence_table = None
+        self._presence_writer = None
+        if self.opts.get('presence_table', False) and tcp_only:
+            self.presence_table = salt.utils.presence.PresenceTable(self.opts)
+            self.presence_table.write()
+            self._presence_writer = tornado.ioloop.PeriodicCallback(
+                self.presence_table.write, 1000, io_loop=self.io_loop)
+            self._presence_writer.start()
+
     def close(self):
         if self._closing:
             return
         self._closing = True
+        if self._presence_writer is not None:
+            self._presence_writer.stop()
+            self._presence_writer = None
 
     def __del__(self):
         self.close()
@@ -1196,6 +1219,8 @@ class PubServer(tornado.tcpserver.TCPServer, object):
             clients.add(client)
         else:
             self.present[id_] = set([client])
+            if self.presence_table is not None:
+                self.presence_table.connect(id_)
             if self.presence_events:
                 data = {'new': [id_],
                         'lost': []}
@@ -1227,6 +1252,8 @@ class PubServer(tornado.tcpserver.TCPServer, object):
         clients.remove(client)
         if len(clients) == 0:
             del self.present[id_]
+            if self.presence_table is not None:
+                self.presence_table.disconnect(id_)
             if self.presence_events:
                 data = {'new': [],
                         'lost': [id_]}
@@ -1405,7 +1432,7 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
 
         process_manager.add_process(self._publish_daemon, kwargs=kwargs)
 
-    def publish(self, load):
+    def publish(self, load, minions=None):
         '''
         Publish "load" to minions
         '''
@@ -1417,6 +1444,9 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
             master_pem_path = os.path.join(self.opts['pki_dir'], 'master.pem')
             log.debug("Signing data packet")
             payload['sig'] = salt.crypt.sign_message(master_pem_path, payload['load'])
+        tgt_filter = salt.utils.minions.pub_target_filter(self.opts, load, minions)
+        if tgt_filter is not None:
+            payload['tgt_filter'] = tgt_filter
         # Use the Salt IPC server
         if self.opts.get('ipc_mode', '') == 'tcp':
             pull_uri = int(self.opts.get('tcp_master_publish_pull', 4514))
@@ -1435,5 +1465,8 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
         # add some targeting stuff for lists only (for now)
         if load['tgt_type'] == 'list':
             int_payload['topic_lst'] = load['tgt']
+        elif tgt_filter is not None:
+            # The target was resolved master side, only send to those minions
+            int_payload['topic_lst'] = minions
         # Send it over IPC!
         pub_sock.send(int_payload)
@@ -10,6 +10,7 @@ import sys
 import copy
 import errno
 import signal
+import time
 import hashlib
 import logging
 import weakref
@@ -187,6 +188,7 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
             zmq.eventloop.ioloop.install()
             self._io_loop = tornado.ioloop.IOLoop.current()
 
+        self.serial = salt.payload.Serial(self.opts)
         if self.crypt != 'clear':
             # we don't need to worry about auth as a kwarg, since its a singleton
             self.auth = salt.crypt.AsyncAuth(self.opts, io_loop=self._io_loop)
@@ -225,12 +227,23 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
         if not self.auth.authenticated:
             # Return control back to the caller, continue when authentication succeeds
             yield self.auth.authenticate()
+        if self.opts.get('zmq_multipart'):
+            message = tuple([self.serial.dumps({'enc': self.crypt})] +
+                            self.auth.crypticle.dumps_parts(load))
+        else:
+            message = self._package_load(self.auth.crypticle.dumps(load))
         # Return control to the caller. When send() completes, resume by populating ret with the Future.result
         ret = yield self.message_client.send(
-            self._package_load(self.auth.crypticle.dumps(load)),
+            message,
             timeout=timeout,
             tries=tries,
         )
+        if isinstance(ret, list):
+            # A msgpack header holding the encrypted key, followed by the
+            # frames of the encrypted dict entry
+            header = self.serial.loads(memoryview(ret[0]).tobytes())
+            header[dictkey] = ret[1:]
+            ret = header
         key = self.auth.get_keys()
         cipher = PKCS1_OAEP.new(key)
         if 'key' not in ret:
@@ -265,9 +278,16 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
         '''
         @tornado.gen.coroutine
         def _do_transfer():
+            if self.opts.get('zmq_multipart'):
+                # Send the encrypted load as separate frames next to a small
+                # header, so large loads are neither wrapped nor copied
+                message = tuple([self.serial.dumps({'enc': self.crypt})] +
+                                self.auth.crypticle.dumps_parts(load))
+            else:
+                message = self._package_load(self.auth.crypticle.dumps(load))
             # Yield control to the caller. When send() completes, resume by populating data with the Future.result
             data = yield self.message_client.send(
-                self._package_load(self.auth.crypticle.dumps(load)),
+                message,
                 timeout=timeout,
                 tries=tries,
             )
@@ -613,7 +633,7 @@ class ZeroMQReqServerChannel(salt.transport.mixins.auth.AESReqServerMixin, salt.
         salt.transport.mixins.auth.AESReqServerMixin.post_fork(self, payload_handler, io_loop)
 
         self.stream = zmq.eventloop.zmqstream.ZMQStream(self._socket, io_loop=self.io_loop)
-        self.stream.on_recv_stream(self.handle_message)
+        self.stream.on_recv_stream(self.handle_message, copy=False)
 
     @tornado.gen.coroutine
     def handle_message(self, stream, payload):
@@ -625,8 +645,17 @@ class ZeroMQReqServerChannel(salt.transport.mixins.auth.AESReqServerMixin, salt.
 
         :param dict payload: A payload to process
         '''
+        recv_time = time.time()
+        multipart = len(payload) > 1
         try:
-            payload = self.serial.loads(payload[0])
+            if multipart:
+                # A msgpack header followed by the frames of the encrypted
+                # load, decrypt them straight from the zmq buffers
+                header = self.serial.loads(payload[0].bytes)
+                payload = {'enc': header['enc'],
+                           'load': [frame.buffer for frame in payload[1:]]}
+            else:
+                payload = self.serial.loads(payload[0].bytes)
             payload = self._decode_payload(payload)
         except Exception as exc:
             exc_type = type(exc).__name__
@@ -665,6 +694,9 @@ class ZeroMQReqServerChannel(salt.transport.mixins.auth.AESReqServerMixin, salt.
             stream.send(self.serial.dumps(self._auth(payload['load'])))
             raise tornado.gen.Return()
 
+        # Let the handler account for the time spent before it was called
+        payload['recv_time'] = recv_time
+
         # TODO: test
         try:
             # Take the payload_handler function that was registered when we created the channel
@@ -679,8 +711,20 @@ class ZeroMQReqServerChannel(salt.transport.mixins.auth.AESReqServerMixin, salt.
         req_fun = req_opts.get('fun', 'send')
         if req_fun == 'send_clear':
             stream.send(self.serial.dumps(ret))
+        elif req_fun == 'send' and multipart:
+            stream.send_multipart(self.crypticle.dumps_parts(ret), copy=False)
         elif req_fun == 'send':
             stream.send(self.serial.dumps(self.crypticle.dumps(ret)))
+        elif req_fun == 'send_private' and multipart:
+            pret = self._encrypt_private(ret,
+                                         req_opts['key'],
+                                         req_opts['tgt'],
+                                         parts=True)
+            if isinstance(pret, dict) and isinstance(pret.get(req_opts['key']), list):
+                parts = pret.pop(req_opts['key'])
+                stream.send_multipart([self.serial.dumps(pret)] + parts, copy=False)
+            else:
+                stream.send(self.serial.dumps(pret))
         elif req_fun == 'send_private':
             stream.send(self.serial.dumps(self._encrypt_private(ret,
                                                                 req_opts['key'],
@@ -853,11 +897,13 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
         '''
         process_manager.add_process(self._publish_daemon)
 
-    def publish(self, load):
+    def publish(self, load, minions=None):
         '''
         Publish "load" to minions
 
         :param dict load: A load to be sent across the wire to minions
+        :param list minions: The minions the master resolved the target to,
+                             if known
         '''
         payload = {'enc': 'aes'}
 
@@ -867,6 +913,9 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
             master_pem_path = os.path.join(self.opts['pki_dir'], 'master.pem')
             log.debug("Signing data packet")
             payload['sig'] = salt.crypt.sign_message(master_pem_path, payload['load'])
+        tgt_filter = salt.utils.minions.pub_target_filter(self.opts, load, minions)
+        if tgt_filter is not None:
+            payload['tgt_filter'] = tgt_filter
         # Send 0MQ to the publisher
         context = zmq.Context(1)
         pub_sock = context.socket(zmq.PUSH)
@@ -888,10 +937,14 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
         # If zmq_filtering is enabled, target matching has to happen master side
         match_targets = ["pcre", "glob", "list"]
         if self.opts['zmq_filtering'] and load['tgt_type'] in match_targets:
-            # Fetch a list of minions that match
-            _res = self.ckminions.check_minions(load['tgt'],
-                                                tgt_type=load['tgt_type'])
-            match_ids = _res['minions']
+            if minions is not None:
+                # The master already resolved the target
+                match_ids = minions
+            else:
+                # Fetch a list of minions that match
+                _res = self.ckminions.check_minions(load['tgt'],
+                                                    tgt_type=load['tgt_type'])
+                match_ids = _res['minions']
 
             log.debug("Publish Side Match: {0}".format(match_ids))
             # Send list of miions thru so zmq can target them
@@ -1020,10 +1073,17 @@ class AsyncReqMessageClient(object):
             # send
             def mark_future(msg):
                 if not future.done():
-                    data = self.serial.loads(msg[0])
+                    if len(msg) > 1:
+                        # Multipart reply, hand the frame buffers over as-is
+                        data = [frame.buffer for frame in msg]
+                    else:
+                        data = self.serial.loads(msg[0].bytes)
                     future.set_result(data)
-            self.stream.on_recv(mark_future)
-            self.stream.send(message)
+            self.stream.on_recv(mark_future, copy=False)
+            if isinstance(message, tuple):
+                self.stream.send_multipart(message, copy=False)
+            else:
+                self.stream.send(message)
 
             try:
                 ret = yield future
@@ -1071,6 +1131,9 @@ class AsyncReqMessageClient(object):
     def send(self, message, timeout=None, tries=3, future=None, callback=None, raw=False):
         '''
         Return a future which will be completed when the message has a response
+
+        A tuple is sent as-is as a multipart message of the contained frames,
+        anything else is serialized into a single frame.
         '''
         if future is None:
             future = tornado.concurrent.Future()
@@ -1078,7 +1141,8 @@ class AsyncReqMessageClient(object):
             future.attempts = 0
             future.timeout = timeout
             # if a future wasn't passed in, we need to serialize the message
-            message = self.serial.dumps(message)
+            if not isinstance(message, tuple):
+                message = self.serial.dumps(message)
         if callback is not None:
             def handle_future(future):
                 response = future.result()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+'''
+A compact Bloom filter for minion ids
+
+The master attaches one of these to a publication so that minions which are
+certainly not targeted can drop it before decrypting and deserializing the
+load. A Bloom filter never reports a false negative, a false positive only
+means that the minion does the full target matching as it always did.
+
+The serialized form is a dict with the number of bits (``m``), the number of
+hash functions (``k``) and the base64-encoded bit array (``bits``), which
+survives msgpack on both Python 2 and 3 and allows :func:`check` to test a
+key by decoding only the few bytes it needs.
+'''
+
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import base64
+import hashlib
+import math
+import struct
+
+# Import salt libs
+import salt.utils.stringutils
+
+# Import 3rd-party libs
+from salt.ext import six
+from salt.ext.six.moves import range  # pylint: disable=import-error,redefined-builtin
+
+
+def _indexes(key, nbits, nhashes):
+    '''
+    Return the bit positions of ``key`` using double hashing
+    '''
+    digest = hashlib.sha1(salt.utils.stringutils.to_bytes(key)).digest()
+    first, second = struct.unpack('>QQ', digest[:16])
+    second |= 1
+    return [(first + num * second) % nbits for num in range(nhashes)]
+
+
+class BloomFilter(object):
+    '''
+    A Bloom filter sized for ``capacity`` keys at the ``error_rate`` false
+    positive rate
+    '''
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(int(capacity), 1)
+        nbits = -capacity * math.log(error_rate) / (math.log(2) ** 2)
+        # Round up to a multiple of 24 bits so the base64 encoding has no
+        # padding and every 4 characters map to exactly 3 bytes
+        self.nbits = int(math.ceil(nbits / 24.0)) * 24
+        self.nhashes = max(1, int(round(self.nbits / float(capacity) * math.log(2))))
+        self.bits = bytearray(self.nbits // 8)
+
+    def add(self, key):
+        for idx in _indexes(key, self.nbits, self.nhashes):
+            self.bits[idx // 8] |= 1 << (idx % 8)
+
+    def __contains__(self, key):
+        for idx in _indexes(key, self.nbits, self.nhashes):
+            if not self.bits[idx // 8] & (1 << (idx % 8)):
+                return False
+        return True
+
+    def to_dict(self):
+        '''
+        Return the serialized filter
+        '''
+        bits = base64.b64encode(bytes(self.bits))
+        if six.PY3:
+            bits = bits.decode('ascii')
+        return {'m': self.nbits, 'k': self.nhashes, 'bits': bits}
+
+
+def build(keys, error_rate=0.01):
+    '''
+    Return a serialized Bloom filter containing ``keys``
+    '''
+    bfilter = BloomFilter(len(keys), error_rate)
+    for key in keys:
+        bfilter.add(key)
+    return bfilter.to_dict()
+
+
+def check(data, key):
+    '''
+    Check whether ``key`` may be in the serialized filter ``data``. Only the
+    base64 groups holding the bits of ``key`` are decoded.
+    '''
+    bits = data['bits']
+    for idx in _indexes(key, data['m'], data['k']):
+        byte = idx // 8
+        group = byte // 3 * 4
+        chunk = bytearray(base64.b64decode(bits[group:group + 4]))
+        if not chunk[byte % 3] & (1 << (idx % 8)):
+            return False
+    return True
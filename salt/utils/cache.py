@@ -4,10 +4,13 @@ In-memory caching used by Salt
 '''
 # Import Python libs
 from __future__ import absolute_import, print_function
+import mmap
 import os
 import re
+import struct
 import time
 import logging
+import zlib
 try:
     import msgpack
     HAS_MSGPACK = True
@@ -19,6 +22,7 @@ import salt.config
 import salt.payload
 import salt.utils.dictupdate
 import salt.utils.files
+import salt.utils.stringutils
 
 # Import third party libs
 from salt.ext.six.moves import range  # pylint: disable=import-error,redefined-builtin
@@ -27,6 +31,12 @@ try:
     HAS_ZMQ = True
 except ImportError:
     HAS_ZMQ = False
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    # fcntl is not available on windows
+    HAS_FCNTL = False
 
 log = logging.getLogger(__name__)
 
@@ -272,6 +282,77 @@ class CacheRegex(object):
         return regex
 
 
+class CacheGenerations(object):
+    '''
+    A table of generation counters shared by the processes mapping the same
+    file, used to tell the processes keeping cache data in memory that
+    another process changed it.
+
+    The banks and keys are hashed to the slots of the table, a change of a
+    key increments its slot and a change of a bank the slot of the bank. The
+    version of a key is the sum of its slot and of the slots of the banks
+    holding it, it changes with every change of the key or of these banks.
+    Two keys sharing a slot only cause needless reads.
+    '''
+    SLOTS = 65536
+    SLOT_SIZE = 8
+
+    def __init__(self, path, slots=SLOTS):
+        self.path = path
+        self.slots = slots
+        size = slots * self.SLOT_SIZE
+        fd_ = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd_).st_size < size:
+                os.ftruncate(fd_, size)
+            self.map = mmap.mmap(fd_, size)
+        except Exception:
+            os.close(fd_)
+            raise
+        self.fd_ = fd_
+
+    def _offset(self, name):
+        return (zlib.crc32(salt.utils.stringutils.to_bytes(name)) & 0xffffffff) \
+            % self.slots * self.SLOT_SIZE
+
+    @staticmethod
+    def _names(bank, key=None):
+        parts = bank.strip('/').split('/')
+        names = ['/'.join(parts[:idx]) + '/' for idx in range(1, len(parts) + 1)]
+        if key is not None:
+            names.append(names[-1] + key)
+        return names
+
+    def version(self, bank, key):
+        '''
+        Return the version of a key
+        '''
+        return sum(struct.unpack_from('<Q', self.map, self._offset(name))[0]
+                   for name in self._names(bank, key))
+
+    def bump(self, bank, key=None):
+        '''
+        Change the version of a key, or of all the keys of a bank when
+        ``key`` is ``None``
+        '''
+        offset = self._offset(self._names(bank, key)[-1])
+        if HAS_FCNTL:
+            fcntl.lockf(self.fd_, fcntl.LOCK_EX, self.SLOT_SIZE, offset)
+        try:
+            value = struct.unpack_from('<Q', self.map, offset)[0]
+            struct.pack_into('<Q', self.map, offset, (value + 1) & 0xffffffffffffffff)
+        finally:
+            if HAS_FCNTL:
+                fcntl.lockf(self.fd_, fcntl.LOCK_UN, self.SLOT_SIZE, offset)
+
+    def close(self):
+        '''
+        Unmap the table
+        '''
+        self.map.close()
+        os.close(self.fd_)
+
+
 class ContextCache(object):
     def __init__(self, opts, name):
         '''
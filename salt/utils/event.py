@@ -439,9 +439,21 @@ class SaltEvent(object):
             data = serial.loads(mdata, encoding='utf-8')
         return mtag, data
 
+    @classmethod
+    def unpack_tag(cls, raw):
+        '''
+        Return the tag of a raw event without unpacking its data
+        '''
+        if six.PY2:
+            return raw.partition(TAGEND)[0]
+        return salt.utils.stringutils.to_str(
+            raw.partition(salt.utils.stringutils.to_bytes(TAGEND))[0])
+
     def _get_match_func(self, match_type=None):
         if match_type is None:
             match_type = self.opts['event_match_type']
+        if callable(match_type):
+            return match_type
         return getattr(self, '_match_tag_{0}'.format(match_type), None)
 
     def _check_pending(self, tag, match_func=None):
@@ -541,6 +553,13 @@ class SaltEvent(object):
                 raw = self.subscriber.read_sync(timeout=wait)
                 if raw is None:
                     break
+                mtag = self.unpack_tag(raw)
+                if not match_func(mtag, tag) \
+                        and not any(pmatch_func(mtag, ptag) for ptag, pmatch_func in self.pending_tags):
+                    # Nobody wants this event, skip unpacking its data
+                    if wait:  # only update the wait timeout if we had one
+                        wait = timeout_at - time.time()
+                    continue
                 mtag, data = self.unpack(raw, self.serial)
                 ret = {'data': data, 'tag': mtag}
             except KeyboardInterrupt:
@@ -595,6 +614,8 @@ class SaltEvent(object):
              - 'find' : search for event tags that contain tag
              - 'regex' : regex search '^' + tag event tags
              - 'fnmatch' : fnmatch tag event tags matching
+            A function taking the event tag and the search tag and returning
+            whether they match can be passed as well.
             Default is opts['event_match_type'] or 'startswith'
 
             .. versionadded:: 2015.8.0
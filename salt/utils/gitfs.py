@@ -12,6 +12,7 @@ import errno
 import fnmatch
 import glob
 import hashlib
+import json
 import logging
 import os
 import re
@@ -19,12 +20,14 @@ import shlex
 import shutil
 import stat
 import subprocess
+import threading
 import time
 import tornado.ioloop
 import weakref
 from datetime import datetime
 
 # Import salt libs
+import salt.utils.atomicfile
 import salt.utils.configparser
 import salt.utils.data
 import salt.utils.files
@@ -51,6 +54,7 @@ from salt.utils.versions import LooseVersion as _LooseVersion
 
 # Import third party libs
 from salt.ext import six
+from salt.ext.six.moves import queue  # pylint: disable=import-error
 
 VALID_REF_TYPES = _DEFAULT_MASTER_OPTS['gitfs_ref_types']
 
@@ -58,6 +62,16 @@ VALID_REF_TYPES = _DEFAULT_MASTER_OPTS['gitfs_ref_types']
 # thus do not have defaults in salt/config.py.
 PER_REMOTE_ONLY = ('name',)
 SYMLINK_RECURSE_DEPTH = 100
+# File mode of a submodule (gitlink) entry in a tree
+GITLINK_MODE = 0o160000
+# Maximum number of trees whose entries are cached by Pygit2.list_tree()
+TREE_CACHE_MAX = 100000
+# Tags of the events which make the master fetch the remotes named in them,
+# the second one is fired by the webhook engine for posts to /git/push
+PUSH_TAGS = ('salt/git/push', 'salt/engines/hook/git/push')
+# Repository URLs in the push notifications of GitHub and GitLab
+PUSH_URL_KEYS = ('clone_url', 'ssh_url', 'git_url', 'git_http_url',
+                 'git_ssh_url', 'url')
 
 # Auth support (auth params can be global or per-remote, too)
 AUTH_PROVIDERS = ('pygit2',)
@@ -124,6 +138,62 @@ PYGIT2_MINVER = '0.20.3'
 LIBGIT2_MINVER = '0.20.0'
 
 
+def _is_binary(data):
+    '''
+    Detect if the data of a blob is binary, like salt.utils.files.is_binary()
+    does for the start of a file
+    '''
+    try:
+        if six.PY3:
+            data = data.decode(__salt_system_encoding__)
+        return salt.utils.stringutils.is_binary(data)
+    except UnicodeDecodeError:
+        return True
+
+
+def _oid_hex(oid):
+    '''
+    Return the hex SHA of a pygit2 Oid, newer pygit2 releases dropped the
+    ``hex`` attribute in favor of str()
+    '''
+    return oid.hex if hasattr(oid, 'hex') else str(oid)
+
+
+def push_targets(data):
+    '''
+    Return the remotes and refs named by the data of a push event as a tuple
+    of two lists, either of which may be None.
+
+    The event data can name them directly with the ``remote`` (a URL or glob
+    pattern, or a list of them) and ``refs`` keys. It can also be the data the
+    :mod:`webhook engine <salt.engines.webhook>` fires for a push notification
+    from GitHub or GitLab, in which case the remotes are taken from the URLs
+    of the repository in the JSON body and the ref from its ``ref`` key.
+    '''
+    remotes = data.get('remote', data.get('remotes'))
+    refs = data.get('refs', data.get('ref'))
+    if remotes is None and data.get('body'):
+        body = data['body']
+        if isinstance(body, six.binary_type):
+            body = body.decode(__salt_system_encoding__)
+        try:
+            body = json.loads(body) if isinstance(body, six.string_types) else body
+        except ValueError:
+            log.debug('Push event body is not JSON')
+            return None, None
+        if not isinstance(body, dict):
+            return None, None
+        repository = body.get('repository') or {}
+        remotes = [repository[key] for key in PUSH_URL_KEYS
+                   if isinstance(repository.get(key), six.string_types)] or None
+        refs = body.get('ref')
+    if isinstance(remotes, six.string_types):
+        remotes = [remotes]
+    if isinstance(refs, six.string_types):
+        refs = [refs]
+    return remotes, refs
+
+
 def enforce_types(key, val):
     '''
     Force params to be strings unless they should remain a different type
@@ -456,6 +526,28 @@ class GitProvider(object):
 
         return ret
 
+    def saltenvs_for_refs(self, refs=None):
+        '''
+        Return the saltenvs served from the passed branches/tags, or from any
+        ref if refs is None. Refs can be full names as sent by a push
+        (``refs/heads/master``, ``refs/tags/v1.0``) or bare branch/tag names.
+        Return None if any saltenv can be served from them.
+        '''
+        if hasattr(self, 'all_saltenvs'):
+            # The same ref is used for every saltenv
+            return None
+        if refs is None:
+            return set(self.envs())
+        paths = []
+        for ref in refs:
+            if ref.startswith('refs/heads/'):
+                paths.append('refs/remotes/origin/' + ref[len('refs/heads/'):])
+            elif ref.startswith('refs/'):
+                paths.append(ref)
+            else:
+                paths.extend(('refs/remotes/origin/' + ref, 'refs/tags/' + ref))
+        return self._get_envs_from_ref_paths(paths)
+
     def _get_lock_file(self, lock_type='update'):
         return salt.utils.path.join(self.gitdir, lock_type + '.lk')
 
@@ -715,6 +807,13 @@ class GitProvider(object):
         '''
         try:
             with self.gen_lock(lock_type='update'):
+                if self.opts.get('{0}_check_refs'.format(self.role), True) \
+                        and self.refs_unchanged():
+                    log.debug(
+                        'Refs for %s remote \'%s\' have not moved, skipping '
+                        'fetch', self.role, self.id
+                    )
+                    return False
                 log.debug('Fetching %s remote \'%s\'', self.role, self.id)
                 # Run provider-specific fetch code
                 return self._fetch()
@@ -734,6 +833,61 @@ class GitProvider(object):
                 )
             return False
 
+    def refs_unchanged(self):
+        '''
+        Compare the refs advertised by the remote to the local refs the
+        refspecs fetch them into. Return True if they all match, meaning a
+        fetch would not change anything, and False if they differ or cannot be
+        compared.
+        '''
+        mappings = []
+        for refspec in self.refspecs:
+            src, sep, dst = refspec.lstrip('+').partition(':')
+            if not sep or not dst or src.endswith('*') != dst.endswith('*'):
+                # Nothing is stored locally for this refspec, there is nothing
+                # to compare.
+                return False
+            mappings.append((src, dst))
+        try:
+            advertised = self._remote_refs()
+        except Exception as exc:
+            log.debug(
+                'Unable to list the refs of %s remote \'%s\': %s',
+                self.role, self.id, exc
+            )
+            return False
+        if advertised is None:
+            return False
+
+        def _dst(name, mapping):
+            src, dst = mapping
+            if src.endswith('*'):
+                if name.startswith(src[:-1]):
+                    return dst[:-1] + name[len(src) - 1:]
+            elif name == src:
+                return dst
+            return None
+
+        expected = {}
+        for name, sha in six.iteritems(advertised):
+            if name.endswith('^{}'):
+                # Peeled tag
+                continue
+            for mapping in mappings:
+                local_name = _dst(name, mapping)
+                if local_name is not None:
+                    expected[local_name] = sha
+        local = {}
+        for name, sha in six.iteritems(self._local_refs()):
+            if name.endswith('/HEAD'):
+                continue
+            for _, dst in mappings:
+                if (dst.endswith('*') and name.startswith(dst[:-1])) \
+                        or name == dst:
+                    local[name] = sha
+                    break
+        return expected == local
+
     def _lock(self, lock_type='update', failhard=False):
         '''
         Place a lock file if (and only if) it does not already exist.
@@ -886,6 +1040,20 @@ class GitProvider(object):
         '''
         raise NotImplementedError()
 
+    def _remote_refs(self):
+        '''
+        Provider-specific code returning a dict mapping the refs advertised by
+        the remote to their SHAs, or None if the provider cannot list them
+        '''
+        return None
+
+    def _local_refs(self):
+        '''
+        Provider-specific code returning a dict mapping the local refs to their
+        SHAs, must be implemented in a sub-class if _remote_refs() is.
+        '''
+        raise NotImplementedError()
+
     def envs(self):
         '''
         This function must be overridden in a sub-class
@@ -1155,6 +1323,29 @@ class GitPython(GitProvider):
         cleaned = self.clean_stale_refs()
         return True if (new_objs or cleaned) else None
 
+    def _remote_refs(self):
+        '''
+        Return the refs advertised by the remote using GitPython
+        '''
+        ret = {}
+        for line in self.repo.git.ls_remote('origin').splitlines():
+            sha, _, name = line.partition('\t')
+            if name:
+                ret[name.strip()] = sha.strip()
+        return ret
+
+    def _local_refs(self):
+        '''
+        Return the local refs using GitPython
+        '''
+        ret = {}
+        refs = self.repo.git.for_each_ref(format='%(objectname) %(refname)')
+        for line in refs.splitlines():
+            sha, _, name = line.partition(' ')
+            if name:
+                ret[name.strip()] = sha.strip()
+        return ret
+
     def file_list(self, tgt_env):
         '''
         Get file list for the target environment using GitPython
@@ -1279,6 +1470,8 @@ class Pygit2(GitProvider):
     def __init__(self, opts, remote, per_remote_defaults, per_remote_only,
                  override_params, cache_root, role='gitfs'):
         self.provider = 'pygit2'
+        # Tree SHA -> entries of the tree, see _tree_entries()
+        self._trees = {}
         super(Pygit2, self).__init__(
             opts, remote, per_remote_defaults, per_remote_only,
             override_params, cache_root, role
@@ -1633,6 +1826,38 @@ class Pygit2(GitProvider):
             if (received_objects or refs_pre != refs_post or cleaned) \
             else None
 
+    def _remote_refs(self):
+        '''
+        Return the refs advertised by the remote using pygit2, or None if this
+        version of pygit2 cannot list them
+        '''
+        origin = self.repo.remotes[0]
+        if not hasattr(origin, 'ls_remotes'):
+            return None
+        if self.remotecallbacks is not None:
+            heads = origin.ls_remotes(callbacks=self.remotecallbacks)
+        else:
+            if self.credentials is not None:
+                origin.credentials = self.credentials
+            heads = origin.ls_remotes()
+        return dict(
+            (head['name'], _oid_hex(head['oid']))
+            for head in heads if head.get('oid') is not None
+        )
+
+    def _local_refs(self):
+        '''
+        Return the local refs using pygit2, skipping symbolic refs
+        '''
+        ret = {}
+        for name in self.repo.listall_references():
+            target = self.repo.lookup_reference(name).target
+            if isinstance(target, six.string_types):
+                # Symbolic ref
+                continue
+            ret[name] = _oid_hex(target)
+        return ret
+
     def file_list(self, tgt_env):
         '''
         Get file list for the target environment using pygit2
@@ -1730,6 +1955,86 @@ class Pygit2(GitProvider):
             return blob, blob.hex, mode
         return None, None, None
 
+    def get_blob(self, hexsha):
+        '''
+        Return the pygit2.Blob object with the passed SHA, or None if it is not
+        in this repo
+        '''
+        try:
+            blob = self.repo[hexsha]
+        except (KeyError, ValueError):
+            return None
+        return blob if isinstance(blob, pygit2.Blob) else None
+
+    def _tree_entries(self, oid):
+        '''
+        Return the entries of the tree with the passed oid as a list of
+        (name, oid, is_tree, symlink target) tuples. Trees are immutable, so
+        the entries are cached by the SHA of the tree, which also shares them
+        between all refs containing the same subtree.
+        '''
+        key = oid.hex if hasattr(oid, 'hex') else oid
+        try:
+            return self._trees[key]
+        except KeyError:
+            pass
+        entries = []
+        for entry in self.repo[oid]:
+            mode = entry.filemode
+            if stat.S_IFMT(mode) == GITLINK_MODE:
+                # Entry is a submodule, skip it
+                continue
+            if stat.S_ISDIR(mode):
+                entries.append((entry.name, entry.oid, True, None))
+            elif stat.S_ISLNK(mode):
+                entries.append((entry.name, entry.oid, False,
+                                self.repo[entry.oid].data))
+            else:
+                entries.append((entry.name, entry.oid, False, None))
+        if len(self._trees) >= TREE_CACHE_MAX:
+            self._trees.clear()
+        self._trees[key] = entries
+        return entries
+
+    def list_tree(self, tgt_env):
+        '''
+        Return the files, symlinks and directories for the target environment
+        in one pass, using the cached entries of every tree. Only the trees
+        which are not shared with a previously listed ref are read from the
+        repo.
+        '''
+        files = set()
+        symlinks = {}
+        dirs = set()
+        tree = self.get_tree(tgt_env)
+        if not tree:
+            return files, symlinks, dirs
+        if self.root(tgt_env):
+            try:
+                tree = self.repo[tree[self.root(tgt_env)].oid]
+            except KeyError:
+                return files, symlinks, dirs
+            if not isinstance(tree, pygit2.Tree):
+                return files, symlinks, dirs
+        mountpoint = self.mountpoint(tgt_env)
+        if mountpoint:
+            dirs.add(mountpoint)
+            mountpoint += '/'
+
+        def _walk(oid, prefix):
+            for name, child, is_tree, link_tgt in self._tree_entries(oid):
+                path = prefix + name
+                if is_tree:
+                    dirs.add(path)
+                    _walk(child, path + '/')
+                else:
+                    files.add(path)
+                    if link_tgt is not None:
+                        symlinks[path] = link_tgt
+
+        _walk(tree.oid, mountpoint)
+        return files, symlinks, dirs
+
     def get_tree_from_branch(self, ref):
         '''
         Return a pygit2.Tree object matching a head ref fetched into
@@ -2171,6 +2476,33 @@ class GitBase(object):
                     )
         return errors
 
+    def clear_file_list_cache(self, saltenvs=None):
+        '''
+        Remove the file list caches of the passed saltenvs, or of all saltenvs
+        if None is passed, so that they are rebuilt on the next request
+        '''
+        if saltenvs is None:
+            try:
+                saltenvs = [x[:-2] for x in os.listdir(self.file_list_cachedir)
+                            if x.endswith('.p')]
+            except OSError:
+                return
+        else:
+            saltenvs = [x.replace(os.path.sep, '_|-') for x in saltenvs]
+        for saltenv in saltenvs:
+            list_cache = salt.utils.path.join(
+                self.file_list_cachedir, '{0}.p'.format(saltenv))
+            try:
+                os.remove(list_cache)
+            except OSError as exc:
+                if exc.errno != errno.ENOENT:
+                    log.error(
+                        'Unable to remove file list cache %s: %s',
+                        list_cache, exc
+                    )
+            else:
+                log.debug('Removed file list cache %s', list_cache)
+
     def clear_lock(self, remote=None, lock_type='update'):
         '''
         Clear update.lk for all remotes
@@ -2193,28 +2525,81 @@ class GitBase(object):
             errors.extend(failed)
         return cleared, errors
 
-    def fetch_remotes(self):
+    def match_remotes(self, remotes=None):
+        '''
+        Return the remotes whose URL or id matches one of the passed URLs or
+        glob patterns, or all remotes if None is passed
+        '''
+        if remotes is None:
+            return list(self.remotes)
+        if isinstance(remotes, six.string_types):
+            remotes = [x.strip() for x in remotes.split(',')]
+        remotes = [six.text_type(x) for x in remotes]
+        return [repo for repo in self.remotes
+                if any(fnmatch.fnmatch(repo.url, x) or fnmatch.fnmatch(repo.id, x)
+                       for x in remotes)]
+
+    def fetch_remotes(self, remotes=None):
         '''
         Fetch all remotes and return a boolean to let the calling function know
         whether or not any remotes were updated in the process of fetching
+
+        Up to ``<role>_fetch_concurrency`` remotes are fetched at the same time,
+        each one under its own update lock. The time spent on each remote is
+        kept in the ``fetch_times`` attribute, keyed by remote id.
+
+        remotes
+            Only fetch the remotes matching these URLs or glob patterns, see
+            :py:meth:`match_remotes`
         '''
-        changed = False
-        for repo in self.remotes:
-            try:
-                if repo.fetch():
-                    # We can't just use the return value from repo.fetch()
-                    # because the data could still have changed if old remotes
-                    # were cleared above. Additionally, we're running this in a
-                    # loop and later remotes without changes would override
-                    # this value and make it incorrect.
-                    changed = True
-            except Exception as exc:
-                log.error(
-                    'Exception caught while fetching %s remote \'%s\': %s',
-                    self.role, repo.id, exc,
-                    exc_info=True
-                )
-        return changed
+        self.fetch_times = {}
+        changed = []
+        matched = self.match_remotes(remotes)
+        remotes = queue.Queue()
+        for repo in matched:
+            remotes.put(repo)
+
+        def _fetch():
+            while True:
+                try:
+                    repo = remotes.get_nowait()
+                except queue.Empty:
+                    return
+                start = time.time()
+                try:
+                    if repo.fetch():
+                        # We can't just use the return value from
+                        # repo.fetch() because the data could still have
+                        # changed if old remotes were cleared above.
+                        # Additionally, later remotes without changes would
+                        # override this value and make it incorrect.
+                        changed.append(repo.id)
+                except Exception as exc:
+                    log.error(
+                        'Exception caught while fetching %s remote \'%s\': %s',
+                        self.role, repo.id, exc,
+                        exc_info=True
+                    )
+                finally:
+                    self.fetch_times[repo.id] = round(time.time() - start, 3)
+
+        try:
+            concurrency = int(
+                self.opts.get('{0}_fetch_concurrency'.format(self.role), 1))
+        except (TypeError, ValueError):
+            concurrency = 1
+        concurrency = min(max(concurrency, 1), len(matched))
+        if concurrency <= 1:
+            _fetch()
+        else:
+            threads = [threading.Thread(target=_fetch)
+                       for _ in range(concurrency)]
+            for thread in threads:
+                thread.daemon = True
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return bool(changed)
 
     def lock(self, remote=None):
         '''
@@ -2238,18 +2623,48 @@ class GitBase(object):
             errors.extend(failed)
         return locked, errors
 
-    def update(self):
+    def update(self, remotes=None, refs=None):
         '''
         Execute a git fetch on all of the repos and perform maintenance on the
         fileserver cache.
+
+        remotes
+            .. versionadded:: Oxygen
+
+            Only fetch the remotes matching these URLs or glob patterns, for
+            instance after a push to them. The file list caches of the
+            saltenvs served by these remotes are cleared if anything changed.
+
+        refs
+            .. versionadded:: Oxygen
+
+            With ``remotes``, the branches/tags which were pushed. Only the
+            file list caches of the saltenvs mapped to them are cleared.
         '''
         # data for the fileserver event
         data = {'changed': False,
                 'backend': 'gitfs'}
 
-        data['changed'] = self.clear_old_remotes()
-        if self.fetch_remotes():
+        if remotes is None:
+            data['changed'] = self.clear_old_remotes()
+        else:
+            data['remotes'] = [repo.id for repo in self.match_remotes(remotes)]
+        if self.fetch_remotes(remotes=remotes):
             data['changed'] = True
+        data['fetch_times'] = self.fetch_times
+
+        if remotes is not None and data['changed']:
+            if isinstance(refs, six.string_types):
+                refs = [x.strip() for x in refs.split(',')]
+            saltenvs = set()
+            for repo in self.match_remotes(remotes):
+                repo_saltenvs = repo.saltenvs_for_refs(refs)
+                if repo_saltenvs is None:
+                    saltenvs = None
+                    break
+                saltenvs.update(repo_saltenvs)
+            self.clear_file_list_cache(saltenvs)
+            data['saltenvs'] = sorted(saltenvs) if saltenvs is not None else None
 
         # A masterless minion will need a new env cache file even if no changes
         # were fetched.
@@ -2543,6 +2958,12 @@ class GitFS(GitBase):
                     else GIT_PROVIDERS,
                 cache_root=cache_root,
                 init_remotes=init_remotes)
+            # (blob SHA, hash_type) -> hash, see _blob_hash()
+            obj._blob_hashes = {}
+            # blob SHA -> whether the blob is binary, see serve_file()
+            obj._blob_binary = {}
+            # (blob SHA, memoryview of its data) of the last served blob
+            obj._blob_data = (None, None)
             if not init_remotes:
                 log.debug('Created gitfs object with uninitialized remotes')
             else:
@@ -2559,6 +2980,25 @@ class GitFS(GitBase):
         # Initialization happens above in __new__(), so don't do anything here
         pass
 
+    @property
+    def object_store(self):
+        '''
+        Serve files straight from the git object store instead of writing them
+        to the cachedir first. Only supported with pygit2.
+        '''
+        return bool(self.opts.get('gitfs_object_store')) \
+            and getattr(self, 'provider', None) == 'pygit2'
+
+    def _get_blob(self, hexsha):
+        '''
+        Return the pygit2.Blob object with the passed SHA from the remotes
+        '''
+        for repo in self.remotes:
+            blob = repo.get_blob(hexsha)
+            if blob is not None:
+                return blob
+        return None
+
     def dir_list(self, load):
         '''
         Return a list of all directories on the master
@@ -2609,14 +3049,17 @@ class GitFS(GitBase):
                                      '{0}.lk'.format(path))
         destdir = os.path.dirname(dest)
         hashdir = os.path.dirname(blobshadest)
-        if not os.path.isdir(destdir):
+        if self.object_store:
+            # Nothing is written to the cachedir
+            pass
+        elif not os.path.isdir(destdir):
             try:
                 os.makedirs(destdir)
             except OSError:
                 # Path exists and is a file, remove it and retry
                 os.remove(destdir)
                 os.makedirs(destdir)
-        if not os.path.isdir(hashdir):
+        if not self.object_store and not os.path.isdir(hashdir):
             try:
                 os.makedirs(hashdir)
             except OSError:
@@ -2650,6 +3093,14 @@ class GitFS(GitBase):
                     fnd['stat'] = [mode]
                 return fnd
 
+            if self.object_store:
+                # serve_file() and file_hash() read the blob, the path is
+                # only used to tell that the file was found
+                fnd['rel'] = path
+                fnd['path'] = blob_hexsha
+                fnd['blob'] = blob_hexsha
+                return _add_file_stat(fnd, blob_mode)
+
             salt.fileserver.wait_lock(lk_fn, dest)
             if os.path.isfile(blobshadest) and os.path.isfile(dest):
                 with salt.utils.files.fopen(blobshadest, 'r') as fp_:
@@ -2704,6 +3155,29 @@ class GitFS(GitBase):
             return ret
         ret['dest'] = fnd['rel']
         gzip = load.get('gzip', None)
+        if fnd.get('blob'):
+            hexsha = fnd['blob']
+            if self._blob_data[0] == hexsha:
+                view = self._blob_data[1]
+            else:
+                # Files are served a chunk at a time, keep the data of the
+                # blob for its next chunks
+                blob = self._get_blob(hexsha)
+                if blob is None:
+                    return ret
+                view = memoryview(blob.data)
+                self._blob_data = (hexsha, view)
+            data = view[load['loc']:load['loc'] + self.opts['file_buffer_size']].tobytes()
+            if data and six.PY3:
+                if hexsha not in self._blob_binary:
+                    self._blob_binary[hexsha] = _is_binary(view[:2048].tobytes())
+                if not self._blob_binary[hexsha]:
+                    data = data.decode(__salt_system_encoding__)
+            if gzip and data:
+                data = salt.utils.gzip_util.compress(data, gzip)
+                ret['gzip'] = gzip
+            ret['data'] = data
+            return ret
         fpath = os.path.normpath(fnd['path'])
         with salt.utils.files.fopen(fpath, 'rb') as fp_:
             fp_.seek(load['loc'])
@@ -2727,6 +3201,9 @@ class GitFS(GitBase):
         if not all(x in load for x in ('path', 'saltenv')):
             return '', None
         ret = {'hash_type': self.opts['hash_type']}
+        if fnd.get('blob'):
+            ret['hsum'] = self._blob_hash(fnd['blob'])
+            return ret
         relpath = fnd['rel']
         path = fnd['path']
         hashdest = salt.utils.path.join(self.hash_cachedir,
@@ -2745,6 +3222,39 @@ class GitFS(GitBase):
                 ret['hsum'] = fp_.read()
             return ret
 
+    def _blob_hash(self, hexsha):
+        '''
+        Return the hash of the blob with the passed SHA using the configured
+        hash_type. A blob never changes, so the mapping from the blob SHA is
+        kept in memory and in the cachedir for the other master processes.
+        '''
+        hash_type = self.opts['hash_type']
+        try:
+            return self._blob_hashes[(hexsha, hash_type)]
+        except KeyError:
+            pass
+        hashdest = salt.utils.path.join(self.cache_root, 'blob_hash',
+                                        hexsha[:2],
+                                        '{0}.{1}'.format(hexsha[2:], hash_type))
+        hsum = None
+        if os.path.isfile(hashdest):
+            with salt.utils.files.fopen(hashdest, 'r') as fp_:
+                hsum = fp_.read()
+        if not hsum:
+            blob = self._get_blob(hexsha)
+            if blob is None:
+                return ''
+            hsum = getattr(hashlib, hash_type)(blob.data).hexdigest()
+            try:
+                if not os.path.isdir(os.path.dirname(hashdest)):
+                    os.makedirs(os.path.dirname(hashdest))
+                with salt.utils.atomicfile.atomic_open(hashdest, 'w') as fp_:
+                    fp_.write(hsum)
+            except (IOError, OSError):
+                log.debug('Unable to cache the hash of blob %s', hexsha, exc_info=True)
+        self._blob_hashes[(hexsha, hash_type)] = hsum
+        return hsum
+
     def _file_lists(self, load, form):
         '''
         Return a dict containing the file lists for files and dirs
@@ -2782,10 +3292,15 @@ class GitFS(GitBase):
             if salt.utils.stringutils.is_hex(load['saltenv']) \
                     or load['saltenv'] in self.envs():
                 for repo in self.remotes:
-                    repo_files, repo_symlinks = repo.file_list(load['saltenv'])
+                    if self.object_store:
+                        repo_files, repo_symlinks, repo_dirs = \
+                            repo.list_tree(load['saltenv'])
+                    else:
+                        repo_files, repo_symlinks = repo.file_list(load['saltenv'])
+                        repo_dirs = repo.dir_list(load['saltenv'])
                     ret['files'].update(repo_files)
                     ret['symlinks'].update(repo_symlinks)
-                    ret['dirs'].update(repo.dir_list(load['saltenv']))
+                    ret['dirs'].update(repo_dirs)
             ret['files'] = sorted(ret['files'])
             ret['dirs'] = sorted(ret['dirs'])
 
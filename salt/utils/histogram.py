@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+'''
+Mergeable, log-bucketed latency histograms
+
+A :class:`LatencyHistogram` records durations (in seconds) into buckets whose
+boundaries grow geometrically, so the relative error of any reported
+percentile is bounded by the bucket growth factor regardless of the magnitude
+of the value. Histograms with the same layout can be merged by adding their
+bucket counts, which makes them suitable for collecting data in several
+processes and aggregating it later.
+
+A :class:`CountHistogram` records small counts, like the number of events in
+a request, with a bucket per value.
+'''
+
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+import math
+
+# Import 3rd-party libs
+from salt.ext import six
+
+# Smallest resolvable duration, anything faster lands in the first bucket
+MIN_VALUE = 1e-5
+# Eight buckets per power of two, roughly 9% relative error per bucket
+GROWTH = 2 ** 0.125
+_LOG_GROWTH = math.log(GROWTH)
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+class LatencyHistogram(object):
+    '''
+    A log-bucketed histogram of durations
+    '''
+    __slots__ = ('buckets', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    @staticmethod
+    def bucket_index(value):
+        '''
+        Return the index of the bucket holding ``value``
+        '''
+        if value <= MIN_VALUE:
+            return 0
+        return int(math.log(value / MIN_VALUE) / _LOG_GROWTH) + 1
+
+    @staticmethod
+    def bucket_upper(index):
+        '''
+        Return the upper boundary of the bucket at ``index``
+        '''
+        return MIN_VALUE * GROWTH ** index
+
+    def add(self, value):
+        '''
+        Record a single duration
+        '''
+        if value < 0:
+            value = 0.0
+        idx = self.bucket_index(value)
+        self.buckets[idx] = self.buckets.get(idx, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        '''
+        Add the counts of another histogram to this one
+        '''
+        for idx, num in six.iteritems(other.buckets):
+            self.buckets[idx] = self.buckets.get(idx, 0) + num
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+        return self
+
+    @property
+    def mean(self):
+        if not self.count:
+            return 0.0
+        return self.total / self.count
+
+    def percentile(self, pct):
+        '''
+        Return the upper bound of the bucket holding the ``pct`` percentile,
+        clamped to the recorded minimum and maximum.
+        '''
+        if not self.count:
+            return 0.0
+        if pct <= 0:
+            return self.min
+        rank = max(1, int(math.ceil(self.count * float(pct) / 100)))
+        seen = 0
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if seen >= rank:
+                return max(self.min, min(self.bucket_upper(idx), self.max))
+        return self.max
+
+    def summary(self, percentiles=DEFAULT_PERCENTILES):
+        '''
+        Return a dict with the count, mean, max and requested percentiles
+        '''
+        ret = {'count': self.count,
+               'mean': self.mean,
+               'min': self.min or 0.0,
+               'max': self.max or 0.0}
+        for pct in percentiles:
+            ret['p{0}'.format(pct)] = self.percentile(pct)
+        return ret
+
+    def to_dict(self):
+        '''
+        Return a serializable representation of the histogram. Buckets are
+        encoded as ``[index, count]`` pairs so the result survives JSON, which
+        only supports string keys.
+        '''
+        return {'buckets': sorted([idx, num] for idx, num in six.iteritems(self.buckets)),
+                'count': self.count,
+                'total': self.total,
+                'min': self.min,
+                'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        '''
+        Rebuild a histogram from the output of :meth:`to_dict`
+        '''
+        hist = cls()
+        if not data:
+            return hist
+        for idx, num in data.get('buckets', []):
+            hist.buckets[int(idx)] = hist.buckets.get(int(idx), 0) + num
+        hist.count = data.get('count', 0)
+        hist.total = data.get('total', 0.0)
+        hist.min = data.get('min')
+        hist.max = data.get('max')
+        return hist
+
+
+class CountHistogram(LatencyHistogram):
+    '''
+    A histogram of counts, with a bucket per value
+    '''
+    __slots__ = ()
+
+    @staticmethod
+    def bucket_index(value):
+        '''
+        Return the index of the bucket holding ``value``
+        '''
+        return max(int(value), 0)
+
+    @staticmethod
+    def bucket_upper(index):
+        '''
+        Return the upper boundary of the bucket at ``index``
+        '''
+        return index
+
+
+def merge_stats(dest, stats):
+    '''
+    Merge a per-command stats dict as fired by a master worker into ``dest``.
+    Both map a command name to ``{'runs': int, 'proc': dict, 'wait': dict}``
+    where ``proc`` and ``wait`` are serialized histograms. The stats of
+    ``_minion_event`` also hold an ``events`` count histogram of the number
+    of events carried by each request.
+    '''
+    for cmd, data in six.iteritems(stats):
+        if not isinstance(data, dict):
+            continue
+        cur = dest.setdefault(cmd, {'runs': 0,
+                                    'proc': LatencyHistogram(),
+                                    'wait': LatencyHistogram()})
+        cur['runs'] += data.get('runs', 0)
+        for key, hist_cls in (('proc', LatencyHistogram),
+                              ('wait', LatencyHistogram),
+                              ('events', CountHistogram)):
+            if key in data:
+                cur.setdefault(key, hist_cls()).merge(hist_cls.from_dict(data[key]))
+    return dest
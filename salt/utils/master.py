@@ -21,6 +21,7 @@ import salt.client
 import salt.pillar
 import salt.utils.atomicfile
 import salt.utils.files
+import salt.utils.mine
 import salt.utils.minions
 import salt.utils.platform
 import salt.utils.stringutils
@@ -130,9 +131,7 @@ class MasterPillarUtil(object):
         for minion_id in minion_ids:
             if not salt.utils.verify.valid_id(self.opts, minion_id):
                 continue
-            mdata = self.cache.fetch('minions/{0}'.format(minion_id), 'mine')
-            if isinstance(mdata, dict):
-                mine_data[minion_id] = mdata
+            mine_data[minion_id] = salt.utils.mine.get_all(self.opts, minion_id, self.cache)
         return mine_data
 
     def _get_cached_minion_data(self, *minion_ids):
@@ -146,10 +145,9 @@ class MasterPillarUtil(object):
             return grains, pillars
         if not minion_ids:
             minion_ids = self.cache.list('minions')
-        for minion_id in minion_ids:
-            if not salt.utils.verify.valid_id(self.opts, minion_id):
-                continue
-            mdata = self.cache.fetch('minions/{0}'.format(minion_id), 'data')
+        minion_ids = [minion_id for minion_id in minion_ids
+                      if salt.utils.verify.valid_id(self.opts, minion_id)]
+        for minion_id, mdata in salt.utils.minions.iter_cached_data(self.cache, minion_ids):
             if not isinstance(mdata, dict):
                 log.warning(
                     'cache.fetch should always return a dict. ReturnedType: {0}, MinionId: {1}'.format(
@@ -390,14 +388,12 @@ class MasterPillarUtil(object):
                 elif clear_grains and minion_pillar:
                     self.cache.store(bank, 'data', {'pillar': minion_pillar})
                 if clear_mine:
-                    # Delete the whole mine file
-                    self.cache.flush(bank, 'mine')
+                    # Delete the whole mine
+                    salt.utils.mine.delete(self.opts, minion_id, cache=self.cache)
                 elif clear_mine_func is not None:
-                    # Delete a specific function from the mine file
-                    mine_data = self.cache.fetch(bank, 'mine')
-                    if isinstance(mine_data, dict):
-                        if mine_data.pop(clear_mine_func, False):
-                            self.cache.store(bank, 'mine', mine_data)
+                    # Delete a specific function from the mine
+                    salt.utils.mine.delete(self.opts, minion_id, clear_mine_func,
+                                           cache=self.cache)
         except (OSError, IOError):
             return True
         return True
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+'''
+The storage of the mine data in the master's minion data cache
+
+.. versionadded:: Oxygen
+
+Every mine function of a minion is stored as its own key of the
+``minions/<id>/mine`` bank, so reading one function of many minions only
+deserializes that function, and a ``mine.send`` only rewrites the functions
+it sends. The master converts the mine data of older masters, a single
+``mine`` key of the ``minions/<id>`` bank, when it starts.
+
+With :conf_master:`mine_cache_ttl` the master processes keep the mine data
+they read in memory. The process storing new mine data drops the entries of
+the minion, the other processes read it again after the ttl.
+'''
+
+# Import python libs
+from __future__ import absolute_import
+import logging
+import time
+
+# Import salt libs
+import salt.cache
+import salt.utils.verify
+from salt.utils.odict import OrderedDict
+
+# Import 3rd-party libs
+from salt.ext import six
+from salt.ext.six.moves.urllib.parse import quote, unquote  # pylint: disable=import-error,no-name-in-module
+
+log = logging.getLogger(__name__)
+
+# The bank and key of the mine data of older masters
+LEGACY_KEY = 'mine'
+# The number of mine functions kept in memory by each process
+CACHE_MAX_ITEMS = 20000
+
+# (minion id, function) -> [time read, data], the mine data read by this
+# process
+_CACHE = OrderedDict()
+
+
+def enabled(opts):
+    '''
+    Return whether the master stores the mine data
+    '''
+    return bool(opts.get('minion_data_cache', False)
+                or opts.get('enforce_mine_cache', False))
+
+
+def bank(minion_id):
+    '''
+    Return the cache bank of the mine data of a minion
+    '''
+    return 'minions/{0}/mine'.format(minion_id)
+
+
+def _key(fun):
+    # The key is a file name with the localfs cache, the function names are
+    # user defined mine_functions aliases
+    return quote(fun, safe='')
+
+
+def _cached(minion_id, fun, ttl, now):
+    if not ttl:
+        return None
+    record = _CACHE.get((minion_id, fun))
+    if record is None or record[0] + ttl < now:
+        return None
+    return record
+
+
+def _remember(minion_id, fun, data, ttl, now):
+    if not ttl:
+        return
+    _CACHE.pop((minion_id, fun), None)
+    while len(_CACHE) >= CACHE_MAX_ITEMS:
+        _CACHE.popitem(last=False)
+    _CACHE[(minion_id, fun)] = [now, data]
+
+
+def forget(minion_id, fun=None):
+    '''
+    Drop the mine data of a minion, or only of one function, kept in memory
+    '''
+    if fun is not None:
+        _CACHE.pop((minion_id, fun), None)
+        return
+    for cache_key in [cache_key for cache_key in _CACHE if cache_key[0] == minion_id]:
+        del _CACHE[cache_key]
+
+
+def get(opts, minion_ids, fun, cache=None):
+    '''
+    Return a dict of the data of the mine function ``fun`` of the minions,
+    the minions without data are left out
+    '''
+    if cache is None:
+        cache = salt.cache.factory(opts)
+    ttl = opts.get('mine_cache_ttl', 0)
+    now = time.time()
+    ret = {}
+    missing = []
+    for minion_id in minion_ids:
+        record = _cached(minion_id, fun, ttl, now)
+        if record is None:
+            missing.append(minion_id)
+        elif record[1]:
+            ret[minion_id] = record[1]
+    if missing:
+        key = _key(fun)
+        fetched = cache.fetch_many([(bank(minion_id), key) for minion_id in missing])
+        for minion_id in missing:
+            data = fetched.get((bank(minion_id), key))
+            _remember(minion_id, fun, data, ttl, now)
+            if data:
+                ret[minion_id] = data
+    return ret
+
+
+def get_all(opts, minion_id, cache=None):
+    '''
+    Return a dict of all the mine functions of a minion
+    '''
+    if cache is None:
+        cache = salt.cache.factory(opts)
+    ttl = opts.get('mine_cache_ttl', 0)
+    now = time.time()
+    ret = {}
+    for key, data in six.iteritems(cache.list_with_data(bank(minion_id))):
+        fun = unquote(key)
+        _remember(minion_id, fun, data, ttl, now)
+        if data:
+            ret[fun] = data
+    return ret
+
+
+def store(opts, minion_id, data, clear=False, cache=None):
+    '''
+    Store the mine functions in ``data``, with ``clear`` the other mine
+    functions of the minion are removed
+    '''
+    if cache is None:
+        cache = salt.cache.factory(opts)
+    forget(minion_id)
+    if clear:
+        cache.flush(bank(minion_id))
+    for fun, fdata in six.iteritems(data):
+        cache.store(bank(minion_id), _key(fun), fdata)
+
+
+def delete(opts, minion_id, fun=None, cache=None):
+    '''
+    Remove a mine function of a minion, or all of them
+    '''
+    if cache is None:
+        cache = salt.cache.factory(opts)
+    forget(minion_id, fun)
+    if fun is None:
+        return cache.flush(bank(minion_id))
+    return cache.flush(bank(minion_id), _key(fun))
+
+
+def migrate(opts, cache=None):
+    '''
+    Convert the mine data stored by older masters, return the number of
+    converted minions
+    '''
+    if cache is None:
+        cache = salt.cache.factory(opts)
+    count = 0
+    for minion_id in cache.list('minions'):
+        if not salt.utils.verify.valid_id(opts, minion_id):
+            continue
+        minion_bank = 'minions/{0}'.format(minion_id)
+        if not cache.contains(minion_bank, LEGACY_KEY):
+            continue
+        data = cache.fetch(minion_bank, LEGACY_KEY)
+        if isinstance(data, dict):
+            # Keep the functions the minion sent since the upgrade. Not all
+            # of the drivers list the keys of a bank with list().
+            current = set(unquote(key) for key in cache.list_with_data(bank(minion_id)))
+            store(opts, minion_id,
+                  dict((fun, fdata) for fun, fdata in six.iteritems(data)
+                       if fun not in current),
+                  cache=cache)
+        cache.flush(minion_bank, LEGACY_KEY)
+        count += 1
+    if count:
+        log.info('Converted the mine data of %s minions', count)
+    return count
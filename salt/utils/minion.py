@@ -6,11 +6,15 @@ Utility functions for minions
 # Import Python Libs
 from __future__ import absolute_import
 import os
+import collections
+import fnmatch
 import logging
 import threading
+import time
 
 # Import Salt Libs
 import salt.payload
+import salt.utils.atomicfile
 import salt.utils.files
 import salt.utils.platform
 import salt.utils.process
@@ -44,6 +48,156 @@ def running(opts):
     return ret
 
 
+def queued(opts):
+    '''
+    Return the jobs waiting in the job queue of the running minion
+    '''
+    path = os.path.join(opts['cachedir'], JobQueue.QUEUE_FILE)
+    serial = salt.payload.Serial(opts)
+    try:
+        with salt.utils.files.fopen(path, 'rb') as fp_:
+            data = serial.loads(fp_.read())
+    except (IOError, OSError):
+        return []
+    except Exception:
+        log.debug('Unable to read the job queue file %s', path, exc_info=True)
+        return []
+    if not isinstance(data, dict) or not data.get('pid') \
+            or not salt.utils.process.os_is_running(data['pid']):
+        # Left behind by a minion which is no longer running
+        return []
+    return data.get('jobs', [])
+
+
+def _job_functions(data):
+    '''
+    Return the list of functions called by a job
+    '''
+    fun = data.get('fun')
+    if isinstance(fun, (list, tuple)):
+        return list(fun)
+    return [fun]
+
+
+class JobQueue(object):
+    '''
+    Hold back publications while the minion runs as many jobs as it is
+    allowed to by ``process_count_max`` and ``process_count_max_functions``.
+
+    Jobs are started in the order they were received, a job which is held
+    back by a per-function limit does not delay jobs calling other
+    functions. The running jobs are counted from the proc directory.
+    '''
+    QUEUE_FILE = 'proc_queue.p'
+    # Functions needed to look after running and queued jobs, they are
+    # never held back
+    EXEMPT = ('saltutil.find_job',
+              'saltutil.running',
+              'saltutil.kill_job',
+              'saltutil.term_job',
+              'saltutil.signal_job')
+    # Seconds a started job is counted for before its proc file shows up
+    STARTUP_GRACE = 10
+
+    def __init__(self, opts):
+        self.opts = opts
+        self.process_count_max = opts.get('process_count_max') or -1
+        self.function_max = opts.get('process_count_max_functions') or {}
+        self.queue = collections.deque()
+        self.started = {}
+        self.serial = salt.payload.Serial(opts)
+
+    def __len__(self):
+        return len(self.queue)
+
+    @property
+    def enabled(self):
+        return self.process_count_max > 0 or bool(self.function_max)
+
+    def _running(self):
+        '''
+        Return the running jobs, including the ones started by the queue
+        which have not written their proc file yet
+        '''
+        jobs = running(self.opts)
+        seen = set(job.get('jid') for job in jobs)
+        now = time.time()
+        pending = []
+        for jid, (funs, started) in list(six.iteritems(self.started)):
+            if jid in seen or now - started > self.STARTUP_GRACE:
+                del self.started[jid]
+            else:
+                pending.append({'jid': jid, 'fun': funs})
+        return jobs + pending
+
+    def _fits(self, data, jobs):
+        '''
+        Return True if the per-function limits allow ``data`` to start
+        '''
+        funs = _job_functions(data)
+        for pattern, limit in six.iteritems(self.function_max):
+            if not any(fnmatch.fnmatch(fun, pattern) for fun in funs):
+                continue
+            count = 0
+            for job in jobs:
+                if any(fnmatch.fnmatch(fun, pattern) for fun in _job_functions(job)):
+                    count += 1
+            if count >= limit:
+                return False
+        return True
+
+    def submit(self, data):
+        '''
+        Queue a new job and return the list of jobs which can start now
+        '''
+        if not self.enabled:
+            return [data]
+        if all(fun in self.EXEMPT for fun in _job_functions(data)):
+            return [data]
+        self.queue.append(data)
+        ret = self.ready()
+        if data not in ret:
+            log.info(
+                'Maximum number of jobs reached, queued jid %s (%s queued)',
+                data['jid'], len(self.queue)
+            )
+            self.dump()
+        return ret
+
+    def ready(self):
+        '''
+        Remove and return the queued jobs which can start now, oldest first
+        '''
+        if not self.queue:
+            return []
+        jobs = self._running()
+        ret = []
+        for data in list(self.queue):
+            if 0 < self.process_count_max <= len(jobs):
+                break
+            if not self._fits(data, jobs):
+                continue
+            self.queue.remove(data)
+            funs = _job_functions(data)
+            self.started[data['jid']] = (funs, time.time())
+            jobs.append({'jid': data['jid'], 'fun': funs})
+            ret.append(data)
+        if ret:
+            self.dump()
+        return ret
+
+    def dump(self):
+        '''
+        Write the queued jobs to the cachedir for :func:`queued`
+        '''
+        path = os.path.join(self.opts['cachedir'], self.QUEUE_FILE)
+        try:
+            with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+                fp_.write(self.serial.dumps({'pid': os.getpid(), 'jobs': list(self.queue)}))
+        except (IOError, OSError):
+            log.debug('Unable to write the job queue file %s', path, exc_info=True)
+
+
 def cache_jobs(opts, jid, ret):
     serial = salt.payload.Serial(opts=opts)
 
@@ -10,12 +10,16 @@ import os
 import fnmatch
 import re
 import logging
+import time
 
 # Import salt libs
 import salt.payload
+import salt.utils.bloom
 import salt.utils.data
 import salt.utils.files
+import salt.utils.mine
 import salt.utils.network
+import salt.utils.presence
 import salt.utils.stringutils
 import salt.utils.versions
 from salt.defaults import DEFAULT_TARGET_DELIM
@@ -23,6 +27,7 @@ from salt.exceptions import CommandExecutionError, SaltCacheError
 import salt.auth.ldap
 import salt.cache
 from salt.ext import six
+from salt.ext.six.moves import range  # pylint: disable=import-error,redefined-builtin
 
 # Import 3rd-party libs
 if six.PY3:
@@ -38,6 +43,9 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 
+# The number of minions whose cached data is fetched at once
+CACHE_FETCH_BATCH = 500
+
 TARGET_REX = re.compile(
         r'''(?x)
         (
@@ -90,6 +98,103 @@ def get_minion_data(minion, opts):
     return minion if minion else None, grains, pillar
 
 
+def iter_cached_data(cache, minion_ids, key='data'):
+    '''
+    Yield the minion ids with their data cached under ``key``, fetched in
+    batches with ``fetch_many``. The minions whose data cannot be read are
+    yielded with ``None``.
+    '''
+    minion_ids = list(minion_ids)
+    for idx in range(0, len(minion_ids), CACHE_FETCH_BATCH):
+        bank_keys = [('minions/{0}'.format(id_), key)
+                     for id_ in minion_ids[idx:idx + CACHE_FETCH_BATCH]]
+        try:
+            fetched = cache.fetch_many(bank_keys)
+        except SaltCacheError:
+            # Read the minions of the batch one by one to skip the failing ones
+            fetched = {}
+            for bank_key in bank_keys:
+                try:
+                    fetched[bank_key] = cache.fetch(*bank_key)
+                except SaltCacheError:
+                    log.debug('Unable to read the cached %s of %s',
+                              key, bank_key[0], exc_info=True)
+        for id_, bank_key in zip(minion_ids[idx:idx + CACHE_FETCH_BATCH], bank_keys):
+            yield id_, fetched.get(bank_key)
+
+
+def pub_target_filter(opts, load, minions):
+    '''
+    Return the serialized Bloom filter of the minions resolved for the
+    publication ``load``, or None if no filter should be attached to it.
+
+    Minions which are not in the filter drop the publication before decrypting
+    it, so it is only built for the target types listed in
+    ``pub_target_filter_types``, whose master side resolution is trusted.
+    '''
+    if not opts.get('pub_target_filter') or minions is None:
+        return None
+    if opts.get('order_masters'):
+        # Syndics relay publications for minions this master does not know
+        return None
+    tgt_type = load.get('tgt_type', 'glob')
+    if tgt_type not in opts.get('pub_target_filter_types', []):
+        return None
+    if tgt_type == 'glob' and load.get('tgt') == '*':
+        # A broadcast, the filter would just hold every minion
+        return None
+    return salt.utils.bloom.build(minions)
+
+
+def store_running_jobs(opts, minion_id, data, cache=None):
+    '''
+    Store the jobs reported by the job heartbeat of a minion in the running
+    jobs table
+    '''
+    if cache is None:
+        cache = salt.cache.factory(opts)
+    cache.store('minions/{0}'.format(minion_id),
+                'jobs',
+                {'time': time.time(),
+                 'interval': data.get('interval', 0),
+                 'jobs': data.get('jobs', {})})
+
+
+def running_jobs(opts, minions=None, cache=None):
+    '''
+    Return the running jobs table, a dict mapping minion ids to the time of
+    their last job heartbeat and the jobs it reported:
+
+    .. code-block:: python
+
+        {'minion': {'time': 1508498760.5,
+                    'interval': 10,
+                    'jobs': {'20171020112600123456': {'fun': 'state.apply',
+                                                      'pid': 1234,
+                                                      'state': 'running'}}}}
+
+    Entries older than three heartbeat intervals are left out as outdated.
+    Minions only send heartbeats while they have jobs, so the entry of an idle
+    minion expires as well.
+    '''
+    if cache is None:
+        cache = salt.cache.factory(opts)
+    if minions is None:
+        try:
+            minions = cache.list('minions')
+        except SaltCacheError:
+            return {}
+    now = time.time()
+    ret = {}
+    for id_, data in iter_cached_data(cache, minions, 'jobs'):
+        if not data or data.get('interval', 0) <= 0:
+            continue
+        if now - data.get('time', 0) > 3 * data['interval']:
+            continue
+        ret[id_] = data
+    return ret
+
+
 def nodegroup_comp(nodegroup, nodegroups, skip=None, first_call=True):
     '''
     Recursively expand ``nodegroup`` from ``nodegroups``; ignore nodegroups in ``skip``
@@ -281,10 +386,9 @@ class CkMinions(object):
                 return {'minions': minions,
                         'missing': []}
             minions = set(minions)
-            for id_ in cminions:
-                if greedy and id_ not in minions:
-                    continue
-                mdata = self.cache.fetch('minions/{0}'.format(id_), 'data')
+            if greedy:
+                cminions = [id_ for id_ in cminions if id_ in minions]
+            for id_, mdata in iter_cached_data(self.cache, cminions):
                 if mdata is None:
                     if not greedy:
                         minions.remove(id_)
@@ -380,8 +484,7 @@ class CkMinions(object):
             proto = 'ipv{0}'.format(tgt.version)
 
             minions = set(minions)
-            for id_ in cminions:
-                mdata = self.cache.fetch('minions/{0}'.format(id_), 'data')
+            for id_, mdata in iter_cached_data(self.cache, cminions):
                 if mdata is None:
                     if not greedy:
                         minions.remove(id_)
@@ -592,6 +695,22 @@ class CkMinions(object):
     def connected_ids(self, subset=None, show_ipv4=False, include_localhost=False):
         '''
         Return a set of all connected minion ids, optionally within a subset
+
+        The ids come from the master's presence table when
+        :conf_master:`presence_table` is enabled, otherwise from
+        :py:meth:`scan_connected_ids`.
+        '''
+        if not show_ipv4:
+            minions = salt.utils.presence.connected(self.opts, subset or None)
+            if minions is not None:
+                return minions
+        return self.scan_connected_ids(subset, show_ipv4, include_localhost)
+
+    def scan_connected_ids(self, subset=None, show_ipv4=False, include_localhost=False):
+        '''
+        Return a set of all connected minion ids, optionally within a subset,
+        by matching the IP addresses in the grains of every minion in the
+        minion data cache against the connections to the publish port
         '''
         minions = set()
         if self.opts.get('minion_data_cache', False):
@@ -605,15 +724,10 @@ class CkMinions(object):
                 addrs.update(set(salt.utils.network.ip_addrs(include_loopback=include_localhost)))
             if subset:
                 search = subset
-            for id_ in search:
-                try:
-                    mdata = self.cache.fetch('minions/{0}'.format(id_), 'data')
-                except SaltCacheError:
-                    # If a SaltCacheError is explicitly raised during the fetch operation,
-                    # permission was denied to open the cached data.p file. Continue on as
-                    # in the releases <= 2016.3. (An explicit error raise was added in PR
-                    # #35388. See issue #36867 for more information.
-                    continue
+            # The minions whose cached data.p file cannot be read are skipped
+            # as in the releases <= 2016.3. (An explicit error raise was added
+            # in PR #35388. See issue #36867 for more information.
+            for id_, mdata in iter_cached_data(self.cache, search):
                 if mdata is None:
                     continue
                 grains = mdata.get('grains', {})
@@ -1106,19 +1220,9 @@ def mine_get(tgt, fun, tgt_type='glob', opts=None):
     Gathers the data from the specified minions' mine, pass in the target,
     function to look up and the target type
     '''
-    ret = {}
-    serial = salt.payload.Serial(opts)
     checker = CkMinions(opts)
     _res = checker.check_minions(
             tgt,
             tgt_type)
     minions = _res['minions']
-    cache = salt.cache.factory(opts)
-    for minion in minions:
-        mdata = cache.fetch('minions/{0}'.format(minion), 'mine')
-        if mdata is None:
-            continue
-        fdata = mdata.get(fun)
-        if fdata:
-            ret[minion] = fdata
-    return ret
+    return salt.utils.mine.get(opts, minions, fun)
@@ -1969,6 +1969,23 @@ class SaltCMDOptionParser(six.with_metaclass(OptionParserMeta,
             help=('Wait the specified time in seconds after each job is done '
                   'before freeing the slot in the batch for the next one.')
         )
+        self.add_option(
+            '--batch-stream',
+            default=False,
+            dest='batch_stream',
+            action='store_true',
+            help=('Run the batch on the connected minions without pinging them '
+                  'first, keeping a sliding window of jobs in flight.')
+        )
+        self.add_option(
+            '--batch-max-latency',
+            default=0,
+            dest='batch_max_latency',
+            type=float,
+            help=('With --batch-stream, grow the batch size while the 95th '
+                  'percentile of the time minions take to return stays under '
+                  'this number of seconds.')
+        )
         self.add_option(
             '--batch-safe-limit',
             default=0,
@@ -2929,6 +2946,27 @@ class SaltSSHOptionParser(six.with_metaclass(OptionParserMeta,
                  'time to manage connections, the more running processes the '
                  'faster communication should be. Default: %default.'
         )
+        self.add_option(
+            '--threads',
+            dest='ssh_threads',
+            default=0,
+            type=int,
+            help='Communicate with up to this number of minions at a time '
+                 'from threads of a single process instead of spawning a '
+                 'process per minion. Suited to functions which mostly wait '
+                 'on the network, like raw shell commands. The threads share '
+                 'the fileserver client and the extension modules of the '
+                 'run. Default: %default.'
+        )
+        self.add_option(
+            '--multiplex',
+            dest='ssh_multiplex',
+            default=False,
+            action='store_true',
+            help='Share a single ssh connection per minion between all of '
+                 'the commands run against it, and keep it open between runs '
+                 'for ssh_control_persist seconds.'
+        )
         self.add_option(
             '--extra-filerefs',
             dest='extra_filerefs',
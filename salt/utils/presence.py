@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+'''
+The master's table of connected minions
+
+One process of the master maintains the table and writes it to the master's
+cachedir, with the time each minion connected and disconnected. With the TCP
+transport this is the publisher, which knows the id of every connected
+minion. With ZeroMQ, where the publisher only knows peer addresses, the
+Maintenance process updates the table from
+:py:meth:`salt.utils.minions.CkMinions.scan_connected_ids` once per
+``loop_interval``.
+
+Readers like :py:meth:`salt.utils.minions.CkMinions.connected_ids`, the
+``manage`` runner and batch runs only load the table again when it changed,
+so asking for the connected minions no longer costs a scan of the minion data
+cache of every minion.
+'''
+
+# Import python libs
+from __future__ import absolute_import
+import logging
+import os
+import time
+
+# Import salt libs
+import salt.payload
+import salt.utils.atomicfile
+import salt.utils.files
+import salt.utils.process
+
+# Import 3rd-party libs
+from salt.ext import six
+
+log = logging.getLogger(__name__)
+
+PRESENCE_FILE = 'presence.p'
+# Forget minions which have been disconnected for a week
+PRUNE_AFTER = 7 * 86400
+
+# path -> ((inode, mtime), table data), the table last read by this process
+_CACHE = {}
+
+
+def _path(opts):
+    return os.path.join(opts['cachedir'], PRESENCE_FILE)
+
+
+def load(opts):
+    '''
+    Return the presence table written by the running master, or None if
+    there is no presence table or the process maintaining it is gone.
+
+    The table is a dict mapping the minion ids to dicts with the
+    ``connected`` and ``disconnected`` times, ``disconnected`` is ``None``
+    while the minion is connected.
+    '''
+    if not opts.get('presence_table'):
+        return None
+    path = _path(opts)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    # The table is replaced on every write, so a new inode means new data
+    version = (stat.st_ino, stat.st_mtime)
+    cached = _CACHE.get(path)
+    if cached is not None and cached[0] == version:
+        data = cached[1]
+    else:
+        serial = salt.payload.Serial(opts)
+        try:
+            with salt.utils.files.fopen(path, 'rb') as fp_:
+                data = serial.loads(fp_.read())
+        except Exception:
+            log.debug('Unable to read the presence table %s', path, exc_info=True)
+            return None
+        if not isinstance(data, dict):
+            return None
+        _CACHE[path] = (version, data)
+    if not data.get('pid') or not salt.utils.process.os_is_running(data['pid']):
+        # Left behind by a master which is no longer running
+        return None
+    return data.get('minions', {})
+
+
+def connected(opts, subset=None):
+    '''
+    Return the set of connected minion ids, optionally within a subset, or
+    None if the presence table is not available
+    '''
+    table = load(opts)
+    if table is None:
+        return None
+    if subset is not None:
+        return set(id_ for id_ in subset
+                   if id_ in table and table[id_]['disconnected'] is None)
+    return set(id_ for id_, entry in six.iteritems(table)
+               if entry['disconnected'] is None)
+
+
+class PresenceTable(object):
+    '''
+    The writing side of the presence table
+    '''
+    def __init__(self, opts):
+        self.opts = opts
+        self.path = _path(opts)
+        self.serial = salt.payload.Serial(opts)
+        self.minions = {}
+        self.dirty = True
+
+    def connect(self, id_, now=None):
+        entry = self.minions.get(id_)
+        if entry is not None and entry['disconnected'] is None:
+            return
+        self.minions[id_] = {'connected': now or time.time(), 'disconnected': None}
+        self.dirty = True
+
+    def disconnect(self, id_, now=None):
+        entry = self.minions.get(id_)
+        if entry is None or entry['disconnected'] is not None:
+            return
+        entry['disconnected'] = now or time.time()
+        self.dirty = True
+
+    def update(self, present, now=None):
+        '''
+        Set the connected minions to ``present``, return the sets of minions
+        which connected and disconnected
+        '''
+        now = now or time.time()
+        present = set(present)
+        old = set(id_ for id_, entry in six.iteritems(self.minions)
+                  if entry['disconnected'] is None)
+        new = present.difference(old)
+        lost = old.difference(present)
+        for id_ in new:
+            self.connect(id_, now)
+        for id_ in lost:
+            self.disconnect(id_, now)
+        return new, lost
+
+    def write(self):
+        '''
+        Write the table if it changed since the last write
+        '''
+        if not self.dirty:
+            return
+        now = time.time()
+        for id_ in [id_ for id_, entry in six.iteritems(self.minions)
+                    if entry['disconnected'] is not None
+                    and now - entry['disconnected'] > PRUNE_AFTER]:
+            del self.minions[id_]
+        try:
+            with salt.utils.atomicfile.atomic_open(self.path, 'wb') as fp_:
+                fp_.write(self.serial.dumps({'pid': os.getpid(),
+                                             'updated': now,
+                                             'minions': self.minions}))
+            self.dirty = False
+        except (IOError, OSError):
+            log.error('Unable to write the presence table %s', self.path, exc_info=True)
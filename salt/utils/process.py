@@ -6,6 +6,7 @@ Functions for daemonizing and otherwise modifying running processes
 # Import python libs
 from __future__ import absolute_import, with_statement
 import copy
+import itertools
 import os
 import sys
 import time
@@ -298,14 +299,27 @@ class ThreadPool(object):
     '''
     def __init__(self,
                  num_threads=None,
-                 queue_size=0):
+                 queue_size=0,
+                 priority=False,
+                 timer=None):
         # if no count passed, default to number of CPUs
         if num_threads is None:
             num_threads = multiprocessing.cpu_count()
         self.num_threads = num_threads
-
-        # create a task queue of queue_size
-        self._job_queue = queue.Queue(queue_size)
+        self.queue_size = queue_size
+        # called with the seconds each func waited in the queue and ran, and
+        # whether it raised an exception
+        self.timer = timer
+
+        # create a task queue of queue_size, with a priority queue the funcs
+        # with the highest priority run first
+        self.priority = priority
+        if priority:
+            self._job_queue = queue.PriorityQueue(queue_size)
+            # Keeps the funcs of the same priority in order
+            self._counter = itertools.count()
+        else:
+            self._job_queue = queue.Queue(queue_size)
 
         self._workers = []
 
@@ -319,23 +333,32 @@ class ThreadPool(object):
     # intentionally not called "apply_async"  since we aren't keeping track of
     # the return at all, if we want to make this API compatible with multiprocessing
     # threadpool we can in the future, and we won't have to worry about name collision
-    def fire_async(self, func, args=None, kwargs=None):
+    def fire_async(self, func, args=None, kwargs=None, priority=0):
         if args is None:
             args = []
         if kwargs is None:
             kwargs = {}
+        job = (func, args, kwargs, time.time())
+        if self.priority:
+            job = (-priority, next(self._counter), job)
         try:
-            self._job_queue.put_nowait((func, args, kwargs))
+            self._job_queue.put_nowait(job)
             return True
         except queue.Full:
             return False
 
+    def qsize(self):
+        '''
+        Return the number of funcs waiting for a worker
+        '''
+        return self._job_queue.qsize()
+
     def _thread_target(self):
         while True:
             # 1s timeout so that if the parent dies this thread will die within 1s
             try:
                 try:
-                    func, args, kwargs = self._job_queue.get(timeout=1)
+                    job = self._job_queue.get(timeout=1)
                     self._job_queue.task_done()  # Mark the task as done once we get it
                 except queue.Empty:
                     continue
@@ -344,12 +367,23 @@ class ThreadPool(object):
                 # we have to catch a possible exception from our exception handler in
                 # order to avoid an unclean shutdown. Le sigh.
                 continue
+            if self.priority:
+                job = job[2]
+            func, args, kwargs, queued = job
+            start = time.time()
+            failed = False
             try:
                 log.debug('ThreadPool executing func: {0} with args:{1}'
                           ' kwargs{2}'.format(func, args, kwargs))
                 func(*args, **kwargs)
             except Exception as err:
+                failed = True
                 log.debug(err, exc_info=True)
+            if self.timer is not None:
+                try:
+                    self.timer(start - queued, time.time() - start, failed)
+                except Exception as err:
+                    log.debug(err, exc_info=True)
 
 
 class ProcessManager(object):
@@ -807,6 +841,127 @@ class SignalHandlingMultiprocessingProcess(MultiprocessingProcess):
             super(SignalHandlingMultiprocessingProcess, self).start()
 
 
+class ForkServer(object):
+    '''
+    Fork new processes from a warm template process
+
+    The template process is forked from the calling process when the server
+    starts. It calls ``warmup`` once, for instance to load modules, and then
+    forks a child for every :meth:`submit` which runs ``target`` with the
+    submitted arguments. The children share the memory of the template
+    copy-on-write, so whatever ``warmup`` loaded is not loaded again.
+
+    The template is a snapshot of the calling process, call :meth:`stop`
+    whenever the state the children rely on changes and the next
+    :meth:`submit` starts a fresh template. The template waits for each
+    child to exit before forking the next one, ``target`` is expected to
+    daemonize if it runs for long. Not available on Windows.
+    '''
+    def __init__(self, target, warmup=None, name='ForkServer'):
+        self.target = target
+        self.warmup = warmup
+        self.name = name
+        self.process = None
+        self.conn = None
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        '''
+        Fork the template process
+        '''
+        parent_conn, child_conn = multiprocessing.Pipe()
+        self.process = SignalHandlingMultiprocessingProcess(
+            target=self._serve,
+            args=(parent_conn, child_conn)
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        log.debug('Started %s with PID %s', self.name, self.process.pid)
+
+    def stop(self, timeout=1):
+        '''
+        Stop the template process. Children which are already running are
+        not affected.
+        '''
+        if self.conn is not None:
+            # The template exits when it reads EOF
+            self.conn.close()
+            self.conn = None
+        if self.process is not None:
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+            self.process = None
+
+    def submit(self, *args):
+        '''
+        Run ``target(*args)`` in a new child of the template process, the
+        arguments must be picklable. Returns False if the template could not
+        be reached.
+        '''
+        if not self.is_alive():
+            self.stop()
+            self.start()
+        try:
+            self.conn.send(args)
+        except (IOError, OSError, EOFError, ValueError):
+            log.error('Unable to submit a job to %s, restarting it', self.name, exc_info=True)
+            self.stop()
+            return False
+        return True
+
+    def _serve(self, parent_conn, conn):
+        parent_conn.close()
+        appendproctitle(self.name)
+        if self.warmup is not None:
+            try:
+                self.warmup()
+            except Exception:
+                log.error('%s failed to warm up', self.name, exc_info=True)
+        while True:
+            try:
+                args = conn.recv()
+            except (EOFError, IOError, OSError):
+                break
+            try:
+                pid = os.fork()
+            except OSError:
+                log.error('%s failed to fork', self.name, exc_info=True)
+                continue
+            if pid == 0:
+                conn.close()
+                self._run_child(args)
+            try:
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
+
+    def _run_child(self, args):
+        # The signal handlers of the template terminate its children, which
+        # are the other jobs from the point of view of this process
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        # Avoid circular import
+        import salt.utils.crypt
+        salt.utils.crypt.reinit_crypto()
+        code = salt.defaults.exitcodes.EX_OK
+        try:
+            self.target(*args)
+        except SystemExit as exc:
+            if isinstance(exc.code, int):
+                code = exc.code
+        except Exception:
+            log.error('%s child failed', self.name, exc_info=True)
+            code = salt.defaults.exitcodes.EX_GENERIC
+        finally:
+            salt.log.setup.shutdown_multiprocessing_logging()
+            os._exit(code)  # pylint: disable=protected-access
+
+
 @contextlib.contextmanager
 def default_signals(*signals):
     old_signals = {}
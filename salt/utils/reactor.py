@@ -6,9 +6,14 @@ Functions which implement running reactor jobs
 
 # Import python libs
 from __future__ import absolute_import
+import collections
 import fnmatch
 import glob
 import logging
+import os
+import re
+import threading
+import time
 
 # Import salt libs
 import salt.client
@@ -38,6 +43,266 @@ REACTOR_INTERNAL_KEYWORDS = frozenset([
     'state',
 ])
 
+# The characters starting a wildcard in a reactor tag
+GLOB_CHARS = re.compile(r'[*?[]')
+# The tags of the events managing the reactors
+MANAGE_TAG = 'salt/reactors/manage/'
+# The tag of the events with the statistics of the reactor
+STATS_TAG = 'salt/reactors/stats'
+# How often the runs no longer limiting the reactions are forgotten
+PRUNE_INTERVAL = 60
+
+
+class ReactorMap(object):
+    '''
+    The reactor map compiled to match event tags
+
+    The reactions to tags without wildcards are looked up in a dict. The other
+    tags are stored in a trie of the characters before their first wildcard,
+    so the globs a tag can match are found walking the trie along the tag and
+    most tags, like the job returns, are rejected after a few characters. The
+    globs starting with a wildcard are checked with a single combined regex
+    first.
+    '''
+    def __init__(self, react_map):
+        self.reactors = []
+        self.exact = {}
+        self.trie = {}
+        self.regexes = []
+        self.unanchored = []
+        for ropt in react_map or []:
+            if not isinstance(ropt, dict) or len(ropt) != 1:
+                continue
+            key, val = next(six.iteritems(ropt))
+            if not isinstance(key, six.string_types):
+                continue
+            if isinstance(val, six.string_types):
+                val = [val]
+            elif not isinstance(val, list):
+                continue
+            idx = len(self.reactors)
+            self.reactors.append(val)
+            self.regexes.append(None)
+            pattern = os.path.normcase(key)
+            wildcard = GLOB_CHARS.search(pattern)
+            if wildcard is None:
+                self.exact.setdefault(pattern, []).append(idx)
+                continue
+            self.regexes[idx] = re.compile(fnmatch.translate(pattern))
+            prefix = pattern[:wildcard.start()]
+            if not prefix:
+                self.unanchored.append(idx)
+                continue
+            node = self.trie
+            for char in prefix:
+                node = node.setdefault(char, {})
+            # The empty string holds the globs ending at this node
+            node.setdefault('', []).append(idx)
+        if self.unanchored:
+            self.unanchored_regex = re.compile('|'.join(
+                '(?:{0})'.format(self.regexes[idx].pattern) for idx in self.unanchored))
+        else:
+            self.unanchored_regex = None
+
+    def match(self, tag):
+        '''
+        Return the list of reactor SLS files for the tag, in the order of the
+        reactor map
+        '''
+        tag = os.path.normcase(tag)
+        matches = list(self.exact.get(tag, ()))
+        node = self.trie
+        for char in tag:
+            node = node.get(char)
+            if node is None:
+                break
+            for idx in node.get('', ()):
+                if self.regexes[idx].match(tag):
+                    matches.append(idx)
+        if self.unanchored_regex is not None and self.unanchored_regex.match(tag):
+            matches.extend(idx for idx in self.unanchored if self.regexes[idx].match(tag))
+        reactors = []
+        for idx in sorted(matches):
+            reactors.extend(self.reactors[idx])
+        return reactors
+
+
+def merge_local_reactions(chunks):
+    '''
+    Merge the ``local`` reactions which only differ by the minions they
+    target into a single call with a list target, return the new list of
+    reactions
+    '''
+    merged = []
+    by_call = {}
+    for chunk in chunks:
+        tgt = chunk.get('tgt')
+        tgt_type = chunk.get('tgt_type', chunk.get('expr_form', 'glob'))
+        if tgt_type == 'list' and isinstance(tgt, six.string_types):
+            tgt = tgt.split(',')
+        elif tgt_type == 'glob' and isinstance(tgt, six.string_types) \
+                and not GLOB_CHARS.search(tgt):
+            tgt = [tgt]
+        if chunk.get('state') != 'local' or not isinstance(tgt, list):
+            merged.append(chunk)
+            continue
+        call = repr(sorted((key, val) for key, val in six.iteritems(chunk)
+                           if key not in ('tgt', 'tgt_type', 'expr_form')))
+        if call in by_call:
+            targets = by_call[call]['tgt']
+            targets.extend(id_ for id_ in tgt if id_ not in targets)
+            continue
+        chunk = dict(chunk, tgt=list(tgt), tgt_type='list')
+        chunk.pop('expr_form', None)
+        by_call[call] = chunk
+        merged.append(chunk)
+    return merged
+
+
+class ReactionLimits(object):
+    '''
+    The priorities and rate limits of the reactor SLS files, configured with
+    :conf_master:`reactor_limits`
+
+    The limits are looked up by the SLS files as written in the reactor map,
+    the keys of ``reactor_limits`` can be globs. A reaction with an
+    ``interval`` runs at most ``limit`` times per ``interval`` seconds for
+    each value of the event data ``key``, or overall without a ``key``.
+    '''
+    def __init__(self, limits):
+        self.limits = limits or {}
+        # SLS -> the limits of the SLS
+        self._refs = {}
+        # (SLS, value of the key) -> the times the reaction ran
+        self._runs = {}
+
+    def get(self, ref):
+        '''
+        Return the limits of the SLS
+        '''
+        if ref not in self._refs:
+            conf = self.limits.get(ref)
+            if conf is None:
+                for pattern in sorted(self.limits):
+                    if fnmatch.fnmatch(ref, pattern):
+                        conf = self.limits[pattern]
+                        break
+            self._refs[ref] = conf or {}
+        return self._refs[ref]
+
+    def priority(self, ref):
+        '''
+        Return the priority of the reactions of the SLS, the reactions with a
+        higher priority run first
+        '''
+        return self.get(ref).get('priority', 0)
+
+    def allow(self, ref, data, now=None):
+        '''
+        Return whether the SLS may react to an event with this data, and
+        record the run
+        '''
+        conf = self.get(ref)
+        interval = conf.get('interval')
+        if not interval:
+            return True
+        now = now or time.time()
+        keys = conf.get('key') or []
+        if isinstance(keys, six.string_types):
+            keys = [keys]
+        value = repr([salt.utils.data.traverse_dict_and_list(data, key)
+                      for key in keys])
+        runs = self._runs.setdefault((ref, value), collections.deque())
+        while runs and runs[0] <= now - interval:
+            runs.popleft()
+        if len(runs) >= conf.get('limit', 1):
+            return False
+        runs.append(now)
+        return True
+
+    def prune(self, now=None):
+        '''
+        Forget the runs which no longer limit the reactions
+        '''
+        now = now or time.time()
+        for run_key in list(self._runs):
+            runs = self._runs[run_key]
+            if not runs or runs[-1] <= now - self.get(run_key[0]).get('interval', 0):
+                del self._runs[run_key]
+
+
+class ReactorStats(object):
+    '''
+    The counters and latencies of the reactor, for the ``salt/reactors/stats``
+    events and the ``reactor.stats`` runner. The worker threads running the
+    ``runner`` and ``wheel`` reactions record their latencies.
+    '''
+    COUNTERS = ('events', 'limited', 'reactions', 'queued', 'dropped',
+                'executed', 'failed')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.totals = dict.fromkeys(self.COUNTERS, 0)
+        self.reset()
+
+    def reset(self):
+        '''
+        Start a new interval
+        '''
+        with self.lock:
+            self._reset()
+
+    def _reset(self):
+        self.since = time.time()
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        # [total, max] seconds
+        self.latency = {'wait': [0.0, 0.0], 'run': [0.0, 0.0]}
+
+    def incr(self, name, count=1):
+        '''
+        Increment a counter, return the count in the current interval
+        '''
+        with self.lock:
+            self.counters[name] += count
+            self.totals[name] += count
+            return self.counters[name]
+
+    def timer(self, wait, run, failed):
+        '''
+        Record a reaction run by a worker thread
+        '''
+        with self.lock:
+            for name, secs in (('wait', wait), ('run', run)):
+                latency = self.latency[name]
+                latency[0] += secs
+                latency[1] = max(latency[1], secs)
+            for name in ('executed', 'failed') if failed else ('executed',):
+                self.counters[name] += 1
+                self.totals[name] += 1
+
+    def snapshot(self, pool, reset=False):
+        '''
+        Return the statistics of the current interval and since the start,
+        with the depth of the queue of the worker threads
+        '''
+        now = time.time()
+        with self.lock:
+            executed = self.counters['executed']
+            interval = dict(self.counters)
+            for name, (total, max_) in six.iteritems(self.latency):
+                interval[name] = {'mean': total / executed if executed else 0.0,
+                                  'max': max_}
+            interval['seconds'] = now - self.since
+            ret = {'interval': interval,
+                   'total': dict(self.totals),
+                   'uptime': now - self.started,
+                   'queue_depth': pool.qsize(),
+                   'queue_size': pool.queue_size}
+            if reset:
+                self._reset()
+        return ret
+
 
 class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.state.Compiler):
     '''
@@ -54,8 +319,16 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
         super(Reactor, self).__init__(log_queue=log_queue)
         local_minion_opts = opts.copy()
         local_minion_opts['file_client'] = 'local'
+        # Keep the reactor SLS files compiled, the renders only differ by the
+        # tag and data of the events
+        local_minion_opts['_jinja_template_cache'] = True
         self.minion = salt.minion.MasterMinion(local_minion_opts)
         salt.state.Compiler.__init__(self, opts, self.minion.rend)
+        self._compiled_map = None
+        self._map_mtime = None
+        # glob_ref -> (expiry time, list of files)
+        self._reaction_files = {}
+        self.limits = ReactionLimits(opts.get('reactor_limits'))
 
     # We need __setstate__ and __getstate__ to avoid pickling errors since
     # 'self.rend' (from salt.state.Compiler) contains a function reference
@@ -79,9 +352,7 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
         '''
         react = {}
 
-        if glob_ref.startswith('salt://'):
-            glob_ref = self.minion.functions['cp.cache_file'](glob_ref) or ''
-        globbed_ref = glob.glob(glob_ref)
+        globbed_ref = self.reaction_files(glob_ref)
         if not globbed_ref:
             log.error('Can not render SLS {0} for tag {1}. File missing or not found.'.format(glob_ref, tag))
         for fn_ in globbed_ref:
@@ -101,49 +372,61 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
                 log.error('Failed to render "{0}": '.format(fn_), exc_info=True)
         return react
 
+    def compiled_map(self):
+        '''
+        Return the reactor map compiled to match event tags. A reactor map
+        read from a file is compiled again when the file changes.
+        '''
+        if isinstance(self.minion.opts['reactor'], six.string_types):
+            try:
+                mtime = os.path.getmtime(self.minion.opts['reactor'])
+            except OSError:
+                mtime = None
+            if mtime != self._map_mtime:
+                self._map_mtime = mtime
+                self._compiled_map = None
+        if self._compiled_map is None:
+            self._compiled_map = ReactorMap(self.list_all())
+        return self._compiled_map
+
+    def reaction_files(self, glob_ref):
+        '''
+        Return the files of a reaction, the ``salt://`` URLs and globs are
+        resolved at most once per ``reactor_refresh_interval``
+        '''
+        now = time.time()
+        cached = self._reaction_files.get(glob_ref)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        path = glob_ref
+        if path.startswith('salt://'):
+            path = self.minion.functions['cp.cache_file'](path) or ''
+        files = glob.glob(path)
+        if files:
+            self._reaction_files[glob_ref] = (
+                now + self.opts.get('reactor_refresh_interval', 60), files)
+        return files
+
     def list_reactors(self, tag):
         '''
         Take in the tag from an event and return a list of the reactors to
         process
         '''
         log.debug('Gathering reactors for tag {0}'.format(tag))
-        reactors = []
-        if isinstance(self.opts['reactor'], six.string_types):
-            try:
-                with salt.utils.files.fopen(self.opts['reactor']) as fp_:
-                    react_map = yaml.safe_load(fp_.read())
-            except (OSError, IOError):
-                log.error(
-                    'Failed to read reactor map: "{0}"'.format(
-                        self.opts['reactor']
-                        )
-                    )
-            except Exception:
-                log.error(
-                    'Failed to parse YAML in reactor map: "{0}"'.format(
-                        self.opts['reactor']
-                        )
-                    )
-        else:
-            react_map = self.opts['reactor']
-        for ropt in react_map:
-            if not isinstance(ropt, dict):
-                continue
-            if len(ropt) != 1:
-                continue
-            key = next(six.iterkeys(ropt))
-            val = ropt[key]
-            if fnmatch.fnmatch(tag, key):
-                if isinstance(val, six.string_types):
-                    reactors.append(val)
-                elif isinstance(val, list):
-                    reactors.extend(val)
-        return reactors
+        return self.compiled_map().match(tag)
+
+    def match_event(self, event_tag, search_tag=None):
+        '''
+        Return whether the reactor needs the event with this tag, used to
+        skip the other events before their data is unpacked
+        '''
+        return MANAGE_TAG in event_tag or bool(self.compiled_map().match(event_tag))
 
     def list_all(self):
         '''
         Return a list of the reactors
         '''
+        react_map = []
         if isinstance(self.minion.opts['reactor'], six.string_types):
             log.debug('Reading reactors from yaml {0}'.format(self.opts['reactor']))
             try:
@@ -177,6 +460,7 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
                 return {'status': False, 'comment': 'Reactor already exists.'}
 
         self.minion.opts['reactor'].append({tag: reaction})
+        self._compiled_map = None
         return {'status': True, 'comment': 'Reactor added.'}
 
     def delete_reactor(self, tag):
@@ -188,6 +472,7 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
             _tag = next(six.iterkeys(reactor))
             if _tag == tag:
                 self.minion.opts['reactor'].remove(reactor)
+                self._compiled_map = None
                 return {'status': True, 'comment': 'Reactor deleted.'}
 
         return {'status': False, 'comment': 'Reactor does not exists.'}
@@ -209,9 +494,15 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
         log.debug('Compiling reactions for tag {0}'.format(tag))
         high = {}
         chunks = []
+        # ID -> priority of the SLS declaring it
+        priorities = {}
         try:
             for fn_ in reactors:
-                high.update(self.render_reaction(fn_, tag, data))
+                react = self.render_reaction(fn_, tag, data)
+                priority = self.limits.priority(fn_)
+                for name in react:
+                    priorities[name] = priority
+                high.update(react)
             if high:
                 errors = self.verify_high(high)
                 if errors:
@@ -222,6 +513,10 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
         except Exception as exc:
             log.error('Exception trying to compile reactions: {0}'.format(exc), exc_info=True)
 
+        for chunk in chunks:
+            if priorities.get(chunk['__id__']):
+                chunk['__priority__'] = priorities[chunk['__id__']]
+
         self.resolve_aliases(chunks)
         return chunks
 
@@ -247,35 +542,114 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
                 listen=True)
         self.wrap = ReactWrap(self.opts)
 
-        for data in self.event.iter_events(full=True):
+        stats_interval = self.opts.get('reactor_stats_interval', 60)
+        next_stats = time.time() + stats_interval
+        next_prune = time.time() + PRUNE_INTERVAL
+        while True:
+            data = self.event.get_event(full=True, match_type=self.match_event)
+            if stats_interval and time.time() >= next_stats:
+                self.publish_stats()
+                next_stats = time.time() + stats_interval
+            if time.time() >= next_prune:
+                self.limits.prune()
+                next_prune = time.time() + PRUNE_INTERVAL
+            if data is None:
+                continue
             # skip all events fired by ourselves
             if data['data'].get('user') == self.wrap.event_user:
                 continue
-            if data['tag'].endswith('salt/reactors/manage/add'):
-                _data = data['data']
-                res = self.add_reactor(_data['event'], _data['reactors'])
-                self.event.fire_event({'reactors': self.list_all(),
-                                       'result': res},
-                                      'salt/reactors/manage/add-complete')
-            elif data['tag'].endswith('salt/reactors/manage/delete'):
-                _data = data['data']
-                res = self.delete_reactor(_data['event'])
-                self.event.fire_event({'reactors': self.list_all(),
-                                       'result': res},
-                                      'salt/reactors/manage/delete-complete')
-            elif data['tag'].endswith('salt/reactors/manage/list'):
-                self.event.fire_event({'reactors': self.list_all()},
-                                      'salt/reactors/manage/list-results')
-            else:
-                reactors = self.list_reactors(data['tag'])
+            if self.manage_reactors(data):
+                continue
+            events = [data]
+            merge_window = self.opts.get('reactor_merge_window', 0)
+            if merge_window:
+                events.extend(self.gather_events(merge_window))
+            chunks = []
+            for event in events:
+                self.wrap.stats.incr('events')
+                reactors = [fn_ for fn_ in self.list_reactors(event['tag'])
+                            if self.allowed(fn_, event)]
                 if not reactors:
                     continue
-                chunks = self.reactions(data['tag'], data['data'], reactors)
-                if chunks:
-                    try:
-                        self.call_reactions(chunks)
-                    except SystemExit:
-                        log.warning('Exit ignored by reactor')
+                chunks.extend(self.reactions(event['tag'], event['data'], reactors))
+            if merge_window:
+                chunks = merge_local_reactions(chunks)
+            if chunks:
+                try:
+                    self.call_reactions(chunks)
+                except SystemExit:
+                    log.warning('Exit ignored by reactor')
+
+    def manage_reactors(self, data):
+        '''
+        Handle the events adding, deleting and listing reactors, return
+        whether the event was one of them
+        '''
+        if data['tag'].endswith('salt/reactors/manage/add'):
+            _data = data['data']
+            res = self.add_reactor(_data['event'], _data['reactors'])
+            self.event.fire_event({'reactors': self.list_all(),
+                                   'result': res},
+                                  'salt/reactors/manage/add-complete')
+        elif data['tag'].endswith('salt/reactors/manage/delete'):
+            _data = data['data']
+            res = self.delete_reactor(_data['event'])
+            self.event.fire_event({'reactors': self.list_all(),
+                                   'result': res},
+                                  'salt/reactors/manage/delete-complete')
+        elif data['tag'].endswith('salt/reactors/manage/list'):
+            self.event.fire_event({'reactors': self.list_all()},
+                                  'salt/reactors/manage/list-results')
+        elif data['tag'].endswith('salt/reactors/manage/stats'):
+            self.event.fire_event(self.wrap.stats.snapshot(self.wrap.pool),
+                                  'salt/reactors/manage/stats-results')
+        else:
+            return False
+        return True
+
+    def allowed(self, glob_ref, event):
+        '''
+        Return whether the rate limits of the SLS allow it to react to the
+        event
+        '''
+        if self.limits.allow(glob_ref, event['data']):
+            return True
+        log.debug('Reactor %s is rate limited, skipping the event %s',
+                  glob_ref, event['tag'])
+        self.wrap.stats.incr('limited')
+        return False
+
+    def publish_stats(self):
+        '''
+        Fire the statistics of the last interval on the event bus
+        '''
+        stats = self.wrap.stats.snapshot(self.wrap.pool, reset=True)
+        if stats['interval']['dropped']:
+            log.warning(
+                'The reactor dropped %s runner and wheel reactions in the last '
+                '%d seconds, the queue of reactor_worker_threads is full',
+                stats['interval']['dropped'], stats['interval']['seconds'])
+        self.event.fire_event(stats, STATS_TAG)
+
+    def gather_events(self, window):
+        '''
+        Return the events the reactor reacts to arriving in the next
+        ``window`` seconds, to merge their reactions
+        '''
+        events = []
+        end = time.time() + window
+        while True:
+            wait = end - time.time()
+            if wait <= 0:
+                break
+            data = self.event.get_event(wait=wait, full=True, match_type=self.match_event)
+            if data is None:
+                break
+            if data['data'].get('user') == self.wrap.event_user:
+                continue
+            if not self.manage_reactors(data):
+                events.append(data)
+        return events
 
 
 class ReactWrap(object):
@@ -298,9 +672,12 @@ class ReactWrap(object):
         if ReactWrap.client_cache is None:
             ReactWrap.client_cache = salt.utils.cache.CacheDict(opts['reactor_refresh_interval'])
 
+        self.stats = ReactorStats()
         self.pool = salt.utils.process.ThreadPool(
             self.opts['reactor_worker_threads'],  # number of workers for runner/wheel
-            queue_size=self.opts['reactor_worker_hwm']  # queue size for those workers
+            queue_size=self.opts['reactor_worker_hwm'],  # queue size for those workers
+            priority=True,
+            timer=self.stats.timer
         )
 
     def populate_client_cache(self, low):
@@ -332,6 +709,10 @@ class ReactWrap(object):
         '''
         Execute a reaction by invoking the proper wrapper func
         '''
+        # The priority orders the runner and wheel reactions waiting for a
+        # worker thread
+        priority = low.pop('__priority__', 0)
+        self.stats.incr('reactions')
         self.populate_client_cache(low)
         try:
             l_fun = getattr(self, low['state'])
@@ -353,6 +734,7 @@ class ReactWrap(object):
                 # Replace ``state`` kwarg which comes from high data compiler.
                 # It breaks some runner functions and seems unnecessary.
                 kwargs['__state__'] = kwargs.pop('state')
+                kwargs['__priority__'] = priority
                 # NOTE: if any additional keys are added here, they will also
                 # need to be added to filter_kwargs()
 
@@ -433,17 +815,29 @@ class ReactWrap(object):
                 low['__id__'], low['state'], low['fun'], exc_info=True
             )
 
-    def runner(self, fun, **kwargs):
+    def fire_async(self, func, args, priority):
+        '''
+        Queue a reaction for the worker threads, count it if the queue is
+        full and the reaction is dropped
+        '''
+        if self.pool.fire_async(func, args=args, priority=priority):
+            self.stats.incr('queued')
+        elif self.stats.incr('dropped') == 1:
+            # Once per stats interval, the stats event reports the others
+            log.warning('The reactor queue is full, dropping the reaction %s',
+                        args[0])
+
+    def runner(self, fun, __priority__=0, **kwargs):
         '''
         Wrap RunnerClient for executing :ref:`runner modules <all-salt.runners>`
         '''
-        self.pool.fire_async(self.client_cache['runner'].low, args=(fun, kwargs))
+        self.fire_async(self.client_cache['runner'].low, (fun, kwargs), __priority__)
 
-    def wheel(self, fun, **kwargs):
+    def wheel(self, fun, __priority__=0, **kwargs):
         '''
         Wrap Wheel to enable executing :ref:`wheel modules <all-salt.wheel>`
         '''
-        self.pool.fire_async(self.client_cache['wheel'].low, args=(fun, kwargs))
+        self.fire_async(self.client_cache['wheel'].low, (fun, kwargs), __priority__)
 
     def local(self, fun, tgt, **kwargs):
         '''
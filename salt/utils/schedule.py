@@ -349,6 +349,7 @@ import time
 import copy
 import signal
 import datetime
+import heapq
 import itertools
 import threading
 import logging
@@ -444,6 +445,15 @@ class Schedule(object):
         self.schedule_returner = self.option('schedule_returner')
         # Keep track of the lowest loop interval needed in this variable
         self.loop_interval = six.MAXSIZE
+        # The plan of the next evaluations of the jobs, see _iter_jobs
+        self._stale = True
+        self._sources = None
+        self._always = set()
+        self._deadlines = {}
+        self._heap = []
+        # The dates parsed today, see _parse_date
+        self._dates = {}
+        self._dates_day = None
         if not self.standalone:
             clean_proc_dir(opts)
         if cleanup:
@@ -518,6 +528,7 @@ class Schedule(object):
         '''
         Deletes a job from the scheduler. Ignore jobs from pillar
         '''
+        self._changed()
         # ensure job exists, then delete it
         if name in self.opts['schedule']:
             del self.opts['schedule'][name]
@@ -541,6 +552,7 @@ class Schedule(object):
         '''
         Deletes a job from the scheduler. Ignores jobs from pillar
         '''
+        self._changed()
         # ensure job exists, then delete it
         for job in list(self.opts['schedule'].keys()):
             if job.startswith(name):
@@ -569,6 +581,7 @@ class Schedule(object):
         the configuration file. See the docs on how YAML is interpreted into
         python data-structures to make sure, you pass correct dictionaries.
         '''
+        self._changed()
 
         # we don't do any checking here besides making sure its a dict.
         # eval() already does for us and raises errors accordingly
@@ -610,6 +623,7 @@ class Schedule(object):
         '''
         Enable a job in the scheduler. Ignores jobs from pillar
         '''
+        self._changed()
         # ensure job exists, then enable it
         if name in self.opts['schedule']:
             self.opts['schedule'][name]['enabled'] = True
@@ -630,6 +644,7 @@ class Schedule(object):
         '''
         Disable a job in the scheduler. Ignores jobs from pillar
         '''
+        self._changed()
         # ensure job exists, then disable it
         if name in self.opts['schedule']:
             self.opts['schedule'][name]['enabled'] = False
@@ -650,6 +665,7 @@ class Schedule(object):
         '''
         Modify a job in the scheduler. Ignores jobs from pillar
         '''
+        self._changed()
         # ensure job exists, then replace it
         if name in self.opts['schedule']:
             self.delete_job(name, persist)
@@ -711,6 +727,7 @@ class Schedule(object):
         '''
         Enable the scheduler.
         '''
+        self._changed()
         self.opts['schedule']['enabled'] = True
 
         # Fire the complete event back along with updated list of schedule
@@ -722,6 +739,7 @@ class Schedule(object):
         '''
         Disable the scheduler.
         '''
+        self._changed()
         self.opts['schedule']['enabled'] = False
 
         # Fire the complete event back along with updated list of schedule
@@ -733,6 +751,7 @@ class Schedule(object):
         '''
         Reload the schedule from saved schedule file.
         '''
+        self._changed()
         # Remove all jobs from self.intervals
         self.intervals = {}
 
@@ -772,6 +791,7 @@ class Schedule(object):
         Postpone a job in the scheduler.
         Ignores jobs from pillar
         '''
+        self._changed()
         time = data['time']
         new_time = data['new_time']
 
@@ -799,6 +819,7 @@ class Schedule(object):
         Skip a job at a specific time in the scheduler.
         Ignores jobs from pillar
         '''
+        self._changed()
         time = data['time']
 
         # ensure job exists, then disable it
@@ -1033,6 +1054,118 @@ class Schedule(object):
                         # Let's make sure we exit the process!
                         sys.exit(salt.defaults.exitcodes.EX_GENERIC)
 
+    def _schedule_sources(self):
+        '''
+        Return the dicts the schedule is read from with their sizes, so that
+        replacing them, or adding a job to them without the methods of this
+        class, makes the next evaluation evaluate all the jobs
+        '''
+        sources = (self.opts.get('schedule'),
+                   self.opts.get('pillar', {}).get('schedule'))
+        return [(source, len(source) if isinstance(source, dict) else None)
+                for source in sources]
+
+    def _changed(self):
+        '''
+        Evaluate all the jobs again on the next evaluation
+        '''
+        self._stale = True
+
+    @staticmethod
+    def _next_eval(data):
+        '''
+        Return the time a job needs to be evaluated again, ``True`` if it
+        needs to be evaluated every time and ``None`` if it only needs to be
+        when the schedule changes
+        '''
+        if not isinstance(data, dict) or ('enabled' in data and not data['enabled']):
+            return None
+        if data.get('_run_on_start') or \
+                any(item in data for item in ('when', 'once', 'run_explicit')):
+            return True
+        if 'cron' in data or \
+                any(item in data for item in ('seconds', 'minutes', 'hours', 'days')):
+            if data.get('_splay'):
+                return data['_splay']
+            if data.get('_next_fire_time') is None:
+                return True
+            return data['_next_fire_time']
+        return None
+
+    def _plan(self, job, data):
+        self._always.discard(job)
+        self._deadlines.pop(job, None)
+        deadline = self._next_eval(data)
+        if deadline is True:
+            self._always.add(job)
+        elif deadline is not None:
+            self._deadlines[job] = deadline
+            heapq.heappush(self._heap, (deadline, job))
+
+    def _iter_jobs(self, schedule, now):
+        '''
+        Yield the jobs to evaluate at ``now`` with their data, and plan their
+        next evaluation once evaluated.
+
+        The interval and cron jobs are only evaluated when they are due,
+        their next fire times are kept in a heap. The jobs with other
+        schedules are evaluated every time, and all the jobs when the
+        schedule changed.
+        '''
+        sources = self._schedule_sources()
+        if self._stale or self._sources is None or \
+                any(old[0] is not new[0] or old[1] != new[1]
+                    for old, new in zip(self._sources, sources)):
+            self._stale = False
+            self._sources = sources
+            self._always = set()
+            self._deadlines = {}
+            self._heap = []
+            jobs = list(schedule)
+        else:
+            jobs = list(self._always)
+            while self._heap and self._heap[0][0] <= now:
+                deadline, job = heapq.heappop(self._heap)
+                if self._deadlines.get(job) == deadline:
+                    del self._deadlines[job]
+                    jobs.append(job)
+        # Plan the jobs again before evaluating them, so that a job failing
+        # does not keep the jobs after it from being evaluated next time
+        for job in jobs:
+            self._plan(job, schedule.get(job))
+        for job in jobs:
+            data = schedule.get(job)
+            yield job, data
+            self._plan(job, data)
+
+    def next_fire_time(self):
+        '''
+        Return the time of the next interval or cron job planned by the last
+        evaluation, ``None`` if there is none. The jobs with other schedules
+        are evaluated on every evaluation, while there are some this is the
+        current time.
+        '''
+        if self._always:
+            return time.time()
+        while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def _parse_date(self, value):
+        '''
+        Parse a date string with dateutil. The results are kept for the day,
+        the strings without a date are dates of the current day.
+        '''
+        if not isinstance(value, six.string_types):
+            return dateutil_parser.parse(value)
+        today = datetime.date.today()
+        if today != self._dates_day:
+            self._dates = {}
+            self._dates_day = today
+        if value not in self._dates:
+            self._dates[value] = dateutil_parser.parse(value)
+        return self._dates[value]
+
     def eval(self, now=None):
         '''
         Evaluate and execute the schedule
@@ -1066,7 +1199,9 @@ class Schedule(object):
             return
         if 'skip_function' in schedule:
             self.skip_function = schedule['skip_function']
-        for job, data in six.iteritems(schedule):
+        if not now:
+            now = int(time.time())
+        for job, data in self._iter_jobs(schedule, now):
             if job == 'enabled' or not data:
                 continue
             if job == 'skip_function' or not data:
@@ -1113,7 +1248,7 @@ class Schedule(object):
                     log.error('Missing python-dateutil. '
                               'Ignoring until.')
                 else:
-                    until__ = dateutil_parser.parse(data['until'])
+                    until__ = self._parse_date(data['until'])
                     until = int(time.mktime(until__.timetuple()))
 
                     if until <= now:
@@ -1126,7 +1261,7 @@ class Schedule(object):
                     log.error('Missing python-dateutil. '
                               'Ignoring after.')
                 else:
-                    after__ = dateutil_parser.parse(data['after'])
+                    after__ = self._parse_date(data['after'])
                     after = int(time.mktime(after__.timetuple()))
 
                     if after >= now:
@@ -1231,7 +1366,7 @@ class Schedule(object):
                                 continue
                             __when = self.opts['pillar']['whens'][i]
                             try:
-                                when__ = dateutil_parser.parse(__when)
+                                when__ = self._parse_date(__when)
                             except ValueError:
                                 log.error('Invalid date string. Ignoring')
                                 continue
@@ -1244,13 +1379,13 @@ class Schedule(object):
                                 continue
                             __when = self.opts['grains']['whens'][i]
                             try:
-                                when__ = dateutil_parser.parse(__when)
+                                when__ = self._parse_date(__when)
                             except ValueError:
                                 log.error('Invalid date string. Ignoring')
                                 continue
                         else:
                             try:
-                                when__ = dateutil_parser.parse(i)
+                                when__ = self._parse_date(i)
                             except ValueError:
                                 log.error('Invalid date string {0}. '
                                           'Ignoring job {1}.'.format(i, job))
@@ -1301,7 +1436,7 @@ class Schedule(object):
                             continue
                         _when = self.opts['pillar']['whens'][data['when']]
                         try:
-                            when__ = dateutil_parser.parse(_when)
+                            when__ = self._parse_date(_when)
                         except ValueError:
                             log.error('Invalid date string. Ignoring')
                             continue
@@ -1312,13 +1447,13 @@ class Schedule(object):
                             continue
                         _when = self.opts['grains']['whens'][data['when']]
                         try:
-                            when__ = dateutil_parser.parse(_when)
+                            when__ = self._parse_date(_when)
                         except ValueError:
                             log.error('Invalid date string. Ignoring')
                             continue
                     else:
                         try:
-                            when__ = dateutil_parser.parse(data['when'])
+                            when__ = self._parse_date(data['when'])
                         except ValueError:
                             log.error('Invalid date string. Ignoring')
                             continue
@@ -1408,12 +1543,12 @@ class Schedule(object):
                     else:
                         if isinstance(data['range'], dict):
                             try:
-                                start = int(time.mktime(dateutil_parser.parse(data['range']['start']).timetuple()))
+                                start = int(time.mktime(self._parse_date(data['range']['start']).timetuple()))
                             except ValueError:
                                 log.error('Invalid date string for start. Ignoring job {0}.'.format(job))
                                 continue
                             try:
-                                end = int(time.mktime(dateutil_parser.parse(data['range']['end']).timetuple()))
+                                end = int(time.mktime(self._parse_date(data['range']['end']).timetuple()))
                             except ValueError:
                                 log.error('Invalid date string for end. Ignoring job {0}.'.format(job))
                                 continue
@@ -1448,12 +1583,12 @@ class Schedule(object):
                     else:
                         if isinstance(data['skip_during_range'], dict):
                             try:
-                                start = int(time.mktime(dateutil_parser.parse(data['skip_during_range']['start']).timetuple()))
+                                start = int(time.mktime(self._parse_date(data['skip_during_range']['start']).timetuple()))
                             except ValueError:
                                 log.error('Invalid date string for start in skip_during_range. Ignoring job {0}.'.format(job))
                                 continue
                             try:
-                                end = int(time.mktime(dateutil_parser.parse(data['skip_during_range']['end']).timetuple()))
+                                end = int(time.mktime(self._parse_date(data['skip_during_range']['end']).timetuple()))
                             except ValueError:
                                 log.error('Invalid date string for end in skip_during_range. Ignoring job {0}.'.format(job))
                                 log.error(data)
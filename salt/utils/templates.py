@@ -53,6 +53,12 @@ TEMPLATE_DIRNAME = os.path.join(saltpath[0], 'templates')
 SLS_ENCODING = 'utf-8'  # this one has no BOM.
 SLS_ENCODER = codecs.getencoder(SLS_ENCODING)
 
+# Compiled jinja templates, for the renders with ``_jinja_template_cache`` set
+# in their opts, like the reactor rendering the same files with the data of
+# every event. Keyed by the template and the settings of the environment.
+JINJA_TEMPLATE_CACHE_SIZE = 256
+_JINJA_TEMPLATES = OrderedDict()
+
 
 class AliasedLoader(object):
     '''
@@ -390,21 +396,38 @@ def render_jinja_tmpl(tmplstr, context, tmplpath=None):
     else:
         opt_jinja_env_helper(opt_jinja_env, 'jinja_env')
 
-    if opts.get('allow_undefined', False):
-        jinja_env = jinja2.Environment(**env_args)
-    else:
-        jinja_env = jinja2.Environment(undefined=jinja2.StrictUndefined,
-                                       **env_args)
+    template = cache_key = None
+    if opts.get('_jinja_template_cache'):
+        cache_key = (tmplstr, tmplpath, saltenv, bool(context.get('_pillar_rend')),
+                     bool(opts.get('allow_undefined', False)),
+                     repr(sorted((key, val) for key, val in six.iteritems(env_args)
+                                 if key not in ('loader', 'extensions'))))
+        template = _JINJA_TEMPLATES.pop(cache_key, None)
+        if template is not None:
+            # Most recently used
+            _JINJA_TEMPLATES[cache_key] = template
+            # Fetch the files included or imported by the template again,
+            # like a new SaltCacheLoader would. The environment compiles them
+            # again when their cached copy changed.
+            if isinstance(template.environment.loader, salt.utils.jinja.SaltCacheLoader):
+                template.environment.loader.cached = []
+
+    if template is None:
+        if opts.get('allow_undefined', False):
+            jinja_env = jinja2.Environment(**env_args)
+        else:
+            jinja_env = jinja2.Environment(undefined=jinja2.StrictUndefined,
+                                           **env_args)
 
-    jinja_env.tests.update(JinjaTest.salt_jinja_tests)
-    jinja_env.filters.update(JinjaFilter.salt_jinja_filters)
-    jinja_env.globals.update(JinjaGlobal.salt_jinja_globals)
+        jinja_env.tests.update(JinjaTest.salt_jinja_tests)
+        jinja_env.filters.update(JinjaFilter.salt_jinja_filters)
+        jinja_env.globals.update(JinjaGlobal.salt_jinja_globals)
 
-    # globals
-    jinja_env.globals['odict'] = OrderedDict
-    jinja_env.globals['show_full_context'] = salt.utils.jinja.show_full_context
+        # globals
+        jinja_env.globals['odict'] = OrderedDict
+        jinja_env.globals['show_full_context'] = salt.utils.jinja.show_full_context
 
-    jinja_env.tests['list'] = salt.utils.data.is_list
+        jinja_env.tests['list'] = salt.utils.data.is_list
 
     decoded_context = {}
     for key, value in six.iteritems(context):
@@ -415,8 +438,16 @@ def render_jinja_tmpl(tmplstr, context, tmplpath=None):
         decoded_context[key] = salt.utils.locales.sdecode(value)
 
     try:
-        template = jinja_env.from_string(tmplstr)
-        template.globals.update(decoded_context)
+        if template is None:
+            template = jinja_env.from_string(tmplstr)
+            if cache_key is not None:
+                _JINJA_TEMPLATES[cache_key] = template
+                while len(_JINJA_TEMPLATES) > JINJA_TEMPLATE_CACHE_SIZE:
+                    _JINJA_TEMPLATES.popitem(last=False)
+        if cache_key is None:
+            template.globals.update(decoded_context)
+        # A cached template is shared between the renders, only pass them
+        # their own context
         output = template.render(**decoded_context)
     except jinja2.exceptions.TemplateSyntaxError as exc:
         trace = traceback.extract_tb(sys.exc_info()[2])
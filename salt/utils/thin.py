@@ -9,11 +9,18 @@ from __future__ import absolute_import
 import os
 import sys
 import json
+import time
+import zlib
 import shutil
+import struct
+import hashlib
+import logging
 import tarfile
 import zipfile
 import tempfile
 import subprocess
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 
 # Import third party libs
 import jinja2
@@ -70,11 +77,23 @@ except ImportError:
 
 # Import salt libs
 import salt
+import salt.utils.atomicfile
 import salt.utils.files
 import salt.utils.hashutils
 import salt.exceptions
 import salt.version
 
+log = logging.getLogger(__name__)
+
+# The modification time of every file in the thin, so the same files always
+# make the same thin. SOURCE_DATE_EPOCH overrides it, the default is
+# 1980-01-01, the earliest time a zip file can hold.
+THIN_MTIME = 315532800
+# The checksums of the files of the last thin built
+THIN_INDEX = 'index.json'
+# The thin is compressed in gzip members of this size, in parallel
+COMPRESS_CHUNK = 1024 * 1024
+
 SALTCALL = '''
 import os
 import sys
@@ -155,14 +174,171 @@ def get_tops(extra_mods='', so_mods=''):
     return tops
 
 
+def _thin_mtime():
+    try:
+        return int(os.environ.get('SOURCE_DATE_EPOCH', THIN_MTIME))
+    except ValueError:
+        return THIN_MTIME
+
+
+def _thin_files(tops_py_version_mapping, absonly=True, tempdirs=None):
+    '''
+    Return the sorted list of the archive names and paths of the files going
+    into the thin. Compressed eggs are extracted to temporary directories,
+    which are appended to ``tempdirs``.
+    '''
+    if tempdirs is None:
+        tempdirs = []
+    files = {}
+    for py_ver, tops in _six.iteritems(tops_py_version_mapping):
+        pydir = 'py{0}'.format(py_ver)
+        for top in tops:
+            if absonly and not os.path.isabs(top):
+                continue
+            base = os.path.basename(top)
+            top_dirname = os.path.dirname(top)
+            if not os.path.isdir(top_dirname):
+                # This is likely a compressed python .egg
+                tempdir = tempfile.mkdtemp()
+                tempdirs.append(tempdir)
+                egg = zipfile.ZipFile(top_dirname)
+                egg.extractall(tempdir)
+                top = os.path.join(tempdir, base)
+            if not os.path.isdir(top):
+                # top is a single file module
+                if os.path.isfile(top):
+                    files.setdefault(os.path.join(pydir, base), top)
+                continue
+            for root, dirs, names in os.walk(top, followlinks=True):
+                for name in names:
+                    if name.endswith(('.pyc', '.pyo')):
+                        continue
+                    path = os.path.join(root, name)
+                    files.setdefault(
+                        os.path.join(pydir, base, os.path.relpath(path, top)),
+                        path)
+    return sorted(files.items())
+
+
+def _read_index(thindir):
+    try:
+        with salt.utils.files.fopen(os.path.join(thindir, THIN_INDEX), 'r') as fp_:
+            index = json.load(fp_)
+    except (IOError, OSError, ValueError):
+        return {}
+    return index if isinstance(index, dict) else {}
+
+
+def _write_index(thindir, index):
+    try:
+        with salt.utils.atomicfile.atomic_open(os.path.join(thindir, THIN_INDEX), 'w') as fp_:
+            json.dump(index, fp_)
+    except (IOError, OSError):
+        log.error('Unable to write the index of the salt-thin', exc_info=True)
+
+
+def _thin_index(thindir, files, compress):
+    '''
+    Return the index of the thin made of ``files``: the size, modification
+    time and checksum of every file, and a digest of the whole thin. The
+    files whose size and modification time did not change since the last
+    build are not read again.
+    '''
+    cached = _read_index(thindir).get('files', {})
+    sums = {}
+    digest = hashlib.sha256()
+    digest.update('{0} {1}\n'.format(compress, _thin_mtime()).encode('utf-8'))
+    for arcname, path in files:
+        stat = os.stat(path)
+        entry = cached.get(path)
+        if not entry or entry[:2] != [stat.st_size, stat.st_mtime]:
+            entry = [stat.st_size, stat.st_mtime,
+                     salt.utils.hashutils.get_hash(path, 'sha256')]
+        sums[path] = entry
+        digest.update('{0} {1} {2}\n'.format(
+            arcname, entry[2], bool(stat.st_mode & 0o111)).encode('utf-8'))
+    return {'digest': digest.hexdigest(), 'files': sums}
+
+
+def _gzip_member(data):
+    '''
+    Compress a chunk of the thin to a gzip member. A gzip file can hold any
+    number of members, which decompress as a single stream.
+    '''
+    comp = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+    body = comp.compress(data) + comp.flush()
+    # No file name and no modification time in the header
+    return b''.join((b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x02\xff',
+                     body,
+                     struct.pack('<LL', zlib.crc32(data) & 0xffffffff,
+                                 len(data) & 0xffffffff)))
+
+
+def _write_tgz(fp_, files, threads=0):
+    '''
+    Write the gzipped tarball of ``files`` to ``fp_``. The tarball is
+    compressed in chunks from ``threads`` threads, zlib does not hold the GIL,
+    and does not depend on the number of threads.
+    '''
+    mtime = _thin_mtime()
+    with tempfile.TemporaryFile() as tar_fp:
+        tfp = tarfile.open(fileobj=tar_fp, mode='w', dereference=True)
+        for arcname, path in files:
+            info = tfp.gettarinfo(path, arcname)
+            info.mtime = mtime
+            info.uid = info.gid = 0
+            info.uname = info.gname = ''
+            info.mode = 0o755 if info.mode & 0o111 else 0o644
+            with salt.utils.files.fopen(path, 'rb') as src:
+                tfp.addfile(info, src)
+        tfp.close()
+        tar_fp.seek(0)
+
+        threads = threads or multiprocessing.cpu_count()
+        pool = ThreadPool(threads)
+        try:
+            while True:
+                chunks = []
+                for _ in range(threads * 4):
+                    chunk = tar_fp.read(COMPRESS_CHUNK)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                if not chunks:
+                    break
+                for member in pool.map(_gzip_member, chunks):
+                    fp_.write(member)
+        finally:
+            pool.close()
+            pool.join()
+
+
+def _write_zip(fp_, files):
+    '''
+    Write the zip file of ``files`` to ``fp_``
+    '''
+    date_time = time.gmtime(max(_thin_mtime(), THIN_MTIME))[:6]
+    with zipfile.ZipFile(fp_, 'w') as zfp:
+        for arcname, path in files:
+            info = zipfile.ZipInfo(arcname, date_time)
+            mode = 0o755 if os.stat(path).st_mode & 0o111 else 0o644
+            info.external_attr = (0o100000 | mode) << 16
+            with salt.utils.files.fopen(path, 'rb') as src:
+                zfp.writestr(info, src.read())
+
+
 def gen_thin(cachedir, extra_mods='', overwrite=False, so_mods='',
              python2_bin='python2', python3_bin='python3', absonly=True,
-             compress='gzip'):
+             compress='gzip', compress_threads=0):
     '''
     Generate the salt-thin tarball and print the location of the tarball
     Optional additional mods to include (e.g. mako) can be supplied as a comma
     delimited string.  Permits forcing an overwrite of the output file as well.
 
+    The same files always make the same thin, and the thin is only written
+    again when its files changed. The tarball is compressed from
+    ``compress_threads`` threads, one per CPU by default.
+
     CLI Example:
 
     .. code-block:: bash
@@ -196,12 +372,7 @@ def gen_thin(cachedir, extra_mods='', overwrite=False, so_mods='',
             else:
                 overwrite = True
 
-        if overwrite:
-            try:
-                os.remove(thintar)
-            except OSError:
-                pass
-        else:
+        if not overwrite:
             return thintar
     if _six.PY3:
         # Let's check for the minimum python 2 version requirement, 2.6
@@ -268,72 +439,31 @@ def gen_thin(cachedir, extra_mods='', overwrite=False, so_mods='',
             except ValueError:
                 pass
 
-    if compress == 'gzip':
-        tfp = tarfile.open(thintar, 'w:gz', dereference=True)
-    elif compress == 'zip':
-        tfp = zipfile.ZipFile(thintar, 'w')
-    try:  # cwd may not exist if it was removed but salt was run from it
-        start_dir = os.getcwd()
-    except OSError:
-        start_dir = None
-    tempdir = None
-    for py_ver, tops in _six.iteritems(tops_py_version_mapping):
-        for top in tops:
-            if absonly and not os.path.isabs(top):
-                continue
-            base = os.path.basename(top)
-            top_dirname = os.path.dirname(top)
-            if os.path.isdir(top_dirname):
-                os.chdir(top_dirname)
-            else:
-                # This is likely a compressed python .egg
-                tempdir = tempfile.mkdtemp()
-                egg = zipfile.ZipFile(top_dirname)
-                egg.extractall(tempdir)
-                top = os.path.join(tempdir, base)
-                os.chdir(tempdir)
-            if not os.path.isdir(top):
-                # top is a single file module
-                if os.path.exists(os.path.join(top_dirname, base)):
-                    if compress == 'gzip':
-                        tfp.add(base, arcname=os.path.join('py{0}'.format(py_ver), base))
-                    elif compress == 'zip':
-                        tfp.write(base, arcname=os.path.join('py{0}'.format(py_ver), base))
-                continue
-            for root, dirs, files in os.walk(base, followlinks=True):
-                for name in files:
-                    if not name.endswith(('.pyc', '.pyo')):
-                        if compress == 'gzip':
-                            tfp.add(os.path.join(root, name),
-                                    arcname=os.path.join('py{0}'.format(py_ver), root, name))
-                        elif compress == 'zip':
-                            try:
-                                # This is a little slow but there's no clear way to detect duplicates
-                                tfp.getinfo(os.path.join('py{0}'.format(py_ver), root, name))
-                            except KeyError:
-                                tfp.write(os.path.join(root, name), arcname=os.path.join('py{0}'.format(py_ver), root, name))
-            if tempdir is not None:
-                shutil.rmtree(tempdir)
-                tempdir = None
-    os.chdir(thindir)
-    if compress == 'gzip':
-        tfp.add('salt-call')
-    elif compress == 'zip':
-        tfp.write('salt-call')
     with salt.utils.files.fopen(thinver, 'w+') as fp_:
         fp_.write(salt.version.__version__)
     with salt.utils.files.fopen(pythinver, 'w+') as fp_:
         fp_.write(str(sys.version_info[0]))
-    os.chdir(os.path.dirname(thinver))
-    if compress == 'gzip':
-        tfp.add('version')
-        tfp.add('.thin-gen-py-version')
-    elif compress == 'zip':
-        tfp.write('version')
-        tfp.write('.thin-gen-py-version')
-    if start_dir:
-        os.chdir(start_dir)
-    tfp.close()
+
+    tempdirs = []
+    try:
+        files = _thin_files(tops_py_version_mapping, absonly, tempdirs)
+        for name in ('salt-call', 'version', '.thin-gen-py-version'):
+            files.append((name, os.path.join(thindir, name)))
+        index = _thin_index(thindir, files, compress)
+        if os.path.isfile(thintar) and index['digest'] == _read_index(thindir).get('digest'):
+            # Same files as the current thin, which is left alone to keep
+            # its checksum
+            log.debug('The files of the salt-thin did not change, keeping %s', thintar)
+        else:
+            with salt.utils.atomicfile.atomic_open(thintar, 'wb') as fp_:
+                if compress == 'gzip':
+                    _write_tgz(fp_, files, compress_threads)
+                elif compress == 'zip':
+                    _write_zip(fp_, files)
+        _write_index(thindir, index)
+    finally:
+        for tempdir in tempdirs:
+            shutil.rmtree(tempdir, ignore_errors=True)
     return thintar
 
 
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+'''
+Compare the minion data cache drivers on a cache of many keys.
+
+Every driver stores the keys one by one and in a single ``store_many``,
+then fetches them one by one, with ``fetch_many``, and lists the banks. The
+rates are per key, and per bank for the listing. The keys are spread over
+banks the way the minion data cache does it: a ``data`` key and a ``mine``
+bank of two keys per minion. The data stored under every key is about 2 KB.
+
+Usage:
+
+    python tests/perf/cache_backends.py [number of keys] [driver ...]
+
+The default is 100000 keys with the localfs and lmdb drivers. The lmdb
+driver requires the lmdb Python module.
+'''
+
+from __future__ import absolute_import, print_function
+import shutil
+import sys
+import tempfile
+import time
+
+import salt.cache
+import salt.config
+
+
+def make_keys(count):
+    keys = []
+    minion = 0
+    while len(keys) < count:
+        keys.append(('minions/minion{0:06d}'.format(minion), 'data'))
+        keys.append(('minions/minion{0:06d}/mine'.format(minion), 'network.ip_addrs'))
+        keys.append(('minions/minion{0:06d}/mine'.format(minion), 'grains.items'))
+        minion += 1
+    return keys[:count]
+
+
+def make_data(bank):
+    return {'grains': dict(('grain{0:03d}'.format(num), '{0}-{1}'.format(bank, num))
+                           for num in range(64))}
+
+
+def timed(name, func, count):
+    start = time.time()
+    func()
+    duration = time.time() - start
+    print('  {0:<16} {1:8.2f} s {2:10.0f} ops/s'.format(name, duration, count / duration))
+
+
+def bench(driver, keys):
+    cachedir = tempfile.mkdtemp(prefix='salt-cache-bench-')
+    try:
+        opts = dict(salt.config.DEFAULT_MASTER_OPTS, cache=driver, cachedir=cachedir)
+        cache = salt.cache.Cache(opts, cachedir=cachedir)
+        data = dict((bank_key, make_data(bank_key[0])) for bank_key in keys)
+        banks = sorted(set(bank for bank, _ in keys))
+        print('{0}:'.format(driver))
+
+        def store():
+            for (bank, key), value in data.items():
+                cache.store(bank, key, value)
+
+        def fetch():
+            for bank, key in keys:
+                cache.fetch(bank, key)
+
+        def list_():
+            cache.list('minions')
+            for bank in banks:
+                cache.list(bank)
+
+        timed('store', store, len(keys))
+        timed('store_many', lambda: cache.store_many(data), len(keys))
+        timed('fetch', fetch, len(keys))
+        timed('fetch_many', lambda: cache.fetch_many(keys), len(keys))
+        timed('list', list_, len(banks) + 1)
+    finally:
+        shutil.rmtree(cachedir, ignore_errors=True)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    drivers = sys.argv[2:] or ['localfs', 'lmdb']
+    keys = make_keys(count)
+    for driver in drivers:
+        bench(driver, keys)
+
+
+if __name__ == '__main__':
+    main()
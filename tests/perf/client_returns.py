@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+'''
+Measure the overhead of ``LocalClient`` collecting the returns of a job sent
+to a large number of minions.
+
+Synthetic return events are fed to ``cmd_iter`` and ``cmd_cli`` in bursts,
+the way they arrive from the event bus, so that the bookkeeping done by
+``get_iter_returns`` on every pass through its event loop is what gets
+measured. Publishing the job and the event bus are replaced with fakes, no
+master is needed, and the 10ms pause between passes is skipped.
+
+Usage:
+
+    python tests/perf/client_returns.py [number of minions ...] [--burst N]
+
+The number of minions defaults to 10000 and 50000, the burst size (returns
+read per pass through the event loop) to 100.
+'''
+
+from __future__ import absolute_import, print_function
+import collections
+import copy
+import sys
+import time
+
+import salt.client
+import salt.config
+
+JID = '20171019000000000000'
+
+
+class FakeEvent(object):
+    '''
+    Serve the return events of ``minions``, with a pause after every
+    ``burst`` returns
+    '''
+    cpub = True
+
+    def __init__(self, minions, burst):
+        self.events = collections.deque()
+        for num, id_ in enumerate(minions):
+            if num and not num % burst:
+                self.events.append(None)
+            self.events.append({
+                'tag': 'salt/job/{0}/ret/{1}'.format(JID, id_),
+                'data': {'id': id_, 'jid': JID, 'fun': 'test.ping',
+                         'return': True, 'retcode': 0, 'success': True}})
+
+    def get_event(self, **kwargs):
+        if self.events:
+            return self.events.popleft()
+        return None
+
+    def __getattr__(self, name):
+        # connect_pub, close_pub, unsubscribe ...
+        return lambda *args, **kwargs: None
+
+
+def make_client(minions, burst):
+    client = salt.client.LocalClient.__new__(salt.client.LocalClient)
+    client.opts = copy.deepcopy(salt.config.DEFAULT_MASTER_OPTS)
+    client.opts['timeout'] = 3600
+    client.auto_reconnect = False
+    client.event = FakeEvent(minions, burst)
+    client.returners = {
+        '{0}.get_load'.format(client.opts['master_job_cache']): lambda jid: {'jid': jid}}
+    client.run_job = lambda *args, **kwargs: {'jid': JID, 'minions': list(minions)}
+    return client
+
+
+def cmd_iter(client, minions):
+    return sum(1 for _ in client.cmd_iter(minions, 'test.ping', tgt_type='list'))
+
+
+def cmd_cli(client, minions):
+    return sum(1 for _ in client.cmd_cli(minions, 'test.ping', tgt_type='list'))
+
+
+def run(counts, burst):
+    for count in counts:
+        minions = ['minion-{0:06d}'.format(num) for num in range(count)]
+        for name, func in (('cmd_iter', cmd_iter), ('cmd_cli', cmd_cli)):
+            client = make_client(minions, burst)
+            start = time.time()
+            returns = func(client, minions)
+            duration = time.time() - start
+            assert returns == count, returns
+            print('{0:>6} minions {1:>8}: {2:7.2f}s, {3:9.0f} returns/s'.format(
+                count, name, duration, count / duration))
+
+
+def main():
+    args = sys.argv[1:]
+    burst = 100
+    if '--burst' in args:
+        idx = args.index('--burst')
+        burst = int(args[idx + 1])
+        del args[idx:idx + 2]
+    counts = [int(arg) for arg in args] or [10000, 50000]
+
+    # Only measure the time spent in the client, not the pause between passes
+    sleep, time.sleep = time.sleep, lambda seconds: None
+    try:
+        run(counts, burst)
+    finally:
+        time.sleep = sleep
+
+
+if __name__ == '__main__':
+    main()
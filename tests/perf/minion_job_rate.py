@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+'''
+Compare the number of jobs per second a minion can start with and without
+the ``fork_server`` option.
+
+Each job runs ``test.ping`` in a new process, the same way the minion does:
+
+cold
+    The job process loads the execution modules from scratch, which is what
+    every job does on Windows.
+
+fork
+    The job process is forked from a process holding the lazy loader, like
+    a minion with ``fork_server: False``. Only the modules the job needs are
+    loaded in the job process.
+
+fork_server
+    The job process is forked from a ``salt.utils.process.ForkServer`` which
+    loaded all modules ahead of time, like a minion with ``fork_server: True``.
+
+Usage:
+
+    python tests/perf/minion_job_rate.py [number of jobs] [function]
+
+Requires a working minion configuration in /etc/salt/minion, or the path to
+one in the SALT_MINION_CONFIG environment variable. Not available on Windows.
+'''
+
+from __future__ import absolute_import, print_function
+import multiprocessing
+import os
+import sys
+import time
+
+import salt.config
+import salt.loader
+import salt.utils.process
+
+
+def run_job(functions, fun, results):
+    results.put(functions[fun]())
+    results.close()
+    results.join_thread()
+
+
+def cold(opts, fun, count):
+    results = multiprocessing.Queue()
+
+    def job():
+        run_job(salt.loader.minion_mods(opts), fun, results)
+
+    start = time.time()
+    for _ in range(count):
+        process = multiprocessing.Process(target=job)
+        process.start()
+        results.get()
+        process.join()
+    return time.time() - start
+
+
+def fork(opts, fun, count):
+    results = multiprocessing.Queue()
+    functions = salt.loader.minion_mods(opts)
+
+    start = time.time()
+    for _ in range(count):
+        process = multiprocessing.Process(target=run_job, args=(functions, fun, results))
+        process.start()
+        results.get()
+        process.join()
+    return time.time() - start
+
+
+def fork_server(opts, fun, count):
+    results = multiprocessing.Queue()
+    functions = salt.loader.minion_mods(opts)
+    server = salt.utils.process.ForkServer(
+        lambda: run_job(functions, fun, results),
+        warmup=lambda: len(functions))
+    # The warmup is paid once per module refresh, not per job
+    server.submit()
+    results.get()
+
+    start = time.time()
+    try:
+        for _ in range(count):
+            server.submit()
+            results.get()
+        return time.time() - start
+    finally:
+        server.stop()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    fun = sys.argv[2] if len(sys.argv) > 2 else 'test.ping'
+    opts = salt.config.minion_config(
+        os.environ.get('SALT_MINION_CONFIG', '/etc/salt/minion'))
+    opts['file_client'] = 'local'
+    opts['grains'] = salt.loader.grains(opts)
+
+    print('{0} jobs running {1}'.format(count, fun))
+    for name, func in (('cold', cold), ('fork', fork), ('fork_server', fork_server)):
+        duration = func(opts, fun, count)
+        print('{0:>12}: {1:8.1f} jobs/s'.format(name, count / duration))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+'''
+Compare the memory churn of a large encrypted ZeroMQ request with the
+single-frame and the multipart (``zmq_multipart``) payload formats.
+
+Both formats are sent over an inproc REQ/REP socket pair, encrypted and
+decrypted the same way the minion and the master do it. The peak of newly
+allocated memory, measured with tracemalloc, is reported per request as a
+multiple of the serialized load size.
+
+Usage:
+
+    python tests/perf/req_payload_copies.py [load size in MB]
+
+Requires Python 3, pyzmq, msgpack and pycryptodome.
+'''
+
+from __future__ import absolute_import, print_function
+import sys
+import time
+import tracemalloc
+
+import zmq
+
+import salt.crypt
+import salt.payload
+
+
+def make_load(size):
+    '''
+    A _return load with roughly ``size`` bytes of package data
+    '''
+    count = size // 40
+    return {'cmd': '_return',
+            'id': 'minion',
+            'fun': 'pkg.list_pkgs',
+            'return': dict(('package-name-{0:08d}'.format(num), '1.2.3-{0}'.format(num))
+                           for num in range(count))}
+
+
+def single_frame(req, rep, serial, crypticle, load):
+    req.send(serial.dumps({'enc': 'aes', 'load': crypticle.dumps(load)}))
+    payload = serial.loads(rep.recv())
+    return crypticle.loads(payload['load'])
+
+
+def multipart(req, rep, serial, crypticle, load):
+    req.send_multipart([serial.dumps({'enc': 'aes'})] + crypticle.dumps_parts(load), copy=False)
+    frames = rep.recv_multipart(copy=False)
+    serial.loads(frames[0].bytes)
+    return crypticle.loads([frame.buffer for frame in frames[1:]])
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.time()
+    ret = func(*args)
+    duration = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return ret, peak, duration
+
+
+def main():
+    size = int(float(sys.argv[1]) * 1024 * 1024) if len(sys.argv) > 1 else 8 * 1024 * 1024
+    serial = salt.payload.Serial({})
+    crypticle = salt.crypt.Crypticle({}, salt.crypt.Crypticle.generate_key_string())
+    load = make_load(size)
+    packed = len(serial.dumps(load))
+
+    context = zmq.Context()
+    rep = context.socket(zmq.REP)
+    rep.bind('inproc://bench')
+    req = context.socket(zmq.REQ)
+    req.connect('inproc://bench')
+
+    print('Serialized load: {0:.1f} MB'.format(packed / 1024.0 / 1024))
+    for name, func in (('single frame', single_frame), ('multipart', multipart)):
+        ret, peak, duration = measure(func, req, rep, serial, crypticle, load)
+        assert ret == load
+        # Complete the REQ/REP cycle
+        rep.send(b'')
+        req.recv()
+        print('{0:>12}: {1:6.1f} MB allocated ({2:.1f}x the load), {3:.3f}s'.format(
+            name, peak / 1024.0 / 1024, float(peak) / packed, duration))
+
+    req.close()
+    rep.close()
+    context.term()
+
+
+if __name__ == '__main__':
+    main()
@@ -50,7 +50,7 @@ class StatusBeaconTestCase(TestCase, LoaderModuleMockMixin):
         if sys.platform.startswith('win'):
             expected = []
         else:
-            expected = sorted(['loadavg', 'meminfo', 'cpustats', 'vmstats', 'time'])
+            expected = sorted(['loadavg', 'meminfo', 'cpustats', 'vmstats', 'time', 'jobs'])
 
         self.assertEqual(sorted(list(ret[0]['data'])), expected)
 
@@ -5,19 +5,25 @@ unit tests for the localfs cache
 
 # Import Python libs
 from __future__ import absolute_import
+import os
+import shutil
+import tempfile
 
 # Import Salt Testing libs
 # import integration
+from tests.support.paths import TMP
 from tests.support.unit import skipIf, TestCase
 from tests.support.mock import (
     NO_MOCK,
     NO_MOCK_REASON,
+    MagicMock,
     patch,
 )
 
 # Import Salt libs
 import salt.payload
 import salt.cache
+import salt.utils.cache
 
 
 class CacheFunctionsTest(TestCase):
@@ -41,6 +47,48 @@ class CacheFunctionsTest(TestCase):
         self.assertIsInstance(ret, salt.cache.MemCache)
 
 
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class CacheBulkTest(TestCase):
+    '''
+    Validate the bulk methods of the Cache class
+    '''
+    def setUp(self):
+        self.opts = {'cache': 'fake_driver',
+                     'memcache_expire_seconds': 0}
+
+    def test_fallback(self):
+        data = {('bank', 'key1'): 'data1', ('bank/sub', 'key2'): {}}
+        fetch = MagicMock(side_effect=lambda bank, key, **kwargs: data.get((bank, key), {}))
+        store = MagicMock()
+        modules = {'fake_driver.fetch': fetch,
+                   'fake_driver.store': store,
+                   'fake_driver.list': MagicMock(return_value=['key1', 'sub'])}
+        with patch('salt.loader.cache', return_value=modules):
+            cache = salt.cache.factory(self.opts)
+            self.assertEqual(cache.fetch_many([('bank', 'key1'), ('bank', 'key3')]),
+                             {('bank', 'key1'): 'data1', ('bank', 'key3'): {}})
+            # The sub-bank is left out
+            self.assertEqual(cache.list_with_data('bank'), {'key1': 'data1'})
+            cache.store_many({('bank', 'key1'): 'data2'})
+        store.assert_called_once_with('bank', 'key1', 'data2')
+
+    def test_driver(self):
+        fetch_many = MagicMock(return_value={('bank', 'key1'): 'data1'})
+        store_many = MagicMock()
+        fetch = MagicMock()
+        modules = {'fake_driver.fetch': fetch,
+                   'fake_driver.fetch_many': fetch_many,
+                   'fake_driver.store_many': store_many}
+        with patch('salt.loader.cache', return_value=modules):
+            cache = salt.cache.factory(self.opts)
+            self.assertEqual(cache.fetch_many(iter([('bank', 'key1')])),
+                             {('bank', 'key1'): 'data1'})
+            cache.store_many({('bank', 'key1'): 'data2'})
+        fetch_many.assert_called_once_with([('bank', 'key1')])
+        store_many.assert_called_once_with({('bank', 'key1'): 'data2'})
+        fetch.assert_not_called()
+
+
 @skipIf(NO_MOCK, NO_MOCK_REASON)
 class MemCacheTest(TestCase):
     '''
@@ -65,18 +113,19 @@ class MemCacheTest(TestCase):
         self.assertEqual(ret, 'fake_data')
         self.assertDictEqual(salt.cache.MemCache.data, {
             'fake_driver': {
-                ('bank', 'key'): [0, 'fake_data'],
+                ('bank', 'key'): [0, 'fake_data', None],
                 }})
         cache_fetch_mock.assert_called_once_with('bank', 'key')
         cache_fetch_mock.reset_mock()
 
-        # Fetch again, cached value is used, time updated.
+        # Fetch again, cached value is used, it expires from the time it
+        # was read.
         with patch('time.time', return_value=1):
             ret = self.cache.fetch('bank', 'key')
         self.assertEqual(ret, 'fake_data')
         self.assertDictEqual(salt.cache.MemCache.data, {
             'fake_driver': {
-                ('bank', 'key'): [1, 'fake_data'],
+                ('bank', 'key'): [0, 'fake_data', None],
                 }})
         cache_fetch_mock.assert_not_called()
 
@@ -86,11 +135,33 @@ class MemCacheTest(TestCase):
         self.assertEqual(ret, 'fake_data')
         self.assertDictEqual(salt.cache.MemCache.data, {
             'fake_driver': {
-                ('bank', 'key'): [12, 'fake_data'],
+                ('bank', 'key'): [12, 'fake_data', None],
                 }})
         cache_fetch_mock.assert_called_once_with('bank', 'key')
         cache_fetch_mock.reset_mock()
 
+    @patch('salt.cache.Cache.fetch_many')
+    @patch('salt.loader.cache', return_value={})
+    def test_fetch_many(self, loader_mock, cache_fetch_many_mock):
+        cache_fetch_many_mock.side_effect = lambda bank_keys: dict(
+            (bank_key, 'data_' + bank_key[1]) for bank_key in bank_keys)
+        with patch('time.time', return_value=0):
+            self.cache.fetch_many([('bank', 'key1')])
+        with patch('time.time', return_value=5):
+            self.cache.fetch_many([('bank', 'key2'), ('bank', 'key1')])
+        cache_fetch_many_mock.assert_called_with([('bank', 'key2')])
+        cache_fetch_many_mock.reset_mock()
+
+        # Only the expired and unknown keys are fetched
+        with patch('time.time', return_value=12):
+            ret = self.cache.fetch_many([('bank', 'key1'), ('bank', 'key2'), ('bank', 'key3')])
+        self.assertEqual(ret, {('bank', 'key1'): 'data_key1',
+                               ('bank', 'key2'): 'data_key2',
+                               ('bank', 'key3'): 'data_key3'})
+        cache_fetch_many_mock.assert_called_once_with([('bank', 'key1'), ('bank', 'key3')])
+        self.assertEqual(list(salt.cache.MemCache.data['fake_driver']),
+                         [('bank', 'key2'), ('bank', 'key1'), ('bank', 'key3')])
+
     @patch('salt.cache.Cache.store')
     @patch('salt.loader.cache', return_value={})
     def test_store(self, loader_mock, cache_store_mock):
@@ -99,7 +170,7 @@ class MemCacheTest(TestCase):
             self.cache.store('bank', 'key', 'fake_data')
         self.assertDictEqual(salt.cache.MemCache.data, {
             'fake_driver': {
-                ('bank', 'key'): [0, 'fake_data'],
+                ('bank', 'key'): [0, 'fake_data', None],
                 }})
         cache_store_mock.assert_called_once_with('bank', 'key', 'fake_data')
         cache_store_mock.reset_mock()
@@ -109,8 +180,8 @@ class MemCacheTest(TestCase):
             self.cache.store('bank', 'key2', 'fake_data2')
         self.assertDictEqual(salt.cache.MemCache.data, {
             'fake_driver': {
-                ('bank', 'key'): [0, 'fake_data'],
-                ('bank', 'key2'): [1, 'fake_data2'],
+                ('bank', 'key'): [0, 'fake_data', None],
+                ('bank', 'key2'): [1, 'fake_data2', None],
                 }})
         cache_store_mock.assert_called_once_with('bank', 'key2', 'fake_data2')
 
@@ -132,10 +203,10 @@ class MemCacheTest(TestCase):
         with patch('time.time', return_value=0):
             self.cache.store('bank', 'key', 'fake_data')
         self.assertEqual(salt.cache.MemCache.data['fake_driver'][('bank', 'key')],
-                         [0, 'fake_data'])
+                         [0, 'fake_data', None])
         self.assertDictEqual(salt.cache.MemCache.data, {
             'fake_driver': {
-                ('bank', 'key'): [0, 'fake_data'],
+                ('bank', 'key'): [0, 'fake_data', None],
                 }})
         self.cache.flush('bank', 'key')
         self.assertDictEqual(salt.cache.MemCache.data, {'fake_driver': {}})
@@ -153,18 +224,19 @@ class MemCacheTest(TestCase):
         with patch('time.time', return_value=2):
             self.cache.store('bank2', 'key1', 'fake_data21')
         self.assertDictEqual(salt.cache.MemCache.data['fake_driver'], {
-            ('bank1', 'key1'): [0, 'fake_data11'],
-            ('bank1', 'key2'): [1, 'fake_data12'],
-            ('bank2', 'key1'): [2, 'fake_data21'],
+            ('bank1', 'key1'): [0, 'fake_data11', None],
+            ('bank1', 'key2'): [1, 'fake_data12', None],
+            ('bank2', 'key1'): [2, 'fake_data21', None],
             })
         # Put one more and check the oldest was removed
         with patch('time.time', return_value=3):
             self.cache.store('bank2', 'key2', 'fake_data22')
         self.assertDictEqual(salt.cache.MemCache.data['fake_driver'], {
-            ('bank1', 'key2'): [1, 'fake_data12'],
-            ('bank2', 'key1'): [2, 'fake_data21'],
-            ('bank2', 'key2'): [3, 'fake_data22'],
+            ('bank1', 'key2'): [1, 'fake_data12', None],
+            ('bank2', 'key1'): [2, 'fake_data21', None],
+            ('bank2', 'key2'): [3, 'fake_data22', None],
             })
+        self.assertEqual(self.cache.get_stats()['evicted'], 1)
 
     @patch('salt.cache.Cache.store')
     @patch('salt.loader.cache', return_value={})
@@ -179,16 +251,16 @@ class MemCacheTest(TestCase):
         with patch('time.time', return_value=2):
             self.cache.store('bank2', 'key1', 'fake_data21')
         self.assertDictEqual(salt.cache.MemCache.data['fake_driver'], {
-            ('bank1', 'key1'): [0, 'fake_data11'],
-            ('bank1', 'key2'): [1, 'fake_data12'],
-            ('bank2', 'key1'): [2, 'fake_data21'],
+            ('bank1', 'key1'): [0, 'fake_data11', None],
+            ('bank1', 'key2'): [1, 'fake_data12', None],
+            ('bank2', 'key1'): [2, 'fake_data21', None],
             })
         # Put one more and check all expired was removed
         with patch('time.time', return_value=12):
             self.cache.store('bank2', 'key2', 'fake_data22')
         self.assertDictEqual(salt.cache.MemCache.data['fake_driver'], {
-            ('bank2', 'key1'): [2, 'fake_data21'],
-            ('bank2', 'key2'): [12, 'fake_data22'],
+            ('bank2', 'key1'): [2, 'fake_data21', None],
+            ('bank2', 'key2'): [12, 'fake_data22', None],
             })
 
     @patch('salt.cache.Cache.fetch', return_value='fake_data')
@@ -215,5 +287,43 @@ class MemCacheTest(TestCase):
             ret = self.cache.fetch('bank', 'key2')
 
         # Check debug data
-        self.assertEqual(self.cache.call, 6)
-        self.assertEqual(self.cache.hit, 3)
+        self.assertEqual(self.cache.get_stats(),
+                         {'hit': 3, 'miss': 3, 'expired': 1,
+                          'invalidated': 0, 'evicted': 0})
+
+    @patch('salt.cache.Cache.flush')
+    @patch('salt.cache.Cache.store')
+    @patch('salt.cache.Cache.fetch', return_value='fake_data')
+    @patch('salt.loader.cache', return_value={})
+    def test_shared(self, loader_mock, cache_fetch_mock, cache_store_mock, cache_flush_mock):
+        tmp_dir = tempfile.mkdtemp(dir=TMP)
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        self.opts['memcache_shared'] = True
+        self.cache = salt.cache.factory(self.opts, cachedir=tmp_dir)
+        # The table of another process
+        gens = salt.utils.cache.CacheGenerations(
+            os.path.join(tmp_dir, '.memcache_generations'))
+        self.addCleanup(gens.close)
+
+        self.cache.fetch('bank', 'key')
+        self.cache.fetch('bank', 'key')
+        self.assertEqual(cache_fetch_mock.call_count, 1)
+        # Another process stored the key
+        gens.bump('bank', 'key')
+        self.cache.fetch('bank', 'key')
+        self.assertEqual(cache_fetch_mock.call_count, 2)
+        # Another process flushed the bank
+        gens.bump('bank')
+        self.cache.fetch('bank', 'key')
+        self.assertEqual(cache_fetch_mock.call_count, 3)
+        self.assertEqual(self.cache.get_stats()['invalidated'], 2)
+
+        # The stored value is read again
+        self.cache.store('bank', 'key', 'new_data')
+        self.assertNotIn(('bank', 'key'), salt.cache.MemCache.data['fake_driver'])
+        self.cache.fetch('bank', 'key')
+        self.assertEqual(cache_fetch_mock.call_count, 4)
+        version = gens.version('bank', 'key')
+        self.cache.flush('bank')
+        self.assertGreater(gens.version('bank', 'key'), version)
+        self.assertEqual(salt.cache.MemCache.data['fake_driver'], {})
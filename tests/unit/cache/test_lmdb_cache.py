@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+'''
+unit tests for the lmdb cache
+'''
+
+# Import Python libs
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+
+# Import Salt Testing libs
+from tests.support.mixins import LoaderModuleMockMixin
+from tests.support.paths import TMP
+from tests.support.unit import skipIf, TestCase
+from tests.support.mock import (
+    NO_MOCK,
+    NO_MOCK_REASON,
+    patch
+)
+
+# Import Salt libs
+import salt.payload
+import salt.cache.lmdb_cache as lmdb_cache
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+@skipIf(not lmdb_cache.HAS_LMDB, 'lmdb is not installed')
+class LMDBCacheTest(TestCase, LoaderModuleMockMixin):
+    '''
+    Validate the functions in the lmdb cache
+    '''
+
+    def setup_loader_modules(self):
+        return {lmdb_cache: {'__context__': {'serial': salt.payload.Serial('msgpack')}}}
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(dir=TMP)
+        self.path = os.path.join(self.tmp_dir, 'lmdb')
+
+    def tearDown(self):
+        for env in lmdb_cache._ENVS.values():
+            env.close()
+        lmdb_cache._ENVS.clear()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        del self.tmp_dir
+        del self.path
+
+    def test_store_fetch(self):
+        with patch('time.time', return_value=1500000000.5):
+            lmdb_cache.store('minions/web1', 'data', {'grains': {'os': 'Debian'}}, self.path)
+        self.assertEqual(lmdb_cache.fetch('minions/web1', 'data', self.path),
+                         {'grains': {'os': 'Debian'}})
+        self.assertEqual(lmdb_cache.fetch('minions/web1', 'mine', self.path), {})
+        self.assertEqual(lmdb_cache.updated('minions/web1', 'data', self.path), 1500000000)
+        self.assertIsNone(lmdb_cache.updated('minions/web1', 'mine', self.path))
+        self.assertTrue(lmdb_cache.contains('minions/web1', 'data', self.path))
+        self.assertFalse(lmdb_cache.contains('minions/web1', 'mine', self.path))
+        self.assertTrue(lmdb_cache.contains('minions', None, self.path))
+        self.assertFalse(lmdb_cache.contains('minions/web2', None, self.path))
+
+    def test_many(self):
+        data = {('minions/web1', 'data'): 'web1',
+                ('minions/web2', 'data'): 'web2',
+                ('minions/web2/mine', 'ip_addr'): 'ip'}
+        lmdb_cache.store_many(data, self.path)
+        data[('minions/web3', 'data')] = {}
+        self.assertEqual(lmdb_cache.fetch_many(list(data), self.path), data)
+        self.assertEqual(lmdb_cache.list_with_data('minions/web2', self.path),
+                         {'data': 'web2'})
+
+    def test_list_flush(self):
+        lmdb_cache.store_many(dict(((bank, key), key) for bank, key in (
+            ('minions', 'key'),
+            ('minions/a', 'data'),
+            ('minions/a/mine', 'ip_addr'),
+            ('minions/a.b', 'data'),
+            ('minions/ab', 'data'),
+            ('minions/a', 'mine'),
+            ('other', 'key'))), self.path)
+        self.assertEqual(sorted(lmdb_cache.list_('minions', self.path)),
+                         ['a', 'a.b', 'ab', 'key'])
+        self.assertEqual(sorted(lmdb_cache.list_('minions/a', self.path)),
+                         ['data', 'mine', 'mine'])
+        self.assertEqual(sorted(lmdb_cache.list_('', self.path)), ['minions', 'other'])
+
+        self.assertTrue(lmdb_cache.flush('minions/a', 'mine', self.path))
+        self.assertFalse(lmdb_cache.flush('minions/a', 'mine', self.path))
+        self.assertTrue(lmdb_cache.flush('minions/a', path=self.path))
+        self.assertFalse(lmdb_cache.flush('minions/a', path=self.path))
+        self.assertEqual(sorted(lmdb_cache.list_('minions', self.path)),
+                         ['a.b', 'ab', 'key'])
+        self.assertEqual(lmdb_cache.fetch('other', 'key', self.path), 'key')
+
+    def test_map_full(self):
+        with patch.dict(lmdb_cache.__opts__, {'cache.lmdb.map_size': 64 * 1024}):
+            for idx in range(20):
+                lmdb_cache.store('bank', 'key{0}'.format(idx), 'x' * 10000, self.path)
+        self.assertEqual(len(lmdb_cache.list_('bank', self.path)), 20)
@@ -242,6 +242,44 @@ class LocalFSTest(TestCase, LoaderModuleMockMixin):
         with patch.dict(localfs.__opts__, {'cachedir': tmp_dir}):
             self.assertEqual(localfs.list_(bank='bank', cachedir=tmp_dir), ['key'])
 
+    # 'fetch_many' function tests: 1
+
+    def test_fetch_many(self):
+        '''
+        Tests that fetch_many returns the data of the keys, read in parallel
+        when there are many keys, and empty dicts for the missing keys.
+        '''
+        tmp_dir = tempfile.mkdtemp(dir=TMP)
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        serializer = salt.payload.Serial(self)
+        bank_keys = [('bank', 'key{0}'.format(idx)) for idx in range(localfs.PARALLEL_MIN_KEYS)]
+        with patch.dict(localfs.__context__, {'serial': serializer}):
+            for bank, key in bank_keys:
+                localfs.store(bank=bank, key=key, data=key, cachedir=tmp_dir)
+            bank_keys.append(('bank', 'missing'))
+            ret = localfs.fetch_many(bank_keys, cachedir=tmp_dir)
+            self.assertEqual(len(ret), localfs.PARALLEL_MIN_KEYS + 1)
+            self.assertEqual(ret[('bank', 'key3')], 'key3')
+            self.assertEqual(ret[('bank', 'missing')], {})
+            self.assertEqual(localfs.fetch_many(bank_keys[:2], cachedir=tmp_dir),
+                             {('bank', 'key0'): 'key0', ('bank', 'key1'): 'key1'})
+
+    # 'list_with_data' function tests: 1
+
+    def test_list_with_data(self):
+        '''
+        Tests that list_with_data returns the data of the keys of a bank
+        without its sub-banks.
+        '''
+        tmp_dir = tempfile.mkdtemp(dir=TMP)
+        serializer = salt.payload.Serial(self)
+        self._create_tmp_cache_file(tmp_dir, serializer)
+        with patch.dict(localfs.__context__, {'serial': serializer}):
+            localfs.store(bank='bank/sub', key='key', data='sub data', cachedir=tmp_dir)
+            self.assertEqual(localfs.list_with_data(bank='bank', cachedir=tmp_dir),
+                             {'key': 'payload data'})
+            self.assertEqual(localfs.list_with_data(bank='nobank', cachedir=tmp_dir), {})
+
     # 'contains' function tests: 1
 
     def test_contains(self):
@@ -65,3 +65,107 @@ class BatchTestCase(TestCase):
         '''
         ret = Batch.get_bnum(self.batch)
         self.assertEqual(ret, None)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class StreamingBatchTestCase(TestCase):
+    '''
+    Unit Tests for the sliding window batch runs of salt.cli.batch
+    '''
+
+    def setUp(self):
+        self.opts = {'batch': '2',
+                     'batch_stream': True,
+                     'minion_data_cache': True,
+                     'conf_file': {},
+                     'tgt': '*',
+                     'fun': 'test.ping',
+                     'arg': [],
+                     'transport': '',
+                     'timeout': 5,
+                     'gather_job_timeout': 5}
+        self.events = []
+        self.in_flight = set()
+        self.max_in_flight = 0
+        self.local = MagicMock()
+        self.local.run_job.side_effect = self._run_job
+        self.local.event.get_event.side_effect = self._get_event
+
+    def _run_job(self, minions, fun, *args, **kwargs):
+        jid = str(self.local.run_job.call_count)
+        self.in_flight.update(minions)
+        self.max_in_flight = max(self.max_in_flight, len(self.in_flight))
+        for minion in minions:
+            self.events.append({'tag': 'salt/job/{0}/ret/{1}'.format(jid, minion),
+                                'data': {'id': minion, 'jid': jid, 'return': True, 'retcode': 0}})
+        return {'jid': jid, 'minions': minions}
+
+    def _get_event(self, *args, **kwargs):
+        if self.events:
+            event = self.events.pop(0)
+            self.in_flight.discard(event['data']['id'])
+            return event
+        return None
+
+    def _batch(self, targeted, connected):
+        ckminions = MagicMock()
+        ckminions.check_minions.return_value = {'minions': targeted, 'missing': []}
+        ckminions.connected_ids.return_value = set(connected)
+        with patch('salt.client.get_local_client', MagicMock(return_value=self.local)), \
+                patch('salt.utils.minions.CkMinions', MagicMock(return_value=ckminions)):
+            return Batch(self.opts, quiet=True)
+
+    def test_connected_minions(self):
+        '''
+        Tests that the minions are taken from the minion data cache
+        '''
+        batch = self._batch(['foo', 'bar', 'baz'], ['foo', 'bar'])
+        self.assertEqual(batch.minions, ['foo', 'bar'])
+        self.assertEqual(batch.down_minions, set(['baz']))
+        self.local.cmd_iter.assert_not_called()
+
+    def test_batch_stream_string(self):
+        '''
+        Tests that batch_stream passed as a string is parsed as a boolean
+        '''
+        self.opts['batch_stream'] = 'False'
+        batch = self._batch(['foo', 'bar'], ['foo', 'bar'])
+        self.assertFalse(batch.stream)
+        self.local.cmd_iter.assert_called_once()
+
+    def test_sliding_window(self):
+        '''
+        Tests that every minion returns and the window is never exceeded
+        '''
+        minions = ['minion{0}'.format(num) for num in range(7)]
+        batch = self._batch(minions, minions)
+        ret = {}
+        for part in batch.run():
+            ret.update(part)
+        self.assertEqual(ret, dict((minion, True) for minion in minions))
+        self.assertEqual(self.max_in_flight, 2)
+
+    def test_timeout(self):
+        '''
+        Tests that a minion which does not return is checked with find_job
+        and then reported with an empty return
+        '''
+        self.opts['timeout'] = 0
+        self.opts['gather_job_timeout'] = 0
+        self.local.run_job.side_effect = lambda *args, **kwargs: {'jid': '1', 'minions': ['foo']}
+        self.local.gather_job_info.return_value = {'jid': '2', 'minions': ['foo']}
+        batch = self._batch(['foo'], ['foo'])
+        with patch('salt.utils.minions.running_jobs', MagicMock(return_value={})):
+            self.assertEqual(list(batch.run()), [{'foo': {}}])
+        self.local.gather_job_info.assert_called_once_with(
+            '1', ['foo'], 'list', gather_job_timeout=0)
+
+    def test_adaptive_batch_size(self):
+        '''
+        Tests that the batch grows while the returns are fast enough
+        '''
+        self.opts['batch_max_latency'] = 60
+        minions = ['minion{0}'.format(num) for num in range(20)]
+        batch = self._batch(minions, minions)
+        self.assertEqual(len(list(batch.run())), 20)
+        self.assertGreater(self.max_in_flight, 2)
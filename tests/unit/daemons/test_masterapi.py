@@ -9,6 +9,7 @@ import stat
 # Import Salt libs
 import salt.config
 import salt.daemons.masterapi as masterapi
+import salt.utils.mine
 
 # Import Salt Testing Libs
 from tests.support.unit import TestCase, skipIf
@@ -529,6 +530,21 @@ class FakeCache(object):
     def fetch(self, bank, key):
         return self.data[bank, key]
 
+    def fetch_many(self, bank_keys):
+        return dict((bank_key, self.data.get(bank_key, {})) for bank_key in bank_keys)
+
+    def list(self, bank):
+        return [key for _bank, key in self.data if _bank == bank]
+
+    def list_with_data(self, bank):
+        return dict((key, value) for (_bank, key), value in self.data.items()
+                    if _bank == bank)
+
+    def flush(self, bank, key=None):
+        for bank_key in list(self.data):
+            if bank_key[0] == bank and key in (None, bank_key[1]):
+                del self.data[bank_key]
+
 
 class RemoteFuncsTestCase(TestCase):
     '''
@@ -549,8 +565,8 @@ class RemoteFuncsTestCase(TestCase):
         - the correct check minions method is called
         - the correct cache key is subsequently used
         '''
-        self.funcs.cache.store('minions/webserver', 'mine',
-                               dict(ip_addr='2001:db8::1:3'))
+        self.funcs.cache.store('minions/webserver/mine', 'ip_addr',
+                               '2001:db8::1:3')
         with patch('salt.utils.minions.CkMinions._check_compound_minions',
                    MagicMock(return_value=(dict(
                        minions=['webserver'],
@@ -572,3 +588,50 @@ class RemoteFuncsTestCase(TestCase):
         This is what minions before Nitrogen would issue.
         '''
         self.test_mine_get(tgt_type_key='expr_form')
+
+    def test_mine(self):
+        '''
+        Asserts that every mine function is stored on its own, and that the
+        mine data kept in memory is dropped when the minion sends new data
+        '''
+        self.funcs.opts['mine_cache_ttl'] = 60
+        self.addCleanup(salt.utils.mine._CACHE.clear)
+        self.funcs._mine({'id': 'webserver',
+                          'data': {'ip_addr': '2001:db8::1:3', 'cmd/run': 'foo'}})
+        self.assertEqual(self.funcs.cache.data,
+                         {('minions/webserver/mine', 'ip_addr'): '2001:db8::1:3',
+                          ('minions/webserver/mine', 'cmd%2Frun'): 'foo'})
+        self.assertEqual(salt.utils.mine.get_all(self.funcs.opts, 'webserver',
+                                                 self.funcs.cache),
+                         {'ip_addr': '2001:db8::1:3', 'cmd/run': 'foo'})
+
+        self.funcs._mine({'id': 'webserver', 'data': {'ip_addr': '2001:db8::1:4'}})
+        self.assertEqual(self.funcs.cache.data[('minions/webserver/mine', 'cmd%2Frun')],
+                         'foo')
+        self.assertEqual(salt.utils.mine.get(self.funcs.opts, ['webserver'],
+                                             'ip_addr', self.funcs.cache),
+                         {'webserver': '2001:db8::1:4'})
+
+        self.funcs._mine({'id': 'webserver', 'data': {'ip_addr': '2001:db8::1:5'},
+                          'clear': True})
+        self.assertEqual(self.funcs.cache.data,
+                         {('minions/webserver/mine', 'ip_addr'): '2001:db8::1:5'})
+        self.funcs._mine_delete({'id': 'webserver', 'fun': 'ip_addr'})
+        self.assertEqual(salt.utils.mine.get(self.funcs.opts, ['webserver'],
+                                             'ip_addr', self.funcs.cache),
+                         {})
+
+    def test_mine_migrate(self):
+        '''
+        Asserts that the mine data of older masters is converted
+        '''
+        self.funcs.cache.store('minions/webserver', 'mine',
+                               {'ip_addr': '2001:db8::1:3', 'cmd.run': 'foo'})
+        self.funcs.cache.store('minions/webserver/mine', 'ip_addr', '2001:db8::1:4')
+        self.funcs.cache.contains = lambda bank, key: (bank, key) in self.funcs.cache.data
+        with patch.object(self.funcs.cache, 'list',
+                          MagicMock(side_effect=[['webserver'], ['ip_addr']])):
+            self.assertEqual(salt.utils.mine.migrate(self.funcs.opts, self.funcs.cache), 1)
+        self.assertEqual(self.funcs.cache.data,
+                         {('minions/webserver/mine', 'ip_addr'): '2001:db8::1:4',
+                          ('minions/webserver/mine', 'cmd.run'): 'foo'})
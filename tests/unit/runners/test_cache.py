@@ -48,3 +48,44 @@ class CacheTest(TestCase, LoaderModuleMockMixin):
 
         with patch.object(salt.utils.master, 'MasterPillarUtil', MockMaster):
             self.assertEqual(cache.grains(), mock_data)
+
+    def test_migrate(self):
+        '''
+        test cache.migrate runner
+        '''
+        stores = {'localfs': {('minions/web1', 'data'): 'grains',
+                              ('minions/web1', 'mine'): 'legacy',
+                              ('minions/web1/mine', 'ip_addr'): 'ip',
+                              ('minions/web2', 'data'): 'grains2',
+                              ('other', 'key'): 'other'},
+                  'lmdb': {}}
+
+        class MockCache(object):
+            def __init__(self, opts, cachedir=None):
+                self.data = stores[opts['cache']]
+
+            def list_with_data(self, bank):
+                return dict((key, value) for (bank_, key), value in self.data.items()
+                            if bank_ == bank)
+
+            def list(self, bank):
+                prefix = bank + '/'
+                return [key for bank_, key in self.data if bank_ == bank] + \
+                    [bank_[len(prefix):].split('/')[0] for bank_, _ in self.data
+                     if bank_.startswith(prefix)]
+
+            def contains(self, bank, key=None):
+                return any(bank_ == bank or bank_.startswith(bank + '/')
+                           for bank_, _ in self.data)
+
+            def store_many(self, data):
+                self.data.update(data)
+
+        with patch('salt.cache.Cache', MockCache), \
+                patch.dict(cache.__opts__, {'cachedir': TMP}):
+            self.assertEqual(cache.migrate(target='lmdb', batch=2),
+                             {'banks': 4, 'keys': 4})
+            self.assertRaises(cache.SaltInvocationError,
+                              cache.migrate, target='localfs')
+        stores['localfs'].pop(('other', 'key'))
+        self.assertEqual(stores['lmdb'], stores['localfs'])
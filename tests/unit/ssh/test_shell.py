@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+'''
+Tests for salt.client.ssh.shell
+'''
+
+# Import python libs
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+
+# Import Salt Testing libs
+from tests.support.unit import TestCase, skipIf
+from tests.support.mock import MagicMock, NO_MOCK, NO_MOCK_REASON, patch
+from tests.support.paths import TMP
+
+# Import Salt libs
+import salt.client.ssh.shell as shell
+
+
+class SSHShellMultiplexTests(TestCase):
+    '''
+    Test the options multiplexing the ssh connections
+    '''
+    def setUp(self):
+        if not os.path.isdir(TMP):
+            os.makedirs(TMP)
+        self.cachedir = tempfile.mkdtemp(dir=TMP)
+        self.opts = {'cachedir': self.cachedir,
+                     '_ssh_version': (7, 4),
+                     'ssh_multiplex': True,
+                     'ssh_control_persist': 120}
+
+    def tearDown(self):
+        shutil.rmtree(self.cachedir, ignore_errors=True)
+        del self.cachedir
+        del self.opts
+
+    def _shell(self, **kwargs):
+        kwargs.setdefault('priv', '/etc/salt/pki/master/ssh/salt-ssh.rsa')
+        return shell.Shell(self.opts, 'host1', user='root', port='22',
+                           timeout=65, **kwargs)
+
+    def test_control_opts(self):
+        control_dir = os.path.join(self.cachedir, 'ssh_control')
+        cmd = self._shell()._cmd_str('true')
+        self.assertIn('-o ControlMaster=auto ', cmd)
+        self.assertIn('-o ControlPath={0} '.format(os.path.join(control_dir, '%C')), cmd)
+        self.assertIn('-o ControlPersist=120 ', cmd)
+        self.assertTrue(os.path.isdir(control_dir))
+        # scp shares the connection
+        self.assertIn('ControlPath=', self._shell()._cmd_str('a host1:b', ssh='scp'))
+
+    def test_control_opts_passwd(self):
+        cmd = self._shell(priv=None, passwd='abc123')._cmd_str('true')
+        self.assertEqual(cmd.count('ControlMaster=auto'), 1)
+        self.assertIn('ControlPath=', cmd)
+
+    def test_control_opts_old_ssh(self):
+        self.opts['_ssh_version'] = (6, 6)
+        self.assertIn('%r@%h:%p', self._shell()._cmd_str('true'))
+        self.opts['_ssh_version'] = (5, 3)
+        self.assertNotIn('ControlPath', self._shell()._cmd_str('true'))
+
+    def test_disabled(self):
+        self.opts['ssh_multiplex'] = False
+        self.assertNotIn('ControlPath', self._shell()._cmd_str('true'))
+        # The password options keep ControlMaster for users setting a
+        # ControlPath in their ssh config
+        cmd = self._shell(priv=None, passwd='abc123')._cmd_str('true')
+        self.assertIn('ControlMaster=auto', cmd)
+        self.assertNotIn('ControlPath', cmd)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class SSHShellRunCmdTests(TestCase):
+    '''
+    Test reading the output of the ssh commands
+    '''
+    def test_exited_with_buffered_output(self):
+        '''
+        The output ssh wrote right before exiting is read after an empty read
+        '''
+        term = MagicMock(has_unread_data=True, exitstatus=0)
+        term.recv.side_effect = [('', ''), ('{"local": true}', ''), ('', 'bye'), ('', '')]
+        term.isalive.return_value = False
+        sshell = shell.Shell({}, 'host1')
+        with patch('salt.utils.vt.Terminal', MagicMock(return_value=term)):
+            self.assertEqual(sshell._run_cmd('ssh host1 true'),
+                             ('{"local": true}', 'bye', 0))
+        self.assertEqual(term.recv.call_count, 4)
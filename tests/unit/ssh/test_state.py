@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+'''
+Tests for the state packages salt-ssh sends to the targets
+'''
+
+# Import python libs
+from __future__ import absolute_import
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+from contextlib import closing
+
+# Import Salt Testing libs
+from tests.support.mixins import LoaderModuleMockMixin
+from tests.support.unit import TestCase, skipIf
+from tests.support.mock import NO_MOCK, NO_MOCK_REASON, patch
+from tests.support.paths import TMP
+
+# Import Salt libs
+import salt.client.ssh.state
+import salt.exceptions
+import salt.modules.state
+import salt.utils.files
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class StatePkgDeltaTests(TestCase, LoaderModuleMockMixin):
+    '''
+    Test the state packages only holding the files changed since the last run
+    '''
+    def setup_loader_modules(self):
+        return {salt.modules.state: {'__opts__': {}}}
+
+    def setUp(self):
+        if not os.path.isdir(TMP):
+            os.makedirs(TMP)
+        self.tmpdir = tempfile.mkdtemp(dir=TMP)
+        self.opts = {'cachedir': os.path.join(self.tmpdir, 'master'),
+                     'thin_dir': '/var/tmp/.root_abc_salt'}
+        self.files = {'lowstate.json': b'[{"state": "file"}]',
+                      'base/web/init.sls': b'nginx: pkg.installed',
+                      'base/web/nginx.conf': b'worker_processes 4;'}
+        self.trans_tar = self._tar(self.files)
+        patcher = patch.dict(salt.modules.state.__opts__,
+                             {'cachedir': os.path.join(self.tmpdir, 'target')})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+        del self.tmpdir
+        del self.opts
+        del self.files
+        del self.trans_tar
+
+    def _tar(self, files):
+        path = salt.utils.files.mkstemp(dir=self.tmpdir)
+        with closing(tarfile.open(path, 'w:gz')) as tfp:
+            for name, data in files.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tfp.addfile(info, io.BytesIO(data))
+        return path
+
+    def _send(self, delta):
+        '''
+        Strip the package and unpack it like state.pkg does, return the names
+        in the stripped package, the unpacked files and the missing objects
+        '''
+        pkg_tar = delta.strip(self.trans_tar)
+        with closing(tarfile.open(pkg_tar, 'r:gz')) as tfp:
+            names = set(tfp.getnames())
+            root = tempfile.mkdtemp(dir=self.tmpdir)
+            tfp.extractall(root)
+        missing = salt.modules.state._unpack_state_objects(root)
+        unpacked = {}
+        for name in self.files:
+            path = os.path.join(root, name)
+            if os.path.isfile(path):
+                with salt.utils.files.fopen(path, 'rb') as fp_:
+                    unpacked[name] = fp_.read()
+        return names, unpacked, missing
+
+    def test_delta(self):
+        delta = salt.client.ssh.state.StatePkgDelta(self.opts, 'web1')
+        names, unpacked, missing = self._send(delta)
+        self.assertEqual(names, set(self.files).union(['manifest.json']))
+        self.assertEqual(unpacked, self.files)
+        self.assertEqual(missing, [])
+        delta.delivered()
+
+        # The next run only sends the manifest and the lowstate
+        delta = salt.client.ssh.state.StatePkgDelta(self.opts, 'web1')
+        names, unpacked, missing = self._send(delta)
+        self.assertEqual(names, set(['manifest.json', 'lowstate.json']))
+        self.assertEqual(unpacked, self.files)
+        self.assertEqual(missing, [])
+
+        # Changed files are sent
+        self.files['base/web/nginx.conf'] = b'worker_processes 8;'
+        self.trans_tar = self._tar(self.files)
+        names, unpacked, missing = self._send(delta)
+        self.assertEqual(names, set(['manifest.json', 'lowstate.json', 'base/web/nginx.conf']))
+        self.assertEqual(unpacked, self.files)
+
+    def test_missing_objects(self):
+        delta = salt.client.ssh.state.StatePkgDelta(self.opts, 'web1')
+        self._send(delta)
+        delta.delivered()
+        shutil.rmtree(os.path.join(self.tmpdir, 'target', 'state_objects'))
+
+        names, unpacked, missing = self._send(delta)
+        self.assertEqual(len(missing), 2)
+        # A full package after a reset
+        delta.reset()
+        names, unpacked, missing = self._send(delta)
+        self.assertEqual(unpacked, self.files)
+        self.assertEqual(missing, [])
+
+    def test_private_files(self):
+        '''
+        The pillar, grains and lowstate are sent every time and never left in
+        the object cache of the target
+        '''
+        self.files['pillar.json'] = b'{"db_password": "secret"}'
+        self.files['roster_grains.json'] = b'{"os": "Debian"}'
+        self.trans_tar = self._tar(self.files)
+        delta = salt.client.ssh.state.StatePkgDelta(self.opts, 'web1')
+        self._send(delta)
+        self.assertEqual(sorted(delta.manifest), ['base/web/init.sls', 'base/web/nginx.conf'])
+        delta.delivered()
+        names, unpacked, missing = self._send(delta)
+        self.assertEqual(names, set(['manifest.json', 'lowstate.json', 'pillar.json', 'roster_grains.json']))
+        self.assertEqual(unpacked, self.files)
+
+        objdir = os.path.join(self.tmpdir, 'target', 'state_objects')
+        self.assertEqual(len(os.listdir(objdir)), 2)
+        for name in os.listdir(objdir):
+            with salt.utils.files.fopen(os.path.join(objdir, name), 'rb') as fp_:
+                self.assertNotIn(b'secret', fp_.read())
+
+    def test_new_thin_dir(self):
+        delta = salt.client.ssh.state.StatePkgDelta(self.opts, 'web1')
+        self._send(delta)
+        delta.delivered()
+        self.opts['thin_dir'] = '/tmp/.root_abc_salt'
+        delta = salt.client.ssh.state.StatePkgDelta(self.opts, 'web1')
+        self.assertEqual(delta.objects, {})
+        self.assertEqual(len(self._send(delta)[0]), 4)
+
+    def test_bad_manifest(self):
+        path = self._tar({'manifest.json': json.dumps({'../../etc/passwd': 'abc'}).encode()})
+        root = tempfile.mkdtemp(dir=self.tmpdir)
+        with closing(tarfile.open(path, 'r:gz')) as tfp:
+            tfp.extractall(root)
+        self.assertRaises(salt.exceptions.CommandExecutionError,
+                          salt.modules.state._unpack_state_objects,
+                          root)
+
+    def test_delta_enabled(self):
+        self.assertTrue(salt.client.ssh.state.delta_enabled({}))
+        self.assertFalse(salt.client.ssh.state.delta_enabled({'ssh_wipe': True}))
+        self.assertFalse(salt.client.ssh.state.delta_enabled({'ssh_state_delta': False}))
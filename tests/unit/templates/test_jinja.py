@@ -541,6 +541,45 @@ class TestJinjaDefaultOptions(TestCase):
                                      dict(opts=self.local_opts, saltenv='test', salt=self.local_salt))
         self.assertEqual(rendered, u'onetwothree')
 
+    def test_template_cache(self):
+        template = '{{ data.id }} {{ tag }}'
+        opts = dict(self.local_opts, _jinja_template_cache=True)
+        with patch('salt.utils.templates._JINJA_TEMPLATES', OrderedDict()) as cache:
+            rendered = render_jinja_tmpl(template,
+                                         dict(opts=opts, saltenv='test', tag='a', data={'id': 'web1'}))
+            self.assertEqual(rendered, u'web1 a')
+            self.assertEqual(len(cache), 1)
+            with patch('jinja2.Environment.from_string') as from_string:
+                rendered = render_jinja_tmpl(template,
+                                             dict(opts=opts, saltenv='test', tag='b', data={'id': 'web2'}))
+                self.assertFalse(from_string.called)
+            self.assertEqual(rendered, u'web2 b')
+            # Not cached without the option
+            render_jinja_tmpl(template + ' ',
+                              dict(opts=self.local_opts, saltenv='test', tag='a', data={'id': 'web1'}))
+            self.assertEqual(len(cache), 1)
+
+    def test_template_cache_context(self):
+        template = "{{ extra | default('none') }}"
+        opts = dict(self.local_opts, _jinja_template_cache=True)
+        with patch('salt.utils.templates._JINJA_TEMPLATES', OrderedDict()):
+            rendered = render_jinja_tmpl(template, dict(opts=opts, saltenv='test', extra='a'))
+            self.assertEqual(rendered, u'a')
+            rendered = render_jinja_tmpl(template, dict(opts=opts, saltenv='test'))
+            self.assertEqual(rendered, u'none')
+
+    def test_template_cache_include(self):
+        template = "{% include 'hello_import' %}"
+        opts = dict(self.local_opts, _jinja_template_cache=True)
+        with patch('salt.utils.templates._JINJA_TEMPLATES', OrderedDict()), \
+                patch.object(SaltCacheLoader, 'cache_file') as cache_file:
+            for _ in range(2):
+                rendered = render_jinja_tmpl(template, dict(opts=opts, saltenv='test'))
+                self.assertEqual(rendered, u'Hey world !a b !')
+        # The included files are fetched again on every render
+        self.assertEqual([call[0][0] for call in cache_file.call_args_list],
+                         ['hello_import', 'macro'] * 2)
+
 
 class TestCustomExtensions(TestCase):
 
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+'''
+unit tests for the beacon system
+'''
+
+# Import Python libs
+from __future__ import absolute_import
+from collections import OrderedDict
+
+# Import Salt Testing libs
+from tests.support.unit import skipIf, TestCase
+from tests.support.mock import NO_MOCK, NO_MOCK_REASON, patch, MagicMock
+
+# Import Salt libs
+import salt.beacons
+
+
+def _beacon(config):
+    return [{'tag': 'changed', 'config': config}]
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class BeaconTestCase(TestCase):
+    '''
+    Unit tests for salt.beacons.Beacon
+    '''
+
+    def setUp(self):
+        with patch('salt.loader.beacons', MagicMock(return_value={'test.beacon': _beacon})):
+            self.beacon = salt.beacons.Beacon({'id': 'minion', 'loop_interval': 1}, {})
+
+    def test_process(self):
+        '''
+        Tests that the events of a beacon are tagged with the minion id and the beacon
+        '''
+        self.assertEqual(self.beacon.process({'test': [{'key': 'value'}]}, {}),
+                         [{'tag': 'salt/beacon/minion/test/changed',
+                           'data': {'config': [{'key': 'value'}], 'id': 'minion'}}])
+        self.assertEqual(self.beacon.running, {})
+
+    def test_interval(self):
+        '''
+        Tests that a beacon with an interval runs on the loop closest to the end of its interval
+        '''
+        config = {'test': [{'key': 'value'}, {'interval': 10}]}
+        for now, expected in ((1000, 0), (1009.4, 0), (1009.5, 1), (1015, 0), (1019.5, 1)):
+            with patch('time.time', MagicMock(return_value=now)):
+                self.assertEqual(len(self.beacon.process(config, {})), expected)
+
+    def test_running(self):
+        '''
+        Tests that a beacon left running by a worker thread is skipped until it returns
+        '''
+        self.beacon.running['test'] = 1000
+        self.assertEqual(self.beacon.process({'test': [{'key': 'value'}]}, {}), [])
+        del self.beacon.running['test']
+        self.assertEqual(len(self.beacon.process({'test': [{'key': 'value'}]}, {})), 1)
+
+    def test_abandoned(self):
+        '''
+        Tests that a run left behind by the minion stops once its current beacon returns
+        '''
+        def _stuck(config):
+            self.beacon.abandon()
+            return []
+
+        self.beacon.beacons['stuck.beacon'] = _stuck
+        config = OrderedDict([('stuck', [{'key': 'value'}]), ('test', [{'key': 'value'}])])
+        self.assertEqual(self.beacon.process(config, {}, self.beacon.generation), [])
+        self.assertEqual(self.beacon.running, {})
+        self.assertEqual(len(self.beacon.process({'test': [{'key': 'value'}]}, {},
+                                                 self.beacon.generation)), 1)
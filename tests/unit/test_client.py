@@ -83,3 +83,46 @@ class LocalClientTestCase(TestCase,
                 self.assertRaises(SaltInvocationError,
                                   self.client.pub,
                                   'non_existent_group', 'test.ping', tgt_type='nodegroup')
+
+
+class ReturnTrackerTestCase(TestCase):
+    '''
+    Test the return bookkeeping of get_iter_returns
+    '''
+    def test_returned(self):
+        minions = set(['m1', 'm2'])
+        tracker = client.ReturnTracker(minions, 5)
+        tracker.returned('m1')
+        self.assertFalse(tracker.all_returned())
+        # A minion which was not targeted does not count
+        tracker.returned('m3')
+        self.assertFalse(tracker.all_returned())
+        tracker.returned('m2')
+        self.assertTrue(tracker.all_returned())
+        self.assertEqual(tracker.found, set(['m1', 'm2', 'm3']))
+
+    def test_add(self):
+        minions = set(['m1'])
+        tracker = client.ReturnTracker(minions, 5)
+        tracker.returned('m1')
+        tracker.add(['m1', 'm2'])
+        # The set of the caller is updated in place
+        self.assertEqual(minions, set(['m1', 'm2']))
+        self.assertEqual(tracker.remaining, set(['m2']))
+        tracker.remove('m2')
+        self.assertTrue(tracker.all_returned())
+        self.assertEqual(minions, set(['m1']))
+
+    def test_timed_out(self):
+        tracker = client.ReturnTracker(set(), 5)
+        tracker.add(['m1', 'm2'], now=100)
+        self.assertFalse(tracker.timed_out(104))
+        self.assertTrue(tracker.timed_out(105))
+        # A running minion extends its timeout
+        tracker.set_timeout('m2', 110)
+        self.assertFalse(tracker.timed_out(105))
+        # Only the minions which did not return count
+        tracker.returned('m2')
+        self.assertTrue(tracker.timed_out(105))
+        tracker.returned('m1')
+        self.assertTrue(tracker.timed_out(0))
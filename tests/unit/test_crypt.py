@@ -132,3 +132,35 @@ class CryptTestCase(TestCase):
     def test_verify_signature(self):
         with patch('salt.utils.files.fopen', mock_open(read_data=PUBKEY_DATA)):
             self.assertTrue(crypt.verify_signature('/keydir/keyname.pub', MSG, SIG))
+
+
+@skipIf(not HAS_PYCRYPTO_RSA, 'pycrypto >= 2.6 is not available')
+class CrypticleTestCase(TestCase):
+
+    def setUp(self):
+        self.crypticle = crypt.Crypticle({}, crypt.Crypticle.generate_key_string())
+
+    def test_encrypt_parts(self):
+        parts = self.crypticle.encrypt_parts(b'foo', b'bar' * 100)
+        self.assertEqual(len(parts), 3)
+        self.assertEqual(len(parts[0]), crypt.Crypticle.AES_BLOCK_SIZE)
+        self.assertEqual(len(parts[2]), crypt.Crypticle.SIG_SIZE)
+        # The joined parts are a regular encrypted message
+        self.assertEqual(self.crypticle.decrypt(b''.join(parts)), b'foo' + b'bar' * 100)
+
+    def test_decrypt_parts(self):
+        parts = [memoryview(part) for part in self.crypticle.encrypt_parts(MSG)]
+        self.assertEqual(memoryview(self.crypticle.decrypt_parts(parts)).tobytes(), MSG)
+        # A message split differently is still accepted
+        data = self.crypticle.encrypt(MSG)
+        self.assertEqual(memoryview(self.crypticle.decrypt_parts([data[:5], data[5:]])).tobytes(), MSG)
+
+    def test_decrypt_parts_bad_sig(self):
+        parts = self.crypticle.encrypt_parts(MSG)
+        parts[2] = b'\0' * crypt.Crypticle.SIG_SIZE
+        self.assertRaises(crypt.AuthenticationError, self.crypticle.decrypt_parts, parts)
+
+    def test_dumps_parts_roundtrip(self):
+        load = {'cmd': '_return', 'return': {'pkg{0}'.format(num): '1.0' for num in range(1000)}}
+        self.assertEqual(self.crypticle.loads(self.crypticle.dumps_parts(load)), load)
+        self.assertEqual(self.crypticle.loads(b''.join(self.crypticle.dumps_parts(load))), load)
@@ -6,6 +6,7 @@ from __future__ import absolute_import
 # Import Salt libs
 import salt.config
 import salt.master
+from salt.ext import six
 
 # Import Salt Testing Libs
 from tests.support.unit import TestCase
@@ -313,3 +314,35 @@ class ClearFuncsTestCase(TestCase):
                 patch('salt.utils.master.get_values_of_matching_keys', MagicMock(return_value=['test'])), \
                 patch('salt.utils.minions.CkMinions.auth_check', MagicMock(return_value=False)):
             self.assertEqual(u'', self.clear_funcs.publish(load))
+
+
+class AESFuncsTestCase(TestCase):
+    '''
+    TestCase for salt.master.AESFuncs class
+    '''
+
+    def test_minion_event_batch(self):
+        '''
+        Test that every event load of a batch is fired and handled on its own
+        '''
+        aes_funcs = MagicMock()
+        aes_funcs._AESFuncs__verify_load = lambda load, keys: load
+        events = [{'tag': 'salt/beacon/minion/ps/', 'data': {}},
+                  {'tag': 'salt/beacon/minion/load/', 'data': {}}]
+        load = {'id': 'minion',
+                'cmd': '_minion_event',
+                'pretag': None,
+                'batch': [{'data': {'comment': 'done'}, 'tag': 'salt/state/progress', 'pretag': None},
+                          {'events': events, 'pretag': None}]}
+        six.get_unbound_function(salt.master.AESFuncs._minion_event)(aes_funcs, load)
+        self.assertEqual(aes_funcs.masterapi._minion_event.call_count, 2)
+        self.assertEqual(aes_funcs.masterapi._minion_event.call_args_list[0][0][0],
+                         {'id': 'minion',
+                          'cmd': '_minion_event',
+                          'data': {'comment': 'done'},
+                          'tag': 'salt/state/progress',
+                          'pretag': None})
+        self.assertEqual(aes_funcs._handle_minion_event.call_args[0][0],
+                         {'id': 'minion', 'cmd': '_minion_event', 'events': events, 'pretag': None})
+        self.assertEqual(salt.master.MWorker._count_events(load), 3)
+        self.assertEqual(salt.master.MWorker._count_events({'tag': 'salt/state/progress', 'data': {}}), 1)
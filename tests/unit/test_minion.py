@@ -7,6 +7,7 @@
 from __future__ import absolute_import
 import copy
 import os
+import time
 
 # Import Salt Testing libs
 from tests.support.unit import TestCase, skipIf
@@ -136,13 +137,13 @@ class MinionTestCase(TestCase):
     def test_process_count_max(self):
         '''
         Tests that the _handle_decoded_payload function does not spawn more than the configured amount of processes,
-        as per process_count_max.
+        as per process_count_max, and queues the remaining jobs until a process finishes.
         '''
         with patch('salt.minion.Minion.ctx', MagicMock(return_value={})), \
                 patch('salt.utils.process.SignalHandlingMultiprocessingProcess.start', MagicMock(return_value=True)), \
                 patch('salt.utils.process.SignalHandlingMultiprocessingProcess.join', MagicMock(return_value=True)), \
                 patch('salt.utils.minion.running', MagicMock(return_value=[])), \
-                patch('tornado.gen.sleep', MagicMock(return_value=tornado.concurrent.Future())):
+                patch('salt.utils.minion.JobQueue.dump', MagicMock()):
             process_count_max = 10
             mock_opts = salt.config.DEFAULT_MINION_OPTS
             mock_opts['minion_jid_queue_hwm'] = 100
@@ -152,29 +153,180 @@ class MinionTestCase(TestCase):
                 io_loop = tornado.ioloop.IOLoop()
                 minion = salt.minion.Minion(mock_opts, jid_queue=[], io_loop=io_loop)
 
-                # mock gen.sleep to throw a special Exception when called, so that we detect it
-                class SleepCalledEception(Exception):
-                    """Thrown when sleep is called"""
-                    pass
-                tornado.gen.sleep.return_value.set_exception(SleepCalledEception())
-
-                # up until process_count_max: gen.sleep does not get called, processes are started normally
+                # up until process_count_max: processes are started normally
                 for i in range(process_count_max):
                     mock_data = {'fun': 'foo.bar',
                                  'jid': i}
                     io_loop.run_sync(lambda data=mock_data: minion._handle_decoded_payload(data))
                     self.assertEqual(salt.utils.process.SignalHandlingMultiprocessingProcess.start.call_count, i + 1)
                     self.assertEqual(len(minion.jid_queue), i + 1)
-                    salt.utils.minion.running.return_value += [i]
+                    salt.utils.minion.running.return_value += [mock_data]
 
-                # above process_count_max: gen.sleep does get called, JIDs are created but no new processes are started
+                # above process_count_max: JIDs are created but the job is queued
                 mock_data = {'fun': 'foo.bar',
                              'jid': process_count_max + 1}
-
-                self.assertRaises(SleepCalledEception,
-                                  lambda: io_loop.run_sync(lambda: minion._handle_decoded_payload(mock_data)))
+                io_loop.run_sync(lambda: minion._handle_decoded_payload(mock_data))
                 self.assertEqual(salt.utils.process.SignalHandlingMultiprocessingProcess.start.call_count,
                                  process_count_max)
                 self.assertEqual(len(minion.jid_queue), process_count_max + 1)
+                self.assertEqual(list(minion.job_queue.queue), [mock_data])
+                self.assertIsNotNone(minion._job_queue_handle)
+
+                # find_job is never held back
+                io_loop.run_sync(lambda: minion._handle_decoded_payload({'fun': 'saltutil.find_job',
+                                                                         'jid': process_count_max + 2}))
+                self.assertEqual(salt.utils.process.SignalHandlingMultiprocessingProcess.start.call_count,
+                                 process_count_max + 1)
+
+                # once a job finishes the queued job is started
+                salt.utils.minion.running.return_value.pop(0)
+                minion._process_job_queue()
+                self.assertEqual(salt.utils.process.SignalHandlingMultiprocessingProcess.start.call_count,
+                                 process_count_max + 2)
+                self.assertEqual(len(minion.job_queue), 0)
+                self.assertIsNone(minion._job_queue_handle)
+            finally:
+                minion.destroy()
+
+    @skipIf(salt.utils.platform.is_windows(), 'Windows does not support fork')
+    def test_fork_server(self):
+        '''
+        Tests that jobs are handed to the fork server when fork_server is enabled, and that the fork server
+        is stopped when the modules are reloaded.
+        '''
+        with patch('salt.minion.Minion.ctx', MagicMock(return_value={})), \
+                patch('salt.utils.process.SignalHandlingMultiprocessingProcess.start', MagicMock(return_value=True)), \
+                patch('salt.utils.process.ForkServer.submit', MagicMock(return_value=True)), \
+                patch('salt.utils.process.ForkServer.stop', MagicMock()):
+            mock_opts = copy.deepcopy(salt.config.DEFAULT_MINION_OPTS)
+            mock_opts['process_count_max'] = -1
+            mock_opts['fork_server'] = True
+            mock_data = {'fun': 'foo.bar',
+                         'jid': 123}
+            try:
+                minion = salt.minion.Minion(mock_opts, jid_queue=[], io_loop=tornado.ioloop.IOLoop())
+                minion._handle_decoded_payload(mock_data).result()
+                salt.utils.process.ForkServer.submit.assert_called_once_with(mock_data, minion.connected)
+                self.assertEqual(salt.utils.process.SignalHandlingMultiprocessingProcess.start.call_count, 0)
+
+                with patch('salt.loader.grains', MagicMock(return_value={})), \
+                        patch('salt.loader.utils', MagicMock()), \
+                        patch('salt.loader.minion_mods', MagicMock()), \
+                        patch('salt.loader.returners', MagicMock()), \
+                        patch('salt.loader.executors', MagicMock()):
+                    minion._load_modules()
+                self.assertTrue(salt.utils.process.ForkServer.stop.called)
+            finally:
+                minion.destroy()
+
+    def test_job_heartbeat(self):
+        '''
+        Tests that the job heartbeat reports running and queued jobs, once more after the last job is done,
+        and nothing while the minion is idle.
+        '''
+        running = [{'jid': '20171020112600123456', 'fun': 'state.apply', 'pid': 1234}]
+        with patch('salt.utils.minion.running', MagicMock(return_value=running)), \
+                patch('salt.minion.Minion._fire_master', MagicMock()):
+            mock_opts = copy.deepcopy(salt.config.DEFAULT_MINION_OPTS)
+            mock_opts['id'] = 'minion'
+            try:
+                minion = salt.minion.Minion(mock_opts, jid_queue=[], io_loop=tornado.ioloop.IOLoop())
+                minion.connected = True
+                minion.job_queue.queue.append({'jid': '20171020112600654321', 'fun': 'test.ping'})
+                minion._job_heartbeat()
+                events = salt.minion.Minion._fire_master.call_args[1]['events']
+                self.assertEqual(events[0]['tag'], 'salt/minion/minion/jobs')
+                self.assertEqual(events[0]['data']['interval'], mock_opts['job_heartbeat_interval'])
+                self.assertEqual(events[0]['data']['jobs'],
+                                 {'20171020112600123456': {'fun': 'state.apply', 'pid': 1234, 'state': 'running'},
+                                  '20171020112600654321': {'fun': 'test.ping', 'pid': None, 'state': 'queued'}})
+                self.assertEqual(sorted(event['tag'] for event in events[1:]),
+                                 ['salt/job/20171020112600123456/heartbeat/minion',
+                                  'salt/job/20171020112600654321/heartbeat/minion'])
+
+                del running[:]
+                minion.job_queue.queue.clear()
+                minion._job_heartbeat()
+                self.assertEqual(salt.minion.Minion._fire_master.call_count, 2)
+                events = salt.minion.Minion._fire_master.call_args[1]['events']
+                self.assertEqual(len(events), 1)
+                self.assertEqual(events[0]['data']['jobs'], {})
+
+                minion._job_heartbeat()
+                self.assertEqual(salt.minion.Minion._fire_master.call_count, 2)
+            finally:
+                minion.destroy()
+
+    def test_beacons_async(self):
+        '''
+        Tests that the beacons run in a worker thread, that their events are fired in batches, and that a
+        worker running past beacons_timeout is left behind.
+        '''
+        event = {'tag': 'salt/beacon/minion/ps/', 'data': {'id': 'minion'}}
+        with patch('salt.minion.Minion._fire_master', MagicMock()):
+            mock_opts = copy.deepcopy(salt.config.DEFAULT_MINION_OPTS)
+            mock_opts['beacons_batch_interval'] = 5
+            try:
+                minion = salt.minion.Minion(mock_opts, jid_queue=[], io_loop=tornado.ioloop.IOLoop())
+                minion.connected = True
+                minion.functions = {'config.merge': MagicMock(return_value={'ps': [{'salt-master': 'running'}]})}
+                minion.beacons = MagicMock(running={})
+                minion.beacons.process.return_value = [event]
+                with patch.object(minion.io_loop, 'add_callback', side_effect=lambda cb, *args: cb(*args)):
+                    for _ in range(2):
+                        minion._handle_beacons()
+                        worker = minion._beacons_worker
+                        if worker is not None:
+                            worker.join()
+                self.assertEqual(minion.beacons.process.call_count, 2)
+                self.assertIsNone(minion._beacons_worker)
+                self.assertFalse(salt.minion.Minion._fire_master.called)
+                minion._flush_beacon_events()
+                salt.minion.Minion._fire_master.assert_called_once_with(
+                    data=None, tag=None, events=[event, event], pretag=None, sync=False)
+
+                minion._beacons_worker = MagicMock()
+                minion._beacons_started = time.time()
+                minion._handle_beacons()
+                self.assertEqual(minion.beacons.process.call_count, 2)
+                minion._beacons_started = time.time() - mock_opts['beacons_timeout']
+                with patch('threading.Thread.start', MagicMock()) as start:
+                    minion._handle_beacons()
+                self.assertTrue(start.called)
+                minion.beacons.abandon.assert_called_once_with()
+            finally:
+                minion.destroy()
+
+    def test_fire_master_batch(self):
+        '''
+        Tests that the events are queued and sent in a single request once fire_master_batch_size events
+        are queued.
+        '''
+        with patch('salt.minion.Minion._fire_master', MagicMock()):
+            mock_opts = copy.deepcopy(salt.config.DEFAULT_MINION_OPTS)
+            mock_opts['fire_master_batch_size'] = 3
+            try:
+                minion = salt.minion.Minion(mock_opts, jid_queue=[], io_loop=tornado.ioloop.IOLoop())
+                minion.connected = True
+                events = [{'tag': 'salt/beacon/minion/ps/', 'data': {}},
+                          {'tag': 'salt/beacon/minion/load/', 'data': {}}]
+                with patch.object(minion.io_loop, 'call_later', MagicMock(return_value='handle')), \
+                        patch.object(minion.io_loop, 'remove_timeout', MagicMock()):
+                    minion._batch_fire_master({'comment': 'done'}, 'salt/state/progress')
+                    self.assertFalse(salt.minion.Minion._fire_master.called)
+                    self.assertEqual(minion.io_loop.call_later.call_args[0][0],
+                                     mock_opts['fire_master_batch_interval'])
+                    minion._batch_fire_master(events=events, pretag='minion', sync=False)
+                    minion.io_loop.remove_timeout.assert_called_once_with('handle')
+                salt.minion.Minion._fire_master.assert_called_once_with(
+                    batch=[{'data': {'comment': 'done'}, 'tag': 'salt/state/progress', 'pretag': None},
+                           {'events': events, 'pretag': 'minion'}],
+                    sync=False)
+                self.assertEqual(minion._event_batch, [])
+
+                minion.opts['fire_master_batch_size'] = 0
+                minion._batch_fire_master({'comment': 'done'}, 'salt/state/progress')
+                salt.minion.Minion._fire_master.assert_called_with(
+                    data={'comment': 'done'}, tag='salt/state/progress', events=None, pretag=None, sync=True)
             finally:
                 minion.destroy()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+'''
+Tests for salt.utils.bloom
+'''
+
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+
+# Import Salt Testing libs
+from tests.support.unit import TestCase
+
+# Import Salt libs
+import salt.utils.bloom
+
+
+class BloomTestCase(TestCase):
+    '''
+    Test the minion id Bloom filter
+    '''
+    def test_no_false_negatives(self):
+        ids = ['minion{0}'.format(num) for num in range(2000)]
+        data = salt.utils.bloom.build(ids)
+        for id_ in ids:
+            self.assertTrue(salt.utils.bloom.check(data, id_))
+
+    def test_false_positive_rate(self):
+        data = salt.utils.bloom.build(['minion{0}'.format(num) for num in range(2000)], 0.01)
+        positives = sum(1 for num in range(10000)
+                        if salt.utils.bloom.check(data, 'other{0}'.format(num)))
+        self.assertTrue(positives < 300)
+
+    def test_contains(self):
+        bfilter = salt.utils.bloom.BloomFilter(10)
+        bfilter.add('web1')
+        self.assertIn('web1', bfilter)
+        self.assertNotIn('db1', bfilter)
+        # The lazy check agrees with the in-memory filter
+        data = bfilter.to_dict()
+        self.assertTrue(salt.utils.bloom.check(data, 'web1'))
+        self.assertFalse(salt.utils.bloom.check(data, 'db1'))
+
+    def test_empty(self):
+        data = salt.utils.bloom.build([])
+        self.assertFalse(salt.utils.bloom.check(data, 'web1'))
@@ -93,3 +93,39 @@ class CacheContextTestCase(TestCase):
 
         self.assertEqual(cache_test_func()['called'], 0)
         self.assertEqual(cache_test_func()['called'], 1)
+
+
+class CacheGenerationsTestCase(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'gens')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_bump(self):
+        '''
+        Make sure the changes of a key or of its banks are seen through
+        another mapping of the table
+        '''
+        gens = cache.CacheGenerations(self.path, slots=1024)
+        other = cache.CacheGenerations(self.path, slots=1024)
+        self.addCleanup(gens.close)
+        self.addCleanup(other.close)
+        self.assertEqual(os.path.getsize(self.path), 1024 * cache.CacheGenerations.SLOT_SIZE)
+
+        version = other.version('minions/web1', 'data')
+        gens.bump('minions/web1', 'data')
+        self.assertNotEqual(other.version('minions/web1', 'data'), version)
+
+        version = other.version('minions/web1/mine', 'ip_addr')
+        unrelated = other.version('minions/web2', 'data')
+        gens.bump('minions/web1')
+        self.assertGreater(other.version('minions/web1/mine', 'ip_addr'), version)
+        self.assertEqual(other.version('minions/web2', 'data'), unrelated)
+
+        version = other.version('minions/web1/mine', 'ip_addr')
+        gens.bump('minions')
+        self.assertGreater(other.version('minions/web1/mine', 'ip_addr'), version)
+        self.assertGreater(other.version('minions/web2', 'data'), unrelated)
@@ -23,6 +23,7 @@ from multiprocessing import Process
 
 # Import Salt Testing libs
 from tests.support.unit import expectedFailure, skipIf, TestCase
+from tests.support.mock import patch
 
 # Import salt libs
 import salt.utils.event
@@ -226,6 +227,17 @@ class TestSaltEvent(TestCase):
             evt1 = me.get_event(tag='^ev', match_type='regex')
             self.assertGotEvent(evt1, {'data': 'foo1'})
 
+    def test_event_matching_callable(self):
+        '''Test a match with a function, skipping the other events'''
+        with eventpublisher_process():
+            me = salt.utils.event.MasterEvent(SOCK_DIR, listen=True)
+            me.fire_event({'data': 'foo1'}, 'evt1')
+            me.fire_event({'data': 'foo2'}, 'evt2')
+            with patch.object(me, 'unpack', wraps=me.unpack) as unpack:
+                evt2 = me.get_event(match_type=lambda event_tag, tag: event_tag == 'evt2')
+                self.assertEqual(unpack.call_count, 1)
+            self.assertGotEvent(evt2, {'data': 'foo2'})
+
     def test_event_matching_all(self):
         '''Test an all match'''
         with eventpublisher_process():
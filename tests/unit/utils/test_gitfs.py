@@ -1,15 +1,23 @@
 # -*- coding: utf-8 -*-
 '''
-These only test the provider selection and verification logic, they do not init
-any remotes.
+These only test the provider selection and verification logic, the tree
+listing of the pygit2 provider and the fetch logic, they do not init any
+remotes.
 '''
 
 # Import python libs
 from __future__ import absolute_import
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
 
 # Import Salt Testing libs
 from tests.support.unit import skipIf, TestCase
 from tests.support.mock import MagicMock, patch, NO_MOCK, NO_MOCK_REASON
+from tests.support.paths import TMP
 
 # Import salt libs
 import salt.utils.gitfs
@@ -90,3 +98,235 @@ class TestGitFSProvider(TestCase):
                                 role_class,
                                 *args,
                                 **kwargs)
+
+
+class _Entry(object):
+    def __init__(self, name, oid, filemode):
+        self.name = name
+        self.oid = oid
+        self.filemode = filemode
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class TestPygit2ListTree(TestCase):
+    '''
+    Test the tree listing used with gitfs_object_store
+    '''
+    def setUp(self):
+        self.objects = {
+            'root1': [_Entry('top.sls', 'blob1', 0o100644),
+                      _Entry('shared', 'tree1', 0o040000),
+                      _Entry('submodule', 'commit1', 0o160000)],
+            'root2': [_Entry('link', 'link1', 0o120000),
+                      _Entry('shared', 'tree1', 0o040000)],
+            'tree1': [_Entry('init.sls', 'blob2', 0o100644)],
+            'link1': MagicMock(data='top.sls'),
+        }
+        self.reads = []
+
+        def _getitem(oid):
+            self.reads.append(oid)
+            return self.objects[oid]
+
+        self.provider = salt.utils.gitfs.Pygit2.__new__(salt.utils.gitfs.Pygit2)
+        self.provider._trees = {}
+        self.provider.repo = MagicMock()
+        self.provider.repo.__getitem__.side_effect = _getitem
+        self.provider.root = lambda tgt_env: ''
+        self.provider.mountpoint = lambda tgt_env: ''
+        self.provider.get_tree = lambda tgt_env: MagicMock(oid=tgt_env)
+
+    def test_list_tree(self):
+        files, symlinks, dirs = self.provider.list_tree('root1')
+        self.assertEqual(files, set(['top.sls', 'shared/init.sls']))
+        self.assertEqual(symlinks, {})
+        self.assertEqual(dirs, set(['shared']))
+
+        files, symlinks, dirs = self.provider.list_tree('root2')
+        self.assertEqual(files, set(['link', 'shared/init.sls']))
+        self.assertEqual(symlinks, {'link': 'top.sls'})
+        self.assertEqual(dirs, set(['shared']))
+        # The subtree shared by both refs was only read once
+        self.assertEqual(self.reads.count('tree1'), 1)
+
+    def test_list_tree_mountpoint(self):
+        self.provider.mountpoint = lambda tgt_env: 'mnt'
+        files, symlinks, dirs = self.provider.list_tree('root1')
+        self.assertEqual(files, set(['mnt/top.sls', 'mnt/shared/init.sls']))
+        self.assertEqual(dirs, set(['mnt', 'mnt/shared']))
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class TestRefsUnchanged(TestCase):
+    '''
+    Test the comparison of the advertised refs with the local refs
+    '''
+    def setUp(self):
+        self.provider = salt.utils.gitfs.GitProvider.__new__(
+            salt.utils.gitfs.GitProvider)
+        self.provider.role = 'gitfs'
+        self.provider.id = 'https://example.com/repo.git'
+        self.provider.refspecs = ['+refs/heads/*:refs/remotes/origin/*',
+                                  '+refs/tags/*:refs/tags/*']
+        self.advertised = {'HEAD': 'aaa',
+                           'refs/heads/master': 'aaa',
+                           'refs/heads/dev': 'bbb',
+                           'refs/tags/v1': 'ccc',
+                           'refs/tags/v1^{}': 'aaa',
+                           'refs/pull/1/head': 'ddd'}
+        self.local = {'refs/heads/master': 'fff',
+                      'refs/remotes/origin/HEAD': 'aaa',
+                      'refs/remotes/origin/master': 'aaa',
+                      'refs/remotes/origin/dev': 'bbb',
+                      'refs/tags/v1': 'ccc'}
+        self.provider._remote_refs = lambda: self.advertised
+        self.provider._local_refs = lambda: self.local
+
+    def test_unchanged(self):
+        self.assertTrue(self.provider.refs_unchanged())
+
+    def test_moved(self):
+        self.advertised['refs/heads/dev'] = 'eee'
+        self.assertFalse(self.provider.refs_unchanged())
+
+    def test_new_ref(self):
+        self.advertised['refs/tags/v2'] = 'eee'
+        self.assertFalse(self.provider.refs_unchanged())
+
+    def test_stale_ref(self):
+        self.local['refs/remotes/origin/old'] = 'eee'
+        self.assertFalse(self.provider.refs_unchanged())
+
+    def test_unavailable(self):
+        self.provider._remote_refs = lambda: None
+        self.assertFalse(self.provider.refs_unchanged())
+        self.provider._remote_refs = MagicMock(side_effect=Exception('failed'))
+        self.assertFalse(self.provider.refs_unchanged())
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class TestFetchRemotes(TestCase):
+    '''
+    Test fetching the remotes concurrently
+    '''
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+        def _fetch(changed):
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            time.sleep(0.1)
+            with self.lock:
+                self.active -= 1
+            return changed
+
+        self.gitfs = salt.utils.gitfs.GitBase.__new__(salt.utils.gitfs.GitBase)
+        self.gitfs.role = 'gitfs'
+        self.gitfs.remotes = [
+            MagicMock(id='repo{0}'.format(num),
+                      fetch=MagicMock(side_effect=lambda num=num: _fetch(num == 2)))
+            for num in range(4)
+        ]
+
+    def test_concurrency(self):
+        self.gitfs.opts = {'gitfs_fetch_concurrency': 2}
+        self.assertTrue(self.gitfs.fetch_remotes())
+        self.assertEqual(self.max_active, 2)
+        self.assertEqual(sorted(self.gitfs.fetch_times),
+                         ['repo0', 'repo1', 'repo2', 'repo3'])
+        for repo in self.gitfs.remotes:
+            repo.fetch.assert_called_once_with()
+
+    def test_sequential(self):
+        self.gitfs.opts = {'gitfs_fetch_concurrency': 1}
+        self.gitfs.remotes[2].fetch.side_effect = Exception('failed')
+        self.assertFalse(self.gitfs.fetch_remotes())
+        self.assertEqual(self.max_active, 1)
+        self.assertEqual(len(self.gitfs.fetch_times), 4)
+
+
+class TestPushTargets(TestCase):
+    '''
+    Test reading the remotes and refs from push events
+    '''
+    def test_direct(self):
+        self.assertEqual(
+            salt.utils.gitfs.push_targets({'remote': 'https://example.com/*',
+                                           'refs': 'master'}),
+            (['https://example.com/*'], ['master']))
+        self.assertEqual(salt.utils.gitfs.push_targets({}), (None, None))
+
+    def test_webhook(self):
+        body = {'ref': 'refs/heads/dev',
+                'repository': {'clone_url': 'https://example.com/states.git',
+                               'ssh_url': 'git@example.com:states.git',
+                               'name': 'states'}}
+        remotes, refs = salt.utils.gitfs.push_targets(
+            {'headers': {}, 'body': json.dumps(body)})
+        self.assertEqual(remotes, ['https://example.com/states.git',
+                                   'git@example.com:states.git'])
+        self.assertEqual(refs, ['refs/heads/dev'])
+
+    def test_webhook_not_json(self):
+        self.assertEqual(
+            salt.utils.gitfs.push_targets({'headers': {}, 'body': 'foo=bar'}),
+            (None, None))
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class TestPushUpdate(TestCase):
+    '''
+    Test the parts of updating single remotes after a push
+    '''
+    def setUp(self):
+        if not os.path.isdir(TMP):
+            os.makedirs(TMP)
+        self.gitfs = salt.utils.gitfs.GitBase.__new__(salt.utils.gitfs.GitBase)
+        self.gitfs.file_list_cachedir = tempfile.mkdtemp(dir=TMP)
+        self.gitfs.remotes = [
+            MagicMock(url='https://example.com/states.git', id='states'),
+            MagicMock(url='git@example.com:formulas/apache.git', id='apache'),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.gitfs.file_list_cachedir, ignore_errors=True)
+
+    def test_match_remotes(self):
+        self.assertEqual(self.gitfs.match_remotes(),
+                         self.gitfs.remotes)
+        self.assertEqual(
+            self.gitfs.match_remotes(['https://example.com/states.git']),
+            self.gitfs.remotes[:1])
+        self.assertEqual(
+            self.gitfs.match_remotes('foo,*/apache.git'),
+            self.gitfs.remotes[1:])
+        self.assertEqual(self.gitfs.match_remotes('apache'),
+                         self.gitfs.remotes[1:])
+
+    def test_saltenvs_for_refs(self):
+        provider = salt.utils.gitfs.GitProvider.__new__(
+            salt.utils.gitfs.GitProvider)
+        provider.base = 'master'
+        provider.saltenv_revmap = {'prod_branch': ['prod']}
+        provider.ref_types = ['branch', 'tag', 'sha']
+        self.assertEqual(
+            provider.saltenvs_for_refs(['refs/heads/master',
+                                        'refs/heads/prod_branch',
+                                        'refs/tags/v1']),
+            set(['base', 'prod', 'v1']))
+        self.assertEqual(provider.saltenvs_for_refs(['dev']), set(['dev']))
+        provider.all_saltenvs = 'master'
+        self.assertIsNone(provider.saltenvs_for_refs(['dev']))
+
+    def test_clear_file_list_cache(self):
+        for saltenv in ('base', 'dev', 'prod'):
+            with open(os.path.join(self.gitfs.file_list_cachedir,
+                                   saltenv + '.p'), 'w'):
+                pass
+        self.gitfs.clear_file_list_cache(['base', 'dev', 'missing'])
+        self.assertEqual(os.listdir(self.gitfs.file_list_cachedir), ['prod.p'])
+        self.gitfs.clear_file_list_cache()
+        self.assertEqual(os.listdir(self.gitfs.file_list_cachedir), [])
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+'''
+Tests for salt.utils.histogram
+'''
+
+# Import python libs
+from __future__ import absolute_import, print_function, unicode_literals
+
+# Import Salt Testing libs
+from tests.support.unit import TestCase
+
+# Import Salt libs
+import salt.utils.histogram
+from salt.utils.histogram import CountHistogram, LatencyHistogram
+
+
+class LatencyHistogramTestCase(TestCase):
+    '''
+    Test the log-bucketed latency histogram
+    '''
+    def test_empty(self):
+        hist = LatencyHistogram()
+        self.assertEqual(hist.count, 0)
+        self.assertEqual(hist.mean, 0.0)
+        self.assertEqual(hist.percentile(99), 0.0)
+
+    def test_percentiles(self):
+        hist = LatencyHistogram()
+        for num in range(1, 1001):
+            hist.add(num / 1000.0)
+        self.assertEqual(hist.count, 1000)
+        self.assertAlmostEqual(hist.mean, 0.5005)
+        # Values are reported with the bucket's relative error
+        for pct in (50, 90, 99):
+            expected = pct / 100.0
+            self.assertTrue(expected <= hist.percentile(pct) <= expected * salt.utils.histogram.GROWTH)
+        self.assertEqual(hist.percentile(100), 1.0)
+        self.assertEqual(hist.percentile(0), hist.min)
+
+    def test_merge(self):
+        first = LatencyHistogram()
+        second = LatencyHistogram()
+        for num in range(100):
+            first.add(0.001)
+            second.add(1.0)
+        first.merge(second)
+        self.assertEqual(first.count, 200)
+        self.assertEqual(first.min, 0.001)
+        self.assertEqual(first.max, 1.0)
+        self.assertTrue(first.percentile(50) < 0.0011)
+        self.assertEqual(first.percentile(99), 1.0)
+
+    def test_roundtrip(self):
+        hist = LatencyHistogram()
+        for value in (0, 0.00001, 0.002, 0.3, 4.5):
+            hist.add(value)
+        copy = LatencyHistogram.from_dict(hist.to_dict())
+        self.assertEqual(copy.buckets, hist.buckets)
+        self.assertEqual(copy.summary(), hist.summary())
+
+    def test_merge_stats(self):
+        hist = LatencyHistogram()
+        hist.add(0.5)
+        worker = {'_pillar': {'runs': 1,
+                              'mean': 0.5,
+                              'wait': LatencyHistogram().to_dict(),
+                              'proc': hist.to_dict()}}
+        dest = salt.utils.histogram.merge_stats({}, worker)
+        salt.utils.histogram.merge_stats(dest, worker)
+        self.assertEqual(dest['_pillar']['runs'], 2)
+        self.assertEqual(dest['_pillar']['proc'].count, 2)
+        self.assertEqual(dest['_pillar']['wait'].count, 0)
+
+    def test_merge_stats_events(self):
+        events = CountHistogram()
+        events.add(25)
+        worker = {'_minion_event': {'runs': 1,
+                                    'mean': 0.01,
+                                    'wait': LatencyHistogram().to_dict(),
+                                    'proc': LatencyHistogram().to_dict(),
+                                    'events': events.to_dict()}}
+        dest = salt.utils.histogram.merge_stats({'_pillar': {'runs': 1}}, worker)
+        salt.utils.histogram.merge_stats(dest, worker)
+        self.assertNotIn('events', dest['_pillar'])
+        self.assertEqual(dest['_minion_event']['events'].count, 2)
+        self.assertEqual(dest['_minion_event']['events'].max, 25)
+        self.assertIsInstance(dest['_minion_event']['events'], CountHistogram)
+
+
+class CountHistogramTestCase(TestCase):
+    '''
+    Test the CountHistogram class
+    '''
+    def test_percentiles(self):
+        hist = CountHistogram()
+        for num in range(1, 11):
+            hist.add(num)
+        self.assertEqual(hist.count, 10)
+        self.assertEqual(hist.mean, 5.5)
+        self.assertEqual(hist.percentile(50), 5)
+        self.assertEqual(hist.percentile(90), 9)
+        self.assertEqual(hist.percentile(100), 10)
+
+    def test_roundtrip(self):
+        hist = CountHistogram()
+        for value in (0, 1, 1, 250):
+            hist.add(value)
+        copy = CountHistogram.from_dict(hist.to_dict())
+        self.assertIsInstance(copy, CountHistogram)
+        self.assertEqual(copy.buckets, hist.buckets)
+        self.assertEqual(copy.summary(), hist.summary())
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+'''
+Tests for salt.utils.minion
+'''
+
+# Import python libs
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+
+# Import Salt Testing libs
+from tests.support.unit import TestCase, skipIf
+from tests.support.mock import NO_MOCK, NO_MOCK_REASON, patch, MagicMock
+from tests.support.paths import TMP
+
+# Import Salt libs
+import salt.utils.minion
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class JobQueueTestCase(TestCase):
+    '''
+    Test the minion job queue
+    '''
+    def setUp(self):
+        if not os.path.isdir(TMP):
+            os.makedirs(TMP)
+        self.cachedir = tempfile.mkdtemp(dir=TMP)
+        self.running = []
+        patcher = patch('salt.utils.minion.running', MagicMock(side_effect=lambda opts: list(self.running)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.cachedir, ignore_errors=True)
+
+    def _queue(self, **opts):
+        opts.setdefault('cachedir', self.cachedir)
+        return salt.utils.minion.JobQueue(opts)
+
+    def test_disabled(self):
+        queue = self._queue(process_count_max=-1)
+        self.running = [{'jid': str(num), 'fun': 'test.sleep'} for num in range(100)]
+        data = {'jid': '1', 'fun': 'test.ping'}
+        self.assertEqual(queue.submit(data), [data])
+        self.assertEqual(len(queue), 0)
+
+    def test_process_count_max(self):
+        queue = self._queue(process_count_max=2)
+        jobs = [{'jid': str(num), 'fun': 'test.sleep'} for num in range(4)]
+        self.assertEqual(queue.submit(jobs[0]), [jobs[0]])
+        self.assertEqual(queue.submit(jobs[1]), [jobs[1]])
+        # Started jobs count even before their proc file exists
+        self.assertEqual(queue.submit(jobs[2]), [])
+        self.assertEqual(queue.submit(jobs[3]), [])
+        self.assertEqual(salt.utils.minion.queued({'cachedir': self.cachedir}), jobs[2:])
+
+        self.running = jobs[:2]
+        self.assertEqual(queue.ready(), [])
+        self.running = [jobs[1]]
+        self.assertEqual(queue.ready(), [jobs[2]])
+        self.running = []
+        # jobs[2] has not written its proc file yet
+        self.assertEqual(queue.ready(), [jobs[3]])
+        self.assertEqual(len(queue), 0)
+        self.assertEqual(salt.utils.minion.queued({'cachedir': self.cachedir}), [])
+
+    def test_function_max(self):
+        queue = self._queue(process_count_max=3, process_count_max_functions={'state.*': 1})
+        first = {'jid': '1', 'fun': 'state.apply'}
+        second = {'jid': '2', 'fun': 'state.highstate'}
+        ping = {'jid': '3', 'fun': ['test.ping', 'test.version']}
+        self.assertEqual(queue.submit(first), [first])
+        self.assertEqual(queue.submit(second), [])
+        # A job held back by a function limit does not delay other functions
+        self.assertEqual(queue.submit(ping), [ping])
+        self.running = [first, ping]
+        self.assertEqual(queue.ready(), [])
+        self.running = [ping]
+        self.assertEqual(queue.ready(), [second])
+
+    def test_exempt(self):
+        queue = self._queue(process_count_max=1)
+        self.running = [{'jid': '1', 'fun': 'test.sleep'}]
+        find_job = {'jid': '2', 'fun': 'saltutil.find_job'}
+        self.assertEqual(queue.submit(find_job), [find_job])
+
+    def test_queued_stale(self):
+        queue = self._queue(process_count_max=1)
+        self.running = [{'jid': '1', 'fun': 'test.sleep'}]
+        queue.submit({'jid': '2', 'fun': 'test.ping'})
+        with patch('salt.utils.process.os_is_running', MagicMock(return_value=False)):
+            self.assertEqual(salt.utils.minion.queued({'cachedir': self.cachedir}), [])
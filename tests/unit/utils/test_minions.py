@@ -4,6 +4,7 @@
 from __future__ import absolute_import
 
 # Import Salt Libs
+import salt.utils.bloom
 import salt.utils.minions as minions
 
 # Import Salt Testing Libs
@@ -41,6 +42,57 @@ class MinionsTestCase(TestCase):
             ret = minions.nodegroup_comp(nodegroup, NODEGROUPS)
             self.assertEqual(ret, expected)
 
+    def test_pub_target_filter(self):
+        '''
+        Test that the publication filter is only built when it is safe
+        '''
+        opts = {'pub_target_filter': True,
+                'pub_target_filter_types': ['glob', 'list']}
+        load = {'tgt': 'web*', 'tgt_type': 'glob'}
+        ret = minions.pub_target_filter(opts, load, ['web1', 'web2'])
+        self.assertTrue(salt.utils.bloom.check(ret, 'web1'))
+        self.assertTrue(salt.utils.bloom.check(ret, 'web2'))
+
+        # Broadcasts, untrusted target types and syndics get no filter
+        self.assertIsNone(minions.pub_target_filter(opts, {'tgt': '*', 'tgt_type': 'glob'}, ['web1']))
+        self.assertIsNone(minions.pub_target_filter(opts, {'tgt': 'os:Linux', 'tgt_type': 'grain'}, ['web1']))
+        self.assertIsNone(minions.pub_target_filter(dict(opts, order_masters=True), load, ['web1']))
+        self.assertIsNone(minions.pub_target_filter(dict(opts, pub_target_filter=False), load, ['web1']))
+        self.assertIsNone(minions.pub_target_filter(opts, load, None))
+
+    def test_running_jobs(self):
+        '''
+        Test that the running jobs table leaves out outdated heartbeats
+        '''
+        store = {}
+
+        def fetch(bank, key):
+            return store.get((bank, key), {})
+
+        def cache_store(bank, key, data):
+            store[(bank, key)] = data
+
+        cache = MagicMock()
+        cache.fetch.side_effect = fetch
+        cache.store.side_effect = cache_store
+        cache.list.return_value = ['web1', 'web2', 'web3']
+        jobs = {'20171020112600123456': {'fun': 'state.apply', 'pid': 1234, 'state': 'running'}}
+
+        with patch('time.time', MagicMock(return_value=1000)):
+            minions.store_running_jobs({}, 'web1', {'interval': 10, 'jobs': jobs}, cache=cache)
+            minions.store_running_jobs({}, 'web2', {'interval': 10, 'jobs': {}}, cache=cache)
+        with patch('time.time', MagicMock(return_value=1005)):
+            minions.store_running_jobs({}, 'web3', {'interval': 0, 'jobs': jobs}, cache=cache)
+
+        with patch('time.time', MagicMock(return_value=1020)):
+            ret = minions.running_jobs({}, cache=cache)
+            self.assertEqual(sorted(ret), ['web1', 'web2'])
+            self.assertEqual(ret['web1']['jobs'], jobs)
+            self.assertEqual(ret['web1']['time'], 1000)
+            self.assertEqual(list(minions.running_jobs({}, ['web2'], cache=cache)), ['web2'])
+        with patch('time.time', MagicMock(return_value=1031)):
+            self.assertEqual(minions.running_jobs({}, cache=cache), {})
+
 
 class CkMinionsTestCase(TestCase):
     '''
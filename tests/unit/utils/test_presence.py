@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+'''
+Tests for salt.utils.presence
+'''
+
+# Import python libs
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+import time
+
+# Import Salt Testing libs
+from tests.support.unit import TestCase, skipIf
+from tests.support.mock import NO_MOCK, NO_MOCK_REASON, patch, MagicMock
+from tests.support.paths import TMP
+
+# Import Salt libs
+import salt.utils.presence
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class PresenceTableTestCase(TestCase):
+    '''
+    Test the master's presence table
+    '''
+    def setUp(self):
+        if not os.path.isdir(TMP):
+            os.makedirs(TMP)
+        self.cachedir = tempfile.mkdtemp(dir=TMP)
+        self.opts = {'cachedir': self.cachedir, 'presence_table': True}
+
+    def tearDown(self):
+        shutil.rmtree(self.cachedir, ignore_errors=True)
+
+    def test_connect_disconnect(self):
+        now = time.time()
+        table = salt.utils.presence.PresenceTable(self.opts)
+        self.assertIsNone(salt.utils.presence.connected(self.opts))
+        table.connect('foo', now)
+        table.connect('bar', now)
+        table.write()
+        self.assertEqual(salt.utils.presence.connected(self.opts), set(['foo', 'bar']))
+        table.disconnect('bar', now + 1)
+        table.write()
+        self.assertEqual(salt.utils.presence.connected(self.opts), set(['foo']))
+        self.assertEqual(salt.utils.presence.connected(self.opts, ['bar', 'foo', 'baz']), set(['foo']))
+        self.assertEqual(salt.utils.presence.load(self.opts)['bar'],
+                         {'connected': now, 'disconnected': now + 1})
+
+    def test_prune(self):
+        table = salt.utils.presence.PresenceTable(self.opts)
+        table.connect('foo', 100)
+        table.disconnect('foo', 200)
+        table.connect('bar', 100)
+        table.write()
+        self.assertEqual(list(salt.utils.presence.load(self.opts)), ['bar'])
+
+    def test_update(self):
+        table = salt.utils.presence.PresenceTable(self.opts)
+        self.assertEqual(table.update(['foo', 'bar']), (set(['foo', 'bar']), set()))
+        table.write()
+        self.assertEqual(table.update(['foo', 'baz']), (set(['baz']), set(['bar'])))
+        # Nothing changed, nothing to write
+        table.write()
+        self.assertEqual(table.update(['foo', 'baz']), (set(), set()))
+        self.assertFalse(table.dirty)
+
+    def test_disabled(self):
+        salt.utils.presence.PresenceTable(self.opts).write()
+        self.opts['presence_table'] = False
+        self.assertIsNone(salt.utils.presence.connected(self.opts))
+
+    def test_stale(self):
+        table = salt.utils.presence.PresenceTable(self.opts)
+        table.connect('foo')
+        table.write()
+        with patch('salt.utils.process.os_is_running', MagicMock(return_value=False)):
+            self.assertIsNone(salt.utils.presence.connected(self.opts))
@@ -12,11 +12,13 @@ import multiprocessing
 from tests.support.unit import TestCase, skipIf
 from tests.support.mock import (
     patch,
+    MagicMock,
     NO_MOCK,
     NO_MOCK_REASON
 )
 
 # Import salt libs
+import salt.utils.platform
 import salt.utils.process
 
 # Import 3rd-party libs
@@ -167,6 +169,25 @@ class TestThreadPool(TestCase):
         # make sure the queue is still full
         self.assertEqual(pool._job_queue.qsize(), 1)
 
+    @skipIf(NO_MOCK, NO_MOCK_REASON)
+    def test_priority(self):
+        '''
+        Make sure the funcs with a higher priority run first and are timed
+        '''
+        calls = []
+        timer = MagicMock()
+        pool = salt.utils.process.ThreadPool(0, priority=True, timer=timer)
+        for name, priority in (('low', 0), ('high', 10), ('low2', 0)):
+            pool.fire_async(calls.append, args=(name,), priority=priority)
+        self.assertEqual(pool.qsize(), 3)
+        # Run the queued funcs in this thread
+        with patch.object(pool._job_queue, 'get',
+                          side_effect=[pool._job_queue.get_nowait()
+                                       for _ in range(3)] + [SystemExit]):
+            self.assertRaises(SystemExit, pool._thread_target)
+        self.assertEqual(calls, ['high', 'low', 'low2'])
+        self.assertEqual(timer.call_count, 3)
+
 
 class TestProcess(TestCase):
 
@@ -188,3 +209,39 @@ class TestProcess(TestCase):
             salt.utils.process.daemonize_if({})
             self.assertTrue(salt.utils.process.daemonize.called)
         # pylint: enable=assignment-from-none
+
+
+@skipIf(salt.utils.platform.is_windows(), 'Windows does not support fork')
+class TestForkServer(TestCase):
+
+    def test_warm_children(self):
+        results = multiprocessing.Queue()
+        state = {'warm': 0}
+
+        def warmup():
+            state['warm'] += 1
+
+        def target(num):
+            results.put((num, state['warm'], os.getpid()))
+            results.close()
+            results.join_thread()
+
+        server = salt.utils.process.ForkServer(target, warmup=warmup)
+        try:
+            for num in range(3):
+                self.assertTrue(server.submit(num))
+            ret = sorted(results.get(timeout=30) for _ in range(3))
+            # Every child sees the state of the template after a single warmup
+            self.assertEqual([item[:2] for item in ret], [(0, 1), (1, 1), (2, 1)])
+            self.assertEqual(len(set(item[2] for item in ret)), 3)
+            # The warmup ran in the template only
+            self.assertEqual(state['warm'], 0)
+
+            template = server.process.pid
+            server.stop()
+            self.assertFalse(server.is_alive())
+            self.assertTrue(server.submit(3))
+            self.assertEqual(results.get(timeout=30)[:2], (3, 1))
+            self.assertNotEqual(server.process.pid, template)
+        finally:
+            server.stop()
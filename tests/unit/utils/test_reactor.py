@@ -2,6 +2,7 @@
 
 from __future__ import absolute_import
 import codecs
+import fnmatch
 import glob
 import logging
 import os
@@ -379,6 +380,147 @@ WRAPPER_CALLS = {
 log = logging.getLogger(__name__)
 
 
+class TestReactorMap(TestCase):
+    '''
+    Tests for matching event tags against the compiled reactor map
+    '''
+    react_map = [
+        {'salt/minion/*/start': ['/srv/reactor/start.sls']},
+        {'salt/auth': '/srv/reactor/auth.sls'},
+        {'*/custom/[ab]': ['/srv/reactor/custom.sls']},
+        {'salt/minion/web?/start': ['/srv/reactor/web.sls', '/srv/reactor/web2.sls']},
+        {'salt/*': ['/srv/reactor/all.sls']},
+        {'ignored': 'one', 'too many': 'keys'},
+        {'salt/auth': ['/srv/reactor/auth2.sls']},
+    ]
+
+    def test_match(self):
+        rmap = reactor.ReactorMap(self.react_map)
+        for tag in ('salt/minion/web1/start', 'salt/auth', 'my/custom/a',
+                    'salt/job/20171011/ret/web1', 'salt', 'other', '',
+                    'my/custom/c', 'salt/minion/web1/start/more'):
+            expected = []
+            for ropt in self.react_map:
+                if len(ropt) != 1:
+                    continue
+                key, val = next(iter(ropt.items()))
+                if fnmatch.fnmatch(tag, key):
+                    expected.extend([val] if isinstance(val, str) else val)
+            self.assertEqual(rmap.match(tag), expected, tag)
+
+    def test_match_order(self):
+        rmap = reactor.ReactorMap(self.react_map)
+        self.assertEqual(rmap.match('salt/minion/web1/start'),
+                         ['/srv/reactor/start.sls', '/srv/reactor/web.sls',
+                          '/srv/reactor/web2.sls', '/srv/reactor/all.sls'])
+        self.assertEqual(rmap.match('salt/auth'),
+                         ['/srv/reactor/auth.sls', '/srv/reactor/all.sls',
+                          '/srv/reactor/auth2.sls'])
+        self.assertEqual(rmap.match('minion/web1/start'), [])
+
+    def test_empty(self):
+        self.assertEqual(reactor.ReactorMap(None).match('salt/auth'), [])
+
+
+class TestMergeLocalReactions(TestCase):
+    '''
+    Tests for merging the local reactions of a burst of events
+    '''
+    def _chunk(self, tgt, **kwargs):
+        chunk = {'state': 'local', '__id__': 'highstate', 'name': 'highstate',
+                 '__sls__': '/srv/reactor/start.sls', 'order': 1,
+                 'fun': 'state.apply', 'tgt': tgt}
+        chunk.update(kwargs)
+        return chunk
+
+    def test_merge(self):
+        chunks = [self._chunk('web1'),
+                  {'state': 'runner', '__id__': 'notify', 'fun': 'test.arg'},
+                  self._chunk('web2'),
+                  self._chunk('db*'),
+                  self._chunk('web1,web3', tgt_type='list'),
+                  self._chunk('web4', arg=['test=True'])]
+        merged = reactor.merge_local_reactions(chunks)
+        self.assertEqual(merged, [
+            self._chunk(['web1', 'web2', 'web3'], tgt_type='list'),
+            chunks[1],
+            chunks[3],
+            self._chunk(['web4'], tgt_type='list', arg=['test=True'])])
+        # The reactions are not changed
+        self.assertEqual(chunks[0]['tgt'], 'web1')
+
+
+class TestReactionLimits(TestCase):
+    '''
+    Test the priorities and rate limits of the reactor SLS files
+    '''
+    def setUp(self):
+        self.limits = reactor.ReactionLimits({
+            '/srv/reactor/highstate.sls': {'interval': 30, 'key': 'id'},
+            '/srv/reactor/alert/*.sls': {'interval': 60, 'limit': 2,
+                                         'priority': 10},
+        })
+
+    def tearDown(self):
+        del self.limits
+
+    def test_priority(self):
+        self.assertEqual(self.limits.priority('/srv/reactor/alert/disk.sls'), 10)
+        self.assertEqual(self.limits.priority('/srv/reactor/highstate.sls'), 0)
+        self.assertEqual(self.limits.priority('/srv/reactor/other.sls'), 0)
+
+    def test_allow(self):
+        sls = '/srv/reactor/highstate.sls'
+        self.assertTrue(self.limits.allow(sls, {'id': 'web1'}, now=100))
+        self.assertFalse(self.limits.allow(sls, {'id': 'web1'}, now=110))
+        # The limit applies per minion
+        self.assertTrue(self.limits.allow(sls, {'id': 'web2'}, now=110))
+        self.assertTrue(self.limits.allow(sls, {'id': 'web1'}, now=130))
+
+        sls = '/srv/reactor/alert/disk.sls'
+        self.assertTrue(self.limits.allow(sls, {'id': 'web1'}, now=100))
+        self.assertTrue(self.limits.allow(sls, {'id': 'web2'}, now=100))
+        self.assertFalse(self.limits.allow(sls, {'id': 'web3'}, now=159))
+
+        for _ in range(3):
+            self.assertTrue(self.limits.allow('/srv/reactor/other.sls', {}))
+
+    def test_prune(self):
+        sls = '/srv/reactor/highstate.sls'
+        self.limits.allow(sls, {'id': 'web1'}, now=100)
+        self.limits.allow(sls, {'id': 'web2'}, now=120)
+        self.limits.prune(now=140)
+        self.assertEqual(list(self.limits._runs), [(sls, repr(['web2']))])
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class TestReactorStats(TestCase):
+    '''
+    Test the statistics of the reactor
+    '''
+    def test_snapshot(self):
+        stats = reactor.ReactorStats()
+        pool = Mock(queue_size=100)
+        pool.qsize.return_value = 3
+        stats.incr('dropped')
+        stats.timer(1.0, 2.0, False)
+        stats.timer(3.0, 0.5, True)
+        ret = stats.snapshot(pool, reset=True)
+        self.assertEqual(ret['queue_depth'], 3)
+        self.assertEqual(ret['queue_size'], 100)
+        self.assertEqual(ret['interval']['dropped'], 1)
+        self.assertEqual(ret['interval']['executed'], 2)
+        self.assertEqual(ret['interval']['failed'], 1)
+        self.assertEqual(ret['interval']['wait'], {'mean': 2.0, 'max': 3.0})
+        self.assertEqual(ret['interval']['run'], {'mean': 1.25, 'max': 2.0})
+
+        ret = stats.snapshot(pool)
+        self.assertEqual(ret['interval']['dropped'], 0)
+        self.assertEqual(ret['interval']['wait'], {'mean': 0.0, 'max': 0.0})
+        self.assertEqual(ret['total']['dropped'], 1)
+        self.assertEqual(ret['total']['executed'], 2)
+
+
 @skipIf(NO_MOCK, NO_MOCK_REASON)
 class TestReactor(TestCase, AdaptedConfigurationTestCaseMixin):
     '''
@@ -487,7 +629,8 @@ class TestReactWrap(TestCase, AdaptedConfigurationTestCaseMixin):
                 self.wrap.run(chunk)
             thread_pool.fire_async.assert_called_with(
                 self.wrap.client_cache['runner'].low,
-                args=WRAPPER_CALLS[tag]
+                args=WRAPPER_CALLS[tag],
+                priority=0
             )
 
     def test_wheel(self):
@@ -503,7 +646,8 @@ class TestReactWrap(TestCase, AdaptedConfigurationTestCaseMixin):
                 self.wrap.run(chunk)
             thread_pool.fire_async.assert_called_with(
                 self.wrap.client_cache['wheel'].low,
-                args=WRAPPER_CALLS[tag]
+                args=WRAPPER_CALLS[tag],
+                priority=0
             )
 
     def test_local(self):
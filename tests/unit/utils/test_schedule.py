@@ -7,6 +7,7 @@
 from __future__ import absolute_import
 import os
 import copy
+import time
 
 # Import Salt Testing Libs
 from tests.support.unit import skipIf, TestCase
@@ -276,3 +277,94 @@ class ScheduleTestCase(TestCase):
         '''
         self.schedule.opts.update({'schedule': {}, 'pillar': {'schedule': ''}})
         self.assertRaises(ValueError, Schedule.eval, self.schedule)
+
+    def test_eval_due_jobs(self):
+        '''
+        Tests eval only evaluates the interval jobs when they are due
+        '''
+        self.schedule.opts.update({'multiprocessing': False, 'pillar': {}, 'schedule': {
+            'job1': {'function': 'test.ping', 'seconds': 10},
+            'job2': {'function': 'test.ping', 'seconds': 30}}})
+        with patch('salt.utils.schedule.threading.Thread') as thread, \
+                patch.object(self.schedule, '_plan', wraps=self.schedule._plan) as plan:
+            self.schedule.eval(now=1000)
+            self.assertEqual(plan.call_count, 4)
+            self.assertEqual(self.schedule.next_fire_time(), 1010)
+
+            plan.reset_mock()
+            self.schedule.eval(now=1005)
+            self.assertEqual(plan.call_count, 0)
+
+            self.schedule.eval(now=1010)
+            self.assertEqual([call[1]['args'][2]['name'] for call in thread.call_args_list],
+                             ['job1'])
+            self.assertEqual(plan.call_count, 2)
+            self.assertEqual(self.schedule.next_fire_time(), 1020)
+
+            thread.reset_mock()
+            self.schedule.eval(now=1030)
+            self.assertEqual(sorted(call[1]['args'][2]['name'] for call in thread.call_args_list),
+                             ['job1', 'job2'])
+            self.assertEqual(self.schedule.next_fire_time(), 1040)
+
+    def test_eval_failing_job(self):
+        '''
+        Tests a job failing does not keep the other due jobs from running
+        '''
+        self.schedule.opts.update({'multiprocessing': False, 'pillar': {}, 'schedule': {
+            'job1': {'function': 'test.ping', 'seconds': 10},
+            'job2': {'function': 'test.ping', 'seconds': 10}}})
+
+        def _thread(target, args):
+            if args[2]['name'] == 'job1':
+                raise RuntimeError('job1 failed')
+            return MagicMock()
+
+        with patch('salt.utils.schedule.threading.Thread') as thread:
+            self.schedule.eval(now=1000)
+            thread.reset_mock()
+            thread.side_effect = _thread
+            self.assertRaises(RuntimeError, self.schedule.eval, now=1010)
+            self.assertEqual(thread.call_count, 1)
+
+            thread.reset_mock()
+            thread.side_effect = None
+            self.schedule.eval(now=1011)
+            self.assertEqual([call[1]['args'][2]['name'] for call in thread.call_args_list],
+                             ['job2'])
+            self.assertEqual(self.schedule.next_fire_time(), 1020)
+
+    def test_next_fire_time_when(self):
+        '''
+        Tests the jobs evaluated every time make the next fire time now
+        '''
+        self.schedule.opts.update({'multiprocessing': False, 'pillar': {}, 'schedule': {
+            'job1': {'function': 'test.ping', 'seconds': 3600},
+            'job2': {'function': 'test.ping', 'run_explicit': [4102444800]}}})
+        with patch('salt.utils.schedule.threading.Thread'):
+            self.schedule.eval()
+            self.assertLessEqual(self.schedule.next_fire_time(), time.time())
+
+            self.schedule.delete_job('job2', persist=False)
+            self.schedule.eval()
+            self.assertGreater(self.schedule.next_fire_time(), time.time() + 3000)
+
+    def test_eval_changed_schedule(self):
+        '''
+        Tests eval evaluates all the jobs again when the schedule changes
+        '''
+        self.schedule.opts.update({'multiprocessing': False, 'pillar': {}, 'schedule': {
+            'job1': {'function': 'test.ping', 'seconds': 10}}})
+        with patch('salt.utils.schedule.threading.Thread') as thread:
+            self.schedule.eval(now=1000)
+            self.schedule.disable_job('job1', persist=False)
+            self.schedule.eval(now=1010)
+            self.assertEqual(thread.call_count, 0)
+            self.assertIsNone(self.schedule.next_fire_time())
+
+            self.schedule.enable_job('job1', persist=False)
+            self.schedule.opts['schedule']['job2'] = {'function': 'test.ping', 'seconds': 5}
+            self.schedule.eval(now=1010)
+            self.assertEqual([call[1]['args'][2]['name'] for call in thread.call_args_list],
+                             ['job1'])
+            self.assertEqual(self.schedule.next_fire_time(), 1015)
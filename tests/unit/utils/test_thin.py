@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+'''
+Tests for salt.utils.thin
+'''
+
+# Import python libs
+from __future__ import absolute_import
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+
+# Import Salt Testing libs
+from tests.support.unit import TestCase, skipIf
+from tests.support.mock import NO_MOCK, NO_MOCK_REASON, patch, MagicMock
+from tests.support.paths import TMP
+
+# Import Salt libs
+import salt.utils.files
+import salt.utils.thin as thin
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class ThinBuildTestCase(TestCase):
+    '''
+    Test the reproducible thin builds
+    '''
+    def setUp(self):
+        if not os.path.isdir(TMP):
+            os.makedirs(TMP)
+        self.tmpdir = tempfile.mkdtemp(dir=TMP)
+        self.thindir = os.path.join(self.tmpdir, 'thin')
+        os.makedirs(self.thindir)
+        pkg = os.path.join(self.tmpdir, 'site', 'pkg')
+        os.makedirs(os.path.join(pkg, 'sub'))
+        for name, data in (('__init__.py', 'import os\n'),
+                           ('__init__.pyc', 'bytecode'),
+                           ('sub/mod.py', 'x = 1\n' * 100000)):
+            with salt.utils.files.fopen(os.path.join(pkg, name), 'w') as fp_:
+                fp_.write(data)
+        self.single = os.path.join(self.tmpdir, 'site', 'single.py')
+        with salt.utils.files.fopen(self.single, 'w') as fp_:
+            fp_.write('y = 2\n')
+        self.tops = {'2': [pkg, self.single], '3': [pkg]}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+        del self.tmpdir
+        del self.thindir
+        del self.single
+        del self.tops
+
+    def _build(self, compress='gzip', threads=2):
+        files = thin._thin_files(self.tops)
+        out = io.BytesIO()
+        if compress == 'gzip':
+            thin._write_tgz(out, files, threads)
+        else:
+            thin._write_zip(out, files)
+        return out.getvalue()
+
+    def test_thin_files(self):
+        files = thin._thin_files(self.tops)
+        self.assertEqual([arcname for arcname, _ in files],
+                         [os.path.join('py2', 'pkg', '__init__.py'),
+                          os.path.join('py2', 'pkg', 'sub', 'mod.py'),
+                          os.path.join('py2', 'single.py'),
+                          os.path.join('py3', 'pkg', '__init__.py'),
+                          os.path.join('py3', 'pkg', 'sub', 'mod.py')])
+
+    def test_reproducible(self):
+        first = self._build()
+        os.utime(self.single, (0, 0))
+        # The output does not depend on the modification times or the
+        # number of threads
+        self.assertEqual(self._build(threads=1), first)
+        self.assertEqual(self._build(compress='zip'), self._build(compress='zip'))
+
+        with tarfile.open(fileobj=io.BytesIO(first), mode='r:gz') as tfp:
+            members = tfp.getmembers()
+            self.assertEqual(set(member.mtime for member in members), set([thin.THIN_MTIME]))
+            mod = tfp.extractfile(os.path.join('py3', 'pkg', 'sub', 'mod.py')).read()
+        self.assertEqual(mod, b'x = 1\n' * 100000)
+
+    def test_source_date_epoch(self):
+        with patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '1500000000'}):
+            data = self._build(compress='zip')
+        with zipfile.ZipFile(io.BytesIO(data)) as zfp:
+            self.assertEqual(zfp.infolist()[0].date_time[0], 2017)
+
+    def test_index(self):
+        files = thin._thin_files(self.tops)
+        index = thin._thin_index(self.thindir, files, 'gzip')
+        thin._write_index(self.thindir, index)
+        # Unchanged files are not read again
+        with patch('salt.utils.hashutils.get_hash', MagicMock()) as get_hash:
+            self.assertEqual(thin._thin_index(self.thindir, files, 'gzip'), index)
+            self.assertFalse(get_hash.called)
+
+        with salt.utils.files.fopen(self.single, 'w') as fp_:
+            fp_.write('y = 3\n')
+        os.utime(self.single, (1, 1))
+        new = thin._thin_index(self.thindir, files, 'gzip')
+        self.assertNotEqual(new['digest'], index['digest'])
+        self.assertNotEqual(thin._thin_index(self.thindir, files, 'zip')['digest'],
+                            new['digest'])